@@ -1,4 +1,5 @@
 from .config import AsterTradingConfig
+from .ledger import AsterLedger
 from .service import AsterManualTradingService
 
-__all__ = ["AsterTradingConfig", "AsterManualTradingService"]
+__all__ = ["AsterTradingConfig", "AsterLedger", "AsterManualTradingService"]
@@ -1,13 +1,33 @@
 import hashlib
 import hmac
+import json
+import threading
 import time
-from decimal import Decimal, ROUND_DOWN
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlencode
 
 import requests
 
+from app.metrics import REGISTRY, upstream_probe
+from app.upstream import backoff, timeout_for
+
 from .config import AsterTradingConfig
+from .filters import quantizer
+
+
+SIGNED_REJECTS = REGISTRY.counter(
+    "aster_signed_rejects_total",
+    "Signed ASTER requests rejected by the exchange, by error code.",
+    ("code",),
+)
+REQUEST_RETRIES = REGISTRY.counter(
+    "aster_request_retries_total",
+    "ASTER trade request retries by reason.",
+    ("reason",),
+)
+TIME_OFFSET_MS = REGISTRY.gauge("aster_server_time_offset_ms", "ASTER server time minus local time (ms).")
+
+TIMESTAMP_ERROR_CODE = -1021
 
 
 class AsterTradeError(Exception):
@@ -18,6 +38,8 @@ class AsterTradeError(Exception):
 
 
 class AsterTradeClient:
+    TIME_SYNC_SECONDS = 300.0
+
     def __init__(self, config: AsterTradingConfig) -> None:
         self.config = config
         self.base_url = config.api_base_url.rstrip("/")
@@ -26,13 +48,50 @@ class AsterTradeClient:
             "Accept": "application/json",
             "User-Agent": "zzCatBoktoshiTradingBot-ASTER/1.0",
         })
+        self._hmac = hmac.new(config.api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._signed_headers = {"X-MBX-APIKEY": config.api_key}
+        self._recv_window_param = f"recvWindow={int(config.recv_window_ms)}"
+        self.time_offset_ms = 0
+        self._time_synced_at = 0.0
+        self._time_lock = threading.Lock()
 
     def _sign(self, query: str) -> str:
-        return hmac.new(
-            self.config.api_secret.encode("utf-8"),
-            query.encode("utf-8"),
-            hashlib.sha256,
-        ).hexdigest()
+        mac = self._hmac.copy()
+        mac.update(query.encode("utf-8"))
+        return mac.hexdigest()
+
+    def sync_server_time(self) -> int:
+        started = time.time()
+        data = self._request("GET", "/fapi/v1/time", retries=0)
+        finished = time.time()
+        server_time = int(data.get("serverTime", 0)) if isinstance(data, dict) else 0
+        if server_time > 0:
+            self.time_offset_ms = int(server_time - (started + finished) * 500)
+            TIME_OFFSET_MS.set(self.time_offset_ms)
+        self._time_synced_at = finished
+        return self.time_offset_ms
+
+    def _maybe_sync_server_time(self, force: bool = False) -> None:
+        if not force and time.time() - self._time_synced_at < self.TIME_SYNC_SECONDS:
+            return
+        with self._time_lock:
+            if not force and time.time() - self._time_synced_at < self.TIME_SYNC_SECONDS:
+                return
+            try:
+                self.sync_server_time()
+            except (requests.RequestException, AsterTradeError):
+                self._time_synced_at = time.time()
+
+    def _build_query(self, params: Dict[str, Any], signed: bool) -> str:
+        query = urlencode(params, doseq=True)
+        if not signed:
+            return query
+        parts = [query] if query else []
+        if "recvWindow" not in params:
+            parts.append(self._recv_window_param)
+        parts.append(f"timestamp={int(time.time() * 1000) + self.time_offset_ms}")
+        query = "&".join(parts)
+        return f"{query}&signature={self._sign(query)}"
 
     def _request(
         self,
@@ -43,28 +102,38 @@ class AsterTradeClient:
         retries: int = 2,
     ) -> Any:
         url = f"{self.base_url}{path}"
-        payload: Dict[str, Any] = dict(params or {})
-        headers = {}
+        payload: Dict[str, Any] = params or {}
+        in_body = method.upper() in {"POST", "PUT"}
+        headers: Dict[str, str] = {}
         if signed:
             if not self.config.api_key or not self.config.api_secret:
                 raise AsterTradeError("ASTER API credentials are missing.")
-            payload["timestamp"] = int(time.time() * 1000)
-            payload.setdefault("recvWindow", self.config.recv_window_ms)
-            query = urlencode(payload, doseq=True)
-            payload["signature"] = self._sign(query)
-            headers["X-MBX-APIKEY"] = self.config.api_key
+            self._maybe_sync_server_time()
+            headers = self._signed_headers
+        if in_body:
+            headers = {**headers, "Content-Type": "application/x-www-form-urlencoded"}
 
         last_error: Optional[Exception] = None
-        for attempt in range(retries + 1):
+        resynced = False
+        probe = upstream_probe("aster_trade", path)
+        attempt = 0
+        while attempt <= retries:
+            query = self._build_query(payload, signed)
             try:
-                response = self.session.request(
-                    method=method,
-                    url=url,
-                    params=payload if method.upper() in {"GET", "DELETE"} else None,
-                    data=payload if method.upper() in {"POST", "PUT"} else None,
-                    headers=headers,
-                    timeout=15,
-                )
+                try:
+                    with probe.time():
+                        response = self.session.request(
+                            method=method,
+                            url=url,
+                            params=None if in_body else query,
+                            data=query if in_body else None,
+                            headers=headers,
+                            timeout=timeout_for(15),
+                        )
+                except requests.RequestException:
+                    probe.record(0)
+                    raise
+                probe.record(response.status_code)
                 if response.status_code >= 400:
                     code = 0
                     message = response.text
@@ -74,14 +143,23 @@ class AsterTradeClient:
                         message = body.get("msg", message)
                     except Exception:
                         pass
+                    if signed:
+                        SIGNED_REJECTS.inc(1, code)
                     raise AsterTradeError(message=message, code=code, status_code=response.status_code)
                 return response.json()
             except (requests.RequestException, AsterTradeError) as exc:
                 last_error = exc
+                if isinstance(exc, AsterTradeError) and exc.code == TIMESTAMP_ERROR_CODE and signed and not resynced:
+                    resynced = True
+                    REQUEST_RETRIES.inc(1, "timestamp")
+                    self._maybe_sync_server_time(force=True)
+                    continue
                 if isinstance(exc, AsterTradeError) and exc.status_code < 500 and exc.status_code not in {429}:
                     raise
                 if attempt < retries:
-                    time.sleep(0.4 * (attempt + 1))
+                    REQUEST_RETRIES.inc(1, "rate_limit" if getattr(exc, "status_code", 0) == 429 else "transient")
+                    backoff(0.4 * (attempt + 1))
+                    attempt += 1
                     continue
                 if isinstance(exc, AsterTradeError):
                     raise
@@ -104,39 +182,65 @@ class AsterTradeClient:
         data = self._request("GET", "/fapi/v2/balance", signed=True)
         return data if isinstance(data, list) else []
 
-    def get_positions(self, symbol: str) -> List[Dict[str, Any]]:
-        data = self._request("GET", "/fapi/v2/positionRisk", params={"symbol": symbol}, signed=True)
+    def get_positions(self, symbol: str = "") -> List[Dict[str, Any]]:
+        params = {"symbol": symbol} if symbol else {}
+        data = self._request("GET", "/fapi/v2/positionRisk", params=params, signed=True)
         return data if isinstance(data, list) else []
 
-    def get_open_orders(self, symbol: str) -> List[Dict[str, Any]]:
-        data = self._request("GET", "/fapi/v1/openOrders", params={"symbol": symbol}, signed=True)
+    def get_open_orders(self, symbol: str = "") -> List[Dict[str, Any]]:
+        params = {"symbol": symbol} if symbol else {}
+        data = self._request("GET", "/fapi/v1/openOrders", params=params, signed=True)
         return data if isinstance(data, list) else []
 
-    def get_all_orders(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
-        data = self._request(
-            "GET",
-            "/fapi/v1/allOrders",
-            params={"symbol": symbol, "limit": max(1, min(limit, 1000))},
-            signed=True,
+    @staticmethod
+    def _cursor_params(params: Dict[str, Any], **cursors: Optional[int]) -> Dict[str, Any]:
+        for key, value in cursors.items():
+            if value is not None:
+                params[key] = int(value)
+        return params
+
+    def get_all_orders(
+        self,
+        symbol: str,
+        limit: int = 100,
+        order_id: Optional[int] = None,
+        start_time: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        params = self._cursor_params(
+            {"symbol": symbol, "limit": max(1, min(limit, 1000))}, orderId=order_id, startTime=start_time
         )
+        data = self._request("GET", "/fapi/v1/allOrders", params=params, signed=True)
         return data if isinstance(data, list) else []
 
-    def get_user_trades(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
-        data = self._request(
-            "GET",
-            "/fapi/v1/userTrades",
-            params={"symbol": symbol, "limit": max(1, min(limit, 1000))},
-            signed=True,
+    def get_user_trades(
+        self,
+        symbol: str,
+        limit: int = 100,
+        from_id: Optional[int] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        params = self._cursor_params(
+            {"symbol": symbol, "limit": max(1, min(limit, 1000))},
+            fromId=from_id,
+            startTime=start_time,
+            endTime=end_time,
         )
+        data = self._request("GET", "/fapi/v1/userTrades", params=params, signed=True)
         return data if isinstance(data, list) else []
 
-    def get_income(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
-        data = self._request(
-            "GET",
-            "/fapi/v1/income",
-            params={"symbol": symbol, "limit": max(1, min(limit, 1000))},
-            signed=True,
-        )
+    def get_income(
+        self,
+        symbol: str,
+        limit: int = 100,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        page: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"symbol": symbol} if symbol else {}
+        params["limit"] = max(1, min(limit, 1000))
+        params = self._cursor_params(params, startTime=start_time, endTime=end_time, page=page)
+        data = self._request("GET", "/fapi/v1/income", params=params, signed=True)
         return data if isinstance(data, list) else []
 
     def set_leverage(self, symbol: str, leverage: int) -> Dict[str, Any]:
@@ -152,6 +256,17 @@ class AsterTradeClient:
         data = self._request("POST", "/fapi/v1/order", params=params, signed=True)
         return data if isinstance(data, dict) else {}
 
+    def place_batch_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        batch = [{key: str(value) for key, value in order.items()} for order in orders]
+        data = self._request(
+            "POST",
+            "/fapi/v1/batchOrders",
+            params={"batchOrders": json.dumps(batch, separators=(",", ":"))},
+            signed=True,
+            retries=0,
+        )
+        return data if isinstance(data, list) else []
+
     def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
         data = self._request(
             "DELETE",
@@ -172,18 +287,8 @@ class AsterTradeClient:
 
 
 def floor_to_step(value: float, step_size: str) -> float:
-    step = Decimal(step_size)
-    if step <= 0:
-        return value
-    decimal_value = Decimal(str(value))
-    normalized = (decimal_value / step).to_integral_value(rounding=ROUND_DOWN) * step
-    return float(normalized)
+    return quantizer(str(step_size)).floor(value)
 
 
 def round_to_tick(value: float, tick_size: str) -> float:
-    tick = Decimal(tick_size)
-    if tick <= 0:
-        return value
-    decimal_value = Decimal(str(value))
-    normalized = (decimal_value / tick).to_integral_value(rounding=ROUND_DOWN) * tick
-    return float(normalized)
+    return quantizer(str(tick_size)).floor(value)
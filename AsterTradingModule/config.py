@@ -24,3 +24,6 @@ class AsterTradingConfig:
     max_open_positions: int = int(os.getenv("ASTER_MAX_OPEN_POSITIONS", "2"))
     recv_window_ms: int = int(os.getenv("ASTER_RECV_WINDOW_MS", "5000"))
     dry_run: bool = _env_bool("ASTER_DRY_RUN", True)
+    batch_orders: bool = _env_bool("ASTER_BATCH_ORDERS", True)
+    ledger_lookback_days: int = int(os.getenv("ASTER_LEDGER_LOOKBACK_DAYS", "30"))
+    ledger_sync_seconds: float = float(os.getenv("ASTER_LEDGER_SYNC_SECONDS", "60"))
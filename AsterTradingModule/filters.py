@@ -0,0 +1,98 @@
+from decimal import ROUND_DOWN, Decimal
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class Quantizer:
+    __slots__ = ("text", "step", "_exponent")
+
+    def __init__(self, step_text: str) -> None:
+        self.text = str(step_text)
+        self.step = Decimal(self.text)
+        self._exponent: Optional[Decimal] = None
+        if self.step > 0:
+            normalized = self.step.normalize()
+            if normalized.as_tuple().digits == (1,):
+                self._exponent = normalized
+
+    def floor(self, value: float) -> float:
+        if self.step <= 0:
+            return value
+        decimal_value = Decimal(str(value))
+        if self._exponent is not None:
+            return float(decimal_value.quantize(self._exponent, rounding=ROUND_DOWN))
+        return float((decimal_value / self.step).to_integral_value(rounding=ROUND_DOWN) * self.step)
+
+
+@lru_cache(maxsize=512)
+def quantizer(step_text: str) -> Quantizer:
+    return Quantizer(step_text)
+
+
+class SymbolFilters:
+    __slots__ = ("symbol", "step", "tick", "min_qty", "min_notional")
+
+    def __init__(
+        self,
+        symbol: str,
+        step_size: str = "0.001",
+        tick_size: str = "0.01",
+        min_qty: float = 0.0,
+        min_notional: float = 0.0,
+    ) -> None:
+        self.symbol = symbol
+        self.step = quantizer(step_size)
+        self.tick = quantizer(tick_size)
+        self.min_qty = min_qty
+        self.min_notional = min_notional
+
+    def floor_qty(self, value: float) -> float:
+        return self.step.floor(value)
+
+    def round_price(self, value: float) -> float:
+        return self.tick.floor(value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "step_size": self.step.text,
+            "tick_size": self.tick.text,
+            "min_qty": self.min_qty,
+            "min_notional": self.min_notional,
+        }
+
+
+def parse_symbol_filters(info: Dict[str, Any]) -> SymbolFilters:
+    step_size = "0.001"
+    tick_size = "0.01"
+    min_qty = 0.0
+    min_notional = 0.0
+    for item in info.get("filters", []):
+        if not isinstance(item, dict):
+            continue
+        filter_type = item.get("filterType")
+        if filter_type in {"LOT_SIZE", "MARKET_LOT_SIZE"}:
+            step_size = item.get("stepSize", step_size)
+            min_qty = max(min_qty, _to_float(item.get("minQty"), 0.0))
+        elif filter_type == "PRICE_FILTER":
+            tick_size = item.get("tickSize", tick_size)
+        elif filter_type in {"MIN_NOTIONAL", "NOTIONAL"}:
+            min_notional = max(min_notional, _to_float(item.get("notional"), 0.0))
+            min_notional = max(min_notional, _to_float(item.get("minNotional"), 0.0))
+    return SymbolFilters(str(info.get("symbol", "")).upper(), step_size, tick_size, min_qty, min_notional)
+
+
+def build_filter_index(exchange_info: Dict[str, Any]) -> Dict[str, SymbolFilters]:
+    symbols = exchange_info.get("symbols", []) if isinstance(exchange_info, dict) else []
+    index: Dict[str, SymbolFilters] = {}
+    for info in symbols:
+        if isinstance(info, dict) and info.get("symbol"):
+            filters = parse_symbol_filters(info)
+            index[filters.symbol] = filters
+    return index
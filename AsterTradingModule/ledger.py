@@ -0,0 +1,481 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .client import AsterTradeClient, AsterTradeError
+
+PAGE_LIMIT = 1000
+DAY_MS = 86_400_000
+TRADE_WINDOW_MS = 7 * DAY_MS
+FINAL_ORDER_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def init_ledger(db_path: str) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS aster_fills (
+                id INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                order_id INTEGER,
+                side TEXT,
+                position_side TEXT,
+                price REAL,
+                qty REAL,
+                quote_qty REAL,
+                realized_pnl REAL,
+                commission REAL,
+                commission_asset TEXT,
+                maker INTEGER,
+                time INTEGER NOT NULL,
+                PRIMARY KEY (symbol, id)
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_aster_fills_time ON aster_fills (time)")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS aster_income (
+                tran_id TEXT NOT NULL,
+                income_type TEXT NOT NULL,
+                symbol TEXT,
+                income REAL NOT NULL,
+                asset TEXT,
+                info TEXT,
+                trade_id TEXT,
+                time INTEGER NOT NULL,
+                PRIMARY KEY (tran_id, income_type)
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_aster_income_time ON aster_income (time)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_aster_income_symbol_time ON aster_income (symbol, time)")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS aster_orders (
+                order_id INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                client_order_id TEXT,
+                side TEXT,
+                type TEXT,
+                status TEXT,
+                price REAL,
+                avg_price REAL,
+                orig_qty REAL,
+                executed_qty REAL,
+                reduce_only INTEGER,
+                time INTEGER,
+                update_time INTEGER,
+                raw TEXT,
+                PRIMARY KEY (symbol, order_id)
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_aster_orders_update ON aster_orders (symbol, update_time)")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS aster_sync_state (
+                stream TEXT PRIMARY KEY,
+                cursor INTEGER NOT NULL,
+                synced_at INTEGER NOT NULL
+            )
+            """
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def upsert_fills(db_path: str, rows: List[Dict[str, Any]]) -> int:
+    values = [
+        (
+            int(r.get("id", 0)),
+            str(r.get("symbol", "")),
+            int(r.get("orderId", 0) or 0),
+            r.get("side"),
+            r.get("positionSide"),
+            _to_float(r.get("price")),
+            _to_float(r.get("qty")),
+            _to_float(r.get("quoteQty")),
+            _to_float(r.get("realizedPnl")),
+            _to_float(r.get("commission")),
+            r.get("commissionAsset"),
+            1 if r.get("maker") else 0,
+            int(r.get("time", 0) or 0),
+        )
+        for r in rows
+    ]
+    return _executemany(db_path, "INSERT OR REPLACE INTO aster_fills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+
+
+def upsert_income(db_path: str, rows: List[Dict[str, Any]]) -> int:
+    values = [
+        (
+            str(r.get("tranId", "")),
+            str(r.get("incomeType", "")),
+            r.get("symbol") or "",
+            _to_float(r.get("income")),
+            r.get("asset"),
+            r.get("info"),
+            str(r.get("tradeId", "") or ""),
+            int(r.get("time", 0) or 0),
+        )
+        for r in rows
+    ]
+    return _executemany(db_path, "INSERT OR REPLACE INTO aster_income VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values)
+
+
+def _income_key(row: Dict[str, Any]) -> Tuple[str, str]:
+    return str(row.get("tranId", "")), str(row.get("incomeType", ""))
+
+
+def upsert_orders(db_path: str, rows: List[Dict[str, Any]]) -> int:
+    values = [
+        (
+            int(r.get("orderId", 0)),
+            str(r.get("symbol", "")),
+            r.get("clientOrderId"),
+            r.get("side"),
+            r.get("type"),
+            r.get("status"),
+            _to_float(r.get("price")),
+            _to_float(r.get("avgPrice")),
+            _to_float(r.get("origQty")),
+            _to_float(r.get("executedQty")),
+            1 if str(r.get("reduceOnly", "")).lower() == "true" else 0,
+            int(r.get("time", 0) or 0),
+            int(r.get("updateTime", 0) or 0),
+            json.dumps(r),
+        )
+        for r in rows
+    ]
+    return _executemany(
+        db_path, "INSERT OR REPLACE INTO aster_orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values
+    )
+
+
+def _executemany(db_path: str, sql: str, values: List[tuple]) -> int:
+    if not values:
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(sql, values)
+        conn.commit()
+        return len(values)
+    finally:
+        conn.close()
+
+
+def _scalar(db_path: str, sql: str, params: tuple = ()) -> Any:
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def _set_sync_state(db_path: str, stream: str, cursor: int) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO aster_sync_state (stream, cursor, synced_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(stream) DO UPDATE SET cursor=excluded.cursor, synced_at=excluded.synced_at",
+            (stream, int(cursor), int(time.time())),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_sync_state(db_path: str) -> Dict[str, Dict[str, int]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT stream, cursor, synced_at FROM aster_sync_state").fetchall()
+        return {row[0]: {"cursor": row[1], "synced_at": row[2]} for row in rows}
+    finally:
+        conn.close()
+
+
+def get_fills(db_path: str, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT id, symbol, order_id, side, position_side, price, qty, quote_qty, realized_pnl, commission, "
+            "commission_asset, maker, time FROM aster_fills WHERE symbol=? ORDER BY time DESC, id DESC LIMIT ?",
+            (symbol, limit),
+        ).fetchall()
+        return [
+            {
+                "id": row[0],
+                "symbol": row[1],
+                "orderId": row[2],
+                "side": row[3],
+                "positionSide": row[4],
+                "price": row[5],
+                "qty": row[6],
+                "quoteQty": row[7],
+                "realizedPnl": row[8],
+                "commission": row[9],
+                "commissionAsset": row[10],
+                "maker": bool(row[11]),
+                "time": row[12],
+            }
+            for row in rows
+        ]
+    finally:
+        conn.close()
+
+
+def get_income(db_path: str, symbol: str = "", limit: int = 100) -> List[Dict[str, Any]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        sql = "SELECT tran_id, income_type, symbol, income, asset, info, trade_id, time FROM aster_income"
+        params: tuple = ()
+        if symbol:
+            sql += " WHERE symbol=?"
+            params = (symbol,)
+        rows = conn.execute(f"{sql} ORDER BY time DESC LIMIT ?", params + (limit,)).fetchall()
+        return [
+            {
+                "tranId": row[0],
+                "incomeType": row[1],
+                "symbol": row[2],
+                "income": row[3],
+                "asset": row[4],
+                "info": row[5],
+                "tradeId": row[6],
+                "time": row[7],
+            }
+            for row in rows
+        ]
+    finally:
+        conn.close()
+
+
+def get_daily_pnl(db_path: str, symbol: str = "", days: int = 30) -> List[Dict[str, Any]]:
+    since = int(time.time() * 1000) - max(int(days), 1) * DAY_MS
+    sql = (
+        "SELECT date(time / 1000, 'unixepoch') AS day, "
+        "SUM(CASE WHEN income_type='REALIZED_PNL' THEN income ELSE 0 END), "
+        "SUM(CASE WHEN income_type='COMMISSION' THEN income ELSE 0 END), "
+        "SUM(CASE WHEN income_type='FUNDING_FEE' THEN income ELSE 0 END), "
+        "SUM(income), COUNT(*) "
+        "FROM aster_income WHERE time >= ?"
+    )
+    params: tuple = (since,)
+    if symbol:
+        sql += " AND symbol=?"
+        params += (symbol,)
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(f"{sql} GROUP BY day ORDER BY day", params).fetchall()
+        return [
+            {
+                "day": row[0],
+                "realized_pnl": row[1],
+                "fees": row[2],
+                "funding": row[3],
+                "net": row[4],
+                "entries": row[5],
+            }
+            for row in rows
+        ]
+    finally:
+        conn.close()
+
+
+class AsterLedger:
+    def __init__(
+        self,
+        client: AsterTradeClient,
+        db_path: str,
+        symbols: List[str],
+        lookback_days: int = 30,
+        sync_seconds: float = 60.0,
+    ) -> None:
+        self.client = client
+        self.db_path = db_path
+        self.symbols = [s.upper() for s in symbols]
+        self.lookback_days = lookback_days
+        self.sync_seconds = sync_seconds
+        self.ready = False
+        self.last_error = ""
+        self.last_sync: Dict[str, Any] = {}
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        init_ledger(db_path)
+
+    def _bootstrap_start(self) -> int:
+        return int(time.time() * 1000) - self.lookback_days * DAY_MS
+
+    def sync_fills(self, symbol: str) -> int:
+        last_id = _scalar(self.db_path, "SELECT MAX(id) FROM aster_fills WHERE symbol=?", (symbol,))
+        added = 0
+        if last_id is None:
+            now_ms = int(time.time() * 1000)
+            window_start = self._bootstrap_start()
+            while window_start < now_ms:
+                window_end = min(window_start + TRADE_WINDOW_MS, now_ms)
+                rows = self.client.get_user_trades(symbol, PAGE_LIMIT, start_time=window_start, end_time=window_end)
+                added += upsert_fills(self.db_path, rows)
+                if len(rows) >= PAGE_LIMIT:
+                    break
+                window_start = window_end + 1
+            last_id = _scalar(self.db_path, "SELECT MAX(id) FROM aster_fills WHERE symbol=?", (symbol,))
+            if last_id is None:
+                _set_sync_state(self.db_path, f"fills:{symbol}", 0)
+                return added
+        while True:
+            rows = self.client.get_user_trades(symbol, PAGE_LIMIT, from_id=int(last_id) + 1)
+            added += upsert_fills(self.db_path, rows)
+            if not rows:
+                break
+            last_id = max(int(r.get("id", 0)) for r in rows)
+            if len(rows) < PAGE_LIMIT:
+                break
+        _set_sync_state(self.db_path, f"fills:{symbol}", int(last_id))
+        return added
+
+    def sync_income(self) -> int:
+        last_time = _scalar(self.db_path, "SELECT MAX(time) FROM aster_income")
+        start_time = int(last_time) if last_time is not None else self._bootstrap_start()
+        added = 0
+        seen: Set[Tuple[str, str]] = set()
+        while True:
+            rows = self.client.get_income("", PAGE_LIMIT, start_time=start_time)
+            added += upsert_income(self.db_path, [r for r in rows if _income_key(r) not in seen])
+            if len(rows) < PAGE_LIMIT:
+                break
+            next_start = max(int(r.get("time", 0) or 0) for r in rows)
+            if next_start <= start_time:
+                seen.update(_income_key(r) for r in rows)
+                page = 2
+                while len(rows) >= PAGE_LIMIT:
+                    rows = self.client.get_income("", PAGE_LIMIT, start_time=start_time, end_time=start_time, page=page)
+                    fresh = [r for r in rows if _income_key(r) not in seen]
+                    if not fresh:
+                        break
+                    added += upsert_income(self.db_path, fresh)
+                    seen.update(_income_key(r) for r in fresh)
+                    page += 1
+                next_start, seen = start_time + 1, set()
+            else:
+                seen = {_income_key(r) for r in rows if int(r.get("time", 0) or 0) == next_start}
+            start_time = next_start
+        _set_sync_state(self.db_path, "income", start_time)
+        return added
+
+    def sync_orders(self, symbol: str) -> int:
+        placeholders = ",".join("?" for _ in FINAL_ORDER_STATUSES)
+        open_min = _scalar(
+            self.db_path,
+            f"SELECT MIN(order_id) FROM aster_orders WHERE symbol=? AND status NOT IN ({placeholders})",
+            (symbol,) + FINAL_ORDER_STATUSES,
+        )
+        last_id = open_min if open_min is not None else _scalar(
+            self.db_path, "SELECT MAX(order_id) FROM aster_orders WHERE symbol=?", (symbol,)
+        )
+        if last_id is None:
+            rows = self.client.get_all_orders(symbol, PAGE_LIMIT, start_time=self._bootstrap_start())
+            added = upsert_orders(self.db_path, rows)
+            last_id = max((int(r.get("orderId", 0)) for r in rows), default=0)
+            while len(rows) >= PAGE_LIMIT:
+                rows = self.client.get_all_orders(symbol, PAGE_LIMIT, order_id=last_id + 1)
+                added += upsert_orders(self.db_path, rows)
+                next_id = max((int(r.get("orderId", 0)) for r in rows), default=last_id)
+                if next_id <= last_id:
+                    break
+                last_id = next_id
+            _set_sync_state(self.db_path, f"orders:{symbol}", last_id)
+            return added
+        added = 0
+        while True:
+            rows = self.client.get_all_orders(symbol, PAGE_LIMIT, order_id=int(last_id))
+            added += upsert_orders(self.db_path, rows)
+            next_id = max((int(r.get("orderId", 0)) for r in rows), default=int(last_id))
+            if len(rows) < PAGE_LIMIT or next_id <= int(last_id):
+                break
+            last_id = next_id
+        _set_sync_state(self.db_path, f"orders:{symbol}", int(last_id))
+        return added
+
+    def sync(self) -> Dict[str, Any]:
+        with self._sync_lock:
+            started = time.time()
+            result: Dict[str, Any] = {"fills": 0, "income": 0, "orders": 0, "errors": []}
+            for symbol in self.symbols:
+                for stream, fn in (("fills", self.sync_fills), ("orders", self.sync_orders)):
+                    try:
+                        result[stream] += fn(symbol)
+                    except (AsterTradeError, ValueError) as exc:
+                        result["errors"].append(f"{stream}:{symbol}: {exc}")
+            try:
+                result["income"] = self.sync_income()
+            except (AsterTradeError, ValueError) as exc:
+                result["errors"].append(f"income: {exc}")
+            result["seconds"] = round(time.time() - started, 3)
+            self.last_sync = result
+            self.last_error = "; ".join(result["errors"])
+            if not result["errors"]:
+                self.ready = True
+            return result
+
+    def request_sync(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            self._thread.join()
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name="aster-ledger", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as exc:
+                self.last_error = str(exc)
+            self._wake.wait(self.sync_seconds)
+            self._wake.clear()
+
+    def fills(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+        return get_fills(self.db_path, symbol.upper(), limit)
+
+    def income(self, symbol: str = "", limit: int = 100) -> List[Dict[str, Any]]:
+        return get_income(self.db_path, symbol.upper(), limit)
+
+    def daily_pnl(self, symbol: str = "", days: int = 30) -> List[Dict[str, Any]]:
+        return get_daily_pnl(self.db_path, symbol.upper(), days)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "symbols": self.symbols,
+            "last_sync": self.last_sync,
+            "last_error": self.last_error,
+            "cursors": get_sync_state(self.db_path),
+        }
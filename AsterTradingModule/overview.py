@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Loader = Callable[[], Any]
+
+
+class LegCache:
+    def __init__(self, max_workers: int = 6) -> None:
+        self._values: Dict[str, Tuple[float, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aster-leg")
+        self.hits = 0
+        self.misses = 0
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
+
+    def _fresh(self, key: str, ttl: float) -> Optional[Tuple[float, Any]]:
+        cached = self._values.get(key)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached
+        return None
+
+    def get(self, key: str, ttl: float, loader: Loader) -> Any:
+        cached = self._fresh(key, ttl)
+        if cached is not None:
+            self.hits += 1
+            return cached[1]
+        with self._lock_for(key):
+            cached = self._fresh(key, ttl)
+            if cached is not None:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            value = loader()
+            self._values[key] = (time.monotonic(), value)
+            return value
+
+    def get_many(self, legs: Dict[str, Tuple[float, Loader]]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        futures = {key: self._executor.submit(self.get, key, ttl, loader) for key, (ttl, loader) in legs.items()}
+        values: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for key, future in futures.items():
+            try:
+                values[key] = future.result()
+            except Exception as exc:
+                errors[key] = str(exc)
+        return values, errors
+
+    def invalidate(self, *prefixes: str) -> None:
+        with self._guard:
+            for key in list(self._values):
+                if not prefixes or any(key == p or key.startswith(f"{p}:") for p in prefixes):
+                    self._values.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._values), "hits": self.hits, "misses": self.misses}
@@ -1,9 +1,12 @@
 import time
 from dataclasses import asdict
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .client import AsterTradeClient, AsterTradeError, floor_to_step, round_to_tick
+from .client import AsterTradeClient, AsterTradeError
 from .config import AsterTradingConfig
+from .filters import SymbolFilters, build_filter_index
+from .ledger import AsterLedger
+from .overview import LegCache, Loader
 
 
 def _to_float(value: Any, default: float = 0.0) -> float:
@@ -21,55 +24,128 @@ def _to_bool(value: Any, default: bool = False) -> bool:
     return str(value).strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _order_failed(result: Optional[Dict[str, Any]]) -> bool:
+    if not isinstance(result, dict):
+        return True
+    return "orderId" not in result and "code" in result
+
+
+def _error_result(exc: AsterTradeError) -> Dict[str, Any]:
+    return {"code": exc.code, "msg": str(exc)}
+
+
+ALL_SYMBOLS = "ALL"
+
+
 class AsterManualTradingService:
+    LEG_TTLS = {
+        "account": 2.0,
+        "balance": 2.0,
+        "positions": 2.0,
+        "open_orders": 2.0,
+        "user_trades": 10.0,
+        "income": 10.0,
+    }
+    FILTER_REFRESH_SECONDS = 30.0
+
     def __init__(self, config: Optional[AsterTradingConfig] = None) -> None:
         self.config = config or AsterTradingConfig()
         self.client = AsterTradeClient(self.config)
-        self._symbol_filters_cache: Optional[Dict[str, Any]] = None
-
-    def _symbol_filters(self) -> Dict[str, Any]:
-        if self._symbol_filters_cache is not None:
-            return self._symbol_filters_cache
-        exchange_info = self.client.get_exchange_info()
-        symbols = exchange_info.get("symbols", []) if isinstance(exchange_info, dict) else []
-        target = next((s for s in symbols if str(s.get("symbol", "")).upper() == self.config.symbol), None)
-        if not isinstance(target, dict):
-            raise AsterTradeError(f"Symbol {self.config.symbol} is not available on ASTER futures.")
-
-        raw_filters = target.get("filters", [])
-        out = {
-            "step_size": "0.001",
-            "tick_size": "0.01",
-            "min_qty": 0.0,
-            "min_notional": 0.0,
-        }
-        for item in raw_filters:
-            if not isinstance(item, dict):
-                continue
-            filter_type = item.get("filterType")
-            if filter_type in {"LOT_SIZE", "MARKET_LOT_SIZE"}:
-                out["step_size"] = item.get("stepSize", out["step_size"])
-                out["min_qty"] = max(out["min_qty"], _to_float(item.get("minQty"), 0.0))
-            elif filter_type == "PRICE_FILTER":
-                out["tick_size"] = item.get("tickSize", out["tick_size"])
-            elif filter_type in {"MIN_NOTIONAL", "NOTIONAL"}:
-                out["min_notional"] = max(out["min_notional"], _to_float(item.get("notional"), 0.0))
-                out["min_notional"] = max(out["min_notional"], _to_float(item.get("minNotional"), 0.0))
-
-        self._symbol_filters_cache = out
-        return out
-
-    def _mark_price(self) -> float:
-        premium = self.client.get_premium_index(self.config.symbol)
+        self.legs = LegCache()
+        self._filter_index: Optional[Dict[str, SymbolFilters]] = None
+        self._filter_loaded_at = 0.0
+        self._leverage_cache: Dict[str, int] = {}
+        self.ledger: Optional[AsterLedger] = None
+
+    def attach_ledger(self, ledger: AsterLedger) -> None:
+        self.ledger = ledger
+
+    def _remember_leverage(self, positions: List[Dict[str, Any]]) -> None:
+        for pos in positions:
+            symbol = str(pos.get("symbol", "")).upper()
+            leverage = int(_to_float(pos.get("leverage"), 0.0))
+            if symbol and leverage > 0:
+                self._leverage_cache[symbol] = leverage
+
+    def _ensure_leverage(self, symbol: str, leverage: int) -> Dict[str, Any]:
+        if self._leverage_cache.get(symbol) == leverage:
+            return {"symbol": symbol, "leverage": leverage, "skipped": True}
+        self._leverage_cache.pop(symbol, None)
+        result = self.client.set_leverage(symbol, leverage)
+        self._leverage_cache[symbol] = int(_to_float(result.get("leverage"), leverage))
+        return result
+
+    def _resolve_symbol(self, symbol: Any = None) -> str:
+        return str(symbol or self.config.symbol).strip().upper()
+
+    def filter_index(self, refresh: bool = False) -> Dict[str, SymbolFilters]:
+        if self._filter_index is None or refresh:
+            self._filter_index = build_filter_index(self.client.get_exchange_info())
+            self._filter_loaded_at = time.monotonic()
+        return self._filter_index
+
+    def _symbol_filters(self, symbol: str) -> SymbolFilters:
+        filters = self.filter_index().get(symbol)
+        if filters is None and time.monotonic() - self._filter_loaded_at >= self.FILTER_REFRESH_SECONDS:
+            filters = self.filter_index(refresh=True).get(symbol)
+        if filters is None:
+            raise AsterTradeError(f"Symbol {symbol} is not available on ASTER futures.")
+        return filters
+
+    def _mark_price(self, symbol: str) -> float:
+        premium = self.client.get_premium_index(symbol)
         mark = _to_float(premium.get("markPrice"), 0.0)
         if mark <= 0:
-            raise AsterTradeError("Cannot resolve ASTER mark price for ETHUSDT.")
+            raise AsterTradeError(f"Cannot resolve ASTER mark price for {symbol}.")
         return mark
 
+    def _leg(self, name: str, limit: int = 0, symbol: str = "") -> Tuple[str, Tuple[float, Loader]]:
+        symbol = symbol or self.config.symbol
+        query = "" if symbol == ALL_SYMBOLS else symbol
+        loaders: Dict[str, Loader] = {
+            "account": lambda: self.client.get_account(),
+            "balance": lambda: self.client.get_balance(),
+            "positions": lambda: self.client.get_positions(query),
+            "open_orders": lambda: self.client.get_open_orders(query),
+            "user_trades": lambda: self.client.get_user_trades(query, limit),
+            "income": lambda: self.client.get_income(query, limit),
+        }
+        if self.ledger is not None and self.ledger.ready and symbol in self.ledger.symbols:
+            ledger = self.ledger
+            loaders["user_trades"] = lambda: ledger.fills(symbol, limit)
+            loaders["income"] = lambda: ledger.income(symbol, limit)
+        parts = [name]
+        if limit:
+            parts.append(str(limit))
+        if symbol != self.config.symbol:
+            parts.append(symbol)
+        return ":".join(parts), (self.LEG_TTLS[name], loaders[name])
+
+    def _fetch_legs(self, *legs: Tuple[str, int]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        return self.legs.get_many(dict(self._leg(name, limit) for name, limit in legs))
+
+    def _cached_leg(self, name: str, limit: int = 0, symbol: str = "") -> Any:
+        key, (ttl, loader) = self._leg(name, limit, symbol)
+        return self.legs.get(key, ttl, loader)
+
+    def invalidate_account_cache(self) -> None:
+        self.legs.invalidate("account", "balance", "positions", "open_orders", "user_trades", "income")
+        if self.ledger is not None:
+            self.ledger.request_sync()
+
     def get_account_overview(self) -> Dict[str, Any]:
-        account = self.client.get_account()
-        balances = self.client.get_balance()
-        positions = self.client.get_positions(self.config.symbol)
+        values, errors = self._fetch_legs(("account", 0), ("balance", 0), ("positions", 0))
+        if errors:
+            raise AsterTradeError("; ".join(f"{leg}: {msg}" for leg, msg in errors.items()))
+        return self._build_overview(values["account"], values["balance"], values["positions"])
+
+    def _build_overview(
+        self,
+        account: Dict[str, Any],
+        balances: List[Dict[str, Any]],
+        positions: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        self._remember_leverage(positions)
 
         usdt_balance = next((b for b in balances if str(b.get("asset", "")).upper() == "USDT"), {})
         total_wallet = _to_float(account.get("totalWalletBalance"), _to_float(usdt_balance.get("walletBalance"), 0.0))
@@ -117,7 +193,7 @@ class AsterManualTradingService:
         }
 
     def preview_order(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        symbol = self.config.symbol
+        symbol = self._resolve_symbol(payload.get("symbol"))
         leverage = int(_to_float(payload.get("leverage"), self.config.leverage))
         leverage = max(1, min(leverage, 125))
         notional = max(_to_float(payload.get("notional_usdt"), self.config.position_notional_usdt), 0.0)
@@ -131,27 +207,26 @@ class AsterManualTradingService:
         if order_type not in {"MARKET", "LIMIT", "STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET"}:
             order_type = "MARKET"
 
-        filters = self._symbol_filters()
-        mark_price = self._mark_price()
+        filters = self._symbol_filters(symbol)
+        mark_price = self._mark_price(symbol)
         entry_price = _to_float(payload.get("price"), mark_price) if order_type != "MARKET" else mark_price
         if entry_price <= 0:
             entry_price = mark_price
 
         raw_qty = notional / max(entry_price, 1e-9)
-        quantity = floor_to_step(raw_qty, str(filters.get("step_size", "0.001")))
-        min_qty = _to_float(filters.get("min_qty"), 0.0)
-        min_notional = _to_float(filters.get("min_notional"), 0.0)
+        quantity = filters.floor_qty(raw_qty)
+        min_qty = filters.min_qty
+        min_notional = filters.min_notional
         computed_notional = quantity * entry_price
 
         if quantity < min_qty:
-            quantity = min_qty
-            quantity = floor_to_step(quantity, str(filters.get("step_size", "0.001")))
+            quantity = filters.floor_qty(min_qty)
             computed_notional = quantity * entry_price
 
         sl_mult = 1 - stop_loss_pct if side == "BUY" else 1 + stop_loss_pct
         tp_mult = 1 + take_profit_pct if side == "BUY" else 1 - take_profit_pct
-        stop_price = round_to_tick(entry_price * sl_mult, str(filters.get("tick_size", "0.01")))
-        take_profit_price = round_to_tick(entry_price * tp_mult, str(filters.get("tick_size", "0.01")))
+        stop_price = filters.round_price(entry_price * sl_mult)
+        take_profit_price = filters.round_price(entry_price * tp_mult)
 
         margin = computed_notional / max(leverage, 1)
         risk_usdt = computed_notional * stop_loss_pct
@@ -175,7 +250,7 @@ class AsterManualTradingService:
             "stop_price": stop_price,
             "take_profit_price": take_profit_price,
             "risk_usdt": risk_usdt,
-            "filters": filters,
+            "filters": filters.as_dict(),
             "warnings": warnings,
         }
 
@@ -191,12 +266,13 @@ class AsterManualTradingService:
         side = preview["side"]
         quantity = preview["quantity"]
         order_type = preview["order_type"]
+        symbol = preview["symbol"]
         tif = str(payload.get("time_in_force", "GTC")).upper()
         if tif not in {"GTC", "IOC", "FOK", "GTX"}:
             tif = "GTC"
 
         main_order: Dict[str, Any] = {
-            "symbol": self.config.symbol,
+            "symbol": symbol,
             "side": side,
             "type": order_type,
             "quantity": quantity,
@@ -209,14 +285,14 @@ class AsterManualTradingService:
             stop_price = _to_float(payload.get("trigger_price"), 0.0)
             if stop_price <= 0:
                 stop_price = preview["stop_price"]
-            main_order["stopPrice"] = round_to_tick(stop_price, str(preview["filters"]["tick_size"]))
+            main_order["stopPrice"] = self._symbol_filters(symbol).round_price(stop_price)
         reduce_only = _to_bool(payload.get("reduce_only"), False)
         if reduce_only:
             main_order["reduceOnly"] = "true"
 
         enable_tpsl = _to_bool(payload.get("enable_tpsl"), True)
         sl_order = {
-            "symbol": self.config.symbol,
+            "symbol": symbol,
             "side": "SELL" if side == "BUY" else "BUY",
             "type": "STOP_MARKET",
             "stopPrice": preview["stop_price"],
@@ -224,7 +300,7 @@ class AsterManualTradingService:
             "workingType": "MARK_PRICE",
         }
         tp_order = {
-            "symbol": self.config.symbol,
+            "symbol": symbol,
             "side": "SELL" if side == "BUY" else "BUY",
             "type": "TAKE_PROFIT_MARKET",
             "stopPrice": preview["take_profit_price"],
@@ -239,38 +315,123 @@ class AsterManualTradingService:
                 "message": "DRY_RUN enabled. No live ASTER order submitted.",
                 "preview": preview,
                 "orders": {
-                    "set_leverage": {"symbol": self.config.symbol, "leverage": leverage},
+                    "set_leverage": {"symbol": symbol, "leverage": leverage},
                     "main_order": main_order,
                     "stop_loss_order": sl_order if enable_tpsl else None,
                     "take_profit_order": tp_order if enable_tpsl and preview["take_profit_pct"] > 0 else None,
                 },
             }
 
-        leverage_result = self.client.set_leverage(self.config.symbol, leverage)
-        main_result = self.client.place_order(main_order)
-        sl_result: Dict[str, Any] | None = None
-        tp_result: Dict[str, Any] | None = None
-
+        protective: List[Tuple[str, Dict[str, Any]]] = []
         if enable_tpsl:
-            sl_result = self.client.place_order(sl_order)
+            protective.append(("stop_loss_order", sl_order))
             if preview["take_profit_pct"] > 0:
-                tp_result = self.client.place_order(tp_order)
-
+                protective.append(("take_profit_order", tp_order))
+
+        leverage_result = self._ensure_leverage(symbol, leverage)
+        use_batch = _to_bool(payload.get("batch"), self.config.batch_orders) and bool(protective)
+        if use_batch:
+            batch_results = self.client.place_batch_orders([main_order] + [order for _, order in protective])
+            batch_results += [{"code": 0, "msg": "Missing batch order result."}] * (1 + len(protective) - len(batch_results))
+            main_result = batch_results[0]
+            legs = {name: (order, batch_results[i + 1]) for i, (name, order) in enumerate(protective)}
+        else:
+            main_result = self.client.place_order(main_order)
+            legs = {}
+            for name, order in protective:
+                try:
+                    legs[name] = (order, self.client.place_order(order))
+                except AsterTradeError as exc:
+                    legs[name] = (order, _error_result(exc))
+
+        settled = self._settle_bracket(main_order, main_result, legs)
+        self.invalidate_account_cache()
         return {
-            "success": True,
             "dry_run": False,
+            "mode": "batch" if use_batch else "sequential",
             "preview": preview,
+            **settled,
             "results": {
                 "set_leverage": leverage_result,
                 "main_order": main_result,
-                "stop_loss_order": sl_result,
-                "take_profit_order": tp_result,
+                "stop_loss_order": legs.get("stop_loss_order", (None, None))[1],
+                "take_profit_order": legs.get("take_profit_order", (None, None))[1],
             },
         }
 
+    def _cancel_orders(self, symbol: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        cancelled: List[Dict[str, Any]] = []
+        for result in results:
+            if _order_failed(result):
+                continue
+            try:
+                cancelled.append(self.client.cancel_order(symbol, int(result["orderId"])))
+            except AsterTradeError as exc:
+                cancelled.append({"orderId": result["orderId"], **_error_result(exc)})
+        return cancelled
+
+    def _settle_bracket(
+        self,
+        main_order: Dict[str, Any],
+        main_result: Dict[str, Any],
+        legs: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        symbol = main_order["symbol"]
+        if _order_failed(main_result):
+            cancelled = self._cancel_orders(symbol, [result for _, result in legs.values()])
+            return {
+                "success": False,
+                "message": f"Main order rejected: {main_result.get('msg', 'unknown error')}",
+                "rollback": {"cancelled": cancelled},
+            }
+
+        for name, (order, result) in list(legs.items()):
+            if not _order_failed(result):
+                continue
+            try:
+                legs[name] = (order, self.client.place_order(order))
+            except AsterTradeError as exc:
+                legs[name] = (order, _error_result(exc))
+
+        failed = [name for name, (_, result) in legs.items() if _order_failed(result)]
+        if not failed:
+            return {"success": True}
+
+        rollback: Dict[str, Any] = {
+            "failed": failed,
+            "cancelled": self._cancel_orders(symbol, [result for _, result in legs.values()]),
+        }
+        executed_qty = _to_float(main_result.get("executedQty"), 0.0)
+        if str(main_result.get("status", "")).upper() != "FILLED":
+            rollback["cancelled"] += self._cancel_orders(symbol, [main_result])
+        if executed_qty > 0:
+            flatten = {
+                "symbol": symbol,
+                "side": "SELL" if main_order["side"] == "BUY" else "BUY",
+                "type": "MARKET",
+                "quantity": executed_qty,
+                "reduceOnly": "true",
+                "newOrderRespType": "RESULT",
+            }
+            try:
+                rollback["flatten_order"] = self.client.place_order(flatten)
+            except AsterTradeError as exc:
+                rollback["flatten_order"] = _error_result(exc)
+                return {
+                    "success": False,
+                    "message": "Protective order failed and flattening the position failed; manual action required.",
+                    "rollback": rollback,
+                }
+        return {
+            "success": False,
+            "message": f"Protective order failed ({', '.join(failed)}); entry rolled back.",
+            "rollback": rollback,
+        }
+
     def close_position_market(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         dry_run = _to_bool(payload.get("dry_run"), self.config.dry_run)
-        positions = self.client.get_positions(self.config.symbol)
+        symbol = self._resolve_symbol(payload.get("symbol"))
+        positions = self.client.get_positions(symbol)
         target = None
         for pos in positions:
             amt = _to_float(pos.get("positionAmt"), 0.0)
@@ -278,13 +439,13 @@ class AsterManualTradingService:
                 target = pos
                 break
         if target is None:
-            return {"success": False, "message": "No open ETHUSDT position to close."}
+            return {"success": False, "message": f"No open {symbol} position to close."}
 
         amount = _to_float(target.get("positionAmt"), 0.0)
         side = "SELL" if amount > 0 else "BUY"
         quantity = abs(amount)
         order_payload = {
-            "symbol": self.config.symbol,
+            "symbol": symbol,
             "side": side,
             "type": "MARKET",
             "quantity": quantity,
@@ -301,28 +462,81 @@ class AsterManualTradingService:
             }
 
         result = self.client.place_order(order_payload)
+        self.invalidate_account_cache()
         return {"success": True, "dry_run": False, "result": result}
 
-    def get_open_positions(self) -> Dict[str, Any]:
-        positions = self.client.get_positions(self.config.symbol)
+    def _open_positions(self, positions: List[Dict[str, Any]], symbol: str = "") -> Dict[str, Any]:
+        self._remember_leverage(positions)
         items = []
         for pos in positions:
             amt = _to_float(pos.get("positionAmt"), 0.0)
             if abs(amt) <= 1e-12:
                 continue
             items.append(pos)
-        return {"symbol": self.config.symbol, "items": items}
+        return {"symbol": symbol or self.config.symbol, "items": items}
 
-    def get_open_orders(self) -> Dict[str, Any]:
-        return {"symbol": self.config.symbol, "items": self.client.get_open_orders(self.config.symbol)}
+    def get_open_positions(self, symbol: str = "") -> Dict[str, Any]:
+        symbol = self._resolve_symbol(symbol)
+        return self._open_positions(self._cached_leg("positions", symbol=symbol), symbol)
 
-    def get_trade_history(self, limit: int = 100) -> Dict[str, Any]:
+    def get_open_orders(self, symbol: str = "") -> Dict[str, Any]:
+        symbol = self._resolve_symbol(symbol)
+        return {"symbol": symbol, "items": self._cached_leg("open_orders", symbol=symbol)}
+
+    def get_trade_history(self, limit: int = 100, symbol: str = "") -> Dict[str, Any]:
+        symbol = self._resolve_symbol(symbol)
+        if symbol == ALL_SYMBOLS:
+            raise AsterTradeError("Trade history requires a single symbol.")
+        safe_limit = max(1, min(int(limit), 1000))
+        return {"symbol": symbol, "items": self._cached_leg("user_trades", safe_limit, symbol)}
+
+    def get_income_history(self, limit: int = 100, symbol: str = "") -> Dict[str, Any]:
+        symbol = self._resolve_symbol(symbol)
         safe_limit = max(1, min(int(limit), 1000))
-        return {"symbol": self.config.symbol, "items": self.client.get_user_trades(self.config.symbol, safe_limit)}
+        return {"symbol": symbol, "items": self._cached_leg("income", safe_limit, symbol)}
+
+    def get_symbol_filters(self, symbol: str = "") -> Dict[str, Any]:
+        if symbol:
+            filters = self._symbol_filters(self._resolve_symbol(symbol))
+            return {"symbol": filters.symbol, **filters.as_dict()}
+        return {"items": {name: f.as_dict() for name, f in sorted(self.filter_index().items())}}
+
+    def get_daily_pnl(self, days: int = 30) -> Dict[str, Any]:
+        if self.ledger is None:
+            raise AsterTradeError("ASTER ledger is not enabled.")
+        safe_days = max(1, min(int(days), 365))
+        return {
+            "symbol": self.config.symbol,
+            "days": safe_days,
+            "ready": self.ledger.ready,
+            "items": self.ledger.daily_pnl(self.config.symbol, safe_days),
+        }
 
-    def get_income_history(self, limit: int = 100) -> Dict[str, Any]:
+    def get_snapshot(self, limit: int = 30) -> Dict[str, Any]:
         safe_limit = max(1, min(int(limit), 1000))
-        return {"symbol": self.config.symbol, "items": self.client.get_income(self.config.symbol, safe_limit)}
+        values, errors = self._fetch_legs(
+            ("account", 0),
+            ("balance", 0),
+            ("positions", 0),
+            ("open_orders", 0),
+            ("user_trades", safe_limit),
+            ("income", safe_limit),
+        )
+        symbol = self.config.symbol
+        overview = None
+        if all(key in values for key in ("account", "balance", "positions")):
+            overview = self._build_overview(values["account"], values["balance"], values["positions"])
+        return {
+            "symbol": symbol,
+            "overview": overview,
+            "open_positions": self._open_positions(values["positions"]) if "positions" in values else None,
+            "open_orders": {"symbol": symbol, "items": values["open_orders"]} if "open_orders" in values else None,
+            "trade_history": {"symbol": symbol, "items": values.get(f"user_trades:{safe_limit}", [])},
+            "pnl_history": {"symbol": symbol, "items": values.get(f"income:{safe_limit}", [])},
+            "daily_pnl": self.ledger.daily_pnl(symbol) if self.ledger is not None and self.ledger.ready else None,
+            "errors": errors,
+            "server_time": int(time.time() * 1000),
+        }
 
     def get_config(self) -> Dict[str, Any]:
         return asdict(self.config)
@@ -2,13 +2,30 @@ import json
 import threading
 import time
 from collections import deque
-from typing import Any, Deque, Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from .hyperliquid_client import HyperliquidClient
+from .journal import EventJournal, JournalRecorder, RecordingCandles, RecordingClient
 from .mtc_client import MTCClient, MTCClientError
-from .risk import build_long_sl_tp_prices, parse_total_capital
-from .storage import add_equity_snapshot, add_log, add_signal, add_trade, get_kv, set_kv
-from .strategy import evaluate_exit_ema_cross_down_15m, evaluate_long_ema_rsi_15m, evaluate_long_ma50_cross_3_candles
+from .overlay_cache import OVERLAY_DEFAULT_BARS, OverlayCache, closed_candles
+from .positions import PositionsLike, PositionsSnapshot
+from .profiling import TickInstrumentation
+from .risk import build_long_sl_tp_prices, capital_exit, parse_total_capital, r_multiple_exit
+from .risk_engine import RULE_CAPITAL, RULE_R_MULTIPLE, RiskEngine, TrackedPosition
+from .scanner import StrategyScanner
+from .shadow import SHADOW_STATE_KEY, ShadowMode
+from .storage import add_equity_snapshot, add_log, add_signal, add_trade, get_all_kv, get_kv, set_kv
+from .strategies import (
+    RISK_R_MULTIPLE,
+    STRATEGIES,
+    STRATEGY_EMA_RSI,
+    STRATEGY_MA50,
+    LiveEvaluator,
+    RuleStrategy,
+    Strategy,
+    StrategyRegistry,
+)
 
 
 def _to_float(value: Any, default: float = 0.0) -> float:
@@ -28,9 +45,25 @@ def _to_int(value: Any, default: int = 0) -> int:
 class BotRunner:
     MANUAL_ALLOWED_SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "HYPEUSDT", "PUMPUSDT", "DOGEUSDT"]
     MANUAL_MAX_POSITIONS = 3
-    STRATEGY_MA50 = "MA50_4H_CROSSUP_3C_LONG_ONLY"
-    STRATEGY_EMA_RSI = "EMA_RSI_15M_ETH_ONLY"
+    STRATEGY_MA50 = STRATEGY_MA50
+    STRATEGY_EMA_RSI = STRATEGY_EMA_RSI
     EMA_STATE_KEY = "ema_strategy_state"
+    SCANNER_POSITIONS_KEY = "scanner_position_ids"
+    SCANNER_ENTRY_CANDLES_KEY = "scanner_last_entry_candles"
+    CLOSE_RETRY_SECONDS = 120
+    JOURNAL_SKIP_KV = (
+        "account",
+        "account_ok",
+        "bot_status",
+        "last_history",
+        "last_scan",
+        "last_signal",
+        "last_tick",
+        "notices",
+        "positions",
+        SHADOW_STATE_KEY,
+        "strategy_state",
+    )
 
     def __init__(
         self,
@@ -47,10 +80,19 @@ class BotRunner:
         sl_capital_pct: float,
         tp_capital_pct: float,
         max_positions: int,
+        scanner_symbols: Optional[List[str]] = None,
+        scanner_max_positions: int = 3,
+        client: Optional[MTCClient] = None,
+        hyperliquid: Optional[HyperliquidClient] = None,
+        overlay_cache: Optional[OverlayCache] = None,
+        strategies: Optional[StrategyRegistry] = None,
     ) -> None:
         self.db_path = db_path
-        self.client = MTCClient(base_url, api_key)
-        self.hyperliquid = HyperliquidClient()
+        self.client = client or MTCClient(base_url, api_key)
+        self.hyperliquid = hyperliquid or HyperliquidClient()
+        self.instrumentation = TickInstrumentation(bot=bot_name)
+        self.overlay_cache = overlay_cache or OverlayCache()
+        self.strategies = strategies or STRATEGIES
         self.poll_seconds = poll_seconds
         self.dry_run = dry_run
         self.bot_name = bot_name
@@ -62,6 +104,10 @@ class BotRunner:
         self.sl_capital_pct = sl_capital_pct
         self.tp_capital_pct = tp_capital_pct
         self.max_positions = max_positions
+        self.scanner_max_positions = scanner_max_positions
+        self.scanner: Optional[StrategyScanner] = None
+        if scanner_symbols:
+            self.scanner = StrategyScanner(self.hyperliquid, scanner_symbols, strategies=self.strategies)
 
         self._thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
@@ -70,7 +116,20 @@ class BotRunner:
         self._trade_lock = threading.Lock()
         self._state_lock = threading.Lock()
         self._strategy_paused = False
-        self.active_strategy = self.STRATEGY_MA50
+        self.active_strategy = self.strategies.default_id()
+        self._evaluators: Dict[str, LiveEvaluator] = {}
+        self._tick_candles: Optional[Dict[Tuple[str, int], List[Dict[str, Any]]]] = None
+        self.shadow: Optional[ShadowMode] = None
+        self.risk_engine = RiskEngine(self._on_risk_exit)
+        self._price_subscribe: Optional[Callable[..., Callable[[], None]]] = None
+        self._price_subscriptions: Dict[str, Callable[[], None]] = {}
+        self._close_lock = threading.Lock()
+        self._closed_ids: Dict[str, int] = {}
+        self._positions: Optional[PositionsSnapshot] = None
+        self._kv_positions: Tuple[str, PositionsSnapshot] = ("", PositionsSnapshot())
+        self.journal: Optional[JournalRecorder] = None
+        self.clock: Callable[[], float] = time.time
+        self.fence: Optional[Callable[[], bool]] = None
 
     def get_runtime_settings(self) -> Dict[str, float]:
         with self._state_lock:
@@ -85,23 +144,40 @@ class BotRunner:
         return self.active_strategy
 
     def list_strategies(self) -> List[Dict[str, str]]:
-        return [
-            {
-                "id": self.STRATEGY_MA50,
-                "label": "MA50 4H CrossUp 3 Candles (ETH only)",
-                "entry": "Price crosses above MA50 then closes above MA50 for 3 consecutive 4H candles.",
-            },
-            {
-                "id": self.STRATEGY_EMA_RSI,
-                "label": "EMA20/50 + RSI filter 15m (ETH only)",
-                "entry": "EMA20 cross above EMA50 with RSI in 50-70 band on closed 15m candle.",
-            },
-        ]
+        return self.strategies.describe()
+
+    def strategy(self, strategy_id: str = "") -> Strategy:
+        selected = self.strategies.get(strategy_id or self.active_strategy)
+        if selected is None:
+            selected = self.strategies.get(self.strategies.default_id())
+        assert selected is not None
+        return selected
+
+    def required_interval(self, strategy_id: str = "") -> str:
+        return self.strategy(strategy_id).interval
+
+    def get_strategy_overlay(self, strategy_id: str, bars: int = OVERLAY_DEFAULT_BARS) -> Dict[str, Any]:
+        strategy = self.strategy(strategy_id)
+        return self.overlay_cache.get_or_build(
+            strategy,
+            bars,
+            fetch=lambda: self.hyperliquid.get_candles(self.trade_coin, interval=strategy.interval, bars=bars),
+        )
+
+    def enable_shadow(self, variants: Sequence[Tuple[RuleStrategy, str]] = ()) -> ShadowMode:
+        shadow = ShadowMode(self.db_path, self.trade_coin)
+        for strategy_id in self.strategies.ids():
+            strategy = self.strategies.get(strategy_id)
+            if isinstance(strategy, RuleStrategy):
+                shadow.add(strategy)
+        for strategy, base in variants:
+            shadow.add(strategy, base)
+        self.shadow = shadow
+        return shadow
 
     def set_active_strategy(self, strategy_id: str) -> Dict[str, Any]:
         selected = str(strategy_id or "").strip().upper()
-        valid_ids = {item["id"] for item in self.list_strategies()}
-        if selected not in valid_ids:
+        if selected not in self.strategies:
             return {"success": False, "message": f"Unsupported strategy: {strategy_id}"}
         self.active_strategy = selected
         set_kv(self.db_path, "active_strategy", selected)
@@ -143,9 +219,12 @@ class BotRunner:
             self.leverage = max(leverage, 1.0)
             self.sl_capital_pct = max(sl_capital_pct, 0.0001)
             self.tp_capital_pct = max(tp_capital_pct, 0.0)
-        selected = get_kv(self.db_path, "active_strategy", self.STRATEGY_MA50).upper().strip()
-        valid_ids = {item["id"] for item in self.list_strategies()}
-        self.active_strategy = selected if selected in valid_ids else self.STRATEGY_MA50
+        default_id = self.strategies.default_id()
+        selected = get_kv(self.db_path, "active_strategy", default_id).upper().strip()
+        self.active_strategy = selected if selected in self.strategies else default_id
+        paused = get_kv(self.db_path, "strategy_state", "running") == "paused"
+        with self._state_lock:
+            self._strategy_paused = paused
         return self.get_runtime_settings()
 
     @staticmethod
@@ -167,6 +246,15 @@ class BotRunner:
         return get_kv(self.db_path, self._owner_key(owner), "")
 
     def _set_owner_position_id(self, owner: str, position_id: str) -> None:
+        if owner.startswith("scanner:"):
+            owned = self._get_scanner_position_ids()
+            coin = owner.split(":", 1)[1]
+            if position_id:
+                owned[coin] = position_id
+            else:
+                owned.pop(coin, None)
+            self._set_scanner_position_ids(owned)
+            return
         if owner == "manual":
             if position_id:
                 self._set_manual_position_ids([position_id])
@@ -199,6 +287,21 @@ class BotRunner:
         set_kv(self.db_path, self._owner_key("manual"), json.dumps(clean))
         set_kv(self.db_path, "manual_position_id", clean[0] if clean else "")
 
+    def _get_scanner_position_ids(self) -> Dict[str, str]:
+        raw = get_kv(self.db_path, self.SCANNER_POSITIONS_KEY, "")
+        if not raw:
+            return {}
+        try:
+            parsed = json.loads(raw)
+        except Exception:
+            return {}
+        if not isinstance(parsed, dict):
+            return {}
+        return {str(k).upper(): str(v) for k, v in parsed.items() if str(v)}
+
+    def _set_scanner_position_ids(self, owned: Dict[str, str]) -> None:
+        set_kv(self.db_path, self.SCANNER_POSITIONS_KEY, json.dumps({k: v for k, v in owned.items() if v}))
+
     def _add_manual_position_id(self, position_id: str) -> None:
         if not position_id:
             return
@@ -218,40 +321,281 @@ class BotRunner:
         self._stop.set()
         if self._thread:
             self._thread.join(timeout=2)
+        self._positions = None
 
     def _run_loop(self) -> None:
         while not self._stop.is_set():
-            now = int(time.time())
-            paused = self.is_strategy_paused()
-            set_kv(self.db_path, "bot_status", "paused" if paused else "running")
-            set_kv(self.db_path, "strategy_state", "paused" if paused else "running")
-            set_kv(self.db_path, "last_tick", str(now))
-            if not self.client.api_key:
-                if not self._warned_no_key:
-                    add_log(self.db_path, now, "WARN", "MTC_API_KEY missing; bot idle mode.")
-                    self._warned_no_key = True
-                time.sleep(self.poll_seconds)
-                continue
+            self.run_once()
+            time.sleep(self.poll_seconds)
 
-            try:
-                self._tick(now)
-            except Exception as exc:
-                add_log(self.db_path, now, "ERROR", f"Tick failure: {exc}")
+    def run_once(self, now: Optional[int] = None) -> None:
+        now = int(time.time()) if now is None else now
+        paused = self.is_strategy_paused()
+        set_kv(self.db_path, "bot_status", "paused" if paused else "running")
+        set_kv(self.db_path, "strategy_state", "paused" if paused else "running")
+        set_kv(self.db_path, "last_tick", str(now))
+        if not self.client.api_key:
+            if not self._warned_no_key:
+                add_log(self.db_path, now, "WARN", "MTC_API_KEY missing; bot idle mode.")
+                self._warned_no_key = True
+            return
 
-            time.sleep(self.poll_seconds)
+        try:
+            with self._journal_scope("tick", now):
+                self._tick(now)
+        except Exception as exc:
+            stage = self.instrumentation.failed_stage or "tick"
+            add_log(self.db_path, now, "ERROR", f"Tick failure in {stage}: {exc}")
 
     def _tick(self, now: int) -> None:
-        account = self._fetch_account(now)
-        positions = self._fetch_positions(now)
-        self._sync_owned_position_ids(now, positions)
-        history = self._fetch_history(now)
-        self._record_equity(now, account, positions)
-        self._manage_open_positions(now, account, positions)
-        if not self.is_strategy_paused():
-            self._maybe_open_long(now, account, positions)
-        if now % 3600 < self.poll_seconds:
-            self._maybe_daily_claim(now)
-        set_kv(self.db_path, "last_history", json.dumps(history))
+        self._tick_candles = {}
+        try:
+            self._tick_stages(now)
+        finally:
+            self._tick_candles = None
+
+    def _tick_stages(self, now: int) -> None:
+        probe = self.instrumentation
+        with probe.tick(now):
+            with probe.span("fetch_account"):
+                account = self._fetch_account(now)
+            with probe.span("fetch_positions"):
+                positions = self._fetch_positions(now)
+            with probe.span("sync_owned_position_ids"):
+                self._sync_owned_position_ids(now, positions)
+                self.classify_open_positions(positions)
+            with probe.span("fetch_history"):
+                history = self._fetch_history(now)
+            with probe.span("record_equity"):
+                self._record_equity(now, account, positions)
+            if not self._holds_fence(now):
+                return
+            with probe.span("manage_open_positions"):
+                self._manage_open_positions(now, account, positions)
+            if not self.is_strategy_paused() and self._holds_fence(now):
+                with probe.span("maybe_open_long"):
+                    self._maybe_open_long(now, account, positions)
+            if self.scanner is not None and self._holds_fence(now):
+                with probe.span("manage_scanner_positions"):
+                    self._manage_scanner_positions(now, account, positions)
+                if not self.is_strategy_paused() and self._holds_fence(now):
+                    with probe.span("scan_universe"):
+                        self._scan_and_trade(now, account, positions)
+            if self.shadow is not None:
+                with probe.span("shadow"):
+                    self._run_shadow(now, account)
+            with probe.span("sync_risk_engine"):
+                self._sync_risk_engine(account, positions)
+            with probe.span("refresh_overlay_cache"):
+                self._refresh_overlay_cache(now)
+            if now % 3600 < self.poll_seconds and self._holds_fence(now):
+                with probe.span("daily_claim"):
+                    self._maybe_daily_claim(now)
+            with probe.span("store_history"):
+                set_kv(self.db_path, "last_history", json.dumps(history))
+
+    def attach_journal(self, journal: EventJournal) -> JournalRecorder:
+        journal.meta.update(self.journal_meta())
+        recorder = JournalRecorder(journal, bot=self.bot_name)
+        self.client = RecordingClient(self.client, recorder)
+        self.hyperliquid = RecordingCandles(self.hyperliquid, recorder)
+        if self.scanner is not None:
+            self.scanner.hyperliquid = self.hyperliquid
+        self.journal = recorder
+        return recorder
+
+    def detach_journal(self) -> None:
+        if isinstance(self.client, RecordingClient):
+            self.client = self.client._inner
+        if isinstance(self.hyperliquid, RecordingCandles):
+            self.hyperliquid = self.hyperliquid._inner
+        if self.scanner is not None:
+            self.scanner.hyperliquid = self.hyperliquid
+        self.journal = None
+
+    def _holds_fence(self, now: int) -> bool:
+        if self.fence is None or self.fence():
+            return True
+        add_log(self.db_path, now, "WARN", "Trading lease lost; skipped remaining tick stages.")
+        return False
+
+    def journal_meta(self) -> Dict[str, Any]:
+        return {
+            "bot_name": self.bot_name,
+            "bot_desc": self.bot_desc,
+            "trade_coin": self.trade_pair,
+            "poll_seconds": self.poll_seconds,
+            "dry_run": self.dry_run,
+            "max_positions": self.max_positions,
+            "scanner_symbols": self.scanner.coins if self.scanner else [],
+            "scanner_max_positions": self.scanner_max_positions,
+            "settings": self.get_runtime_settings(),
+        }
+
+    def export_state(self) -> Dict[str, Any]:
+        kv = {k: v for k, v in get_all_kv(self.db_path).items() if k not in self.JOURNAL_SKIP_KV}
+        with self._trade_lock:
+            trade_timestamps = list(self._trade_timestamps)
+        with self._close_lock:
+            closed_ids = dict(self._closed_ids)
+        return {
+            "kv": kv,
+            "paused": self.is_strategy_paused(),
+            "active_strategy": self.active_strategy,
+            "settings": self.get_runtime_settings(),
+            "trade_timestamps": trade_timestamps,
+            "closed_ids": closed_ids,
+            "evaluators": {sid: evaluator.state() for sid, evaluator in self._evaluators.items()},
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        for key, value in state.get("kv", {}).items():
+            set_kv(self.db_path, key, value)
+        self.apply_runtime_settings(state.get("settings", {}))
+        with self._state_lock:
+            self._strategy_paused = bool(state.get("paused", False))
+        self.active_strategy = str(state.get("active_strategy", self.active_strategy))
+        with self._trade_lock:
+            self._trade_timestamps = deque(int(ts) for ts in state.get("trade_timestamps", []))
+        with self._close_lock:
+            self._closed_ids = {str(k): int(v) for k, v in state.get("closed_ids", {}).items()}
+        self._evaluators = {}
+        for sid, saved in state.get("evaluators", {}).items():
+            strategy = self.strategies.get(sid)
+            if strategy is not None:
+                self._evaluators[strategy.id] = strategy.live()
+                self._evaluators[strategy.id].load(saved)
+
+    @contextmanager
+    def _journal_scope(self, kind: str, now: int, op: Optional[Dict[str, Any]] = None) -> Iterator[None]:
+        if self.journal is None:
+            yield
+            return
+        with self.journal.capture(kind, now, self.clock(), self.export_state, op):
+            yield
+
+    def _add_trade(
+        self, ts: int, action: str, coin: str, side: str, margin: float, leverage: float, status: str, notes: str
+    ) -> None:
+        add_trade(self.db_path, ts, action, coin, side, margin, leverage, status, notes)
+        if self.journal is not None:
+            self.journal.decision(
+                "trade",
+                {
+                    "action": action,
+                    "coin": coin,
+                    "side": side,
+                    "margin": margin,
+                    "leverage": leverage,
+                    "status": status,
+                    "notes": notes,
+                },
+            )
+
+    def _add_signal(self, ts: int, coin: str, timeframe: str, signal: bool, details: str) -> None:
+        add_signal(self.db_path, ts, coin, timeframe, signal, details)
+        if self.journal is not None:
+            self.journal.decision("signal", {"coin": coin, "timeframe": timeframe, "signal": signal, "details": details})
+
+    def attach_price_feed(self, subscribe: Callable[..., Callable[[], None]]) -> None:
+        self._price_subscribe = subscribe
+
+    def _on_price_update(self, coin: str, interval: str, candle: Dict[str, Any], closed: bool) -> None:
+        self.risk_engine.on_price(coin, _to_float(candle.get("close"), 0.0))
+
+    def _tracked_position(self, owner: str, pos: Dict[str, Any], capital: float) -> Optional[TrackedPosition]:
+        position_id = str(pos.get("positionId", ""))
+        entry_price = _to_float(pos.get("entryPrice"), 0.0)
+        if not position_id or entry_price <= 0:
+            return None
+        margin = _to_float(pos.get("margin"), self.margin_boks)
+        leverage = _to_float(pos.get("leverage"), self.leverage)
+        tracked = TrackedPosition(
+            position_id=position_id,
+            owner=owner,
+            coin=self._normalize_coin(str(pos.get("coin", "")) or self.trade_pair),
+            entry_price=entry_price,
+            notional=margin * leverage,
+            size=_to_float(pos.get("size"), 0.0),
+            rule=RULE_CAPITAL,
+            capital=capital,
+            sl_capital_pct=self.sl_capital_pct,
+            tp_capital_pct=self.tp_capital_pct,
+        )
+        if owner == "strategy" and self.strategy().risk == RISK_R_MULTIPLE:
+            state = self._get_ema_state()
+            if str(state.get("position_id", "")) != position_id:
+                return None
+            pnl = _to_float(pos.get("unrealizedPnl"), 0.0)
+            tracked.rule = RULE_R_MULTIPLE
+            tracked.risk_r = _to_float(state.get("risk_r"), 0.0)
+            tracked.peak_pnl = _to_float(state.get("peak_pnl"), pnl)
+            tracked.trailing_active = bool(state.get("trailing_active", False))
+        return tracked
+
+    def _sync_risk_engine(self, account: Dict[str, Any], positions: PositionsLike) -> None:
+        capital = parse_total_capital(account)
+        owners: List[Tuple[str, str]] = []
+        strategy_id = self._get_owner_position_id("strategy")
+        if strategy_id:
+            owners.append(("strategy", strategy_id))
+        owners.extend((f"scanner:{coin}", pid) for coin, pid in self._get_scanner_position_ids().items())
+
+        tracked: List[TrackedPosition] = []
+        for owner, position_id in owners:
+            pos = self._find_position_by_id(positions, position_id)
+            item = self._tracked_position(owner, pos, capital) if pos else None
+            if item is not None:
+                tracked.append(item)
+        self.risk_engine.sync(tracked)
+        for item in tracked:
+            if item.rule != RULE_R_MULTIPLE:
+                continue
+            state = self._get_ema_state()
+            if item.peak_pnl > _to_float(state.get("peak_pnl"), 0.0) or item.trailing_active != bool(
+                state.get("trailing_active", False)
+            ):
+                state["peak_pnl"] = item.peak_pnl
+                state["trailing_active"] = item.trailing_active
+                self._set_ema_state(state)
+
+        open_ids = {str(p.get("positionId", "")) for p in positions}
+        expire_before = int(self.clock()) - self.CLOSE_RETRY_SECONDS
+        with self._close_lock:
+            for position_id, ts in list(self._closed_ids.items()):
+                if position_id not in open_ids or ts < expire_before:
+                    del self._closed_ids[position_id]
+
+        if self._price_subscribe is None:
+            return
+        coins = {item.coin for item in tracked}
+        for coin in coins - set(self._price_subscriptions):
+            self._price_subscriptions[coin] = self._price_subscribe(coin, "1m", self._on_price_update)
+        for coin in set(self._price_subscriptions) - coins:
+            self._price_subscriptions.pop(coin)()
+
+    def _on_risk_exit(self, tracked: TrackedPosition, reason: str, pnl: float) -> None:
+        now = int(self.clock())
+        mark = f"local mark {tracked.last_price}"
+        if tracked.rule == RULE_R_MULTIPLE:
+            note, comment = self._ema_exit_text(reason, pnl, tracked.peak_pnl)
+            self._close_position(now, tracked.position_id, f"{note} [{mark}]", comment=comment, owner=tracked.owner)
+            self._clear_ema_state()
+            return
+        if tracked.owner.startswith("scanner:"):
+            note = f"Scanner {reason} hit on total capital for {tracked.coin} ({pnl:.2f} BOKS) [{mark}]"
+        else:
+            note = f"{reason} hit on total capital ({pnl:.2f} BOKS) [{mark}]"
+        self._close_position(now, tracked.position_id, note, owner=tracked.owner, coin=tracked.coin)
+
+    def get_risk_state(self) -> Dict[str, Any]:
+        return {**self.risk_engine.snapshot(), "subscriptions": sorted(self._price_subscriptions)}
+
+    def _refresh_overlay_cache(self, now: int) -> None:
+        try:
+            self.get_strategy_overlay(self.active_strategy)
+        except Exception as exc:
+            add_log(self.db_path, now, "WARN", f"Overlay cache refresh failed: {exc}")
 
     def is_strategy_paused(self) -> bool:
         with self._state_lock:
@@ -293,15 +637,27 @@ class BotRunner:
             add_log(self.db_path, now, "ERROR", f"Account fetch failed: {exc} ({exc.code})")
             return {}
 
-    def _fetch_positions(self, now: int) -> List[Dict[str, Any]]:
+    def _fetch_positions(self, now: int) -> PositionsSnapshot:
         try:
             response = self.client.get_positions()
             set_kv(self.db_path, "positions", json.dumps(response))
-            positions = response.get("positions", response if isinstance(response, list) else [])
-            return positions if isinstance(positions, list) else []
+            snapshot = PositionsSnapshot.from_response(response, now)
+            self._positions = snapshot
+            return snapshot
         except MTCClientError as exc:
             add_log(self.db_path, now, "ERROR", f"Positions fetch failed: {exc} ({exc.code})")
-            return []
+            return PositionsSnapshot((), now)
+
+    def positions_snapshot(self) -> PositionsSnapshot:
+        published = self._positions
+        if published is not None:
+            return published
+        raw = get_kv(self.db_path, "positions", "")
+        cached = self._kv_positions
+        if cached[0] != raw or not raw:
+            cached = (raw, PositionsSnapshot.from_json(raw))
+            self._kv_positions = cached
+        return cached[1]
 
     def _fetch_history(self, now: int) -> List[Dict[str, Any]]:
         try:
@@ -314,12 +670,12 @@ class BotRunner:
             add_log(self.db_path, now, "ERROR", f"History fetch failed: {exc} ({exc.code})")
             return []
 
-    def _record_equity(self, now: int, account: Dict[str, Any], positions: List[Dict[str, Any]]) -> None:
+    def _record_equity(self, now: int, account: Dict[str, Any], positions: PositionsLike) -> None:
         boks = account.get("boks", {}) if isinstance(account, dict) else {}
         balance = float(boks.get("balance", 0) or 0)
         available = float(boks.get("availableBalance", 0) or 0)
         locked = float(boks.get("lockedMargin", 0) or 0)
-        unrealized = sum(float(p.get("unrealizedPnl", 0) or 0) for p in positions)
+        unrealized = PositionsSnapshot.of(positions).unrealized
         total_equity = balance + locked + unrealized
         add_equity_snapshot(
             self.db_path,
@@ -331,25 +687,14 @@ class BotRunner:
             total_equity=total_equity,
         )
 
-    def _eth_long_positions(self, positions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
-        for pos in positions:
-            coin = str(pos.get("coin", "")).upper()
-            side = str(pos.get("side", "")).upper()
-            position_id = str(pos.get("positionId", ""))
-            if coin == self.trade_coin and side == "LONG" and position_id:
-                out.append(pos)
-        return out
-
-    def _find_position_by_id(self, positions: List[Dict[str, Any]], position_id: str) -> Optional[Dict[str, Any]]:
-        if not position_id:
-            return None
-        for pos in positions:
-            if str(pos.get("positionId", "")) == position_id:
-                return pos
-        return None
+    def _eth_long_positions(self, positions: PositionsLike) -> List[Dict[str, Any]]:
+        return [r.raw for r in PositionsSnapshot.of(positions).with_side(self.trade_coin) if r.position_id]
 
-    def _sync_owned_position_ids(self, now: int, positions: List[Dict[str, Any]]) -> None:
+    def _find_position_by_id(self, positions: PositionsLike, position_id: str) -> Optional[Dict[str, Any]]:
+        return PositionsSnapshot.of(positions).get(position_id)
+
+    def _sync_owned_position_ids(self, now: int, positions: PositionsLike) -> None:
+        positions = PositionsSnapshot.of(positions)
         strategy_id = self._get_owner_position_id("strategy")
         manual_ids = self._get_manual_position_ids()
 
@@ -357,6 +702,13 @@ class BotRunner:
             self._set_owner_position_id("strategy", "")
             add_log(self.db_path, now, "INFO", f"Cleared stale strategy position id {strategy_id}.")
 
+        scanner_ids = self._get_scanner_position_ids()
+        live_scanner_ids = {coin: pid for coin, pid in scanner_ids.items() if self._find_position_by_id(positions, pid)}
+        if live_scanner_ids != scanner_ids:
+            self._set_scanner_position_ids(live_scanner_ids)
+            stale = sorted(set(scanner_ids.values()) - set(live_scanner_ids.values()))
+            add_log(self.db_path, now, "INFO", f"Cleared stale scanner position ids: {', '.join(stale)}")
+
         valid_manual_ids = [pid for pid in manual_ids if self._find_position_by_id(positions, pid)]
         cleared_ids = [pid for pid in manual_ids if pid not in valid_manual_ids]
         if cleared_ids:
@@ -398,33 +750,25 @@ class BotRunner:
             f"Mapped legacy unknown ETH positions to owners strategy={strategy_fallback}, manual={manual_fallback}.",
         )
 
-    def _owner_has_open_position(self, owner: str, positions: List[Dict[str, Any]]) -> bool:
+    def _owner_has_open_position(self, owner: str, positions: PositionsLike) -> bool:
+        positions = PositionsSnapshot.of(positions)
         if owner == "manual":
             manual_ids = self._get_manual_position_ids()
             return any(self._find_position_by_id(positions, pid) is not None for pid in manual_ids)
         owner_id = self._get_owner_position_id(owner)
         return self._find_position_by_id(positions, owner_id) is not None
 
-    def _manual_has_open_symbol(self, positions: List[Dict[str, Any]], symbol: str) -> bool:
+    def _manual_has_open_symbol(self, positions: PositionsLike, symbol: str) -> bool:
+        positions = PositionsSnapshot.of(positions)
         coin = self._normalize_coin(symbol)
         for pid in self._get_manual_position_ids():
-            pos = self._find_position_by_id(positions, pid)
-            if not pos:
-                continue
-            if str(pos.get("side", "")).upper() != "LONG":
-                continue
-            if str(pos.get("coin", "")).upper() == coin:
+            record = positions.record(pid)
+            if record is not None and record.side == "LONG" and record.coin == coin:
                 return True
         return False
 
-    def _has_any_open_long_on_coin(self, positions: List[Dict[str, Any]], coin: str) -> bool:
-        target_coin = self._normalize_coin(coin)
-        for pos in positions:
-            if str(pos.get("side", "")).upper() != "LONG":
-                continue
-            if str(pos.get("coin", "")).upper() == target_coin:
-                return True
-        return False
+    def _has_any_open_long_on_coin(self, positions: PositionsLike, coin: str) -> bool:
+        return PositionsSnapshot.of(positions).has(self._normalize_coin(coin))
 
     def _get_ema_state(self) -> Dict[str, Any]:
         raw = get_kv(self.db_path, self.EMA_STATE_KEY, "")
@@ -461,19 +805,36 @@ class BotRunner:
         add_log(self.db_path, now, "INFO", f"Initialized EMA strategy state for {position_id}: R={risk_r:.6f}")
         return created
 
-    def _get_closed_ema_candles(self) -> List[Dict[str, Any]]:
-        candles = self.hyperliquid.get_candles(self.trade_coin, interval="15m", bars=300)
-        if len(candles) >= 2:
-            maybe_open = _to_float(candles[-1].get("close_time", 0), 0.0)
-            if maybe_open > int(time.time() * 1000):
-                candles = candles[:-1]
-        return candles
+    def _candles(self, interval: str, bars: int) -> List[Dict[str, Any]]:
+        if self._tick_candles is None:
+            return self.hyperliquid.get_candles(self.trade_coin, interval=interval, bars=bars)
+        key = (interval, bars)
+        if key not in self._tick_candles:
+            self._tick_candles[key] = self.hyperliquid.get_candles(self.trade_coin, interval=interval, bars=bars)
+        return self._tick_candles[key]
+
+    def _strategy_candles(self, strategy: Strategy, now: int) -> List[Dict[str, Any]]:
+        candles = self._candles(strategy.interval, strategy.bars)
+        if not strategy.closed_only or len(candles) < 2:
+            return candles
+        return closed_candles(candles, now * 1000)
+
+    def _strategy_signal(self, strategy: Strategy, now: int, kind: str = "entry") -> Dict[str, Any]:
+        candles = self._strategy_candles(strategy, now)
+        if not strategy.closed_only:
+            return strategy.evaluate_batch([candles]).payload(0, len(candles) - 1, kind)
+        evaluator = self._evaluators.get(strategy.id)
+        if evaluator is None:
+            evaluator = self._evaluators[strategy.id] = strategy.live()
+        evaluator.feed(candles)
+        return evaluator.entry() if kind == "entry" else evaluator.exit()
 
     def _manage_ema_strategy_position(
         self,
         now: int,
         account: Dict[str, Any],
         position: Dict[str, Any],
+        strategy: Strategy,
     ) -> None:
         position_id = str(position.get("positionId", ""))
         if not position_id:
@@ -482,67 +843,63 @@ class BotRunner:
         state = self._ensure_ema_state(now, position, account)
         risk_r = max(_to_float(state.get("risk_r"), 0.0), 1e-9)
         pnl = float(position.get("unrealizedPnl", 0) or 0)
-        peak_pnl = max(_to_float(state.get("peak_pnl"), pnl), pnl)
-        trailing_active = bool(state.get("trailing_active", False))
-
-        if peak_pnl != _to_float(state.get("peak_pnl"), pnl):
-            state["peak_pnl"] = peak_pnl
-            self._set_ema_state(state)
+        decision = r_multiple_exit(
+            pnl, risk_r, _to_float(state.get("peak_pnl"), pnl), bool(state.get("trailing_active", False))
+        )
+        peak_pnl = float(decision["peak_pnl"])
 
-        if not trailing_active and pnl >= risk_r:
-            trailing_active = True
-            state["trailing_active"] = True
+        if peak_pnl != _to_float(state.get("peak_pnl"), pnl) or decision["activated"]:
             state["peak_pnl"] = peak_pnl
+            state["trailing_active"] = bool(decision["trailing_active"])
             self._set_ema_state(state)
+        if decision["activated"]:
             add_log(self.db_path, now, "INFO", f"EMA trailing activated for {position_id} at >= 1R.")
 
-        try:
-            exit_signal = evaluate_exit_ema_cross_down_15m(self._get_closed_ema_candles())
-            if exit_signal.get("signal"):
-                self._close_position(
-                    now,
-                    position_id,
-                    "EMA20 crossed below EMA50 on closed 15m candle",
-                    comment="EMA strategy exit: cross down on closed 15m candle.",
-                    owner="strategy",
-                )
-                self._clear_ema_state()
-                return
-        except Exception as exc:
-            add_log(self.db_path, now, "ERROR", f"EMA exit signal evaluation failed: {exc}")
-
-        if pnl <= -risk_r:
-            self._close_position(
-                now,
-                position_id,
-                f"EMA strategy SL 1R hit ({pnl:.4f} BOKS)",
-                comment="EMA strategy exit: stop loss 1R.",
-                owner="strategy",
-            )
+        if self._maybe_signal_exit(now, position_id, strategy):
             self._clear_ema_state()
             return
 
-        if pnl >= (2 * risk_r):
-            self._close_position(
-                now,
-                position_id,
-                f"EMA strategy TP 2R hit ({pnl:.4f} BOKS)",
-                comment="EMA strategy exit: take profit 2R.",
-                owner="strategy",
-            )
+        if decision["exit"]:
+            note, comment = self._ema_exit_text(str(decision["exit"]), pnl, peak_pnl)
+            self._close_position(now, position_id, note, comment=comment, owner="strategy")
             self._clear_ema_state()
-            return
 
-        if trailing_active and (peak_pnl - pnl) >= risk_r:
-            self._close_position(
-                now,
-                position_id,
-                f"EMA trailing stop hit: drawdown {peak_pnl - pnl:.4f} >= 1R from peak",
-                comment="EMA strategy exit: trailing stop after 1R activation.",
-                owner="strategy",
-            )
-            self._clear_ema_state()
+    def _run_shadow(self, now: int, account: Dict[str, Any]) -> None:
+        if self.shadow is None:
             return
+        risk = {**self.get_runtime_settings(), "capital": parse_total_capital(account)}
+        try:
+            self.shadow.run(now, self._candles, risk)
+        except Exception as exc:
+            add_log(self.db_path, now, "WARN", f"Shadow evaluation failed: {exc}")
+            return
+        if self.shadow.errors:
+            add_log(self.db_path, now, "WARN", f"Shadow candle fetch errors: {self.shadow.errors}")
+
+    def _maybe_signal_exit(self, now: int, position_id: str, strategy: Strategy) -> bool:
+        if not strategy.has_exit:
+            return False
+        try:
+            exit_signal = self._strategy_signal(strategy, now, "exit")
+        except Exception as exc:
+            add_log(self.db_path, now, "ERROR", f"{strategy.id} exit signal evaluation failed: {exc}")
+            return False
+        if not exit_signal.get("signal"):
+            return False
+        note = f"{strategy.id} exit: {exit_signal.get('reason', 'exit_signal')} on closed {strategy.interval} candle"
+        self._close_position(now, position_id, note, comment=strategy.exit_comment, owner="strategy")
+        return True
+
+    @staticmethod
+    def _ema_exit_text(reason: str, pnl: float, peak_pnl: float) -> Tuple[str, str]:
+        if reason == "SL":
+            return f"EMA strategy SL 1R hit ({pnl:.4f} BOKS)", "EMA strategy exit: stop loss 1R."
+        if reason == "TP":
+            return f"EMA strategy TP 2R hit ({pnl:.4f} BOKS)", "EMA strategy exit: take profit 2R."
+        return (
+            f"EMA trailing stop hit: drawdown {peak_pnl - pnl:.4f} >= 1R from peak",
+            "EMA strategy exit: trailing stop after 1R activation.",
+        )
 
     def _extract_position_id_from_open_response(self, response: Dict[str, Any]) -> str:
         if not isinstance(response, dict):
@@ -562,7 +919,7 @@ class BotRunner:
         self,
         owner: str,
         now: int,
-        before_positions: List[Dict[str, Any]],
+        before_positions: PositionsLike,
         open_response: Dict[str, Any],
     ) -> None:
         before_ids = {str(p.get("positionId", "")) for p in self._eth_long_positions(before_positions)}
@@ -589,105 +946,83 @@ class BotRunner:
                 self._set_owner_position_id(owner, fallback_id)
                 add_log(self.db_path, now, "WARN", f"Mapped {owner} position id {fallback_id} using fallback matching.")
 
-    def _capture_manual_position_id(
+    def _resolve_opened_position_id(
         self,
         now: int,
-        before_positions: List[Dict[str, Any]],
+        before_positions: PositionsLike,
         open_response: Dict[str, Any],
         coin: str,
-    ) -> None:
-        before_ids = {
-            str(p.get("positionId", ""))
-            for p in before_positions
-            if str(p.get("coin", "")).upper() == coin and str(p.get("side", "")).upper() == "LONG"
-        }
-        after_positions = self._fetch_positions(now)
-        after_candidates = [
-            p
-            for p in after_positions
-            if str(p.get("coin", "")).upper() == coin and str(p.get("side", "")).upper() == "LONG"
-        ]
+    ) -> Tuple[str, str]:
+        before_ids = set(PositionsSnapshot.of(before_positions).ids(coin))
+        after_candidates = [r.raw for r in PositionsSnapshot.of(self._fetch_positions(now)).with_side(coin)]
         after_ids = {str(p.get("positionId", "")) for p in after_candidates}
 
         new_ids = [pid for pid in after_ids if pid and pid not in before_ids]
         if len(new_ids) == 1:
-            self._add_manual_position_id(new_ids[0])
-            add_log(self.db_path, now, "INFO", f"Mapped manual position id {new_ids[0]}.")
-            return
+            return new_ids[0], "diff"
 
         response_id = self._extract_position_id_from_open_response(open_response)
         if response_id and response_id in after_ids:
-            self._add_manual_position_id(response_id)
-            add_log(self.db_path, now, "INFO", f"Mapped manual position id {response_id} from open response.")
-            return
+            return response_id, "response"
 
         if after_candidates:
             sorted_after = sorted(after_candidates, key=lambda x: _to_int(x.get("openedAt", 0), 0), reverse=True)
             fallback_id = str(sorted_after[0].get("positionId", ""))
             if fallback_id:
-                self._add_manual_position_id(fallback_id)
-                add_log(self.db_path, now, "WARN", f"Mapped manual position id {fallback_id} using fallback matching.")
-
-    def classify_open_positions(self, positions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        strategy_id = self._get_owner_position_id("strategy")
-        manual_ids = self._get_manual_position_ids()
-
-        strategy_position = self._find_position_by_id(positions, strategy_id)
-        manual_positions = [self._find_position_by_id(positions, pid) for pid in manual_ids]
-        manual_positions = [p for p in manual_positions if p is not None]
-        manual_position = manual_positions[0] if manual_positions else None
-
-        unknown_positions: List[Dict[str, Any]] = []
-        for pos in self._eth_long_positions(positions):
-            pid = str(pos.get("positionId", ""))
-            if pid and pid not in {strategy_id, *manual_ids}:
-                unknown_positions.append(pos)
+                return fallback_id, "fallback"
+        return "", ""
 
-        return {
-            "strategy_position": strategy_position,
-            "manual_position": manual_position,
-            "manual_positions": manual_positions,
-            "unknown_positions": unknown_positions,
-            "items": positions,
-        }
+    def _capture_manual_position_id(
+        self,
+        now: int,
+        before_positions: PositionsLike,
+        open_response: Dict[str, Any],
+        coin: str,
+    ) -> None:
+        position_id, method = self._resolve_opened_position_id(now, before_positions, open_response, coin)
+        if not position_id:
+            return
+        self._add_manual_position_id(position_id)
+        if method == "diff":
+            add_log(self.db_path, now, "INFO", f"Mapped manual position id {position_id}.")
+        elif method == "response":
+            add_log(self.db_path, now, "INFO", f"Mapped manual position id {position_id} from open response.")
+        else:
+            add_log(self.db_path, now, "WARN", f"Mapped manual position id {position_id} using fallback matching.")
+
+    def classify_open_positions(self, positions: Optional[PositionsLike] = None) -> Dict[str, Any]:
+        snapshot = self.positions_snapshot() if positions is None else PositionsSnapshot.of(positions)
+        return snapshot.classify(
+            self.trade_coin, self._get_owner_position_id("strategy"), self._get_manual_position_ids()
+        )
 
-    def _manage_open_positions(self, now: int, account: Dict[str, Any], positions: List[Dict[str, Any]]) -> None:
+    def _manage_open_positions(self, now: int, account: Dict[str, Any], positions: PositionsLike) -> None:
         strategy_id = self._get_owner_position_id("strategy")
         strategy_pos = self._find_position_by_id(positions, strategy_id)
+        strategy = self.strategy()
         if not strategy_pos:
-            if self.active_strategy == self.STRATEGY_EMA_RSI:
+            if strategy.risk == RISK_R_MULTIPLE:
                 self._clear_ema_state()
             return
 
-        if self.active_strategy == self.STRATEGY_EMA_RSI:
-            self._manage_ema_strategy_position(now, account, strategy_pos)
+        if strategy.risk == RISK_R_MULTIPLE:
+            self._manage_ema_strategy_position(now, account, strategy_pos, strategy)
             return
 
         capital = parse_total_capital(account)
         if capital <= 0:
             return
 
-        sl_target = -abs(capital * self.sl_capital_pct)
-        tp_target = abs(capital * self.tp_capital_pct)
         pnl = float(strategy_pos.get("unrealizedPnl", 0) or 0)
         position_id = str(strategy_pos.get("positionId", ""))
         if not position_id:
             return
 
-        if pnl <= sl_target:
-            self._close_position(
-                now,
-                position_id,
-                f"SL hit on total capital ({pnl:.2f} BOKS)",
-                owner="strategy",
-            )
-        elif pnl >= tp_target:
-            self._close_position(
-                now,
-                position_id,
-                f"TP hit on total capital ({pnl:.2f} BOKS)",
-                owner="strategy",
-            )
+        reason = capital_exit(pnl, capital, self.sl_capital_pct, self.tp_capital_pct)
+        if reason:
+            self._close_position(now, position_id, f"{reason} hit on total capital ({pnl:.2f} BOKS)", owner="strategy")
+            return
+        self._maybe_signal_exit(now, position_id, strategy)
 
     def _close_position(
         self,
@@ -696,25 +1031,33 @@ class BotRunner:
         note: str,
         comment: str = "Risk exit: capital threshold reached.",
         owner: str = "",
+        coin: str = "",
     ) -> None:
         payload = {
             "positionId": position_id,
             "comment": comment,
         }
+        trade_coin = coin or self.trade_coin
+        with self._close_lock:
+            if position_id in self._closed_ids:
+                return
         if self.dry_run:
             add_log(self.db_path, now, "INFO", f"DRY_RUN close {position_id}: {note}")
-            add_trade(self.db_path, now, "CLOSE", self.trade_coin, "LONG", self.margin_boks, self.leverage, "DRY_RUN", note)
+            self._add_trade(now, "CLOSE", trade_coin, "LONG", self.margin_boks, self.leverage, "DRY_RUN", note)
             return
         if not self._can_send_trade(now):
             add_log(self.db_path, now, "WARN", "Skipped close trade due to rate limit guard.")
             return
+        with self._close_lock:
+            if position_id in self._closed_ids:
+                return
+            self._closed_ids[position_id] = now
         try:
             response = self.client.close_trade(payload)
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "CLOSE",
-                self.trade_coin,
+                trade_coin,
                 "LONG",
                 self.margin_boks,
                 self.leverage,
@@ -725,10 +1068,16 @@ class BotRunner:
                 self._set_owner_position_id(owner, "")
             add_log(self.db_path, now, "INFO", f"Closed position {position_id}: {note}")
         except MTCClientError as exc:
+            with self._close_lock:
+                self._closed_ids.pop(position_id, None)
             add_log(self.db_path, now, "ERROR", f"Close trade failed: {exc} ({exc.code})")
 
     def manual_force_open_long(self, symbol: str = "ETHUSDT", comment: str = "Manual force open LONG") -> Dict[str, Any]:
-        now = int(time.time())
+        now = int(self.clock())
+        with self._journal_scope("manual", now, {"op": "manual_force_open_long", "symbol": symbol, "comment": comment}):
+            return self._manual_force_open_long(now, symbol, comment)
+
+    def _manual_force_open_long(self, now: int, symbol: str, comment: str) -> Dict[str, Any]:
         if not self.client.api_key:
             return {"success": False, "message": "MTC_API_KEY is missing."}
 
@@ -785,8 +1134,7 @@ class BotRunner:
         }
 
         if self.dry_run:
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "OPEN",
                 target_coin,
@@ -810,8 +1158,7 @@ class BotRunner:
 
         try:
             response = self.client.open_trade(payload)
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "OPEN",
                 target_coin,
@@ -825,8 +1172,7 @@ class BotRunner:
             add_log(self.db_path, now, "INFO", f"Manual force open success on {target_symbol}.")
             return {"success": True, "dry_run": False, "message": "Force open submitted.", "symbol": target_symbol, "response": response}
         except MTCClientError as exc:
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "OPEN",
                 target_coin,
@@ -840,7 +1186,12 @@ class BotRunner:
             return {"success": False, "message": f"Open failed: {exc}", "code": exc.code}
 
     def manual_close_eth_positions(self, position_id: str, comment: str = "Manual close position") -> Dict[str, Any]:
-        now = int(time.time())
+        now = int(self.clock())
+        op = {"op": "manual_close_eth_positions", "position_id": position_id, "comment": comment}
+        with self._journal_scope("manual", now, op):
+            return self._manual_close_eth_positions(now, position_id, comment)
+
+    def _manual_close_eth_positions(self, now: int, position_id: str, comment: str) -> Dict[str, Any]:
         if not self.client.api_key:
             return {"success": False, "message": "MTC_API_KEY is missing."}
 
@@ -865,8 +1216,7 @@ class BotRunner:
         position_coin = str(target.get("coin", "")).upper() or "UNKNOWN"
 
         if self.dry_run:
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "CLOSE",
                 position_coin,
@@ -890,8 +1240,7 @@ class BotRunner:
 
         try:
             response = self.client.close_trade({"positionId": resolved_position_id, "comment": comment})
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "CLOSE",
                 position_coin,
@@ -909,7 +1258,11 @@ class BotRunner:
             return {"success": False, "message": f"Close failed: {exc}", "code": exc.code}
 
     def close_strategy_position(self, comment: str = "Manual close strategy ETHUSDT") -> Dict[str, Any]:
-        now = int(time.time())
+        now = int(self.clock())
+        with self._journal_scope("manual", now, {"op": "close_strategy_position", "comment": comment}):
+            return self._close_strategy_position(now, comment)
+
+    def _close_strategy_position(self, now: int, comment: str) -> Dict[str, Any]:
         if not self.client.api_key:
             return {"success": False, "message": "MTC_API_KEY is missing."}
 
@@ -926,8 +1279,7 @@ class BotRunner:
             return {"success": False, "message": "Strategy position id is invalid."}
 
         if self.dry_run:
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "CLOSE",
                 self.trade_coin,
@@ -945,8 +1297,7 @@ class BotRunner:
 
         try:
             response = self.client.close_trade({"positionId": position_id, "comment": comment})
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "CLOSE",
                 self.trade_coin,
@@ -963,40 +1314,31 @@ class BotRunner:
             add_log(self.db_path, now, "ERROR", f"Close strategy failed {position_id}: {exc} ({exc.code})")
             return {"success": False, "message": f"Close failed: {exc}", "code": exc.code}
 
-    def _maybe_open_long(self, now: int, account: Dict[str, Any], positions: List[Dict[str, Any]]) -> None:
+    def _maybe_open_long(self, now: int, account: Dict[str, Any], positions: PositionsLike) -> None:
         if self._owner_has_open_position("strategy", positions):
             add_log(self.db_path, now, "INFO", f"Strategy position already open for {self.trade_coin}. No new entry.")
             return
-        if self.active_strategy == self.STRATEGY_EMA_RSI and self._has_any_open_long_on_coin(positions, self.trade_coin):
-            add_log(self.db_path, now, "INFO", f"Open LONG already exists on {self.trade_coin}. EMA strategy keeps one position per symbol.")
+        strategy = self.strategy()
+        if strategy.one_position_per_symbol and self._has_any_open_long_on_coin(positions, self.trade_coin):
+            add_log(
+                self.db_path,
+                now,
+                "INFO",
+                f"Open LONG already exists on {self.trade_coin}. {strategy.label} keeps one position per symbol.",
+            )
             return
         if len(positions) >= self.max_positions:
             add_log(self.db_path, now, "WARN", "Max positions reached. Skip entry.")
             return
 
-        signal = {}
-        signal_timeframe = "4h"
-        signal_key = "last_entry_candle"
+        signal_key = strategy.signal_key
         try:
-            if self.active_strategy == self.STRATEGY_EMA_RSI:
-                candles = self.hyperliquid.get_candles(self.trade_coin, interval="15m", bars=300)
-                if len(candles) >= 2:
-                    maybe_open = _to_float(candles[-1].get("close_time", 0), 0.0)
-                    if maybe_open > (now * 1000):
-                        candles = candles[:-1]
-                signal = evaluate_long_ema_rsi_15m(candles)
-                signal_timeframe = "15m"
-                signal_key = "last_entry_candle_ema_rsi"
-            else:
-                candles = self.hyperliquid.get_candles(self.trade_coin, interval="4h", bars=90)
-                signal = evaluate_long_ma50_cross_3_candles(candles)
-                signal_timeframe = "4h"
-                signal_key = "last_entry_candle"
+            signal = self._strategy_signal(strategy, now)
         except Exception as exc:
             add_log(self.db_path, now, "ERROR", f"Hyperliquid candles fetch failed: {exc}")
             return
 
-        add_signal(self.db_path, now, self.trade_coin, signal_timeframe, bool(signal.get("signal")), json.dumps(signal))
+        self._add_signal(now, self.trade_coin, strategy.interval, bool(signal.get("signal")), json.dumps(signal))
         set_kv(self.db_path, "last_signal", json.dumps(signal))
 
         if not signal.get("signal"):
@@ -1024,12 +1366,9 @@ class BotRunner:
             margin=self.margin_boks,
             leverage=self.leverage,
             sl_capital_pct=self.sl_capital_pct,
-            tp_capital_pct=(self.sl_capital_pct * 2) if self.active_strategy == self.STRATEGY_EMA_RSI else self.tp_capital_pct,
+            tp_capital_pct=strategy.take_profit_pct(self.sl_capital_pct, self.tp_capital_pct),
         )
-
-        comment = "MA50(4H) cross-up confirmed by 3 closes. Long setup."
-        if self.active_strategy == self.STRATEGY_EMA_RSI:
-            comment = "EMA20>EMA50 with RSI 50-70 on closed 15m candle. Long setup."
+        comment = strategy.entry_comment
 
         payload = {
             "coin": self.trade_coin,
@@ -1043,8 +1382,7 @@ class BotRunner:
 
         if self.dry_run:
             add_log(self.db_path, now, "INFO", f"DRY_RUN open long payload: {payload}")
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "OPEN",
                 self.trade_coin,
@@ -1063,8 +1401,7 @@ class BotRunner:
 
         try:
             response = self.client.open_trade(payload)
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "OPEN",
                 self.trade_coin,
@@ -1075,7 +1412,7 @@ class BotRunner:
                 json.dumps(response),
             )
             self._capture_owner_position_id("strategy", now, positions, response)
-            if self.active_strategy == self.STRATEGY_EMA_RSI:
+            if strategy.risk == RISK_R_MULTIPLE:
                 latest_positions = self._fetch_positions(now)
                 strategy_position_id = self._get_owner_position_id("strategy")
                 strategy_position = self._find_position_by_id(latest_positions, strategy_position_id)
@@ -1084,8 +1421,7 @@ class BotRunner:
             set_kv(self.db_path, signal_key, candle_key)
             add_log(self.db_path, now, "INFO", f"Opened strategy long on {self.trade_coin}.")
         except MTCClientError as exc:
-            add_trade(
-                self.db_path,
+            self._add_trade(
                 now,
                 "OPEN",
                 self.trade_coin,
@@ -1097,6 +1433,140 @@ class BotRunner:
             )
             add_log(self.db_path, now, "ERROR", f"Open trade failed: {exc} ({exc.code})")
 
+    def get_scanner_state(self) -> Dict[str, Any]:
+        raw = get_kv(self.db_path, "last_scan", "")
+        try:
+            last_scan = json.loads(raw) if raw else None
+        except Exception:
+            last_scan = None
+        return {
+            "enabled": self.scanner is not None,
+            "coins": self.scanner.coins if self.scanner else [],
+            "max_positions": self.scanner_max_positions,
+            "owned": self._get_scanner_position_ids(),
+            "last_scan": last_scan,
+        }
+
+    def _manage_scanner_positions(self, now: int, account: Dict[str, Any], positions: PositionsLike) -> None:
+        owned = self._get_scanner_position_ids()
+        if not owned:
+            return
+        capital = parse_total_capital(account)
+        if capital <= 0:
+            return
+        for coin, position_id in owned.items():
+            pos = self._find_position_by_id(positions, position_id)
+            if not pos:
+                continue
+            pnl = float(pos.get("unrealizedPnl", 0) or 0)
+            reason = capital_exit(pnl, capital, self.sl_capital_pct, self.tp_capital_pct)
+            if not reason:
+                continue
+            note = f"Scanner {reason} hit on total capital for {coin} ({pnl:.2f} BOKS)"
+            self._close_position(now, position_id, note, owner=f"scanner:{coin}", coin=coin)
+
+    def _scan_and_trade(self, now: int, account: Dict[str, Any], positions: PositionsLike) -> None:
+        if self.scanner is None:
+            return
+        try:
+            result = self.scanner.scan(self.active_strategy, now_ms=now * 1000)
+        except Exception as exc:
+            add_log(self.db_path, now, "ERROR", f"Scanner failed: {exc}")
+            return
+        set_kv(self.db_path, "last_scan", json.dumps(result))
+        if result.get("errors"):
+            add_log(self.db_path, now, "WARN", f"Scanner fetch errors: {result['errors']}")
+
+        owned = self._get_scanner_position_ids()
+        entry_candles = self._get_scanner_entry_candles()
+        capital = parse_total_capital(account)
+        open_count = len(positions)
+        timeframe = str(result.get("interval", ""))
+        for row in result.get("signals", []):
+            if not row.get("signal"):
+                break
+            coin = str(row.get("coin", ""))
+            if not coin or coin == self.trade_coin or coin in owned:
+                continue
+            if len(owned) >= self.scanner_max_positions or open_count >= self.max_positions:
+                add_log(self.db_path, now, "INFO", f"Scanner position limits reached. Skip {coin}.")
+                break
+            if self._has_any_open_long_on_coin(positions, coin):
+                continue
+            candle_key = str(int(_to_float(row.get("last_candle_open_time", 0), 0.0)))
+            if entry_candles.get(coin) == candle_key:
+                continue
+            self._add_signal(now, coin, timeframe, True, json.dumps(row))
+            if capital <= 0:
+                add_log(self.db_path, now, "WARN", "Capital unavailable. Skip scanner entry.")
+                return
+            position_id = self._open_scanner_long(now, coin, row, capital, positions)
+            if position_id is None:
+                continue
+            entry_candles[coin] = candle_key
+            self._set_scanner_entry_candles(entry_candles)
+            open_count += 1
+            if position_id:
+                owned[coin] = position_id
+
+    def _get_scanner_entry_candles(self) -> Dict[str, str]:
+        try:
+            parsed = json.loads(get_kv(self.db_path, self.SCANNER_ENTRY_CANDLES_KEY, "") or "{}")
+        except Exception:
+            return {}
+        return {str(k): str(v) for k, v in parsed.items()} if isinstance(parsed, dict) else {}
+
+    def _set_scanner_entry_candles(self, values: Dict[str, str]) -> None:
+        set_kv(self.db_path, self.SCANNER_ENTRY_CANDLES_KEY, json.dumps(values))
+
+    def _open_scanner_long(
+        self,
+        now: int,
+        coin: str,
+        signal: Dict[str, Any],
+        capital: float,
+        positions: PositionsLike,
+    ) -> Optional[str]:
+        entry_price = _to_float(signal.get("close", 0), 0.0)
+        if entry_price <= 0:
+            return None
+        risk_targets = build_long_sl_tp_prices(
+            entry_price=entry_price,
+            capital=capital,
+            margin=self.margin_boks,
+            leverage=self.leverage,
+            sl_capital_pct=self.sl_capital_pct,
+            tp_capital_pct=self.strategy().take_profit_pct(self.sl_capital_pct, self.tp_capital_pct),
+        )
+        payload = {
+            "coin": coin,
+            "side": "LONG",
+            "margin": self.margin_boks,
+            "leverage": self.leverage,
+            "stopLoss": round(risk_targets["stop_loss"], 6),
+            "takeProfit": round(risk_targets["take_profit"], 6),
+            "comment": f"Scanner {self.active_strategy} rank {signal.get('rank', '?')} long setup.",
+        }
+        if self.dry_run:
+            add_log(self.db_path, now, "INFO", f"DRY_RUN scanner open long payload: {payload}")
+            self._add_trade(now, "OPEN", coin, "LONG", self.margin_boks, self.leverage, "DRY_RUN", json.dumps(payload))
+            return ""
+        if not self._can_send_trade(now):
+            add_log(self.db_path, now, "WARN", f"Skipped scanner open on {coin} due to rate limit guard.")
+            return None
+        try:
+            response = self.client.open_trade(payload)
+        except MTCClientError as exc:
+            self._add_trade(now, "OPEN", coin, "LONG", self.margin_boks, self.leverage, "ERROR", f"{exc} ({exc.code})")
+            add_log(self.db_path, now, "ERROR", f"Scanner open failed on {coin}: {exc} ({exc.code})")
+            return None
+        self._add_trade(now, "OPEN", coin, "LONG", self.margin_boks, self.leverage, "OK", json.dumps(response))
+        position_id, _ = self._resolve_opened_position_id(now, positions, response, coin)
+        if position_id:
+            self._set_owner_position_id(f"scanner:{coin}", position_id)
+        add_log(self.db_path, now, "INFO", f"Opened scanner long on {coin} (position {position_id or 'unmapped'}).")
+        return position_id
+
     def _maybe_daily_claim(self, now: int) -> None:
         if self.dry_run:
             return
@@ -1112,6 +1582,8 @@ class BotRunner:
                 add_log(self.db_path, now, "WARN", f"Daily claim failed: {exc} ({exc.code})")
 
     def _can_send_trade(self, now: int) -> bool:
+        if self.fence is not None and not self.fence():
+            return False
         with self._trade_lock:
             while self._trade_timestamps and (now - self._trade_timestamps[0]) > 60:
                 self._trade_timestamps.popleft()
@@ -0,0 +1,395 @@
+import argparse
+import bisect
+import glob
+import json
+import math
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .hyperliquid_client import HyperliquidClient
+
+COLUMNS = ("open_time", "open", "high", "low", "close", "volume")
+COLUMN_TYPES = {"open_time": "q", "open": "d", "high": "d", "low": "d", "close": "d", "volume": "d"}
+ITEM_SIZE = 8
+META_FILE = "meta.json"
+MAX_BARS_PER_REQUEST = 5000
+BASE_REQUEST_WEIGHT = 20
+
+Window = Tuple[int, int]
+
+
+class ArchiveError(RuntimeError):
+    pass
+
+
+def interval_ms(interval: str) -> int:
+    return HyperliquidClient._interval_to_ms(interval)
+
+
+def series_path(root: str, coin: str, interval: str) -> str:
+    return os.path.join(root, coin.upper(), interval)
+
+
+def _column_path(path: str, name: str) -> str:
+    return os.path.join(path, f"{name}.{COLUMN_TYPES[name]}64")
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path: str, meta: Dict[str, Any]) -> None:
+    target = os.path.join(path, META_FILE)
+    tmp = target + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+
+
+def request_weight(bars: int) -> int:
+    return BASE_REQUEST_WEIGHT + math.ceil(bars / 60)
+
+
+class CandleWriter:
+    def __init__(self, root: str, coin: str, interval: str) -> None:
+        self.path = series_path(root, coin, interval)
+        self.interval_ms = interval_ms(interval)
+        os.makedirs(self.path, exist_ok=True)
+        self.meta = read_meta(self.path) or {
+            "coin": coin.upper(),
+            "interval": interval,
+            "interval_ms": self.interval_ms,
+            "rows": 0,
+            "first_open_time": None,
+            "last_open_time": None,
+            "gaps": [],
+        }
+        size = int(self.meta["rows"]) * ITEM_SIZE
+        for name in COLUMNS:
+            with open(_column_path(self.path, name), "ab") as f:
+                if f.tell() < size:
+                    raise ArchiveError(f"{_column_path(self.path, name)} is shorter than its metadata.")
+                f.truncate(size)
+
+    @property
+    def rows(self) -> int:
+        return int(self.meta["rows"])
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        return self.meta["last_open_time"]
+
+    def append(self, candles: Sequence[Dict[str, float]]) -> int:
+        last = self.last_open_time
+        rows: Dict[int, Dict[str, float]] = {}
+        for candle in candles:
+            open_time = int(candle["open_time"])
+            if last is None or open_time > last:
+                rows[open_time] = candle
+        if not rows:
+            return 0
+        ordered = [rows[t] for t in sorted(rows)]
+        columns = {name: array(COLUMN_TYPES[name]) for name in COLUMNS}
+        previous = last
+        for candle in ordered:
+            open_time = int(candle["open_time"])
+            if open_time % self.interval_ms:
+                raise ArchiveError(f"Candle at {open_time} is not aligned to {self.meta['interval']}.")
+            if previous is not None and open_time - previous > self.interval_ms:
+                self.meta["gaps"].append([previous + self.interval_ms, open_time])
+            previous = open_time
+            columns["open_time"].append(open_time)
+            for name in COLUMNS[1:]:
+                columns[name].append(float(candle.get(name, 0.0)))
+        for name in COLUMNS:
+            with open(_column_path(self.path, name), "ab") as f:
+                columns[name].tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        if self.meta["first_open_time"] is None:
+            self.meta["first_open_time"] = int(ordered[0]["open_time"])
+        self.meta["last_open_time"] = previous
+        self.meta["rows"] = self.rows + len(ordered)
+        _write_meta(self.path, self.meta)
+        return len(ordered)
+
+
+class CandleSeries:
+    def __init__(self, root: str, coin: str, interval: str) -> None:
+        self.path = series_path(root, coin, interval)
+        self.meta = read_meta(self.path)
+        self.interval_ms = interval_ms(interval)
+        self.rows = int(self.meta.get("rows", 0))
+        self._files: List[Any] = []
+        self._maps: List[mmap.mmap] = []
+        self.columns: Dict[str, memoryview] = {}
+        for name in COLUMNS:
+            if not self.rows:
+                self.columns[name] = memoryview(array(COLUMN_TYPES[name]))
+                continue
+            f = open(_column_path(self.path, name), "rb")
+            mapped = mmap.mmap(f.fileno(), self.rows * ITEM_SIZE, access=mmap.ACCESS_READ)
+            self._files.append(f)
+            self._maps.append(mapped)
+            self.columns[name] = memoryview(mapped).cast(COLUMN_TYPES[name])
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> "CandleSeries":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def column(self, name: str) -> memoryview:
+        return self.columns[name]
+
+    def index(self, open_time_ms: int) -> int:
+        return bisect.bisect_left(self.columns["open_time"], open_time_ms)
+
+    def slice(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, memoryview]:
+        lo = 0 if start_ms is None else self.index(start_ms)
+        hi = self.rows if end_ms is None else self.index(end_ms)
+        return {name: view[lo:hi] for name, view in self.columns.items()}
+
+    def candles(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Dict[str, float]]:
+        return self._rows(self.slice(start_ms, end_ms))
+
+    def tail(self, bars: int) -> List[Dict[str, float]]:
+        lo = max(self.rows - bars, 0)
+        return self._rows({name: view[lo:] for name, view in self.columns.items()})
+
+    def _rows(self, columns: Dict[str, memoryview]) -> List[Dict[str, float]]:
+        step = self.interval_ms
+        return [
+            {
+                "open_time": float(t),
+                "close_time": float(t + step - 1),
+                "open": o,
+                "high": h,
+                "low": low,
+                "close": c,
+                "volume": v,
+            }
+            for t, o, h, low, c, v in zip(*(columns[name] for name in COLUMNS))
+        ]
+
+    def validate(self) -> Dict[str, Any]:
+        times = self.columns["open_time"]
+        step = self.interval_ms
+        gaps = 0
+        unordered = 0
+        misaligned = 0
+        for i in range(len(times)):
+            if times[i] % step:
+                misaligned += 1
+            if i and times[i] <= times[i - 1]:
+                unordered += 1
+            elif i and times[i] - times[i - 1] > step:
+                gaps += 1
+        return {
+            "rows": self.rows,
+            "gaps": gaps,
+            "unordered": unordered,
+            "misaligned": misaligned,
+            "ok": not unordered and not misaligned,
+        }
+
+    def close(self) -> None:
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                continue
+        for f in self._files:
+            f.close()
+        self._maps = []
+        self._files = []
+
+
+class CandleArchive:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._series: Dict[Tuple[str, str], CandleSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, coin: str, interval: str) -> CandleSeries:
+        key = (coin.upper(), interval)
+        with self._lock:
+            current = self._series.get(key)
+            if current is None or current.rows != int(read_meta(series_path(self.root, coin, interval)).get("rows", 0)):
+                if current is not None:
+                    current.close()
+                current = CandleSeries(self.root, coin, interval)
+                self._series[key] = current
+            return current
+
+    def get_candles(self, coin: str, interval: str = "4h", bars: int = 80) -> List[Dict[str, float]]:
+        return self.series(coin, interval).tail(bars)
+
+    def listing(self) -> List[Dict[str, Any]]:
+        return [read_meta(os.path.dirname(path)) for path in sorted(glob.glob(os.path.join(self.root, "*", "*", META_FILE)))]
+
+    def close(self) -> None:
+        with self._lock:
+            for series in self._series.values():
+                series.close()
+            self._series = {}
+
+
+class RequestBudget:
+    def __init__(
+        self,
+        weight_per_minute: float = 1200.0,
+        max_requests: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = weight_per_minute / 60.0
+        self.capacity = weight_per_minute
+        self.max_requests = max_requests
+        self.requests = 0
+        self.waited = 0.0
+        self._tokens = weight_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: float) -> bool:
+        with self._lock:
+            if self.max_requests and self.requests >= self.max_requests:
+                return False
+            self.requests += 1
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= weight
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited += wait
+        if wait:
+            self._sleep(wait)
+        return True
+
+
+class CandleDownloader:
+    def __init__(
+        self,
+        client: Any,
+        root: str,
+        workers: int = 4,
+        budget: Optional[RequestBudget] = None,
+        bars_per_request: int = MAX_BARS_PER_REQUEST,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.root = root
+        self.workers = max(1, workers)
+        self.budget = budget or RequestBudget()
+        self.bars_per_request = max(1, min(bars_per_request, MAX_BARS_PER_REQUEST))
+        self.clock = clock
+
+    def plan(self, writer: CandleWriter, since_ms: int, until_ms: Optional[int] = None) -> List[Window]:
+        step = writer.interval_ms
+        last = writer.last_open_time
+        start = last + step if last is not None else -(-int(since_ms) // step) * step
+        now_ms = int(self.clock() * 1000) if until_ms is None else int(until_ms)
+        end = now_ms // step * step
+        chunk = self.bars_per_request * step
+        return [(s, min(s + chunk, end) - 1) for s in range(start, end, chunk)]
+
+    def _fetch(self, coin: str, interval: str, window: Window) -> Optional[List[Dict[str, float]]]:
+        bars = (window[1] - window[0]) // interval_ms(interval) + 1
+        if not self.budget.acquire(request_weight(bars)):
+            return None
+        return self.client.get_candles_range(coin, interval, window[0], window[1])
+
+    def download(self, coin: str, interval: str, since_ms: int, until_ms: Optional[int] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        writer = CandleWriter(self.root, coin, interval)
+        windows = self.plan(writer, since_ms, until_ms)
+        appended = 0
+        fetched = 0
+        complete = True
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="candle-archive") as pool:
+            for offset in range(0, len(windows), self.workers):
+                batch = windows[offset : offset + self.workers]
+                results = list(pool.map(lambda w: self._fetch(coin, interval, w), batch))
+                for (lo, hi), candles in zip(batch, results):
+                    if candles is None:
+                        complete = False
+                        break
+                    fetched += 1
+                    appended += writer.append([c for c in candles if lo <= int(c["open_time"]) <= hi])
+                if not complete:
+                    break
+        return {
+            "coin": coin.upper(),
+            "interval": interval,
+            "windows": len(windows),
+            "fetched": fetched,
+            "appended": appended,
+            "rows": writer.rows,
+            "first_open_time": writer.meta["first_open_time"],
+            "last_open_time": writer.last_open_time,
+            "gaps": len(writer.meta["gaps"]),
+            "complete": complete,
+            "seconds": round(time.perf_counter() - started, 6),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Download and inspect the memory-mapped Hyperliquid candle archive.")
+    parser.add_argument("--root", default=os.getenv("CANDLE_ARCHIVE_DIR", "data/candles"), help="Archive directory.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    download = commands.add_parser("download", help="Fetch missing bars, resuming from the last stored candle.")
+    download.add_argument("coins", nargs="+", help="Hyperliquid coins, e.g. ETH BTC.")
+    download.add_argument("--interval", action="append", help="Repeatable, default 15m.")
+    download.add_argument("--days", type=float, default=365.0, help="History to fetch for new series.")
+    download.add_argument("--workers", type=int, default=4, help="Parallel requests.")
+    download.add_argument("--weight-per-minute", type=float, default=1200.0, help="Request weight budget.")
+    download.add_argument("--max-requests", type=int, default=0, help="Stop after this many requests (0 = no cap).")
+    commands.add_parser("info", help="Show stored series and validate their continuity.")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        report: Dict[str, Any] = {}
+        for meta in CandleArchive(args.root).listing():
+            with CandleSeries(args.root, meta["coin"], meta["interval"]) as series:
+                report[f"{meta['coin']}/{meta['interval']}"] = {**series.validate(), **meta, "gaps": len(meta["gaps"])}
+        print(json.dumps(report, indent=2, sort_keys=True))
+        return 0
+
+    budget = RequestBudget(args.weight_per_minute, args.max_requests)
+    downloader = CandleDownloader(HyperliquidClient(pool_size=args.workers), args.root, args.workers, budget)
+    since_ms = int((time.time() - args.days * 86400) * 1000)
+    results = []
+    for coin in args.coins:
+        for interval in args.interval or ["15m"]:
+            try:
+                results.append(downloader.download(coin, interval, since_ms))
+            except Exception as exc:
+                print(f"{coin} {interval}: {exc}", file=sys.stderr)
+                results.append({"coin": coin.upper(), "interval": interval, "error": str(exc), "complete": False})
+    print(json.dumps({"requests": budget.requests, "waited_s": round(budget.waited, 3), "series": results}, indent=2))
+    return 0 if all(item.get("complete") for item in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,55 @@
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from .hyperliquid_client import HyperliquidClient
+
+CandleKey = Tuple[str, str, int]
+
+
+class SharedCandleCache:
+    def __init__(self, client: HyperliquidClient, ttl_seconds: float = 10.0, max_entries: int = 256) -> None:
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items: Dict[CandleKey, Tuple[float, List[Dict[str, float]]]] = {}
+        self._inflight: Dict[CandleKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def get_candles(self, coin: str, interval: str = "4h", bars: int = 80) -> List[Dict[str, float]]:
+        key: CandleKey = (coin, interval, int(bars))
+        while True:
+            with self._lock:
+                cached = self._items.get(key)
+                if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+                    self.hits += 1
+                    return cached[1]
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    waiter = threading.Event()
+                    self._inflight[key] = waiter
+                    self.misses += 1
+                    break
+            waiter.wait(timeout=30)
+
+        try:
+            candles = self.client.get_candles(coin, interval=interval, bars=bars)
+            with self._lock:
+                self._items[key] = (time.monotonic(), candles)
+                if len(self._items) > self.max_entries:
+                    oldest = min(self._items, key=lambda k: self._items[k][0])
+                    del self._items[oldest]
+            return candles
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            waiter.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), "hits": self.hits, "misses": self.misses}
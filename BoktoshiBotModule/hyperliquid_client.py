@@ -3,25 +3,42 @@ from typing import Any, Dict, List
 
 import requests
 
+from .metrics import upstream_probe
+from .upstream import timeout_for
+
 
 class HyperliquidClient:
-    def __init__(self, info_url: str = "https://api.hyperliquid.xyz/info") -> None:
+    def __init__(self, info_url: str = "https://api.hyperliquid.xyz/info", pool_size: int = 16) -> None:
         self.info_url = info_url
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def get_candles(self, coin: str, interval: str = "4h", bars: int = 80) -> List[Dict[str, float]]:
         now_ms = int(time.time() * 1000)
         interval_ms = self._interval_to_ms(interval)
-        start_ms = now_ms - bars * interval_ms
+        return self.get_candles_range(coin, interval, now_ms - bars * interval_ms, now_ms)
+
+    def get_candles_range(self, coin: str, interval: str, start_ms: int, end_ms: int) -> List[Dict[str, float]]:
+        self._interval_to_ms(interval)
         payload = {
             "type": "candleSnapshot",
             "req": {
                 "coin": coin,
                 "interval": interval,
-                "startTime": start_ms,
-                "endTime": now_ms,
+                "startTime": int(start_ms),
+                "endTime": int(end_ms),
             },
         }
-        resp = requests.post(self.info_url, json=payload, timeout=20)
+        probe = upstream_probe("hyperliquid", "candleSnapshot")
+        try:
+            with probe.time():
+                resp = self.session.post(self.info_url, json=payload, timeout=timeout_for(20))
+        except requests.RequestException:
+            probe.record(0)
+            raise
+        probe.record(resp.status_code)
         resp.raise_for_status()
         raw = resp.json()
         candles: List[Dict[str, float]] = []
@@ -0,0 +1,256 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+JOURNAL_VERSION = 1
+SEGMENT_PATTERN = "journal-*.jsonl.gz"
+ORDER_METHODS = ("open_trade", "close_trade", "close_all_trades", "daily_claim")
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), sort_keys=True, default=str)
+
+
+def candles_digest(candles: Any) -> str:
+    return hashlib.blake2s(_dumps({"c": candles}).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def call_key(fn: str, args: Any, kwargs: Any) -> str:
+    return _dumps({"fn": fn, "args": list(args), "kwargs": dict(kwargs)})
+
+
+class EventJournal:
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 16 * 1024 * 1024,
+        segment_seconds: float = 86400.0,
+        compresslevel: int = 6,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.compresslevel = compresslevel
+        self.meta = dict(meta or {})
+        self.records = 0
+        self.failed = 0
+        self._file: Optional[gzip.GzipFile] = None
+        self._path = ""
+        self._opened_at = 0.0
+        self._raw_bytes = 0
+        self._seen_candles: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_segment(self) -> None:
+        now = time.time()
+        sequence = len(self.segments())
+        self._path = os.path.join(self.directory, f"journal-{int(now)}-{sequence:06d}.jsonl.gz")
+        self._file = gzip.open(self._path, "ab", compresslevel=self.compresslevel)
+        self._opened_at = now
+        self._raw_bytes = 0
+        self._seen_candles = {}
+        self._write({"type": "meta", "v": JOURNAL_VERSION, "ts": now, **self.meta})
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = (_dumps(record) + "\n").encode("utf-8")
+        assert self._file is not None
+        self._file.write(line)
+        self._raw_bytes += len(line)
+
+    def _rotate_due(self) -> bool:
+        if self._file is None:
+            return True
+        return self._raw_bytes >= self.segment_bytes or time.time() - self._opened_at >= self.segment_seconds
+
+    def append(self, record: Dict[str, Any], candles: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            try:
+                if self._rotate_due():
+                    self._close_segment()
+                    self._open_segment()
+                for digest, items in (candles or {}).items():
+                    if digest not in self._seen_candles:
+                        self._write({"type": "candles", "digest": digest, "items": items})
+                        self._seen_candles[digest] = True
+                self._write(record)
+                assert self._file is not None
+                self._file.flush(zlib.Z_SYNC_FLUSH)
+                self.records += 1
+            except (OSError, ValueError, TypeError):
+                self.failed += 1
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+    def segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "segment": os.path.basename(self._path),
+            "segments": len(self.segments()),
+            "records": self.records,
+            "failed": self.failed,
+        }
+
+
+def journal_files(path: str) -> List[str]:
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, SEGMENT_PATTERN)))
+    return [path]
+
+
+def read_journal(path: str) -> Iterator[Dict[str, Any]]:
+    for file_path in journal_files(path):
+        with gzip.open(file_path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            except (EOFError, zlib.error, ValueError):
+                continue
+
+
+class _Capture:
+    def __init__(self, kind: str, ts: int, clock: float, state: Dict[str, Any], op: Dict[str, Any]) -> None:
+        self.kind = kind
+        self.ts = ts
+        self.clock = clock
+        self.state = state
+        self.op = op
+        self.calls: List[Dict[str, Any]] = []
+        self.decisions: List[Dict[str, Any]] = []
+        self.candles: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def add_call(self, entry: Dict[str, Any]) -> None:
+        with self.lock:
+            self.calls.append(entry)
+
+
+_ACTIVE: ContextVar[Optional[_Capture]] = ContextVar("journal_capture", default=None)
+
+
+def _error_entry(exc: Exception) -> Dict[str, Any]:
+    return {
+        "type": type(exc).__name__,
+        "message": str(exc),
+        "code": getattr(exc, "code", ""),
+        "status_code": getattr(exc, "status_code", 0),
+    }
+
+
+class RecordingClient:
+    def __init__(self, inner: Any, recorder: "JournalRecorder") -> None:
+        self._inner = inner
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._inner, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            entry: Dict[str, Any] = {"fn": name, "args": list(args), "kwargs": kwargs}
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as exc:
+                entry["error"] = _error_entry(exc)
+                self._recorder.record_call(entry, name in ORDER_METHODS)
+                raise
+            entry["result"] = result
+            self._recorder.record_call(entry, name in ORDER_METHODS)
+            return result
+
+        return call
+
+
+class RecordingCandles:
+    def __init__(self, inner: Any, recorder: "JournalRecorder") -> None:
+        self._inner = inner
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+    def get_candles(self, *args: Any, **kwargs: Any) -> Any:
+        entry: Dict[str, Any] = {"fn": "get_candles", "args": list(args), "kwargs": kwargs}
+        try:
+            candles = self._inner.get_candles(*args, **kwargs)
+        except Exception as exc:
+            entry["error"] = _error_entry(exc)
+            self._recorder.record_call(entry, False)
+            raise
+        digest = candles_digest(candles)
+        entry["digest"] = digest
+        self._recorder.record_call(entry, False, candles={digest: candles})
+        return candles
+
+
+class JournalRecorder:
+    def __init__(self, journal: EventJournal, bot: str = "") -> None:
+        self.journal = journal
+        self.bot = bot
+
+    @contextmanager
+    def capture(
+        self, kind: str, ts: int, clock: float, state: Callable[[], Dict[str, Any]], op: Optional[Dict[str, Any]] = None
+    ) -> Iterator[_Capture]:
+        current = _Capture(kind, ts, clock, state(), op or {})
+        token = _ACTIVE.set(current)
+        started = time.perf_counter()
+        error = ""
+        try:
+            yield current
+        except Exception as exc:
+            error = str(exc)
+            raise
+        finally:
+            _ACTIVE.reset(token)
+            record = {
+                "type": kind,
+                "bot": self.bot,
+                "ts": ts,
+                "clock": clock,
+                "op": current.op,
+                "state": current.state,
+                "calls": current.calls,
+                "decisions": current.decisions,
+                "seconds": round(time.perf_counter() - started, 6),
+                "error": error,
+            }
+            self.journal.append(record, current.candles)
+
+    def record_call(self, entry: Dict[str, Any], is_order: bool, candles: Optional[Dict[str, Any]] = None) -> None:
+        current = _ACTIVE.get()
+        if current is not None:
+            current.add_call(entry)
+            if candles:
+                with current.lock:
+                    current.candles.update(candles)
+            return
+        if is_order:
+            self.journal.append({"type": "order", "bot": self.bot, "ts": int(time.time()), "calls": [entry]})
+
+    def decision(self, kind: str, payload: Dict[str, Any]) -> None:
+        current = _ACTIVE.get()
+        if current is not None:
+            with current.lock:
+                current.decisions.append({"kind": kind, **payload})
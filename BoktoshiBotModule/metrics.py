@@ -0,0 +1 @@
+from app.metrics import *  # noqa: F401,F403
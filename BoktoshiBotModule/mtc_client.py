@@ -1,8 +1,10 @@
-import time
 from typing import Any, Dict, Optional
 
 import requests
 
+from .metrics import upstream_probe
+from .upstream import backoff, timeout_for
+
 
 class MTCClientError(Exception):
     def __init__(self, message: str, code: str = "", status_code: int = 0) -> None:
@@ -18,11 +20,13 @@ class MTCClient:
         api_key: Optional[str],
         timeout_seconds: int = 15,
         max_retries: int = 2,
+        session: Optional[requests.Session] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
+        self.session = session
 
     def _headers(self) -> Dict[str, str]:
         if not self.api_key:
@@ -40,18 +44,21 @@ class MTCClient:
         url = f"{self.base_url}{path}"
         merged_headers = headers or {}
         last_error: Optional[Exception] = None
+        probe = upstream_probe("mtc", path)
         for attempt in range(self.max_retries + 1):
             try:
-                resp = requests.request(
-                    method=method,
-                    url=url,
-                    headers=merged_headers,
-                    json=json_payload,
-                    params=params,
-                    timeout=self.timeout_seconds,
-                )
+                with probe.time():
+                    resp = (self.session or requests).request(
+                        method=method,
+                        url=url,
+                        headers=merged_headers,
+                        json=json_payload,
+                        params=params,
+                        timeout=timeout_for(self.timeout_seconds),
+                    )
+                probe.record(resp.status_code)
                 if 500 <= resp.status_code < 600 and attempt < self.max_retries:
-                    time.sleep(0.5 * (attempt + 1))
+                    backoff(0.5 * (attempt + 1))
                     continue
                 if resp.status_code >= 400:
                     code = ""
@@ -65,9 +72,10 @@ class MTCClient:
                     raise MTCClientError(message=message, code=code, status_code=resp.status_code)
                 return resp.json()
             except requests.RequestException as exc:
+                probe.record(0)
                 last_error = exc
                 if attempt < self.max_retries:
-                    time.sleep(0.5 * (attempt + 1))
+                    backoff(0.5 * (attempt + 1))
                     continue
                 raise MTCClientError(f"Network error: {exc}") from exc
         raise MTCClientError(f"Request failed: {last_error}")
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .hyperliquid_client import HyperliquidClient
+from .strategies import Strategy
+
+OVERLAY_DEFAULT_BARS = 320
+
+OverlayKey = Tuple[str, str, int, int]
+
+
+def last_closed_open_time(interval: str, now_ms: Optional[int] = None) -> int:
+    interval_ms = HyperliquidClient._interval_to_ms(interval)
+    current_ms = int(time.time() * 1000) if now_ms is None else int(now_ms)
+    return (current_ms // interval_ms) * interval_ms - interval_ms
+
+
+def closed_candles(candles: List[Dict[str, Any]], now_ms: int) -> List[Dict[str, Any]]:
+    if candles and float(candles[-1].get("close_time", 0) or 0) > now_ms:
+        return candles[:-1]
+    return candles
+
+
+def build_indicator_overlay(strategy: Strategy, candles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result = strategy.evaluate_batch([candles])
+    columns = result.columns[0]
+    times = [int(t / 1000) for t in columns["open_time"]]
+    out: Dict[str, Any] = {}
+    for name in strategy.overlay:
+        out[name] = [{"time": times[t], "value": float(v)} for t, v in enumerate(columns[name]) if v is not None]
+    out["entry_markers"] = [
+        {"time": times[t], "price": columns["close"][t], "text": strategy.marker}
+        for t, hit in enumerate(result.entry[0])
+        if hit
+    ]
+    out["message"] = f"{strategy.label} indicators and entry markers are computed from Hyperliquid candles."
+    return out
+
+
+class OverlayCache:
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self._items: "OrderedDict[OverlayKey, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: OverlayKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: OverlayKey, value: Dict[str, Any]) -> None:
+        with self._lock:
+            stale = [k for k in self._items if k[:3] == key[:3] and k[3] < key[3]]
+            for k in stale:
+                del self._items[k]
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def get_or_build(
+        self,
+        strategy: Strategy,
+        bars: int,
+        fetch: Callable[[], List[Dict[str, Any]]],
+        now_ms: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        current_ms = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        key: OverlayKey = (strategy.id, strategy.interval, int(bars), last_closed_open_time(strategy.interval, current_ms))
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        candles = closed_candles(fetch(), current_ms)
+        built = build_indicator_overlay(strategy, candles)
+        built["last_closed_open_time"] = int(float(candles[-1].get("open_time", 0) or 0)) if candles else 0
+        if built["last_closed_open_time"] == key[3]:
+            self.put(key, built)
+        return built
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), "hits": self.hits, "misses": self.misses}
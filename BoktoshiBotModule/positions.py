@@ -0,0 +1,114 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+LONG = "LONG"
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class Position:
+    __slots__ = ("position_id", "coin", "side", "opened_at", "unrealized_pnl", "raw")
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        self.raw = raw
+        self.position_id = str(raw.get("positionId", ""))
+        self.coin = str(raw.get("coin", "")).upper()
+        self.side = str(raw.get("side", "")).upper()
+        self.opened_at = _to_int(raw.get("openedAt", 0), 0)
+        self.unrealized_pnl = _to_float(raw.get("unrealizedPnl", 0) or 0, 0.0)
+
+
+class PositionsSnapshot:
+    __slots__ = ("items", "records", "fetched_at", "unrealized", "_by_id", "_by_key", "_classified")
+
+    def __init__(self, items: Sequence[Dict[str, Any]] = (), fetched_at: int = 0) -> None:
+        self.items: Tuple[Dict[str, Any], ...] = tuple(p for p in items if isinstance(p, dict))
+        self.records: Tuple[Position, ...] = tuple(Position(p) for p in self.items)
+        self.fetched_at = fetched_at
+        self.unrealized = sum(r.unrealized_pnl for r in self.records)
+        by_id: Dict[str, Position] = {}
+        by_key: Dict[Tuple[str, str], List[Position]] = {}
+        for record in self.records:
+            if record.position_id:
+                by_id.setdefault(record.position_id, record)
+            by_key.setdefault((record.coin, record.side), []).append(record)
+        self._by_id = by_id
+        self._by_key = {key: tuple(group) for key, group in by_key.items()}
+        self._classified: Dict[Tuple[str, str, Tuple[str, ...]], Dict[str, Any]] = {}
+
+    @classmethod
+    def from_response(cls, response: Any, fetched_at: int = 0) -> "PositionsSnapshot":
+        if isinstance(response, dict):
+            response = response.get("positions", [])
+        return cls(response if isinstance(response, list) else [], fetched_at)
+
+    @classmethod
+    def from_json(cls, raw: str, fetched_at: int = 0) -> "PositionsSnapshot":
+        try:
+            return cls.from_response(json.loads(raw) if raw else [], fetched_at)
+        except ValueError:
+            return cls((), fetched_at)
+
+    @classmethod
+    def of(cls, positions: "PositionsLike") -> "PositionsSnapshot":
+        if isinstance(positions, PositionsSnapshot):
+            return positions
+        return cls(positions)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, position_id: object) -> bool:
+        return position_id in self._by_id
+
+    def get(self, position_id: str) -> Optional[Dict[str, Any]]:
+        record = self._by_id.get(position_id) if position_id else None
+        return record.raw if record is not None else None
+
+    def record(self, position_id: str) -> Optional[Position]:
+        return self._by_id.get(position_id) if position_id else None
+
+    def with_side(self, coin: str, side: str = LONG) -> Tuple[Position, ...]:
+        return self._by_key.get((coin.upper(), side.upper()), ())
+
+    def has(self, coin: str, side: str = LONG) -> bool:
+        return bool(self.with_side(coin, side))
+
+    def ids(self, coin: str, side: str = LONG) -> List[str]:
+        return [r.position_id for r in self.with_side(coin, side) if r.position_id]
+
+    def classify(self, trade_coin: str, strategy_id: str, manual_ids: Sequence[str]) -> Dict[str, Any]:
+        key = (trade_coin.upper(), strategy_id, tuple(manual_ids))
+        cached = self._classified.get(key)
+        if cached is not None:
+            return cached
+        manual_positions = [p for p in (self.get(pid) for pid in manual_ids) if p is not None]
+        owned = {strategy_id, *manual_ids}
+        unknown_positions = [r.raw for r in self.with_side(trade_coin) if r.position_id and r.position_id not in owned]
+        classified = {
+            "strategy_position": self.get(strategy_id),
+            "manual_position": manual_positions[0] if manual_positions else None,
+            "manual_positions": manual_positions,
+            "unknown_positions": unknown_positions,
+            "items": list(self.items),
+        }
+        self._classified[key] = classified
+        return classified
+
+
+PositionsLike = Union[PositionsSnapshot, Sequence[Dict[str, Any]]]
@@ -0,0 +1,137 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .metrics import REGISTRY
+
+TICK_SECONDS = REGISTRY.histogram("bot_tick_seconds", "Wall time of a full BotRunner tick.", ("bot",))
+TICK_STAGE_SECONDS = REGISTRY.histogram(
+    "bot_tick_stage_seconds",
+    "Wall time of each BotRunner tick stage.",
+    ("bot", "stage"),
+)
+TICK_STAGE_FAILURES = REGISTRY.counter(
+    "bot_tick_stage_failures_total",
+    "Exceptions raised out of a BotRunner tick stage.",
+    ("bot", "stage"),
+)
+
+MAX_PROFILE_TICKS = 50
+
+
+class TickInstrumentation:
+    def __init__(self, profile_top_n: int = 40, bot: str = "") -> None:
+        self.profile_top_n = profile_top_n
+        self.bot = bot
+        self.current_stage = ""
+        self.failed_stage = ""
+        self.last_tick: Dict[str, Any] = {}
+        self._stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._profile_requested = 0
+        self._profile_remaining = 0
+        self._profile_ticks_done = 0
+        self._profile_seconds = 0.0
+        self._profiler: Optional[cProfile.Profile] = None
+        self._last_profile: Dict[str, Any] = {}
+
+    @contextmanager
+    def tick(self, now: int) -> Iterator[None]:
+        self._stages = {}
+        self.failed_stage = ""
+        profiler = self._begin_profiled_tick()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._end_profiled_tick(profiler, elapsed)
+            TICK_SECONDS.observe(elapsed, self.bot)
+            self.last_tick = {
+                "ts": now,
+                "seconds": elapsed,
+                "stages": dict(self._stages),
+                "failed_stage": self.failed_stage,
+            }
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        previous = self.current_stage
+        self.current_stage = stage
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if not self.failed_stage:
+                self.failed_stage = stage
+            TICK_STAGE_FAILURES.labels(self.bot, stage).inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            TICK_STAGE_SECONDS.labels(self.bot, stage).observe(elapsed)
+            self._stages[stage] = self._stages.get(stage, 0.0) + elapsed
+            self.current_stage = previous
+
+    def request_profile(self, ticks: int) -> Dict[str, Any]:
+        count = max(1, min(int(ticks), MAX_PROFILE_TICKS))
+        with self._lock:
+            if self._profile_remaining > 0:
+                return {"success": False, "message": "A profile capture is already in progress.", **self._profile_state()}
+            self._profile_requested = count
+            self._profile_remaining = count
+            self._profile_ticks_done = 0
+            self._profile_seconds = 0.0
+            self._profiler = cProfile.Profile()
+            return {"success": True, "message": f"Profiling the next {count} tick(s).", **self._profile_state()}
+
+    def profile_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._profile_state(), "last": dict(self._last_profile)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"last_tick": dict(self.last_tick), "profile": self.profile_status()}
+
+    def _profile_state(self) -> Dict[str, Any]:
+        return {
+            "requested_ticks": self._profile_requested,
+            "pending_ticks": self._profile_remaining,
+            "captured_ticks": self._profile_ticks_done,
+        }
+
+    def _begin_profiled_tick(self) -> Optional[cProfile.Profile]:
+        with self._lock:
+            profiler = self._profiler if self._profile_remaining > 0 else None
+        if profiler is None:
+            return None
+        try:
+            profiler.enable()
+        except ValueError:
+            return None
+        return profiler
+
+    def _end_profiled_tick(self, profiler: Optional[cProfile.Profile], elapsed: float) -> None:
+        if profiler is None:
+            return
+        profiler.disable()
+        with self._lock:
+            self._profile_remaining -= 1
+            self._profile_ticks_done += 1
+            self._profile_seconds += elapsed
+            if self._profile_remaining > 0:
+                return
+            self._profiler = None
+            done = self._profile_ticks_done
+            total = self._profile_seconds
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.profile_top_n)
+        with self._lock:
+            self._last_profile = {
+                "captured_at": int(time.time()),
+                "ticks": done,
+                "total_seconds": total,
+                "stats": out.getvalue(),
+            }
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+from .bot_runner import BotRunner
+from .journal import call_key, read_journal
+from .mtc_client import MTCClientError
+from .storage import init_db
+
+REPLAY_KINDS = ("tick", "manual")
+MANUAL_OPS = ("manual_force_open_long", "manual_close_eth_positions", "close_strategy_position")
+
+
+class ReplayMismatch(RuntimeError):
+    pass
+
+
+def _recorded_error(error: Dict[str, Any]) -> Exception:
+    if error.get("type") == "MTCClientError":
+        return MTCClientError(str(error.get("message", "")), str(error.get("code", "")), int(error.get("status_code", 0)))
+    return RuntimeError(str(error.get("message", "")))
+
+
+class ReplayCalls:
+    def __init__(self) -> None:
+        self.candles: Dict[str, Any] = {}
+        self.missing: List[str] = []
+        self.unused = 0
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+
+    def load(self, calls: Sequence[Dict[str, Any]]) -> None:
+        self.unused += sum(len(q) for q in self._queues.values())
+        self._queues = {}
+        for entry in calls:
+            key = call_key(entry["fn"], entry.get("args", []), entry.get("kwargs", {}))
+            self._queues.setdefault(key, deque()).append(entry)
+
+    def take(self, fn: str, args: Sequence[Any], kwargs: Dict[str, Any], sticky: bool = False) -> Any:
+        key = call_key(fn, args, kwargs)
+        queue = self._queues.get(key)
+        if queue:
+            entry = queue.popleft()
+            self._last[key] = entry
+        elif sticky and key in self._last:
+            entry = self._last[key]
+        else:
+            self.missing.append(key)
+            raise ReplayMismatch(f"No recorded response for {key}")
+        if "error" in entry:
+            raise _recorded_error(entry["error"])
+        if "digest" in entry:
+            return [dict(candle) for candle in self.candles[entry["digest"]]]
+        return entry.get("result")
+
+
+class ReplayClient:
+    def __init__(self, calls: ReplayCalls) -> None:
+        self.api_key = "replay"
+        self._calls = calls
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._calls.take(name, args, kwargs)
+
+
+class ReplayCandles:
+    def __init__(self, calls: ReplayCalls) -> None:
+        self._calls = calls
+
+    def get_candles(self, *args: Any, **kwargs: Any) -> Any:
+        return self._calls.take("get_candles", args, kwargs, sticky=True)
+
+
+class DecisionCollector:
+    def __init__(self) -> None:
+        self.decisions: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def capture(self, kind: str, ts: int, clock: float, state: Any, op: Optional[Dict[str, Any]] = None) -> Iterator[None]:
+        yield
+
+    def decision(self, kind: str, payload: Dict[str, Any]) -> None:
+        self.decisions.append({"kind": kind, **payload})
+
+
+def build_runner(meta: Dict[str, Any], db_path: str, calls: ReplayCalls) -> BotRunner:
+    settings = meta.get("settings", {})
+    runner = BotRunner(
+        db_path=db_path,
+        base_url="replay://",
+        api_key="replay",
+        poll_seconds=int(meta.get("poll_seconds", 20)),
+        dry_run=bool(meta.get("dry_run", True)),
+        bot_name=str(meta.get("bot_name", "replay")),
+        bot_desc=str(meta.get("bot_desc", "")),
+        trade_coin=str(meta.get("trade_coin", "ETHUSDT")),
+        margin_boks=float(settings.get("margin_boks", 100.0)),
+        leverage=float(settings.get("leverage", 5.0)),
+        sl_capital_pct=float(settings.get("sl_capital_pct", 0.01)),
+        tp_capital_pct=float(settings.get("tp_capital_pct", 0.03)),
+        max_positions=int(meta.get("max_positions", 5)),
+        scanner_symbols=list(meta.get("scanner_symbols", [])),
+        scanner_max_positions=int(meta.get("scanner_max_positions", 3)),
+        client=ReplayClient(calls),
+        hyperliquid=ReplayCandles(calls),
+    )
+    return runner
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_s": statistics.fmean(ordered),
+        "median_s": statistics.median(ordered),
+        "p95_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max_s": ordered[-1],
+        "total_s": sum(ordered),
+    }
+
+
+def _run_record(runner: BotRunner, record: Dict[str, Any]) -> None:
+    if record["type"] == "tick":
+        runner.run_once(now=int(record["ts"]))
+        return
+    op = dict(record.get("op") or {})
+    name = str(op.pop("op", ""))
+    if name not in MANUAL_OPS:
+        raise ReplayMismatch(f"Unknown manual op: {name}")
+    getattr(runner, name)(**op)
+
+
+def replay(
+    path: str,
+    kinds: Sequence[str] = REPLAY_KINDS,
+    db_path: str = "",
+    bot: str = "",
+    limit: int = 0,
+    max_mismatches: int = 20,
+) -> Dict[str, Any]:
+    workdir = None
+    if not db_path:
+        workdir = tempfile.TemporaryDirectory(prefix="replay-")
+        db_path = os.path.join(workdir.name, "replay.db")
+    init_db(db_path)
+    calls = ReplayCalls()
+    runner: Optional[BotRunner] = None
+    collector = DecisionCollector()
+    replayed: List[float] = []
+    recorded: List[float] = []
+    mismatches: List[Dict[str, Any]] = []
+    mismatch_count = 0
+    counts: Dict[str, int] = {}
+    started = time.perf_counter()
+    try:
+        for record in read_journal(path):
+            kind = record.get("type")
+            if kind == "candles":
+                calls.candles[record["digest"]] = record["items"]
+                continue
+            if kind == "meta":
+                if runner is None and (not bot or record.get("bot_name") == bot):
+                    runner = build_runner(record, db_path, calls)
+                    runner.journal = collector
+                continue
+            if kind not in kinds or runner is None or (bot and record.get("bot") != bot):
+                continue
+            runner.restore_state(record.get("state", {}))
+            clock = float(record.get("clock", record.get("ts", 0)))
+            runner.clock = lambda: clock
+            calls.load(record.get("calls", []))
+            collector.decisions = []
+            tick_started = time.perf_counter()
+            error = ""
+            try:
+                _run_record(runner, record)
+            except ReplayMismatch as exc:
+                error = str(exc)
+            replayed.append(time.perf_counter() - tick_started)
+            recorded.append(float(record.get("seconds", 0.0)))
+            counts[kind] = counts.get(kind, 0) + 1
+            if error or collector.decisions != record.get("decisions", []):
+                mismatch_count += 1
+                if len(mismatches) < max_mismatches:
+                    mismatches.append(
+                        {
+                            "type": kind,
+                            "ts": record.get("ts"),
+                            "expected": record.get("decisions", []),
+                            "actual": collector.decisions,
+                            "error": error,
+                        }
+                    )
+            if limit and sum(counts.values()) >= limit:
+                break
+        calls.load([])
+    finally:
+        if runner is not None and runner.scanner is not None:
+            runner.scanner.close()
+        if workdir is not None:
+            workdir.cleanup()
+    return {
+        "journal": path,
+        "records": counts,
+        "mismatch_count": mismatch_count,
+        "mismatches": mismatches,
+        "missing_calls": len(calls.missing),
+        "unused_calls": calls.unused,
+        "seconds": round(time.perf_counter() - started, 6),
+        "replay": _summary(replayed),
+        "recorded": _summary(recorded),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-drive BotRunner decisions from an event journal without network.")
+    parser.add_argument("journal", help="Journal directory or a single journal-*.jsonl.gz segment.")
+    parser.add_argument("--kind", action="append", choices=list(REPLAY_KINDS), help="Record types to replay (repeatable).")
+    parser.add_argument("--bot", default="", help="Only replay records of this bot name.")
+    parser.add_argument("--db", default="", help="SQLite file for replay side effects (default: temporary).")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many records.")
+    parser.add_argument("--output", default="", help="Write the report JSON to this path (default stdout).")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 when any decision differs from the journal.")
+    args = parser.parse_args(argv)
+
+    report = replay(args.journal, kinds=args.kind or REPLAY_KINDS, db_path=args.db, bot=args.bot, limit=args.limit)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if report["mismatch_count"]:
+        print(f"{report['mismatch_count']} replayed records diverged from the journal", file=sys.stderr)
+    return 1 if args.strict and report["mismatch_count"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -36,3 +36,36 @@ def build_long_sl_tp_prices(
         "sl_move_pct": sl_move_pct,
         "tp_move_pct": tp_move_pct,
     }
+
+
+def capital_exit(pnl: float, capital: float, sl_capital_pct: float, tp_capital_pct: float) -> str:
+    if capital <= 0:
+        return ""
+    if pnl <= -abs(capital * sl_capital_pct):
+        return "SL"
+    if pnl >= abs(capital * tp_capital_pct):
+        return "TP"
+    return ""
+
+
+def r_multiple_exit(pnl: float, risk_r: float, peak_pnl: float, trailing_active: bool) -> Dict[str, object]:
+    risk_r = max(risk_r, 1e-9)
+    peak = max(peak_pnl, pnl)
+    activated = not trailing_active and pnl >= risk_r
+    trailing = trailing_active or activated
+    reason = ""
+    if pnl <= -risk_r:
+        reason = "SL"
+    elif pnl >= 2 * risk_r:
+        reason = "TP"
+    elif trailing and (peak - pnl) >= risk_r:
+        reason = "TRAIL"
+    return {"peak_pnl": peak, "trailing_active": trailing, "activated": activated, "exit": reason}
+
+
+def estimate_long_pnl(entry_price: float, mark_price: float, notional: float, size: float = 0.0) -> float:
+    if entry_price <= 0 or mark_price <= 0:
+        return 0.0
+    if size > 0:
+        return (mark_price - entry_price) * size
+    return (mark_price - entry_price) / entry_price * notional
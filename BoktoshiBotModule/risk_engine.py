@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .risk import capital_exit, estimate_long_pnl, r_multiple_exit
+
+RULE_CAPITAL = "capital"
+RULE_R_MULTIPLE = "r_multiple"
+
+
+class TrackedPosition:
+    def __init__(
+        self,
+        position_id: str,
+        owner: str,
+        coin: str,
+        entry_price: float,
+        notional: float,
+        rule: str,
+        size: float = 0.0,
+        capital: float = 0.0,
+        sl_capital_pct: float = 0.0,
+        tp_capital_pct: float = 0.0,
+        risk_r: float = 0.0,
+        peak_pnl: float = 0.0,
+        trailing_active: bool = False,
+    ) -> None:
+        self.position_id = position_id
+        self.owner = owner
+        self.coin = coin
+        self.entry_price = entry_price
+        self.notional = notional
+        self.size = size
+        self.rule = rule
+        self.capital = capital
+        self.sl_capital_pct = sl_capital_pct
+        self.tp_capital_pct = tp_capital_pct
+        self.risk_r = risk_r
+        self.peak_pnl = peak_pnl
+        self.trailing_active = trailing_active
+        self.last_pnl: Optional[float] = None
+        self.last_price: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+ExitCallback = Callable[[TrackedPosition, str, float], None]
+
+
+class RiskEngine:
+    def __init__(self, on_exit: ExitCallback) -> None:
+        self.on_exit = on_exit
+        self._positions: Dict[str, TrackedPosition] = {}
+        self._lock = threading.Lock()
+        self.last_prices: Dict[str, Tuple[float, float]] = {}
+        self.evaluations = 0
+        self.exits = 0
+
+    def sync(self, positions: List[TrackedPosition]) -> None:
+        with self._lock:
+            previous = self._positions
+            current: Dict[str, TrackedPosition] = {}
+            for pos in positions:
+                old = previous.get(pos.position_id)
+                if old is not None and old.rule == pos.rule == RULE_R_MULTIPLE:
+                    pos.peak_pnl = max(pos.peak_pnl, old.peak_pnl)
+                    pos.trailing_active = pos.trailing_active or old.trailing_active
+                current[pos.position_id] = pos
+            self._positions = current
+
+    def tracked(self, position_id: str) -> Optional[TrackedPosition]:
+        with self._lock:
+            return self._positions.get(position_id)
+
+    def coins(self) -> List[str]:
+        with self._lock:
+            return sorted({pos.coin for pos in self._positions.values()})
+
+    def on_price(self, coin: str, price: float) -> List[Tuple[str, str]]:
+        if price <= 0:
+            return []
+        triggered: List[Tuple[TrackedPosition, str, float]] = []
+        with self._lock:
+            self.last_prices[coin] = (price, time.time())
+            for pos in list(self._positions.values()):
+                if pos.coin != coin:
+                    continue
+                self.evaluations += 1
+                reason, pnl = self._evaluate(pos, price)
+                if reason:
+                    del self._positions[pos.position_id]
+                    triggered.append((pos, reason, pnl))
+            self.exits += len(triggered)
+        for pos, reason, pnl in triggered:
+            self.on_exit(pos, reason, pnl)
+        return [(pos.position_id, reason) for pos, reason, _ in triggered]
+
+    def _evaluate(self, pos: TrackedPosition, price: float) -> Tuple[str, float]:
+        pnl = estimate_long_pnl(pos.entry_price, price, pos.notional, pos.size)
+        pos.last_pnl = pnl
+        pos.last_price = price
+        if pos.rule == RULE_R_MULTIPLE:
+            decision = r_multiple_exit(pnl, pos.risk_r, pos.peak_pnl, pos.trailing_active)
+            pos.peak_pnl = float(decision["peak_pnl"])
+            pos.trailing_active = bool(decision["trailing_active"])
+            return str(decision["exit"]), pnl
+        return capital_exit(pnl, pos.capital, pos.sl_capital_pct, pos.tp_capital_pct), pnl
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "positions": [pos.to_dict() for pos in self._positions.values()],
+                "last_prices": {coin: {"price": p, "ts": ts} for coin, (p, ts) in self.last_prices.items()},
+                "evaluations": self.evaluations,
+                "exits": self.exits,
+            }
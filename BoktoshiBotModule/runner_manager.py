@@ -0,0 +1,259 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from .bot_runner import BotRunner
+from .candle_cache import SharedCandleCache
+from .hyperliquid_client import HyperliquidClient
+from .mtc_client import MTCClient
+from .overlay_cache import OverlayCache
+from .storage import add_log, disable_write_queue, enable_write_queue, init_db, write_queue_status
+
+BOT_DEFAULTS: Dict[str, Any] = {
+    "base_url": "https://boktoshi.com/api/v1",
+    "api_key": "",
+    "poll_seconds": 20,
+    "dry_run": True,
+    "bot_desc": "",
+    "trade_coin": "ETHUSDT",
+    "margin_boks": 100.0,
+    "leverage": 5.0,
+    "sl_capital_pct": 0.01,
+    "tp_capital_pct": 0.03,
+    "max_positions": 5,
+    "scanner_symbols": None,
+    "scanner_max_positions": 3,
+}
+
+
+def load_bot_specs(path: str) -> List[Dict[str, Any]]:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get("bots", [])
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a list of bot specs")
+    return [item for item in data if isinstance(item, dict)]
+
+
+class _BotSlot:
+    def __init__(self, bot_id: str, runner: BotRunner, strategy: str) -> None:
+        self.bot_id = bot_id
+        self.runner = runner
+        self.strategy = strategy
+        self.running = False
+        self.next_due = 0.0
+        self.future: Optional[Future] = None
+        self.ticks = 0
+        self.last_error = ""
+
+
+class RunnerManager:
+    def __init__(
+        self,
+        max_workers: int = 4,
+        schedule_seconds: float = 0.5,
+        candle_ttl_seconds: float = 10.0,
+        pool_size: int = 16,
+    ) -> None:
+        self.max_workers = max_workers
+        self.schedule_seconds = schedule_seconds
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.hyperliquid = SharedCandleCache(HyperliquidClient(pool_size=pool_size), ttl_seconds=candle_ttl_seconds)
+        self.overlay_cache = OverlayCache(max_entries=32)
+        self._slots: Dict[str, _BotSlot] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.fence: Optional[Callable[[], bool]] = None
+
+    def add_bot(self, spec: Dict[str, Any]) -> BotRunner:
+        bot_id = str(spec.get("id", "")).strip()
+        db_path = str(spec.get("db_path", "")).strip()
+        if not bot_id:
+            raise ValueError("bot spec requires an id")
+        if not db_path:
+            raise ValueError(f"bot {bot_id}: db_path is required")
+        params = dict(BOT_DEFAULTS)
+        params.update({k: v for k, v in spec.items() if k in BOT_DEFAULTS})
+        with self._lock:
+            if bot_id in self._slots:
+                raise ValueError(f"bot {bot_id} already registered")
+            if any(slot.runner.db_path == db_path for slot in self._slots.values()):
+                raise ValueError(f"bot {bot_id}: db_path {db_path} is already used by another bot")
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        init_db(db_path)
+        client = MTCClient(params["base_url"], params["api_key"], session=self.session)
+        runner = BotRunner(
+            db_path=db_path,
+            bot_name=str(spec.get("bot_name") or bot_id),
+            client=client,
+            hyperliquid=self.hyperliquid,
+            overlay_cache=self.overlay_cache,
+            **params,
+        )
+        runner.fence = self.fence
+        runner.instrumentation.bot = bot_id
+        runner.load_runtime_settings_from_db()
+        strategy = str(spec.get("strategy", "")).strip()
+        if strategy:
+            runner.set_active_strategy(strategy)
+
+        slot = _BotSlot(bot_id, runner, strategy)
+        with self._lock:
+            self._slots[bot_id] = slot
+        if self._thread and self._thread.is_alive():
+            enable_write_queue(db_path)
+        if spec.get("autostart", True):
+            self.start_bot(bot_id)
+        return runner
+
+    def remove_bot(self, bot_id: str) -> bool:
+        self.stop_bot(bot_id)
+        with self._lock:
+            slot = self._slots.pop(bot_id, None)
+        if slot is None:
+            return False
+        self._close_scanner(slot)
+        if self._thread and self._thread.is_alive():
+            disable_write_queue(slot.runner.db_path)
+        return True
+
+    def get_runner(self, bot_id: str) -> Optional[BotRunner]:
+        slot = self._slots.get(bot_id)
+        return slot.runner if slot else None
+
+    def set_fence(self, fence: Optional[Callable[[], bool]]) -> None:
+        self.fence = fence
+        with self._lock:
+            for slot in self._slots.values():
+                slot.runner.fence = fence
+
+    def start_bot(self, bot_id: str) -> bool:
+        slot = self._slots.get(bot_id)
+        if slot is None:
+            return False
+        slot.running = True
+        slot.next_due = 0.0
+        return True
+
+    def stop_bot(self, bot_id: str) -> bool:
+        slot = self._slots.get(bot_id)
+        if slot is None:
+            return False
+        slot.running = False
+        return True
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            db_paths = [slot.runner.db_path for slot in self._slots.values()]
+        enable_write_queue(*db_paths)
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bot-tick")
+        self._thread = threading.Thread(target=self._schedule_loop, name="bot-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            slots = list(self._slots.values())
+        for slot in slots:
+            self._close_scanner(slot)
+        disable_write_queue(*[slot.runner.db_path for slot in slots])
+
+    def _close_scanner(self, slot: _BotSlot) -> None:
+        if slot.runner.scanner is None:
+            return
+        try:
+            slot.runner.scanner.close()
+        except Exception as exc:
+            add_log(slot.runner.db_path, int(time.time()), "WARN", f"Scanner shutdown failed for {slot.bot_id}: {exc}")
+
+    def _schedule_loop(self) -> None:
+        while not self._stop.is_set():
+            self.dispatch_due()
+            self._stop.wait(self.schedule_seconds)
+
+    def dispatch_due(self, now: Optional[float] = None) -> int:
+        current = time.time() if now is None else now
+        dispatched = 0
+        with self._lock:
+            slots = list(self._slots.values())
+        for slot in slots:
+            if not slot.running or current < slot.next_due:
+                continue
+            if slot.future is not None and not slot.future.done():
+                continue
+            slot.next_due = current + slot.runner.poll_seconds
+            if self._executor is None:
+                self._run_slot(slot, int(current))
+            else:
+                slot.future = self._executor.submit(self._run_slot, slot, int(current))
+            dispatched += 1
+        return dispatched
+
+    def _run_slot(self, slot: _BotSlot, now: int) -> None:
+        try:
+            slot.runner.run_once(now)
+            slot.ticks += 1
+            slot.last_error = ""
+        except Exception as exc:
+            slot.last_error = str(exc)
+            add_log(slot.runner.db_path, now, "ERROR", f"Scheduled tick failed for {slot.bot_id}: {exc}")
+
+    def bot_status(self, bot_id: str) -> Optional[Dict[str, Any]]:
+        slot = self._slots.get(bot_id)
+        if slot is None:
+            return None
+        runner = slot.runner
+        return {
+            "id": slot.bot_id,
+            "bot_name": runner.bot_name,
+            "db_path": runner.db_path,
+            "running": slot.running,
+            "busy": slot.future is not None and not slot.future.done(),
+            "ticks": slot.ticks,
+            "next_due": slot.next_due,
+            "last_error": slot.last_error,
+            "active_strategy": runner.get_active_strategy(),
+            "strategy_state": "paused" if runner.is_strategy_paused() else "running",
+            "poll_seconds": runner.poll_seconds,
+            "dry_run": runner.dry_run,
+        }
+
+    def list_bots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            bot_ids = list(self._slots)
+        return [status for status in (self.bot_status(bot_id) for bot_id in bot_ids) if status]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bots": len(self._slots),
+            "running": sum(1 for slot in self._slots.values() if slot.running),
+            "max_workers": self.max_workers,
+            "candle_cache": self.hyperliquid.stats(),
+            "overlay_cache": self.overlay_cache.stats(),
+            "write_queue": write_queue_status(),
+        }
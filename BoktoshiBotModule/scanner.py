@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Dict, List, Optional, Tuple
+
+from .hyperliquid_client import HyperliquidClient
+from .overlay_cache import closed_candles, last_closed_open_time
+from .strategies import STRATEGIES, Strategy, StrategyRegistry
+
+
+def _normalize_coin(symbol: str) -> str:
+    value = str(symbol).upper().strip()
+    return value[:-4] if value.endswith("USDT") else value
+
+
+class StrategyScanner:
+    def __init__(
+        self,
+        hyperliquid: HyperliquidClient,
+        symbols: List[str],
+        max_workers: int = 8,
+        strategies: Optional[StrategyRegistry] = None,
+    ) -> None:
+        self.hyperliquid = hyperliquid
+        self.strategies = strategies or STRATEGIES
+        self.coins = list(dict.fromkeys(_normalize_coin(s) for s in symbols if str(s).strip()))
+        self.max_workers = max(1, min(max_workers, len(self.coins) or 1))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._last_key: Optional[Tuple[str, int]] = None
+        self._last_result: Dict[str, Any] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scanner")
+            return self._executor
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def fetch_universe(self, interval: str, bars: int) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+        pool = self._pool()
+        futures = {
+            coin: pool.submit(copy_context().run, self.hyperliquid.get_candles, coin, interval=interval, bars=bars)
+            for coin in self.coins
+        }
+        candles: Dict[str, List[Dict[str, Any]]] = {}
+        errors: Dict[str, str] = {}
+        for coin, future in futures.items():
+            try:
+                candles[coin] = future.result()
+            except Exception as exc:
+                errors[coin] = str(exc)
+        return candles, errors
+
+    def scan(self, strategy_id: str, now_ms: Optional[int] = None, force: bool = False) -> Dict[str, Any]:
+        strategy = self.strategies.get(strategy_id)
+        if strategy is None:
+            return {"strategy": strategy_id, "signals": [], "errors": {"*": f"Unsupported strategy: {strategy_id}"}}
+        current_ms = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        key = (strategy.id, last_closed_open_time(strategy.interval, current_ms))
+        with self._lock:
+            if not force and key == self._last_key and self._last_result:
+                return self._last_result
+
+        fetched, errors = self.fetch_universe(strategy.interval, strategy.bars)
+        universe = {coin: closed_candles(items, current_ms) for coin, items in fetched.items()}
+        rows = evaluate_universe(strategy, universe)
+        ranked = sorted(rows, key=lambda r: (bool(r["signal"]), float(r.get("score", 0.0))), reverse=True)
+        for idx, row in enumerate(ranked, start=1):
+            row["rank"] = idx
+
+        result = {
+            "strategy": strategy.id,
+            "interval": strategy.interval,
+            "scanned_at": int(current_ms / 1000),
+            "candle_key": key[1],
+            "signals": ranked,
+            "errors": errors,
+        }
+        with self._lock:
+            self._last_key = key if not errors else None
+            self._last_result = result
+        return result
+
+
+def _length_groups(
+    universe: Dict[str, List[Dict[str, Any]]], min_bars: int
+) -> Tuple[Dict[int, List[str]], List[Dict[str, Any]]]:
+    groups: Dict[int, List[str]] = {}
+    skipped: List[Dict[str, Any]] = []
+    for coin in sorted(universe):
+        count = len(universe[coin])
+        if count >= min_bars:
+            groups.setdefault(count, []).append(coin)
+        else:
+            skipped.append(
+                {"coin": coin, "signal": False, "reason": "not_enough_candles", "needed": min_bars, "current": count, "score": 0.0}
+            )
+    return groups, skipped
+
+
+def evaluate_universe(strategy: Strategy, universe: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    groups, out = _length_groups(universe, strategy.min_bars)
+    evaluated: Dict[str, Dict[str, Any]] = {}
+    for width, coins in groups.items():
+        result = strategy.evaluate_batch([universe[coin] for coin in coins])
+        for r, coin in enumerate(coins):
+            row = {"coin": coin, **result.payload(r, width - 1)}
+            row["score"] = strategy.score_of(row)
+            evaluated[coin] = row
+    out.extend(evaluated[coin] for coin in sorted(evaluated))
+    return out
@@ -0,0 +1,327 @@
+import json
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .hyperliquid_client import HyperliquidClient
+from .overlay_cache import closed_candles
+from .risk import build_long_sl_tp_prices
+from .storage import add_shadow_trade, get_kv, get_shadow_totals, get_shadow_trades, set_kv
+from .strategies import (
+    PRICE_FIELDS,
+    Column,
+    Indicator,
+    RuleStrategy,
+    StrategyError,
+    StrategyRegistry,
+    derive_strategy,
+    fresh_candles,
+    strategy_from_dict,
+)
+
+Candle = Dict[str, Any]
+NodeKey = Tuple[str, int, str]
+SHADOW_STATE_KEY = "shadow_state"
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _stop_hit(position: Dict[str, Any], low: float, high: float) -> Tuple[float, str]:
+    if position["stop_loss"] > 0 and low <= position["stop_loss"]:
+        return float(position["stop_loss"]), "SL"
+    if position["take_profit"] > 0 and high >= position["take_profit"]:
+        return float(position["take_profit"]), "TP"
+    return 0.0, ""
+
+
+class IndicatorGraph:
+    def __init__(self, interval: str) -> None:
+        self.interval = interval
+        self.interval_ms = HyperliquidClient._interval_to_ms(interval)
+        self.depth = 1
+        self.updates = 0
+        self._specs: Dict[NodeKey, Indicator] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.last_open_time: Optional[float] = None
+        self._nodes = {key: spec.streaming() for key, spec in self._specs.items()}
+        self._rows: Deque[Dict[Any, Optional[float]]] = deque(maxlen=self.depth)
+        self._prices: Dict[str, Column] = {}
+
+    @property
+    def nodes(self) -> int:
+        return len(self._specs)
+
+    def bind(self, indicators: Dict[str, Indicator], depth: int) -> Dict[str, NodeKey]:
+        mapping = {name: (ind.kind, ind.period, ind.source) for name, ind in indicators.items()}
+        added = False
+        for name, ind in indicators.items():
+            if mapping[name] not in self._specs:
+                self._specs[mapping[name]] = ind
+                added = True
+        if added or depth > self.depth:
+            self.depth = max(self.depth, depth)
+            self.reset()
+        return mapping
+
+    def feed(self, candles: List[Candle]) -> Tuple[bool, List[Candle]]:
+        reset, items = fresh_candles(candles, self.last_open_time, self.interval_ms)
+        if reset:
+            self.reset()
+        return reset, items
+
+    def push(self, candle: Candle) -> None:
+        row: Dict[Any, Optional[float]] = {field: _to_float(candle.get(field, 0.0)) for field in PRICE_FIELDS}
+        for key, node in self._nodes.items():
+            row[key] = node.update(row[key[2]])
+        row["open_time"] = _to_float(candle.get("open_time", 0))
+        self.updates += len(self._nodes)
+        self._rows.append(row)
+        self._prices = {}
+        self.count += 1
+        self.last_open_time = row["open_time"]
+
+    def last(self) -> Dict[Any, Optional[float]]:
+        return self._rows[-1] if self._rows else {}
+
+    def columns(self, mapping: Dict[str, NodeKey]) -> Dict[str, Column]:
+        if not self._prices:
+            self._prices = {field: [row[field] for row in self._rows] for field in PRICE_FIELDS + ("open_time",)}
+        columns = dict(self._prices)
+        for name, key in mapping.items():
+            columns[name] = [row[key] for row in self._rows]
+        return columns
+
+
+class ShadowVariant:
+    def __init__(self, strategy: RuleStrategy, graph: IndicatorGraph, base: str = "") -> None:
+        self.strategy = strategy
+        self.graph = graph
+        self.base = base or strategy.id
+        self.nodes = graph.bind(strategy.indicators, strategy.lookback + 1)
+        self.evaluated = 0
+        self.signals = 0
+        self.last_reason = ""
+        self.last_signal_at = 0
+        self.position: Optional[Dict[str, Any]] = None
+
+    @property
+    def id(self) -> str:
+        return self.strategy.id
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "base": self.base,
+            "label": self.strategy.label,
+            "interval": self.strategy.interval,
+            "evaluated": self.evaluated,
+            "signals": self.signals,
+            "last_reason": self.last_reason,
+            "last_signal_at": self.last_signal_at,
+            "position": self.position,
+        }
+
+
+class ShadowMode:
+    def __init__(self, db_path: str, coin: str) -> None:
+        self.db_path = db_path
+        self.coin = coin
+        self.graphs: Dict[str, IndicatorGraph] = {}
+        self.variants: Dict[str, ShadowVariant] = {}
+        self.errors: Dict[str, str] = {}
+        try:
+            saved = json.loads(get_kv(db_path, SHADOW_STATE_KEY, "") or "{}")
+        except ValueError:
+            saved = {}
+        self._saved: Dict[str, Any] = saved.get("variants", {}) if isinstance(saved, dict) else {}
+
+    def add(self, strategy: RuleStrategy, base: str = "") -> ShadowVariant:
+        if strategy.id in self.variants:
+            raise StrategyError(f"Shadow variant already registered: {strategy.id}")
+        graph = self.graphs.get(strategy.interval)
+        if graph is None:
+            graph = self.graphs[strategy.interval] = IndicatorGraph(strategy.interval)
+        variant = ShadowVariant(strategy, graph, base)
+        position = self._saved.get(strategy.id, {}).get("position")
+        variant.position = position if isinstance(position, dict) else None
+        self.variants[strategy.id] = variant
+        return variant
+
+    def run(self, now: int, fetch: Callable[[str, int], List[Candle]], risk: Dict[str, float]) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        evaluated = False
+        for interval, graph in self.graphs.items():
+            group = [v for v in self.variants.values() if v.graph is graph]
+            try:
+                candles = closed_candles(fetch(interval, max(v.strategy.bars for v in group)), now * 1000)
+            except Exception as exc:
+                self.errors[interval] = str(exc)
+                continue
+            self.errors.pop(interval, None)
+            backfill, items = graph.feed(candles)
+            for i, candle in enumerate(items):
+                graph.push(candle)
+                if backfill and i < len(items) - 1:
+                    for variant in group:
+                        event = self._replay_stops(variant)
+                        if event is not None:
+                            events.append(event)
+                    continue
+                evaluated = True
+                for variant in group:
+                    event = self._step(variant, risk)
+                    if event is not None:
+                        events.append(event)
+        if evaluated:
+            set_kv(self.db_path, SHADOW_STATE_KEY, json.dumps(self.state(now)))
+        return events
+
+    def _step(self, variant: ShadowVariant, risk: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        strategy = variant.strategy
+        columns = variant.graph.columns(variant.nodes)
+        t = len(columns["close"]) - 1
+        count = variant.graph.count
+        open_time = int(columns["open_time"][t] or 0)
+        close = _to_float(columns["close"][t])
+        variant.evaluated += 1
+        position = variant.position
+        if position is not None:
+            if open_time <= int(position["opened_at"]):
+                return None
+            exit_price, reason = _stop_hit(position, columns["low"][t] or close, columns["high"][t] or close)
+            if not reason and strategy.has_exit and strategy.payload(columns, t, count, "exit").get("signal"):
+                exit_price, reason = close, strategy.exit_reason
+            if not reason:
+                return None
+            return self._close(variant, open_time, exit_price, reason)
+
+        signal = strategy.payload(columns, t, count, "entry")
+        variant.last_reason = str(signal.get("reason", ""))
+        if not signal.get("signal") or close <= 0:
+            return None
+        variant.signals += 1
+        variant.last_signal_at = open_time
+        margin, leverage = float(risk.get("margin_boks", 0.0)), float(risk.get("leverage", 1.0))
+        capital = float(risk.get("capital", 0.0))
+        stop_loss = take_profit = 0.0
+        if capital > 0:
+            sl_pct = float(risk.get("sl_capital_pct", 0.0))
+            targets = build_long_sl_tp_prices(
+                close, capital, margin, leverage, sl_pct, strategy.take_profit_pct(sl_pct, float(risk.get("tp_capital_pct", 0.0)))
+            )
+            stop_loss, take_profit = targets["stop_loss"], targets["take_profit"]
+        variant.position = {
+            "opened_at": open_time,
+            "entry_price": close,
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "notional": margin * leverage,
+        }
+        return {"variant": variant.id, "action": "OPEN", "time": open_time, "price": close, "reason": signal["reason"]}
+
+    def _replay_stops(self, variant: ShadowVariant) -> Optional[Dict[str, Any]]:
+        position = variant.position
+        row = variant.graph.last()
+        if position is None or not row:
+            return None
+        open_time = int(row["open_time"] or 0)
+        if open_time <= int(position["opened_at"]):
+            return None
+        close = _to_float(row["close"])
+        exit_price, reason = _stop_hit(position, row["low"] or close, row["high"] or close)
+        if not reason:
+            return None
+        return self._close(variant, open_time, exit_price, reason)
+
+    def _close(self, variant: ShadowVariant, open_time: int, exit_price: float, reason: str) -> Dict[str, Any]:
+        position = variant.position
+        assert position is not None
+        entry_price = float(position["entry_price"])
+        pnl = (exit_price - entry_price) / entry_price * float(position["notional"]) if entry_price else 0.0
+        add_shadow_trade(
+            self.db_path,
+            variant.id,
+            self.coin,
+            variant.strategy.interval,
+            int(position["opened_at"]),
+            open_time,
+            entry_price,
+            exit_price,
+            reason,
+            pnl,
+        )
+        variant.position = None
+        return {"variant": variant.id, "action": "CLOSE", "time": open_time, "price": exit_price, "reason": reason, "pnl": pnl}
+
+    def state(self, now: int = 0) -> Dict[str, Any]:
+        return {
+            "coin": self.coin,
+            "updated_at": now,
+            "graphs": {
+                interval: {
+                    "indicator_nodes": graph.nodes,
+                    "variants": sum(1 for v in self.variants.values() if v.graph is graph),
+                    "bars": graph.count,
+                    "indicator_updates": graph.updates,
+                }
+                for interval, graph in self.graphs.items()
+            },
+            "errors": dict(self.errors),
+            "variants": {variant.id: variant.describe() for variant in self.variants.values()},
+        }
+
+
+def load_shadow_variants(path: str, registry: StrategyRegistry) -> List[Tuple[RuleStrategy, str]]:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get("variants", [])
+    if not isinstance(data, list):
+        raise StrategyError(f"{path}: expected a list of shadow variants")
+    out: List[Tuple[RuleStrategy, str]] = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        if "base" not in item:
+            out.append((strategy_from_dict(item), ""))
+            continue
+        base = registry.get(str(item["base"]))
+        if not isinstance(base, RuleStrategy):
+            raise StrategyError(f"{path}: unknown or non-declarative base strategy {item['base']}")
+        out.append((derive_strategy(base, str(item.get("id", "")), dict(item.get("set", {})), str(item.get("label", ""))), base.id))
+    return out
+
+
+def shadow_summary(db_path: str, recent: int = 50) -> Dict[str, Any]:
+    try:
+        state = json.loads(get_kv(db_path, SHADOW_STATE_KEY, "") or "{}")
+    except ValueError:
+        state = {}
+    if not isinstance(state, dict) or not state:
+        return {"enabled": False, "variants": [], "recent": []}
+    totals = get_shadow_totals(db_path)
+    variants = []
+    for variant_id, info in state.get("variants", {}).items():
+        row = {**info, "trades": 0, "wins": 0, "pnl": 0.0, **totals.get(variant_id, {})}
+        row["win_rate"] = row["wins"] / row["trades"] if row["trades"] else None
+        variants.append(row)
+    variants.sort(key=lambda r: float(r["pnl"] or 0.0), reverse=True)
+    return {
+        "enabled": True,
+        "coin": state.get("coin", ""),
+        "updated_at": state.get("updated_at", 0),
+        "graphs": state.get("graphs", {}),
+        "errors": state.get("errors", {}),
+        "variants": variants,
+        "recent": get_shadow_trades(db_path, limit=recent),
+    }
@@ -0,0 +1,793 @@
+import json
+import os
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .hyperliquid_client import HyperliquidClient
+from .strategy import _rsi_value, batch_ema, batch_rsi, batch_sma
+
+Candle = Dict[str, Any]
+Operand = Union[str, float]
+Column = List[Optional[float]]
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+RISK_CAPITAL = "capital"
+RISK_R_MULTIPLE = "r_multiple"
+RULE_OPS = ("gt", "ge", "lt", "le", "between", "cross_above", "cross_below")
+PARITY_BARS = 400
+PARITY_TOLERANCE = 1e-9
+
+STRATEGY_MA50 = "MA50_4H_CROSSUP_3C_LONG_ONLY"
+STRATEGY_EMA_RSI = "EMA_RSI_15M_ETH_ONLY"
+
+
+class StrategyError(ValueError):
+    pass
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _float_column(row: List[Candle], field: str) -> Column:
+    try:
+        return [float(c[field]) for c in row]
+    except (KeyError, TypeError, ValueError):
+        return [_to_float(c.get(field, 0.0)) for c in row]
+
+
+class _StreamingSMA:
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.window: Deque[float] = deque()
+        self.total = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> Optional[float]:
+        if len(self.window) < self.period:
+            self.window.append(value)
+            self.total += value
+            if len(self.window) == self.period:
+                self.value = self.total / self.period
+            return self.value
+        self.total = self.total + (value - self.window.popleft())
+        self.window.append(value)
+        self.value = self.total / self.period
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {"window": list(self.window), "total": self.total, "value": self.value}
+
+    def load(self, state: Dict[str, Any]) -> None:
+        self.window = deque(float(v) for v in state.get("window", []))
+        self.total = float(state.get("total", 0.0))
+        self.value = state.get("value")
+
+
+class _StreamingEMA:
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.seed: List[float] = []
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> Optional[float]:
+        if self.value is None:
+            self.seed.append(value)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = []
+            return self.value
+        self.value = (value - self.value) * self.alpha + self.value
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {"seed": list(self.seed), "value": self.value}
+
+    def load(self, state: Dict[str, Any]) -> None:
+        self.seed = [float(v) for v in state.get("seed", [])]
+        self.value = state.get("value")
+
+
+class _StreamingRSI:
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.prev: Optional[float] = None
+        self.gains: List[float] = []
+        self.losses: List[float] = []
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> Optional[float]:
+        prev, self.prev = self.prev, value
+        if prev is None:
+            return None
+        if self.avg_gain is None or self.avg_loss is None:
+            self.gains.append(max(value - prev, 0.0))
+            self.losses.append(max(prev - value, 0.0))
+            if len(self.gains) < self.period:
+                return None
+            self.avg_gain = sum(self.gains) / self.period
+            self.avg_loss = sum(self.losses) / self.period
+            self.gains, self.losses = [], []
+        else:
+            delta = value - prev
+            self.avg_gain = ((self.avg_gain * (self.period - 1)) + max(delta, 0.0)) / self.period
+            self.avg_loss = ((self.avg_loss * (self.period - 1)) + max(-delta, 0.0)) / self.period
+        self.value = _rsi_value(self.avg_gain, self.avg_loss)
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "prev": self.prev,
+            "gains": list(self.gains),
+            "losses": list(self.losses),
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "value": self.value,
+        }
+
+    def load(self, state: Dict[str, Any]) -> None:
+        self.prev = state.get("prev")
+        self.gains = [float(v) for v in state.get("gains", [])]
+        self.losses = [float(v) for v in state.get("losses", [])]
+        self.avg_gain = state.get("avg_gain")
+        self.avg_loss = state.get("avg_loss")
+        self.value = state.get("value")
+
+
+INDICATOR_KINDS: Dict[str, Tuple[Callable[[List[List[float]], int], List[Column]], Callable[[int], Any], int]] = {
+    "sma": (batch_sma, _StreamingSMA, -1),
+    "ema": (batch_ema, _StreamingEMA, -1),
+    "rsi": (batch_rsi, _StreamingRSI, 0),
+}
+
+
+class Indicator:
+    __slots__ = ("kind", "period", "source")
+
+    def __init__(self, kind: str, period: int, source: str = "close") -> None:
+        if kind not in INDICATOR_KINDS:
+            raise StrategyError(f"Unknown indicator kind: {kind}")
+        if int(period) <= 0:
+            raise StrategyError(f"Indicator period must be > 0: {period}")
+        if source not in PRICE_FIELDS:
+            raise StrategyError(f"Indicator source must be one of {PRICE_FIELDS}: {source}")
+        self.kind = kind
+        self.period = int(period)
+        self.source = source
+
+    @property
+    def warmup(self) -> int:
+        return self.period + INDICATOR_KINDS[self.kind][2]
+
+    def batch(self, matrix: List[List[float]]) -> List[Column]:
+        return INDICATOR_KINDS[self.kind][0](matrix, self.period)
+
+    def streaming(self) -> Any:
+        return INDICATOR_KINDS[self.kind][1](self.period)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "period": self.period, "source": self.source}
+
+
+class Rule:
+    __slots__ = ("op", "left", "right", "upper", "bars", "offset", "label")
+
+    def __init__(
+        self,
+        op: str,
+        left: Operand,
+        right: Operand = 0.0,
+        upper: Optional[Operand] = None,
+        bars: int = 1,
+        offset: int = 0,
+        label: str = "",
+    ) -> None:
+        if op not in RULE_OPS:
+            raise StrategyError(f"Unknown rule op: {op}")
+        if op == "between" and upper is None:
+            raise StrategyError("between rules need an upper bound")
+        if int(bars) < 1 or int(offset) < 0:
+            raise StrategyError("Rule bars must be >= 1 and offset >= 0")
+        self.op = op
+        self.left = left
+        self.right = right
+        self.upper = upper
+        self.bars = int(bars)
+        self.offset = int(offset)
+        self.label = label or f"{left}_{op}_{right}"
+
+    @property
+    def lookback(self) -> int:
+        return self.offset + self.bars - 1 + (1 if self.op.startswith("cross") else 0)
+
+    def operands(self) -> List[str]:
+        return [v for v in (self.left, self.right, self.upper) if isinstance(v, str)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"op": self.op, "left": self.left, "right": self.right, "label": self.label}
+        if self.upper is not None:
+            out["upper"] = self.upper
+        if self.bars != 1:
+            out["bars"] = self.bars
+        if self.offset:
+            out["offset"] = self.offset
+        return out
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rule":
+        return cls(
+            str(data.get("op", "")),
+            data.get("left", "close"),
+            data.get("right", 0.0),
+            upper=data.get("upper"),
+            bars=int(data.get("bars", 1)),
+            offset=int(data.get("offset", 0)),
+            label=str(data.get("label", "")),
+        )
+
+
+def above(left: Operand, right: Operand, **kwargs: Any) -> Rule:
+    return Rule("gt", left, right, **kwargs)
+
+
+def below(left: Operand, right: Operand, **kwargs: Any) -> Rule:
+    return Rule("lt", left, right, **kwargs)
+
+
+def at_or_below(left: Operand, right: Operand, **kwargs: Any) -> Rule:
+    return Rule("le", left, right, **kwargs)
+
+
+def between(left: Operand, lower: Operand, upper: Operand, **kwargs: Any) -> Rule:
+    return Rule("between", left, lower, upper=upper, **kwargs)
+
+
+def cross_above(left: Operand, right: Operand, **kwargs: Any) -> Rule:
+    return Rule("cross_above", left, right, **kwargs)
+
+
+def cross_below(left: Operand, right: Operand, **kwargs: Any) -> Rule:
+    return Rule("cross_below", left, right, **kwargs)
+
+
+def _operand(value: Optional[Operand], columns: Dict[str, Column], width: int) -> Column:
+    if isinstance(value, str):
+        return columns[value]
+    return [None if value is None else float(value)] * width
+
+
+def _compare(op: str, left: Column, right: Column, upper: Column) -> List[bool]:
+    if op == "gt":
+        return [a is not None and b is not None and a > b for a, b in zip(left, right)]
+    if op == "ge":
+        return [a is not None and b is not None and a >= b for a, b in zip(left, right)]
+    if op == "lt":
+        return [a is not None and b is not None and a < b for a, b in zip(left, right)]
+    if op == "le":
+        return [a is not None and b is not None and a <= b for a, b in zip(left, right)]
+    if op == "between":
+        return [a is not None and lo is not None and hi is not None and lo <= a <= hi for a, lo, hi in zip(left, right, upper)]
+    out = [False] * len(left)
+    for t in range(1, len(left)):
+        a0, b0, a1, b1 = left[t - 1], right[t - 1], left[t], right[t]
+        if a0 is None or b0 is None or a1 is None or b1 is None:
+            continue
+        out[t] = (a0 <= b0 and a1 > b1) if op == "cross_above" else (a0 >= b0 and a1 < b1)
+    return out
+
+
+def rule_vector(rule: Rule, columns: Dict[str, Column], width: int) -> List[bool]:
+    values = _compare(
+        rule.op,
+        _operand(rule.left, columns, width),
+        _operand(rule.right, columns, width),
+        _operand(rule.upper, columns, width),
+    )
+    if rule.bars > 1:
+        held: List[bool] = []
+        run = 0
+        for ok in values:
+            run = run + 1 if ok else 0
+            held.append(run >= rule.bars)
+        values = held
+    if rule.offset:
+        values = ([False] * rule.offset + values)[:width]
+    return values
+
+
+class Strategy(ABC):
+    def __init__(
+        self,
+        strategy_id: str,
+        label: str,
+        entry_text: str,
+        interval: str,
+        bars: int,
+        min_bars: int,
+        risk: str = RISK_CAPITAL,
+        tp_r_multiple: float = 0.0,
+        one_position_per_symbol: bool = False,
+        signal_key: str = "",
+        entry_comment: str = "",
+        exit_comment: str = "",
+        marker: str = "",
+        overlay: Sequence[str] = (),
+        score: Optional[Tuple[str, str]] = None,
+        closed_only: bool = True,
+    ) -> None:
+        if risk not in (RISK_CAPITAL, RISK_R_MULTIPLE):
+            raise StrategyError(f"Unknown risk mode: {risk}")
+        self.id = strategy_id.strip().upper()
+        self.label = label or self.id
+        self.entry_text = entry_text
+        self.interval = interval
+        self.interval_ms = HyperliquidClient._interval_to_ms(interval)
+        self.bars = int(bars)
+        self.min_bars = int(min_bars)
+        self.risk = risk
+        self.tp_r_multiple = float(tp_r_multiple)
+        self.one_position_per_symbol = one_position_per_symbol
+        self.signal_key = signal_key or f"last_entry_candle_{self.id.lower()}"
+        self.entry_comment = entry_comment or f"{self.label}: long setup on closed {interval} candle."
+        self.exit_comment = exit_comment or f"{self.label} exit signal on closed {interval} candle."
+        self.marker = marker or f"{self.id} LONG"
+        self.overlay = tuple(overlay)
+        self.score = score
+        self.closed_only = closed_only
+
+    @property
+    def has_exit(self) -> bool:
+        return False
+
+    def indicator_names(self) -> List[str]:
+        return []
+
+    @abstractmethod
+    def live(self) -> "LiveEvaluator":
+        pass
+
+    @abstractmethod
+    def evaluate_batch(self, rows: List[List[Candle]]) -> "BatchResult":
+        pass
+
+    def describe(self) -> Dict[str, str]:
+        return {"id": self.id, "label": self.label, "entry": self.entry_text}
+
+    def take_profit_pct(self, sl_capital_pct: float, tp_capital_pct: float) -> float:
+        return sl_capital_pct * self.tp_r_multiple if self.risk == RISK_R_MULTIPLE else tp_capital_pct
+
+    def score_of(self, signal: Dict[str, Any]) -> float:
+        if self.score is None:
+            return 0.0
+        value, base = _to_float(signal.get(self.score[0])), _to_float(signal.get(self.score[1]))
+        return (value - base) / base * 100 if base else 0.0
+
+
+class BatchResult:
+    def __init__(
+        self,
+        strategy: "RuleStrategy",
+        rows: List[List[Candle]],
+        columns: List[Dict[str, Column]],
+    ) -> None:
+        self.strategy = strategy
+        self.rows = rows
+        self.columns = columns
+        self.entry = [strategy.signal_vector(cols, strategy.entry_rules) for cols in columns]
+        self.exit = [strategy.signal_vector(cols, strategy.exit_rules) for cols in columns]
+
+    def signal(self, kind: str, r: int, t: int) -> bool:
+        return (self.entry if kind == "entry" else self.exit)[r][t]
+
+    def payload(self, r: int, t: int, kind: str = "entry") -> Dict[str, Any]:
+        return self.strategy.payload(self.columns[r], t, t + 1, kind)
+
+
+class RuleStrategy(Strategy):
+    def __init__(
+        self,
+        strategy_id: str,
+        label: str,
+        entry_text: str,
+        interval: str,
+        bars: int,
+        indicators: Dict[str, Indicator],
+        entry: Sequence[Rule],
+        exit: Sequence[Rule] = (),
+        min_bars: int = 0,
+        report: Sequence[str] = (),
+        exit_reason: str = "exit_signal",
+        **kwargs: Any,
+    ) -> None:
+        if not entry:
+            raise StrategyError(f"{strategy_id}: at least one entry rule is required")
+        self.indicators = dict(indicators)
+        self.entry_rules = list(entry)
+        self.exit_rules = list(exit)
+        known = set(PRICE_FIELDS) | set(self.indicators)
+        for name in self.indicators:
+            if name in PRICE_FIELDS:
+                raise StrategyError(f"{strategy_id}: indicator name shadows a price field: {name}")
+        for rule in self.entry_rules + self.exit_rules:
+            missing = [name for name in rule.operands() if name not in known]
+            if missing:
+                raise StrategyError(f"{strategy_id}: rule {rule.label} references unknown series {missing}")
+        self.report = tuple(report) or tuple(self.indicators)
+        self.exit_reason = exit_reason
+        rules = self.entry_rules + self.exit_rules
+        self.lookback = max(rule.lookback for rule in rules)
+        warmup = max((ind.warmup for ind in self.indicators.values()), default=0)
+        super().__init__(strategy_id, label, entry_text, interval, bars, max(min_bars, warmup + self.lookback + 1), **kwargs)
+
+    @property
+    def has_exit(self) -> bool:
+        return bool(self.exit_rules)
+
+    def indicator_names(self) -> List[str]:
+        return list(self.indicators)
+
+    def live(self) -> "LiveEvaluator":
+        return LiveEvaluator(self)
+
+    def evaluate_batch(self, rows: List[List[Candle]]) -> BatchResult:
+        prices = {field: [_float_column(row, field) for row in rows] for field in PRICE_FIELDS}
+        computed = {name: ind.batch(prices[ind.source]) for name, ind in self.indicators.items()}
+        columns: List[Dict[str, Column]] = []
+        for r, row in enumerate(rows):
+            cols: Dict[str, Column] = {field: prices[field][r] for field in PRICE_FIELDS}
+            cols.update({name: matrix[r] for name, matrix in computed.items()})
+            cols["open_time"] = _float_column(row, "open_time")
+            columns.append(cols)
+        return BatchResult(self, rows, columns)
+
+    def signal_vector(self, columns: Dict[str, Column], rules: Sequence[Rule]) -> List[bool]:
+        width = len(columns["close"])
+        if not rules:
+            return [False] * width
+        vectors = [rule_vector(rule, columns, width) for rule in rules]
+        ready = min(max(self.min_bars - 1, 0), width)
+        return [False] * ready + [all(hits) for hits in zip(*vectors)][ready:]
+
+    def payload(self, columns: Dict[str, Column], t: int, count: int, kind: str = "entry") -> Dict[str, Any]:
+        if count < self.min_bars:
+            return {"signal": False, "reason": "not_enough_candles", "needed": self.min_bars, "current": count}
+        rules = self.entry_rules if kind == "entry" else self.exit_rules
+        if any(columns[name][t] is None for name in self.indicators):
+            return {"signal": False, "reason": "indicator_unavailable"}
+        width = len(columns["close"])
+        checks = {rule.label: rule_vector(rule, columns, width)[t] for rule in rules}
+        signal = bool(checks) and all(checks.values())
+        out: Dict[str, Any] = {
+            "signal": signal,
+            "reason": ("long_signal" if kind == "entry" else self.exit_reason) if signal else "conditions_not_met",
+            "close": columns["close"][t],
+        }
+        for name in self.report:
+            out[name] = columns[name][t]
+        out["last_candle_open_time"] = columns["open_time"][t]
+        out["diagnostics"] = {**checks, "passed_filters": [label for label, ok in checks.items() if ok]}
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "entry_text": self.entry_text,
+            "interval": self.interval,
+            "bars": self.bars,
+            "min_bars": self.min_bars,
+            "indicators": {name: ind.to_dict() for name, ind in self.indicators.items()},
+            "entry": [rule.to_dict() for rule in self.entry_rules],
+            "exit": [rule.to_dict() for rule in self.exit_rules],
+            "report": list(self.report),
+            "exit_reason": self.exit_reason,
+            "risk": self.risk,
+            "tp_r_multiple": self.tp_r_multiple,
+            "one_position_per_symbol": self.one_position_per_symbol,
+            "signal_key": self.signal_key,
+            "entry_comment": self.entry_comment,
+            "exit_comment": self.exit_comment,
+            "marker": self.marker,
+            "overlay": list(self.overlay),
+            "score": list(self.score) if self.score else None,
+            "closed_only": self.closed_only,
+        }
+
+
+def strategy_from_dict(data: Dict[str, Any]) -> RuleStrategy:
+    try:
+        indicators = {str(name): Indicator(**spec) for name, spec in dict(data.get("indicators", {})).items()}
+        score = data.get("score")
+        return RuleStrategy(
+            str(data["id"]),
+            str(data.get("label", "")),
+            str(data.get("entry_text", "")),
+            str(data.get("interval", "4h")),
+            int(data.get("bars", 300)),
+            indicators,
+            [Rule.from_dict(item) for item in data.get("entry", [])],
+            [Rule.from_dict(item) for item in data.get("exit", [])],
+            min_bars=int(data.get("min_bars", 0)),
+            report=tuple(data.get("report", ())),
+            exit_reason=str(data.get("exit_reason", "exit_signal")),
+            risk=str(data.get("risk", RISK_CAPITAL)),
+            tp_r_multiple=float(data.get("tp_r_multiple", 0.0)),
+            one_position_per_symbol=bool(data.get("one_position_per_symbol", False)),
+            signal_key=str(data.get("signal_key", "")),
+            entry_comment=str(data.get("entry_comment", "")),
+            exit_comment=str(data.get("exit_comment", "")),
+            marker=str(data.get("marker", "")),
+            overlay=tuple(data.get("overlay", ())),
+            closed_only=bool(data.get("closed_only", True)),
+            score=(str(score[0]), str(score[1])) if score else None,
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        raise StrategyError(f"Invalid strategy definition {data.get('id', '?')}: {exc}") from exc
+
+
+def derive_strategy(base: RuleStrategy, strategy_id: str, overrides: Dict[str, Any], label: str = "") -> RuleStrategy:
+    data = base.to_dict()
+    data.update({"id": strategy_id, "label": label or strategy_id, "signal_key": ""})
+    for path, value in overrides.items():
+        target: Any = data
+        parts = str(path).split(".")
+        for part in parts[:-1]:
+            if isinstance(target, list):
+                matches = [item for item in target if item.get("label") == part]
+                if not matches:
+                    raise StrategyError(f"{strategy_id}: no rule labelled {part} in {path}")
+                target = matches[0]
+            elif isinstance(target, dict) and part in target:
+                target = target[part]
+            else:
+                raise StrategyError(f"{strategy_id}: unknown override path {path}")
+        if not isinstance(target, dict):
+            raise StrategyError(f"{strategy_id}: unknown override path {path}")
+        target[parts[-1]] = value
+    return strategy_from_dict(data)
+
+
+def fresh_candles(candles: Iterable[Candle], last_open_time: Optional[float], step_ms: int) -> Tuple[bool, List[Candle]]:
+    items = list(candles)
+    if not items or last_open_time is None:
+        return last_open_time is None and bool(items), items
+    if _to_float(items[0].get("open_time", 0)) > last_open_time + step_ms or _to_float(
+        items[-1].get("open_time", 0)
+    ) < last_open_time:
+        return True, items
+    return False, [c for c in items if _to_float(c.get("open_time", 0)) > last_open_time]
+
+
+class LiveEvaluator:
+    def __init__(self, strategy: RuleStrategy) -> None:
+        self.strategy = strategy
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.last_open_time: Optional[float] = None
+        self._indicators = {name: ind.streaming() for name, ind in self.strategy.indicators.items()}
+        self._rows: Deque[Dict[str, Optional[float]]] = deque(maxlen=self.strategy.lookback + 1)
+
+    def push(self, candle: Candle) -> None:
+        row: Dict[str, Optional[float]] = {field: _to_float(candle.get(field, 0.0)) for field in PRICE_FIELDS}
+        for name, ind in self.strategy.indicators.items():
+            row[name] = self._indicators[name].update(row[ind.source])
+        row["open_time"] = _to_float(candle.get("open_time", 0))
+        self._rows.append(row)
+        self.count += 1
+        self.last_open_time = row["open_time"]
+
+    def feed(self, candles: Iterable[Candle]) -> int:
+        reset, items = fresh_candles(candles, self.last_open_time, self.strategy.interval_ms)
+        if reset:
+            self.reset()
+        for candle in items:
+            self.push(candle)
+        return len(items)
+
+    def values(self) -> Dict[str, Optional[float]]:
+        return dict(self._rows[-1]) if self._rows else {}
+
+    def _evaluate(self, kind: str) -> Dict[str, Any]:
+        if not self._rows:
+            return self.strategy.payload({}, -1, 0, kind)
+        columns: Dict[str, Column] = {key: [row[key] for row in self._rows] for key in self._rows[0]}
+        return self.strategy.payload(columns, len(self._rows) - 1, self.count, kind)
+
+    def entry(self) -> Dict[str, Any]:
+        return self._evaluate("entry")
+
+    def exit(self) -> Dict[str, Any]:
+        return self._evaluate("exit")
+
+    def signal(self, kind: str) -> bool:
+        return bool(self._evaluate(kind).get("signal"))
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "last_open_time": self.last_open_time,
+            "rows": [dict(row) for row in self._rows],
+            "indicators": {name: ind.state() for name, ind in self._indicators.items()},
+        }
+
+    def load(self, state: Dict[str, Any]) -> None:
+        self.reset()
+        self.count = int(state.get("count", 0))
+        self.last_open_time = state.get("last_open_time")
+        self._rows.extend(dict(row) for row in state.get("rows", []))
+        for name, saved in state.get("indicators", {}).items():
+            if name in self._indicators:
+                self._indicators[name].load(saved)
+
+
+def parity_candles(interval: str, count: int = PARITY_BARS, seed: int = 7) -> List[Candle]:
+    step = HyperliquidClient._interval_to_ms(interval)
+    rng = random.Random(seed)
+    price = 100.0
+    out: List[Candle] = []
+    for i in range(count):
+        drift = 0.004 * (1 if (i // 40) % 2 == 0 else -1)
+        close = max(price * (1 + drift + rng.gauss(0, 0.01)), 0.01)
+        out.append(
+            {
+                "open_time": i * step,
+                "close_time": (i + 1) * step - 1,
+                "open": price,
+                "high": max(price, close) * 1.002,
+                "low": min(price, close) * 0.998,
+                "close": close,
+                "volume": 0.0 if i % 37 == 0 else 10.0 + rng.random(),
+            }
+        )
+        price = close
+    return out
+
+
+def _differs(a: Optional[float], b: Optional[float], tolerance: float) -> float:
+    if a is None or b is None:
+        return 0.0 if a is None and b is None else float("inf")
+    return abs(a - b) if abs(a - b) > tolerance else 0.0
+
+
+def check_parity(strategy: Strategy, candles: List[Candle], tolerance: float = PARITY_TOLERANCE) -> Dict[str, Any]:
+    live = strategy.live()
+    batch = strategy.evaluate_batch([candles])
+    mismatches: List[Dict[str, Any]] = []
+    max_diff = 0.0
+    signals = {"entry": 0, "exit": 0}
+    for t, candle in enumerate(candles):
+        live.feed([candle])
+        values = live.values()
+        for name in strategy.indicator_names():
+            diff = _differs(values.get(name), batch.columns[0][name][t], tolerance)
+            max_diff = max(max_diff, diff)
+            if diff:
+                mismatches.append({"t": t, "series": name, "live": values.get(name), "batch": batch.columns[0][name][t]})
+        for kind in ("entry", "exit"):
+            expected = batch.signal(kind, 0, t)
+            signals[kind] += int(expected)
+            if live.signal(kind) != expected:
+                mismatches.append({"t": t, "rule": kind, "live": not expected, "batch": expected})
+    return {
+        "strategy": strategy.id,
+        "bars": len(candles),
+        "signals": signals,
+        "max_abs_diff": max_diff,
+        "mismatch_count": len(mismatches),
+        "mismatches": mismatches[:20],
+        "ok": not mismatches,
+    }
+
+
+class StrategyRegistry:
+    def __init__(self, parity_bars: int = PARITY_BARS) -> None:
+        self.parity_bars = parity_bars
+        self.parity: Dict[str, Dict[str, Any]] = {}
+        self._items: Dict[str, Strategy] = {}
+
+    def register(self, strategy: Strategy, check: bool = True) -> Strategy:
+        if not strategy.id:
+            raise StrategyError("Strategy id is required")
+        if check:
+            report = check_parity(strategy, parity_candles(strategy.interval, self.parity_bars))
+            if not report["ok"]:
+                raise StrategyError(
+                    f"{strategy.id}: live and batch evaluators disagree on {report['mismatch_count']} bars "
+                    f"(first: {report['mismatches'][0]})"
+                )
+            self.parity[strategy.id] = report
+        self._items[strategy.id] = strategy
+        return strategy
+
+    def __contains__(self, strategy_id: object) -> bool:
+        return isinstance(strategy_id, str) and strategy_id.strip().upper() in self._items
+
+    def get(self, strategy_id: str) -> Optional[Strategy]:
+        return self._items.get(str(strategy_id or "").strip().upper())
+
+    def ids(self) -> List[str]:
+        return list(self._items)
+
+    def default_id(self) -> str:
+        return next(iter(self._items), "")
+
+    def describe(self) -> List[Dict[str, str]]:
+        return [strategy.describe() for strategy in self._items.values()]
+
+    def overlay_series(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(name for strategy in self._items.values() for name in strategy.overlay))
+
+    def load_file(self, path: str) -> List[str]:
+        if not path or not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if isinstance(data, dict):
+            data = data.get("strategies", [])
+        if not isinstance(data, list):
+            raise StrategyError(f"{path}: expected a list of strategy definitions")
+        return [self.register(strategy_from_dict(item)).id for item in data if isinstance(item, dict)]
+
+
+def builtin_strategies() -> List[RuleStrategy]:
+    ma50 = RuleStrategy(
+        STRATEGY_MA50,
+        "MA50 4H CrossUp 3 Candles (ETH only)",
+        "Price crosses above MA50 then closes above MA50 for 3 consecutive 4H candles.",
+        "4h",
+        90,
+        {"ma50": Indicator("sma", 50)},
+        [
+            above("close", "ma50", bars=3, label="above_ma_3c"),
+            at_or_below("close", "ma50", offset=3, label="pre_le_ma"),
+        ],
+        min_bars=54,
+        signal_key="last_entry_candle",
+        entry_comment="MA50(4H) cross-up confirmed by 3 closes. Long setup.",
+        marker="MA50 x3 LONG",
+        overlay=("ma50",),
+        score=("close", "ma50"),
+        closed_only=False,
+    )
+    ema_rsi = RuleStrategy(
+        STRATEGY_EMA_RSI,
+        "EMA20/50 + RSI filter 15m (ETH only)",
+        "EMA20 cross above EMA50 with RSI in 50-70 band on closed 15m candle.",
+        "15m",
+        300,
+        {"ema_fast": Indicator("ema", 20), "ema_slow": Indicator("ema", 50), "rsi": Indicator("rsi", 14)},
+        [
+            cross_above("ema_fast", "ema_slow", label="cross_up"),
+            between("rsi", 50, 70, label="rsi_band_ok"),
+            above("volume", 0, label="volume_ok"),
+            above("close", "ema_slow", label="close_gt_ema_slow"),
+        ],
+        [cross_below("ema_fast", "ema_slow", label="cross_down")],
+        min_bars=55,
+        exit_reason="ema_cross_down",
+        risk=RISK_R_MULTIPLE,
+        tp_r_multiple=2.0,
+        one_position_per_symbol=True,
+        signal_key="last_entry_candle_ema_rsi",
+        entry_comment="EMA20>EMA50 with RSI 50-70 on closed 15m candle. Long setup.",
+        exit_comment="EMA strategy exit: cross down on closed 15m candle.",
+        marker="EMA/RSI LONG",
+        overlay=("ema_fast", "ema_slow"),
+        score=("ema_fast", "ema_slow"),
+    )
+    return [ma50, ema_rsi]
+
+
+STRATEGIES = StrategyRegistry()
+for _builtin in builtin_strategies():
+    STRATEGIES.register(_builtin)
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 def sma(values: List[float], period: int) -> List[float]:
@@ -362,3 +362,62 @@ def detect_ma50_crossup_markers(candles: List[Dict[str, float]]) -> List[Dict[st
         )
 
     return markers
+
+
+def batch_sma(matrix: List[List[float]], period: int) -> List[List[Optional[float]]]:
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    width = len(matrix[0]) if matrix else 0
+    out: List[List[Optional[float]]] = [[None] * width for _ in matrix]
+    if width < period:
+        return out
+    for row, series in zip(matrix, out):
+        total = sum(row[:period])
+        series[period - 1] = total / period
+        for t in range(period, width):
+            total = total + (row[t] - row[t - period])
+            series[t] = total / period
+    return out
+
+
+def batch_ema(matrix: List[List[float]], period: int) -> List[List[Optional[float]]]:
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    width = len(matrix[0]) if matrix else 0
+    out: List[List[Optional[float]]] = [[None] * width for _ in matrix]
+    if width < period:
+        return out
+    alpha = 2 / (period + 1)
+    for row, series in zip(matrix, out):
+        prev = sum(row[:period]) / period
+        series[period - 1] = prev
+        for t in range(period, width):
+            prev = (row[t] - prev) * alpha + prev
+            series[t] = prev
+    return out
+
+
+def _rsi_value(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def batch_rsi(matrix: List[List[float]], period: int) -> List[List[Optional[float]]]:
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    width = len(matrix[0]) if matrix else 0
+    out: List[List[Optional[float]]] = [[None] * width for _ in matrix]
+    if width < period + 1:
+        return out
+    for row, series in zip(matrix, out):
+        avg_gain = sum(max(row[i] - row[i - 1], 0.0) for i in range(1, period + 1)) / period
+        avg_loss = sum(max(row[i - 1] - row[i], 0.0) for i in range(1, period + 1)) / period
+        series[period] = _rsi_value(avg_gain, avg_loss)
+        for t in range(period + 1, width):
+            delta = row[t] - row[t - 1]
+            gain, loss = (delta, 0.0) if delta > 0 else (0.0, -delta)
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+            series[t] = _rsi_value(avg_gain, avg_loss)
+    return out
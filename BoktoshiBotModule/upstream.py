@@ -0,0 +1 @@
+from app.upstream import *  # noqa: F401,F403
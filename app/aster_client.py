@@ -3,6 +3,9 @@ from typing import Any, Dict, List
 
 import requests
 
+from .metrics import upstream_probe
+from .upstream import backoff, timeout_for
+
 
 class AsterClient:
     def __init__(self, base_url: str = "https://www.asterdex.com", timeout_seconds: int = 12) -> None:
@@ -16,15 +19,22 @@ class AsterClient:
             "Accept": "application/json",
             "User-Agent": "zzCatBoktoshiTradingBot/1.0",
         }
+        probe = upstream_probe("aster", path)
         for attempt in range(3):
             try:
-                resp = requests.get(url, params=params, headers=headers, timeout=self.timeout_seconds)
+                try:
+                    with probe.time():
+                        resp = requests.get(url, params=params, headers=headers, timeout=timeout_for(self.timeout_seconds))
+                except requests.RequestException:
+                    probe.record(0)
+                    raise
+                probe.record(resp.status_code)
                 resp.raise_for_status()
                 return resp.json()
             except Exception as exc:
                 last_error = exc
                 if attempt < 2:
-                    time.sleep(0.3 * (attempt + 1))
+                    backoff(0.3 * (attempt + 1))
                     continue
                 raise RuntimeError(f"ASTER request failed for {path}: {exc}") from exc
         raise RuntimeError(f"ASTER request failed for {path}: {last_error}")
@@ -68,6 +78,12 @@ class AsterClient:
                 continue
         raise RuntimeError(f"ASTER depth failed for {symbol}: {last_error}")
 
+    def get_depth_snapshot(self, symbol: str, limit: int = 1000) -> Dict[str, Any]:
+        data = self._get("/fapi/v1/depth", {"symbol": symbol, "limit": limit})
+        if not isinstance(data, dict) or "lastUpdateId" not in data:
+            raise RuntimeError(f"ASTER depth snapshot for {symbol} has no lastUpdateId")
+        return data
+
     def get_exchange_info(self) -> Dict[str, Any]:
         data = self._get("/fapi/v1/exchangeInfo", {})
         return data if isinstance(data, dict) else {}
@@ -0,0 +1,359 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import REGISTRY
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+LEADER_GAUGE = REGISTRY.gauge("leader_is_leader", "1 when this worker holds the trading lease.")
+COMMANDS_TOTAL = REGISTRY.counter("runner_commands_total", "Runner commands handled by the leader.", ("command", "state"))
+
+
+class CommandTimeout(RuntimeError):
+    pass
+
+
+def init_leader_tables(db_path: str) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                term INTEGER NOT NULL,
+                acquired_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS runner_commands (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                command TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL,
+                result TEXT,
+                handled_by TEXT,
+                done_ts REAL
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_runner_commands_state ON runner_commands (state, id)")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaderLease:
+    def __init__(self, db_path: str, name: str = "bot_runner", ttl_seconds: float = 15.0, holder: str = "") -> None:
+        self.db_path = db_path
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.holder = holder or worker_id()
+        self.term = 0
+        self.expires_at = 0.0
+        init_leader_tables(db_path)
+
+    def acquire(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        conn = sqlite3.connect(self.db_path, timeout=self.ttl_seconds / 3)
+        try:
+            cur = conn.execute(
+                """
+                INSERT INTO leases (name, holder, term, acquired_at, expires_at) VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    holder = excluded.holder,
+                    term = CASE WHEN leases.holder = excluded.holder THEN leases.term ELSE leases.term + 1 END,
+                    acquired_at = CASE WHEN leases.holder = excluded.holder THEN leases.acquired_at ELSE excluded.acquired_at END,
+                    expires_at = excluded.expires_at
+                WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+                """,
+                (self.name, self.holder, now, now + self.ttl_seconds, now),
+            )
+            acquired = cur.rowcount == 1
+            conn.commit()
+            if acquired:
+                row = conn.execute("SELECT term, expires_at FROM leases WHERE name=?", (self.name,)).fetchone()
+                self.term, self.expires_at = int(row[0]), float(row[1])
+            return acquired
+        finally:
+            conn.close()
+
+    def release(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("UPDATE leases SET expires_at = 0 WHERE name=? AND holder=?", (self.name, self.holder))
+            conn.commit()
+        finally:
+            conn.close()
+        self.expires_at = 0.0
+
+    def current(self) -> Dict[str, Any]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT holder, term, acquired_at, expires_at FROM leases WHERE name=?", (self.name,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return {}
+        return {"holder": row[0], "term": row[1], "acquired_at": row[2], "expires_at": row[3]}
+
+
+class LeaderElector:
+    def __init__(
+        self,
+        lease: LeaderLease,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        on_follow: Optional[Callable[[], None]] = None,
+        heartbeat_seconds: float = 0.0,
+    ) -> None:
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_follow = on_follow
+        self.heartbeat_seconds = heartbeat_seconds or lease.ttl_seconds / 3
+        self.is_leader = False
+        self.elections = 0
+        self.last_error = ""
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def step(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        with self._lock:
+            try:
+                held = self.lease.acquire(now)
+                self.last_error = ""
+            except sqlite3.Error as exc:
+                held = self.is_leader and now < self.lease.expires_at
+                self.last_error = str(exc)
+            if held and not self.is_leader:
+                self.is_leader = True
+                self.elections += 1
+                self.on_elected()
+            elif not held and self.is_leader:
+                self.is_leader = False
+                self.on_demoted()
+            elif not held and self.on_follow is not None:
+                self.on_follow()
+            return self.is_leader
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.step()
+        self._thread = threading.Thread(target=self._run, name="leader-elector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._lock:
+            if self.is_leader:
+                self.is_leader = False
+                self.on_demoted()
+                self.lease.release()
+
+    def holds(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return self.is_leader and now < self.lease.expires_at
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.step()
+            except Exception as exc:
+                self.last_error = str(exc)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "worker": self.lease.holder,
+            "is_leader": self.is_leader,
+            "term": self.lease.term,
+            "elections": self.elections,
+            "ttl_seconds": self.lease.ttl_seconds,
+            "last_error": self.last_error,
+            "lease": self.lease.current(),
+        }
+
+
+class RunnerCommands:
+    def __init__(
+        self,
+        db_path: str,
+        handlers: Dict[str, Handler],
+        worker: str = "",
+        poll_seconds: float = 0.1,
+        ttl_seconds: float = 30.0,
+    ) -> None:
+        self.db_path = db_path
+        self.handlers = handlers
+        self.worker = worker or worker_id()
+        self.poll_seconds = poll_seconds
+        self.ttl_seconds = ttl_seconds
+        self.handled = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        init_leader_tables(db_path)
+
+    def execute(self, command: str, payload: Dict[str, Any]) -> Any:
+        handler = self.handlers.get(command)
+        if handler is None:
+            raise ValueError(f"Unknown runner command: {command}")
+        return handler(payload)
+
+    def submit(self, command: str, payload: Dict[str, Any]) -> int:
+        if command not in self.handlers:
+            raise ValueError(f"Unknown runner command: {command}")
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cur = conn.execute(
+                "INSERT INTO runner_commands (ts, command, payload, state) VALUES (?, ?, ?, 'pending')",
+                (time.time(), command, json.dumps(payload)),
+            )
+            conn.commit()
+            return int(cur.lastrowid)
+        finally:
+            conn.close()
+
+    def result(self, command_id: int) -> Optional[Dict[str, Any]]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT command, state, result, handled_by FROM runner_commands WHERE id=?", (command_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {
+            "id": command_id,
+            "command": row[0],
+            "state": row[1],
+            "result": json.loads(row[2]) if row[2] else None,
+            "handled_by": row[3] or "",
+        }
+
+    def wait(self, command_id: int, timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        while True:
+            item = self.result(command_id)
+            if item is not None and item["state"] not in {"pending", "running"}:
+                return item
+            if time.monotonic() >= deadline and (self._expire(command_id) or time.monotonic() >= deadline + timeout):
+                raise CommandTimeout(f"Leader did not answer runner command {command_id} within {timeout:.1f}s.")
+            time.sleep(self.poll_seconds)
+
+    def _expire(self, command_id: int) -> bool:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cur = conn.execute(
+                "UPDATE runner_commands SET state='expired', done_ts=? WHERE id=? AND state='pending'",
+                (time.time(), command_id),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def call(self, command: str, payload: Dict[str, Any], timeout: float = 0.0) -> Any:
+        item = self.wait(self.submit(command, payload), timeout or self.ttl_seconds)
+        if item["state"] != "done":
+            raise RuntimeError(str((item["result"] or {}).get("error") or f"Runner command {item['state']}."))
+        return item["result"]
+
+    def _claim(self) -> List[Dict[str, Any]]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE runner_commands SET state='expired', done_ts=? WHERE state IN ('pending', 'running') AND ts < ?",
+                (time.time(), time.time() - self.ttl_seconds),
+            )
+            rows = conn.execute(
+                "SELECT id, command, payload FROM runner_commands WHERE state='pending' ORDER BY id"
+            ).fetchall()
+            conn.executemany(
+                "UPDATE runner_commands SET state='running', handled_by=? WHERE id=?",
+                [(self.worker, row[0]) for row in rows],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return [{"id": row[0], "command": row[1], "payload": json.loads(row[2])} for row in rows]
+
+    def _finish(self, command_id: int, state: str, result: Any) -> None:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                "UPDATE runner_commands SET state=?, result=?, done_ts=? WHERE id=?",
+                (state, json.dumps(result, default=str), time.time(), command_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def process_pending(self) -> int:
+        items = self._claim()
+        for item in items:
+            try:
+                result, state = self.execute(item["command"], item["payload"]), "done"
+            except Exception as exc:
+                result, state = {"error": str(exc)}, "error"
+            self._finish(item["id"], state, result)
+            COMMANDS_TOTAL.inc(1, item["command"], state)
+            self.handled += 1
+        return len(items)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="runner-commands", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.process_pending()
+            except sqlite3.Error:
+                continue
+
+    def status(self) -> Dict[str, Any]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT state, COUNT(*) FROM runner_commands GROUP BY state").fetchall()
+        finally:
+            conn.close()
+        return {"worker": self.worker, "handled": self.handled, "states": {row[0]: row[1] for row in rows}}
+
+
+def bind_metrics(elector: LeaderElector) -> None:
+    LEADER_GAUGE.set_function(lambda: 1.0 if elector.is_leader else 0.0)
@@ -1,30 +1,65 @@
 import json
 import os
-from typing import Any, Dict
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from fastapi import Body, FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.requests import Request
 
+from BoktoshiBotModule.journal import EventJournal
+from BoktoshiBotModule.runner_manager import RunnerManager, load_bot_specs
+from BoktoshiBotModule.shadow import SHADOW_STATE_KEY, load_shadow_variants, shadow_summary
+from BoktoshiBotModule.strategies import RISK_R_MULTIPLE, STRATEGIES
+from AsterTradingModule import AsterLedger, AsterManualTradingService, AsterTradingConfig
+from AsterTradingModule.overview import LegCache
 from .aster_client import AsterClient
 from .bot_runner import BotRunner
-from BoktoshiBotModule.strategy import (
-    build_ema_series,
-    build_ma50_series,
-    detect_ema_rsi_long_markers,
-    detect_ma50_crossup_markers,
+from .hyperliquid_client import HyperliquidClient
+from .leader import CommandTimeout, LeaderElector, LeaderLease, RunnerCommands
+from .leader import bind_metrics as bind_leader_metrics
+from .market_data import (
+    HubCandleSource,
+    MarketDataHub,
+    aster_backfill,
+    aster_stream_factory,
+    candle_to_kline_row,
+    hyperliquid_stream_factory,
 )
-from AsterTradingModule import AsterManualTradingService, AsterTradingConfig
+from .metrics import REGISTRY, RequestMetricsMiddleware
+from .orderbook import OrderBookMirror, websocket_depth_stream
+from .resample import ResampledCandleSource
+from .startup import StartupTracker, bind_metrics
 from .storage import (
+    data_etag,
+    enable_shared_versions,
     get_all_kv,
     get_equity_curve,
     get_logs,
+    get_kv,
     get_signals,
+    get_table_row_counts,
     get_trades,
     init_db,
+    kv_version_key,
 )
+from .upstream import DeadlineExceeded, gate, gates_status
+from .wire import (
+    EQUITY_FIELDS,
+    KLINE_FIELDS,
+    SERIES_FIELDS,
+    SIGNAL_FIELDS,
+    FastJSONResponse,
+    encode_nested_series,
+    encode_series,
+    negotiate,
+)
+
+
+startup = StartupTracker()
 
 
 def _load_env_file_if_exists(path: str) -> None:
@@ -70,6 +105,23 @@ def _safe_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
+def _data_etag(db_path: str, kv_keys: Sequence[str] = (), tables: Sequence[str] = (), extra: str = "") -> str:
+    return data_etag(db_path, *tables, *(kv_version_key(key) for key in kv_keys), extra=extra)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+def _upstream_error(exc: Exception, status_code: int = 502, detail: str = "") -> HTTPException:
+    if isinstance(exc, HTTPException):
+        return exc
+    if isinstance(exc, DeadlineExceeded):
+        return HTTPException(status_code=504, detail=str(exc))
+    return HTTPException(status_code=status_code, detail=detail or str(exc))
+
+
 _load_env_file_if_exists("BoktoshiBotModule/.env")
 _load_env_file_if_exists("AsterTradingModule/.env")
 
@@ -89,11 +141,93 @@ SL_CAPITAL_PCT = float(os.getenv("SL_CAPITAL_PCT", "0.01"))
 TP_CAPITAL_PCT = float(os.getenv("TP_CAPITAL_PCT", "0.03"))
 MAX_POSITIONS = int(os.getenv("MAX_POSITIONS", "5"))
 ASTER_BASE_URL = os.getenv("ASTER_BASE_URL", "https://www.asterdex.com")
-
-app = FastAPI(title="zzCatBoktoshiTradingBot")
+ASTER_WS_URL = os.getenv("ASTER_WS_URL", "wss://fstream.asterdex.com")
+ASTER_DEPTH_MIRROR = _env_bool(os.getenv("ASTER_DEPTH_MIRROR", "true"), True)
+MARKET_DATA_STREAMS = _env_bool(os.getenv("MARKET_DATA_STREAMS", "true"), True)
+HYPERLIQUID_WS_URL = os.getenv("HYPERLIQUID_WS_URL", "wss://api.hyperliquid.xyz/ws")
+HYPERLIQUID_BASE_INTERVAL = os.getenv("HYPERLIQUID_BASE_INTERVAL", "15m")
+ASTER_BASE_INTERVAL = os.getenv("ASTER_BASE_INTERVAL", "5m")
+MARKET_DATA_BASE_BARS = int(os.getenv("MARKET_DATA_BASE_BARS", "1500"))
+SCANNER_SYMBOLS = [s.strip().upper() for s in os.getenv("SCANNER_SYMBOLS", "").split(",") if s.strip()]
+SCANNER_MAX_POSITIONS = int(os.getenv("SCANNER_MAX_POSITIONS", "3"))
+ASTER_LEDGER = _env_bool(os.getenv("ASTER_LEDGER", "true"), True)
+BOTS_CONFIG = os.getenv("BOTS_CONFIG", "")
+BOTS_MAX_WORKERS = int(os.getenv("BOTS_MAX_WORKERS", "4"))
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", "16"))
+UPSTREAM_DEADLINE_SECONDS = float(os.getenv("UPSTREAM_DEADLINE_SECONDS", "10"))
+SQLITE_READ_WORKERS = int(os.getenv("SQLITE_READ_WORKERS", "8"))
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+STARTUP_WARMUP = _env_bool(os.getenv("STARTUP_WARMUP", "true"), True)
+STARTUP_WARMUP_WORKERS = int(os.getenv("STARTUP_WARMUP_WORKERS", "4"))
+ASTER_SYMBOLS_TTL_SECONDS = float(os.getenv("ASTER_SYMBOLS_TTL_SECONDS", "300"))
+LEADER_ELECTION = _env_bool(os.getenv("LEADER_ELECTION", "false"), False)
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "15"))
+RUNNER_COMMAND_TIMEOUT_SECONDS = float(os.getenv("RUNNER_COMMAND_TIMEOUT_SECONDS", "30"))
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", "").strip()
+JOURNAL_SEGMENT_MB = float(os.getenv("JOURNAL_SEGMENT_MB", "16"))
+JOURNAL_SEGMENT_SECONDS = float(os.getenv("JOURNAL_SEGMENT_SECONDS", "86400"))
+ASTER_PINNED_SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "HYPEUSDT", "PUMPUSDT", "DOGEUSDT"]
+STRATEGIES_CONFIG = os.getenv("STRATEGIES_CONFIG", "").strip()
+SHADOW_MODE = _env_bool(os.getenv("SHADOW_MODE", "false"), False)
+SHADOW_CONFIG = os.getenv("SHADOW_CONFIG", "").strip()
+STRATEGIES.load_file(STRATEGIES_CONFIG)
+OVERLAY_SERIES = STRATEGIES.overlay_series()
+STATUS_KV_KEYS = ("bot_status", "last_tick", "account_ok", "last_signal")
+POSITION_KV_KEYS = ("positions", "strategy_position_id", "manual_position_ids")
+
+app = FastAPI(title="zzCatBoktoshiTradingBot", default_response_class=FastJSONResponse)
 templates = Jinja2Templates(directory="app/templates")
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=GZIP_LEVEL)
+app.add_middleware(RequestMetricsMiddleware)
+sqlite_reads = gate("sqlite_reads", SQLITE_READ_WORKERS, UPSTREAM_DEADLINE_SECONDS)
+aster_market_gate = gate("aster_market", UPSTREAM_CONCURRENCY, UPSTREAM_DEADLINE_SECONDS)
+overlay_gate = gate("strategy_overlay", max(UPSTREAM_CONCURRENCY // 2, 1), UPSTREAM_DEADLINE_SECONDS * 2)
+aster_account_gate = gate("aster_account", UPSTREAM_CONCURRENCY, UPSTREAM_DEADLINE_SECONDS)
+aster_orders_gate = gate("aster_orders", 4, 0)
+mtc_manual_gate = gate("mtc_manual", 4, 0)
+
+
+async def _versioned_read(
+    request: Request,
+    etag: str,
+    fn: Callable[..., Dict[str, Any]],
+    *args: Any,
+    render: Optional[Callable[[Dict[str, Any]], Response]] = None,
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    payload = await sqlite_reads.run(fn, *args)
+    response = render(payload) if render is not None else FastJSONResponse(payload)
+    response.headers.update(headers)
+    return response
+
+
+def _shape(request: Request) -> str:
+    return negotiate(request.headers.get("accept", ""), request.query_params.get("format", ""))
+
+
 aster = AsterClient(base_url=ASTER_BASE_URL)
+symbols_cache = LegCache(max_workers=1)
+depth_mirror = OrderBookMirror(aster.get_depth_snapshot, websocket_depth_stream(ASTER_WS_URL))
+aster_market = MarketDataHub(
+    "aster",
+    aster_backfill(aster),
+    aster_stream_factory(ASTER_WS_URL) if MARKET_DATA_STREAMS else None,
+    capacity=MARKET_DATA_BASE_BARS,
+)
+hyperliquid_market = MarketDataHub(
+    "hyperliquid",
+    HyperliquidClient().get_candles,
+    hyperliquid_stream_factory(HYPERLIQUID_WS_URL) if MARKET_DATA_STREAMS else None,
+    capacity=MARKET_DATA_BASE_BARS,
+)
+aster_candles = ResampledCandleSource(HubCandleSource(aster_market), ASTER_BASE_INTERVAL, MARKET_DATA_BASE_BARS)
+hyperliquid_candles = ResampledCandleSource(
+    HubCandleSource(hyperliquid_market), HYPERLIQUID_BASE_INTERVAL, MARKET_DATA_BASE_BARS
+)
 aster_trading = AsterManualTradingService(AsterTradingConfig())
 
 runner = BotRunner(
@@ -110,20 +244,167 @@ runner = BotRunner(
     sl_capital_pct=SL_CAPITAL_PCT,
     tp_capital_pct=TP_CAPITAL_PCT,
     max_positions=MAX_POSITIONS,
+    scanner_symbols=SCANNER_SYMBOLS,
+    scanner_max_positions=SCANNER_MAX_POSITIONS,
+    hyperliquid=hyperliquid_candles,
 )
+if MARKET_DATA_STREAMS:
+    runner.attach_price_feed(hyperliquid_market.subscribe)
+bots = RunnerManager(max_workers=BOTS_MAX_WORKERS)
+commands: Optional[RunnerCommands] = None
+elector: Optional[LeaderElector] = None
+journal: Optional[EventJournal] = None
+startup.record("construct", time.perf_counter() - startup.started)
+bind_metrics(startup)
+
+
+def _tick_age_seconds() -> Any:
+    last_tick = _safe_float(get_kv(DB_PATH, "last_tick", ""), 0.0)
+    if last_tick <= 0:
+        return None
+    return max(time.time() - last_tick, 0.0)
 
 
-@app.on_event("startup")
-def on_startup() -> None:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    init_db(DB_PATH)
+def _tick_lag_seconds() -> Any:
+    age = _tick_age_seconds()
+    if age is None:
+        return None
+    return max(age - POLL_SECONDS, 0.0)
+
+
+def _db_size_bytes() -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for suffix in ("", "-wal"):
+        path = f"{DB_PATH}{suffix}"
+        if os.path.exists(path):
+            out[os.path.basename(path)] = os.path.getsize(path)
+    return out
+
+
+REGISTRY.gauge("bot_tick_age_seconds", "Seconds since the runner last started a tick.").set_function(_tick_age_seconds)
+REGISTRY.gauge(
+    "bot_tick_lag_seconds", "Seconds the runner is behind its POLL_SECONDS schedule."
+).set_function(_tick_lag_seconds)
+REGISTRY.gauge("bot_poll_interval_seconds", "Configured POLL_SECONDS.").set_function(lambda: POLL_SECONDS)
+REGISTRY.gauge("sqlite_file_size_bytes", "Size of the SQLite database files.", ("file",)).set_function(_db_size_bytes)
+REGISTRY.gauge(
+    "sqlite_table_rows", "Highest rowid per SQLite table, an upper bound on its row count.", ("table",)
+).set_function(lambda: get_table_row_counts(DB_PATH))
+
+
+def _warmup_tasks() -> Dict[str, Callable[[], Any]]:
+    tasks: Dict[str, Callable[[], Any]] = {
+        "hyperliquid_candles": _strategy_overlay,
+        "aster_klines": _aster_klines,
+        "aster_symbols": _ranked_symbols,
+    }
+    if aster_trading.config.api_key and aster_trading.config.api_secret:
+        tasks["aster_exchange_info"] = aster_trading.filter_index
+    return tasks
+
+
+def _start_trading() -> None:
+    global journal
     runner.load_runtime_settings_from_db()
+    if JOURNAL_DIR and journal is None:
+        journal = EventJournal(
+            JOURNAL_DIR,
+            segment_bytes=int(JOURNAL_SEGMENT_MB * 1024 * 1024),
+            segment_seconds=JOURNAL_SEGMENT_SECONDS,
+        )
+        runner.attach_journal(journal)
     runner.start()
+    if bots.stats()["bots"]:
+        bots.start()
+    if aster_trading.ledger is not None:
+        aster_trading.ledger.start()
+    if commands is not None:
+        commands.start()
+
+
+def _stop_trading() -> None:
+    global journal
+    if commands is not None:
+        commands.stop()
+    runner.stop()
+    bots.stop()
+    if aster_trading.ledger is not None:
+        aster_trading.ledger.stop()
+    if journal is not None:
+        runner.detach_journal()
+        journal.close()
+        journal = None
+
+
+@app.on_event("startup")
+def on_startup() -> None:
+    global commands, elector
+    with startup.phase("init_db"):
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        init_db(DB_PATH)
+    with startup.phase("runtime_settings"):
+        runner.load_runtime_settings_from_db()
+    if SHADOW_MODE:
+        with startup.phase("shadow"):
+            runner.enable_shadow(load_shadow_variants(SHADOW_CONFIG, STRATEGIES))
+    startup.start_warmup(_warmup_tasks() if STARTUP_WARMUP else {}, max_workers=STARTUP_WARMUP_WORKERS)
+    with startup.phase("bots"):
+        for spec in load_bot_specs(BOTS_CONFIG):
+            bots.add_bot(spec)
+    config = aster_trading.config
+    if ASTER_LEDGER and config.api_key and config.api_secret:
+        with startup.phase("ledger"):
+            aster_trading.attach_ledger(
+                AsterLedger(
+                    aster_trading.client,
+                    DB_PATH,
+                    [config.symbol],
+                    lookback_days=config.ledger_lookback_days,
+                    sync_seconds=config.ledger_sync_seconds,
+                )
+            )
+    if LEADER_ELECTION:
+        with startup.phase("leader_election"):
+            enable_shared_versions()
+            commands = RunnerCommands(DB_PATH, RUNNER_COMMAND_HANDLERS, ttl_seconds=RUNNER_COMMAND_TIMEOUT_SECONDS)
+            lease = LeaderLease(DB_PATH, ttl_seconds=LEADER_LEASE_SECONDS, holder=commands.worker)
+            elector = LeaderElector(lease, _start_trading, _stop_trading, on_follow=runner.load_runtime_settings_from_db)
+            bind_leader_metrics(elector)
+            runner.fence = elector.holds
+            bots.set_fence(elector.holds)
+            elector.start()
+    else:
+        with startup.phase("trading"):
+            _start_trading()
+    startup.mark_ready()
 
 
 @app.on_event("shutdown")
 def on_shutdown() -> None:
-    runner.stop()
+    if elector is not None:
+        elector.stop()
+    else:
+        _stop_trading()
+    depth_mirror.stop()
+    aster_market.stop()
+    hyperliquid_market.stop()
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded) -> JSONResponse:
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.get("/healthz/live")
+def healthz_live() -> Dict[str, Any]:
+    return {"ok": True}
+
+
+@app.get("/healthz/ready")
+def healthz_ready(warm: bool = False) -> JSONResponse:
+    status = startup.status()
+    ready = status["ready"] and (status["warm"] or not warm)
+    return FastJSONResponse(status, status_code=200 if ready else 503)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -161,14 +442,12 @@ def aster_chart_page(request: Request) -> HTMLResponse:
     return templates.TemplateResponse("eth_chart.html", {"request": request})
 
 
-@app.get("/api/status")
-def status() -> Dict[str, Any]:
+def _status() -> Dict[str, Any]:
     kv = get_all_kv(DB_PATH)
     runtime_settings = runner.get_runtime_settings()
     active_strategy = runner.get_active_strategy()
-    strategy_map = {item["id"]: item for item in runner.list_strategies()}
-    strategy_info = strategy_map.get(active_strategy, strategy_map.get(runner.STRATEGY_MA50, {}))
-    is_ema = active_strategy == runner.STRATEGY_EMA_RSI
+    strategy = runner.strategy(active_strategy)
+    is_ema = strategy.risk == RISK_R_MULTIPLE
     ema_runtime_raw = _parse_json(kv.get(runner.EMA_STATE_KEY, ""))
     ema_runtime = ema_runtime_raw if isinstance(ema_runtime_raw, dict) else None
     return {
@@ -181,15 +460,15 @@ def status() -> Dict[str, Any]:
         "trade_coin": runner.trade_coin,
         "strategy": {
             "id": active_strategy,
-            "name": strategy_info.get("label", active_strategy),
-            "entry": strategy_info.get("entry", ""),
+            "name": strategy.label,
+            "entry": strategy.entry_text,
             "short_enabled": False,
             "margin_boks": runtime_settings["margin_boks"],
             "leverage": runtime_settings["leverage"],
             "sl_capital_pct": runtime_settings["sl_capital_pct"],
             "tp_capital_pct": runtime_settings["tp_capital_pct"],
             "risk_mode": "R_MULTIPLE_TRAILING" if is_ema else "CAPITAL_PCT_FIXED",
-            "tp_r_multiple": 2 if is_ema else None,
+            "tp_r_multiple": strategy.tp_r_multiple if is_ema else None,
             "trailing_activation_r": 1 if is_ema else None,
             "ema_runtime": ema_runtime if is_ema else None,
         },
@@ -197,25 +476,27 @@ def status() -> Dict[str, Any]:
     }
 
 
-@app.get("/api/account")
-def account() -> Dict[str, Any]:
+@app.get("/api/status")
+async def status(request: Request) -> Response:
+    state = (runner.get_runtime_settings(), runner.get_active_strategy(), runner.is_strategy_paused())
+    etag = _data_etag(DB_PATH, STATUS_KV_KEYS + (runner.EMA_STATE_KEY,), extra=repr(state))
+    return await _versioned_read(request, etag, _status)
+
+
+def _account() -> Dict[str, Any]:
     kv = get_all_kv(DB_PATH)
     return {"account": _parse_json(kv.get("account", "")), "notices": _parse_json(kv.get("notices", "[]"))}
 
 
-@app.get("/api/open-positions")
-def open_positions() -> Dict[str, Any]:
-    kv = get_all_kv(DB_PATH)
-    positions = _parse_json(kv.get("positions", ""))
-    if isinstance(positions, dict):
-        items = positions.get("positions", [])
-    elif isinstance(positions, list):
-        items = positions
-    else:
-        items = []
-    grouped = runner.classify_open_positions(items)
+@app.get("/api/account")
+async def account(request: Request) -> Response:
+    return await _versioned_read(request, _data_etag(DB_PATH, ("account", "notices")), _account)
+
+
+def _open_positions() -> Dict[str, Any]:
+    grouped = runner.classify_open_positions()
     return {
-        "items": items,
+        "items": grouped["items"],
         "strategy_position": grouped.get("strategy_position"),
         "manual_position": grouped.get("manual_position"),
         "manual_positions": grouped.get("manual_positions", []),
@@ -223,8 +504,12 @@ def open_positions() -> Dict[str, Any]:
     }
 
 
-@app.get("/api/trade-history")
-def trade_history() -> Dict[str, Any]:
+@app.get("/api/open-positions")
+async def open_positions(request: Request) -> Response:
+    return await _versioned_read(request, _data_etag(DB_PATH, POSITION_KV_KEYS), _open_positions)
+
+
+def _trade_history() -> Dict[str, Any]:
     kv = get_all_kv(DB_PATH)
     remote = _parse_json(kv.get("last_history", "[]"))
     if not isinstance(remote, list):
@@ -235,22 +520,56 @@ def trade_history() -> Dict[str, Any]:
     }
 
 
-@app.get("/api/pnl-history")
-def pnl_history() -> Dict[str, Any]:
+@app.get("/api/trade-history")
+async def trade_history(request: Request) -> Response:
+    return await _versioned_read(request, _data_etag(DB_PATH, ("last_history",), ("trades",)), _trade_history)
+
+
+def _pnl_history() -> Dict[str, Any]:
     curve = get_equity_curve(DB_PATH, limit=1000)
     return {"items": curve}
 
 
-@app.get("/api/signals")
-def signals() -> Dict[str, Any]:
+@app.get("/api/pnl-history")
+async def pnl_history(request: Request) -> Response:
+    shape = _shape(request)
+    etag = _data_etag(DB_PATH, tables=("equity_curve",), extra=shape)
+    return await _versioned_read(
+        request, etag, _pnl_history, render=lambda payload: encode_series(shape, payload, EQUITY_FIELDS)
+    )
+
+
+def _signals() -> Dict[str, Any]:
     return {"items": get_signals(DB_PATH, limit=200)}
 
 
-@app.get("/api/logs")
-def logs() -> Dict[str, Any]:
+@app.get("/api/signals")
+async def signals(request: Request) -> Response:
+    shape = _shape(request)
+    etag = _data_etag(DB_PATH, tables=("signals",), extra=shape)
+    return await _versioned_read(
+        request, etag, _signals, render=lambda payload: encode_series(shape, payload, SIGNAL_FIELDS, binary=False)
+    )
+
+
+def _logs() -> Dict[str, Any]:
     return {"items": get_logs(DB_PATH, limit=300)}
 
 
+@app.get("/api/logs")
+async def logs(request: Request) -> Response:
+    return await _versioned_read(request, _data_etag(DB_PATH, tables=("logs",)), _logs)
+
+
+def _shadow() -> Dict[str, Any]:
+    return shadow_summary(DB_PATH)
+
+
+@app.get("/api/shadow")
+async def shadow(request: Request) -> Response:
+    return await _versioned_read(request, _data_etag(DB_PATH, (SHADOW_STATE_KEY,), ("shadow_trades",)), _shadow)
+
+
 @app.get("/api/bot/settings")
 def bot_settings() -> Dict[str, Any]:
     values = runner.get_runtime_settings()
@@ -286,7 +605,7 @@ def update_bot_settings(payload: Dict[str, Any] = Body(default={})) -> Dict[str,
         except Exception:
             pass
 
-    updated = runner.apply_runtime_settings(parsed)
+    updated = _runner_call("settings", parsed)
     return {
         "success": True,
         "settings": {
@@ -300,6 +619,97 @@ def update_bot_settings(payload: Dict[str, Any] = Body(default={})) -> Dict[str,
     }
 
 
+@app.get("/api/risk")
+def risk_state() -> Dict[str, Any]:
+    return runner.get_risk_state()
+
+
+@app.get("/api/scanner")
+def scanner_state() -> Dict[str, Any]:
+    return runner.get_scanner_state()
+
+
+def _bot_runner(bot_id: str) -> BotRunner:
+    bot = bots.get_runner(bot_id)
+    if bot is None:
+        raise HTTPException(status_code=404, detail=f"Unknown bot: {bot_id}")
+    return bot
+
+
+@app.get("/api/bots")
+def list_bots() -> Dict[str, Any]:
+    return {"items": bots.list_bots(), "stats": bots.stats()}
+
+
+def _bot_status(bot_id: str) -> Dict[str, Any]:
+    bot = _bot_runner(bot_id)
+    kv = get_all_kv(bot.db_path)
+    return {
+        **(bots.bot_status(bot_id) or {}),
+        "last_tick": kv.get("last_tick", ""),
+        "last_signal": _parse_json(kv.get("last_signal", "")),
+        "runtime_settings": bot.get_runtime_settings(),
+    }
+
+
+@app.get("/api/bots/{bot_id}/status")
+async def bot_status(request: Request, bot_id: str) -> Response:
+    bot = _bot_runner(bot_id)
+    state = (bots.bot_status(bot_id), bot.get_runtime_settings())
+    etag = _data_etag(bot.db_path, ("last_tick", "last_signal"), extra=repr(state))
+    return await _versioned_read(request, etag, _bot_status, bot_id)
+
+
+@app.post("/api/bots/{bot_id}/start")
+def bot_start(bot_id: str) -> Dict[str, Any]:
+    _bot_runner(bot_id)
+    return _runner_call("bot_start", {"bot_id": bot_id})
+
+
+@app.post("/api/bots/{bot_id}/stop")
+def bot_stop(bot_id: str) -> Dict[str, Any]:
+    _bot_runner(bot_id)
+    return _runner_call("bot_stop", {"bot_id": bot_id})
+
+
+def _set_bot_running(bot_id: str, running: bool) -> Dict[str, Any]:
+    if running:
+        bots.start_bot(bot_id)
+    else:
+        bots.stop_bot(bot_id)
+    return {"success": True, "id": bot_id, "running": running}
+
+
+def _bot_open_positions(bot_id: str) -> Dict[str, Any]:
+    return _bot_runner(bot_id).classify_open_positions()
+
+
+@app.get("/api/bots/{bot_id}/open-positions")
+async def bot_open_positions(request: Request, bot_id: str) -> Response:
+    etag = _data_etag(_bot_runner(bot_id).db_path, POSITION_KV_KEYS)
+    return await _versioned_read(request, etag, _bot_open_positions, bot_id)
+
+
+def _bot_logs(bot_id: str) -> Dict[str, Any]:
+    return {"items": get_logs(_bot_runner(bot_id).db_path, limit=300)}
+
+
+@app.get("/api/bots/{bot_id}/logs")
+async def bot_logs(request: Request, bot_id: str) -> Response:
+    etag = _data_etag(_bot_runner(bot_id).db_path, tables=("logs",))
+    return await _versioned_read(request, etag, _bot_logs, bot_id)
+
+
+def _bot_pnl_history(bot_id: str) -> Dict[str, Any]:
+    return {"items": get_equity_curve(_bot_runner(bot_id).db_path, limit=1000)}
+
+
+@app.get("/api/bots/{bot_id}/pnl-history")
+async def bot_pnl_history(request: Request, bot_id: str) -> Response:
+    etag = _data_etag(_bot_runner(bot_id).db_path, tables=("equity_curve",))
+    return await _versioned_read(request, etag, _bot_pnl_history, bot_id)
+
+
 @app.get("/api/strategies")
 def list_strategies() -> Dict[str, Any]:
     return {"active": runner.get_active_strategy(), "items": runner.list_strategies()}
@@ -307,8 +717,7 @@ def list_strategies() -> Dict[str, Any]:
 
 @app.post("/api/strategy/select")
 def select_strategy(payload: Dict[str, Any] = Body(default={})) -> Dict[str, Any]:  # type: ignore[valid-type]
-    strategy_id = str(payload.get("strategy_id", "") or "")
-    result = runner.set_active_strategy(strategy_id)
+    result = _runner_call("select_strategy", {"strategy_id": str(payload.get("strategy_id", "") or "")})
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=str(result.get("message", "Invalid strategy")))
     return {
@@ -318,77 +727,205 @@ def select_strategy(payload: Dict[str, Any] = Body(default={})) -> Dict[str, Any
     }
 
 
-@app.post("/api/manual/force-open-long")
-def manual_force_open_long(payload: Dict[str, Any] = Body(default={})) -> Dict[str, Any]:  # type: ignore[valid-type]
+def _manual_force_open_long(payload: Dict[str, Any]) -> Dict[str, Any]:
     symbol = str(payload.get("symbol", "ETHUSDT") or "ETHUSDT").upper()
     return runner.manual_force_open_long(symbol=symbol, comment="Manual open LONG position from dashboard")
 
 
-@app.post("/api/manual/close-position")
-def manual_close_position(payload: Dict[str, Any] = Body(default={})) -> Dict[str, Any]:  # type: ignore[valid-type]
+@app.post("/api/manual/force-open-long")
+async def manual_force_open_long(payload: Dict[str, Any] = Body(default={})) -> Dict[str, Any]:  # type: ignore[valid-type]
+    return await mtc_manual_gate.run(_runner_call, "force_open_long", payload)
+
+
+def _manual_close_position(payload: Dict[str, Any]) -> Dict[str, Any]:
     position_id = str(payload.get("position_id", "") or "")
     return runner.manual_close_eth_positions(position_id=position_id, comment="Manual close LONG position from dashboard")
 
 
-@app.post("/api/manual/close-strategy-position")
-def close_strategy_position() -> Dict[str, Any]:
+@app.post("/api/manual/close-position")
+async def manual_close_position(payload: Dict[str, Any] = Body(default={})) -> Dict[str, Any]:  # type: ignore[valid-type]
+    return await mtc_manual_gate.run(_runner_call, "close_position", payload)
+
+
+def _close_strategy_position() -> Dict[str, Any]:
     return runner.close_strategy_position(comment="Manual close strategy LONG ETHUSDT from dashboard")
 
 
+@app.post("/api/manual/close-strategy-position")
+async def close_strategy_position() -> Dict[str, Any]:
+    return await mtc_manual_gate.run(_runner_call, "close_strategy_position", {})
+
+
 @app.post("/api/bot/pause")
 def pause_bot_strategy() -> Dict[str, Any]:
-    return runner.pause_strategy()
+    return _runner_call("pause", {})
 
 
 @app.post("/api/bot/resume")
 def resume_bot_strategy() -> Dict[str, Any]:
-    return runner.resume_strategy()
+    return _runner_call("resume", {})
+
+
+RUNNER_COMMAND_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "pause": lambda payload: runner.pause_strategy(),
+    "resume": lambda payload: runner.resume_strategy(),
+    "settings": runner.apply_runtime_settings,
+    "select_strategy": lambda payload: runner.set_active_strategy(str(payload.get("strategy_id", ""))),
+    "force_open_long": _manual_force_open_long,
+    "close_position": _manual_close_position,
+    "close_strategy_position": lambda payload: _close_strategy_position(),
+    "bot_start": lambda payload: _set_bot_running(str(payload["bot_id"]), True),
+    "bot_stop": lambda payload: _set_bot_running(str(payload["bot_id"]), False),
+    "profile": lambda payload: runner.instrumentation.request_profile(int(payload["ticks"])),
+}
+
+
+def _runner_call(command: str, payload: Dict[str, Any]) -> Any:
+    if commands is None or elector is None or elector.is_leader:
+        return RUNNER_COMMAND_HANDLERS[command](payload)
+    try:
+        result = commands.call(command, payload, timeout=RUNNER_COMMAND_TIMEOUT_SECONDS)
+    except CommandTimeout as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    runner.load_runtime_settings_from_db()
+    return result
 
 
-@app.get("/api/aster/overview")
-def aster_overview(symbol: str = "ETHUSDT") -> Dict[str, Any]:
+@app.get("/api/leader")
+def leader_status() -> Dict[str, Any]:
+    if elector is None or commands is None:
+        return {"enabled": False, "is_leader": True}
+    return {"enabled": True, **elector.status(), "commands": commands.status()}
+
+
+@app.get("/metrics")
+def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/metrics")
+def metrics(format: str = "json") -> Any:
+    if str(format or "").lower() == "prometheus":
+        return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+    return {
+        "tick": runner.instrumentation.snapshot(),
+        "metrics": REGISTRY.snapshot(),
+        "gates": gates_status(),
+        "startup": startup.status(),
+        "journal": journal.status() if journal is not None else None,
+    }
+
+
+@app.get("/api/metrics/profile")
+def metrics_profile() -> Dict[str, Any]:
+    return runner.instrumentation.profile_status()
+
+
+@app.post("/api/metrics/profile")
+def start_metrics_profile(payload: Dict[str, Any] = Body(default={})) -> Dict[str, Any]:  # type: ignore[valid-type]
+    try:
+        ticks = int(payload.get("ticks", 5))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="ticks must be an integer")
+    return _runner_call("profile", {"ticks": ticks})
+
+
+def _aster_overview(symbol: str = "ETHUSDT") -> Dict[str, Any]:
     try:
         return aster.get_overview(symbol=symbol)
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
 
 
-@app.get("/api/aster/klines")
-def aster_klines(symbol: str = "ETHUSDT", interval: str = "5m", limit: int = 400) -> Dict[str, Any]:
+@app.get("/api/aster/overview")
+async def aster_overview(symbol: str = "ETHUSDT") -> Dict[str, Any]:
+    return await aster_market_gate.run(_aster_overview, symbol)
+
+
+def _aster_klines(symbol: str = "ETHUSDT", interval: str = "5m", limit: int = 400) -> Dict[str, Any]:
     try:
-        return {
-            "symbol": symbol,
-            "interval": interval,
-            "items": aster.get_klines(symbol=symbol, interval=interval, limit=limit),
-        }
+        candles = aster_candles.get_candles(symbol.upper(), interval, max(50, min(limit, 1000)))
+    except ValueError:
+        candles = None
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
+    try:
+        items = [candle_to_kline_row(c) for c in candles] if candles is not None else aster.get_klines(
+            symbol=symbol, interval=interval, limit=limit
+        )
+        return {"symbol": symbol, "interval": interval, "items": items}
+    except Exception as exc:
+        raise _upstream_error(exc) from exc
 
 
-@app.get("/api/aster/depth")
-def aster_depth(symbol: str = "ETHUSDT", limit: int = 20) -> Dict[str, Any]:
+@app.get("/api/aster/klines")
+async def aster_klines(request: Request, symbol: str = "ETHUSDT", interval: str = "5m", limit: int = 400) -> Response:
+    payload = await aster_market_gate.run(_aster_klines, symbol, interval, limit)
+    return encode_series(_shape(request), payload, KLINE_FIELDS)
+
+
+@app.get("/api/market-data")
+def market_data_status() -> Dict[str, Any]:
+    return {
+        "aster": aster_market.status(),
+        "hyperliquid": hyperliquid_market.status(),
+        "resampled": {"aster": aster_candles.stats(), "hyperliquid": hyperliquid_candles.stats()},
+    }
+
+
+def _aster_depth(symbol: str = "ETHUSDT", limit: int = 20) -> Dict[str, Any]:
+    if ASTER_DEPTH_MIRROR:
+        depth = depth_mirror.get_depth(symbol, limit=max(5, min(limit, 100)))
+        if depth is not None:
+            return {**depth, "source": "mirror"}
     try:
         return aster.get_depth(symbol=symbol, limit=limit)
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
 
 
-@app.get("/api/aster/symbols")
-def aster_symbols() -> Dict[str, Any]:
+@app.get("/api/aster/depth")
+async def aster_depth(symbol: str = "ETHUSDT", limit: int = 20) -> Dict[str, Any]:
+    return await aster_market_gate.run(_aster_depth, symbol, limit)
+
+
+@app.get("/api/aster/book")
+def aster_book(symbol: str = "ETHUSDT", notional: float = 0.0) -> Dict[str, Any]:
+    if not ASTER_DEPTH_MIRROR:
+        raise HTTPException(status_code=404, detail="ASTER_DEPTH_MIRROR is disabled.")
+    book = depth_mirror.book(symbol)
+    if book is None:
+        return {"symbol": symbol.upper(), "synced": False, "feeds": depth_mirror.status()}
+    return {**book.stats(impact_notional=notional), "synced": True}
+
+
+def _ranked_symbols() -> List[str]:
+    return symbols_cache.get(
+        "aster_symbols",
+        ASTER_SYMBOLS_TTL_SECONDS,
+        lambda: aster.get_usdt_symbols_ranked(pinned_symbols=ASTER_PINNED_SYMBOLS),
+    )
+
+
+def _aster_symbols() -> Dict[str, Any]:
     try:
-        items = aster.get_usdt_symbols_ranked(
-            pinned_symbols=["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "HYPEUSDT", "PUMPUSDT", "DOGEUSDT"]
-        )
+        items = _ranked_symbols()
         return {"items": items, "count": len(items)}
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
 
 
-@app.get("/api/strategy/overlay")
-def strategy_overlay(symbol: str = "ETHUSDT", interval: str = "4h", limit: int = 280) -> Dict[str, Any]:
+@app.get("/api/aster/symbols")
+async def aster_symbols() -> Dict[str, Any]:
+    return await aster_market_gate.run(_aster_symbols)
+
+
+def _strategy_overlay(symbol: str = "ETHUSDT", interval: str = "4h", limit: int = 280) -> Dict[str, Any]:
     selected_symbol = str(symbol or "ETHUSDT").upper().strip()
     active_strategy = runner.get_active_strategy()
-    required_interval = "15m" if active_strategy == runner.STRATEGY_EMA_RSI else "4h"
+    required_interval = runner.required_interval(active_strategy)
 
     if selected_symbol != runner.trade_pair:
         return {
@@ -398,9 +935,7 @@ def strategy_overlay(symbol: str = "ETHUSDT", interval: str = "4h", limit: int =
             "strategy": active_strategy,
             "required_interval": required_interval,
             "message": "Strategy overlay is ETHUSDT-only.",
-            "ma50": [],
-            "ema_fast": [],
-            "ema_slow": [],
+            **{name: [] for name in OVERLAY_SERIES},
             "entry_markers": [],
             "position": None,
         }
@@ -415,44 +950,18 @@ def strategy_overlay(symbol: str = "ETHUSDT", interval: str = "4h", limit: int =
             "strategy": active_strategy,
             "required_interval": required_interval,
             "message": f"Overlay for {active_strategy} is available on {required_interval} timeframe only.",
-            "ma50": [],
-            "ema_fast": [],
-            "ema_slow": [],
+            **{name: [] for name in OVERLAY_SERIES},
             "entry_markers": [],
             "position": None,
         }
 
     bars = max(80, min(int(limit), 600))
     try:
-        candles = runner.hyperliquid.get_candles(runner.trade_coin, interval=required_interval, bars=bars)
+        indicators = runner.get_strategy_overlay(active_strategy, bars=bars)
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Failed to fetch Hyperliquid candles: {exc}") from exc
-
-    ma50 = []
-    ema_fast = []
-    ema_slow = []
-    entry_markers = []
-    message = ""
-    if active_strategy == runner.STRATEGY_EMA_RSI:
-        ema_fast = build_ema_series(candles, 20)
-        ema_slow = build_ema_series(candles, 50)
-        entry_markers = detect_ema_rsi_long_markers(candles)
-        message = "EMA20/EMA50 and EMA-RSI entry markers are computed from Hyperliquid candles."
-    else:
-        ma50 = build_ma50_series(candles)
-        entry_markers = detect_ma50_crossup_markers(candles)
-        message = "MA50 and entry markers are computed from Hyperliquid candles."
+        raise _upstream_error(exc, detail=f"Failed to fetch Hyperliquid candles: {exc}") from exc
 
-    kv = get_all_kv(DB_PATH)
-    raw_positions = _parse_json(kv.get("positions", ""))
-    if isinstance(raw_positions, dict):
-        positions = raw_positions.get("positions", [])
-    elif isinstance(raw_positions, list):
-        positions = raw_positions
-    else:
-        positions = []
-    grouped = runner.classify_open_positions(positions if isinstance(positions, list) else [])
-    strategy_position = grouped.get("strategy_position") if isinstance(grouped, dict) else None
+    strategy_position = runner.classify_open_positions()["strategy_position"]
 
     position_overlay = None
     if isinstance(strategy_position, dict):
@@ -478,74 +987,162 @@ def strategy_overlay(symbol: str = "ETHUSDT", interval: str = "4h", limit: int =
         "interval": required_interval,
         "strategy": active_strategy,
         "required_interval": required_interval,
-        "message": message,
-        "ma50": ma50,
-        "ema_fast": ema_fast,
-        "ema_slow": ema_slow,
-        "entry_markers": entry_markers,
+        "message": indicators["message"],
+        **{name: indicators.get(name, []) for name in OVERLAY_SERIES},
+        "entry_markers": indicators["entry_markers"],
+        "last_closed_open_time": indicators["last_closed_open_time"],
         "position": position_overlay,
     }
 
 
-@app.get("/api/aster-trading/account-overview")
-def aster_trading_account_overview() -> Dict[str, Any]:
+@app.get("/api/strategy/overlay")
+async def strategy_overlay(
+    request: Request, symbol: str = "ETHUSDT", interval: str = "4h", limit: int = 280
+) -> Response:
+    payload = await overlay_gate.run(_strategy_overlay, symbol, interval, limit)
+    return encode_nested_series(_shape(request), payload, SERIES_FIELDS, OVERLAY_SERIES)
+
+
+def _aster_trading_account_overview() -> Dict[str, Any]:
     try:
         return aster_trading.get_account_overview()
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
 
 
-@app.post("/api/aster-trading/order-preview")
-def aster_trading_order_preview(payload: Dict[str, Any] = Body(default={})):  # type: ignore[valid-type]
+@app.get("/api/aster-trading/account-overview")
+async def aster_trading_account_overview() -> Dict[str, Any]:
+    return await aster_account_gate.run(_aster_trading_account_overview)
+
+
+def _aster_trading_snapshot(limit: int = 30) -> Dict[str, Any]:
+    try:
+        return aster_trading.get_snapshot(limit=limit)
+    except Exception as exc:
+        raise _upstream_error(exc) from exc
+
+
+@app.get("/api/aster-trading/snapshot")
+async def aster_trading_snapshot(limit: int = 30) -> Dict[str, Any]:
+    return await aster_account_gate.run(_aster_trading_snapshot, limit)
+
+
+def _aster_trading_ledger_status() -> Dict[str, Any]:
+    if aster_trading.ledger is None:
+        return {"enabled": False}
+    return {"enabled": True, **aster_trading.ledger.status()}
+
+
+@app.get("/api/aster-trading/ledger")
+async def aster_trading_ledger_status() -> Dict[str, Any]:
+    return await sqlite_reads.run(_aster_trading_ledger_status)
+
+
+def _aster_trading_daily_pnl(days: int = 30) -> Dict[str, Any]:
+    if aster_trading.ledger is None:
+        raise HTTPException(status_code=404, detail="ASTER ledger is not enabled.")
+    try:
+        return aster_trading.get_daily_pnl(days=days)
+    except Exception as exc:
+        raise _upstream_error(exc) from exc
+
+
+@app.get("/api/aster-trading/daily-pnl")
+async def aster_trading_daily_pnl(days: int = 30) -> Dict[str, Any]:
+    return await sqlite_reads.run(_aster_trading_daily_pnl, days)
+
+
+def _aster_trading_order_preview(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         return aster_trading.preview_order(payload)
     except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        raise _upstream_error(exc, 400) from exc
 
 
-@app.post("/api/aster-trading/place-order")
-def aster_trading_place_order(payload: Dict[str, Any] = Body(default={})):  # type: ignore[valid-type]
+@app.post("/api/aster-trading/order-preview")
+async def aster_trading_order_preview(payload: Dict[str, Any] = Body(default={})):  # type: ignore[valid-type]
+    return await aster_account_gate.run(_aster_trading_order_preview, payload)
+
+
+def _aster_trading_place_order(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         return aster_trading.place_manual_order(payload)
     except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        raise _upstream_error(exc, 400) from exc
 
 
-@app.post("/api/aster-trading/close-position")
-def aster_trading_close_position(payload: Dict[str, Any] = Body(default={})):  # type: ignore[valid-type]
+@app.post("/api/aster-trading/place-order")
+async def aster_trading_place_order(payload: Dict[str, Any] = Body(default={})):  # type: ignore[valid-type]
+    return await aster_orders_gate.run(_aster_trading_place_order, payload)
+
+
+def _aster_trading_close_position(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         return aster_trading.close_position_market(payload)
     except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        raise _upstream_error(exc, 400) from exc
+
+
+@app.post("/api/aster-trading/close-position")
+async def aster_trading_close_position(payload: Dict[str, Any] = Body(default={})):  # type: ignore[valid-type]
+    return await aster_orders_gate.run(_aster_trading_close_position, payload)
+
+
+def _aster_trading_open_positions(symbol: str = "") -> Dict[str, Any]:
+    try:
+        return aster_trading.get_open_positions(symbol=symbol)
+    except Exception as exc:
+        raise _upstream_error(exc) from exc
 
 
 @app.get("/api/aster-trading/open-positions")
-def aster_trading_open_positions() -> Dict[str, Any]:
+async def aster_trading_open_positions(symbol: str = "") -> Dict[str, Any]:
+    return await aster_account_gate.run(_aster_trading_open_positions, symbol)
+
+
+def _aster_trading_open_orders(symbol: str = "") -> Dict[str, Any]:
     try:
-        return aster_trading.get_open_positions()
+        return aster_trading.get_open_orders(symbol=symbol)
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
 
 
 @app.get("/api/aster-trading/open-orders")
-def aster_trading_open_orders() -> Dict[str, Any]:
+async def aster_trading_open_orders(symbol: str = "") -> Dict[str, Any]:
+    return await aster_account_gate.run(_aster_trading_open_orders, symbol)
+
+
+def _aster_trading_trade_history(limit: int = 100, symbol: str = "") -> Dict[str, Any]:
     try:
-        return aster_trading.get_open_orders()
+        return aster_trading.get_trade_history(limit=limit, symbol=symbol)
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
 
 
 @app.get("/api/aster-trading/trade-history")
-def aster_trading_trade_history(limit: int = 100) -> Dict[str, Any]:
+async def aster_trading_trade_history(limit: int = 100, symbol: str = "") -> Dict[str, Any]:
+    return await aster_account_gate.run(_aster_trading_trade_history, limit, symbol)
+
+
+def _aster_trading_pnl_history(limit: int = 100, symbol: str = "") -> Dict[str, Any]:
     try:
-        return aster_trading.get_trade_history(limit=limit)
+        return aster_trading.get_income_history(limit=limit, symbol=symbol)
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
 
 
 @app.get("/api/aster-trading/pnl-history")
-def aster_trading_pnl_history(limit: int = 100) -> Dict[str, Any]:
+async def aster_trading_pnl_history(limit: int = 100, symbol: str = "") -> Dict[str, Any]:
+    return await aster_account_gate.run(_aster_trading_pnl_history, limit, symbol)
+
+
+def _aster_trading_filters(symbol: str = "") -> Dict[str, Any]:
     try:
-        return aster_trading.get_income_history(limit=limit)
+        return aster_trading.get_symbol_filters(symbol=symbol)
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+        raise _upstream_error(exc) from exc
+
+
+@app.get("/api/aster-trading/filters")
+async def aster_trading_filters(symbol: str = "") -> Dict[str, Any]:
+    return await aster_account_gate.run(_aster_trading_filters, symbol)
\ No newline at end of file
@@ -0,0 +1,383 @@
+import json
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+INTERVAL_MS: Dict[str, int] = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+}
+
+FEED_EVENTS = REGISTRY.counter(
+    "market_data_events_total",
+    "Streamed market-data events by source and kind.",
+    ("source", "kind"),
+)
+FEED_BACKFILLS = REGISTRY.counter(
+    "market_data_backfills_total",
+    "REST backfills issued by the market-data hub, by reason.",
+    ("source", "reason"),
+)
+
+Candle = Dict[str, float]
+FeedKey = Tuple[str, str]
+BackfillFn = Callable[[str, str, int], List[Candle]]
+StreamFactory = Callable[[str, str], Iterable[Dict[str, Any]]]
+Subscriber = Callable[[str, str, Candle, bool], None]
+
+
+def interval_ms(interval: str) -> int:
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return INTERVAL_MS[interval]
+
+
+def parse_kline_row(row: List[Any]) -> Candle:
+    return {
+        "open_time": float(row[0]),
+        "close_time": float(row[6]),
+        "open": float(row[1]),
+        "high": float(row[2]),
+        "low": float(row[3]),
+        "close": float(row[4]),
+        "volume": float(row[5]),
+    }
+
+
+def candle_to_kline_row(candle: Candle) -> List[Any]:
+    return [
+        int(candle["open_time"]),
+        candle["open"],
+        candle["high"],
+        candle["low"],
+        candle["close"],
+        candle["volume"],
+        int(candle["close_time"]),
+    ]
+
+
+class CandleRing:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._items: Deque[Candle] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def last_open_time(self) -> float:
+        return self._items[-1]["open_time"] if self._items else 0.0
+
+    def upsert(self, candle: Candle) -> str:
+        open_time = candle["open_time"]
+        if not self._items or open_time > self._items[-1]["open_time"]:
+            self._items.append(candle)
+            return "append"
+        if open_time == self._items[-1]["open_time"]:
+            self._items[-1] = candle
+            return "update"
+        for idx in range(len(self._items) - 2, -1, -1):
+            existing = self._items[idx]["open_time"]
+            if existing == open_time:
+                self._items[idx] = candle
+                return "update"
+            if existing < open_time:
+                break
+        return "ignored"
+
+    def merge(self, candles: List[Candle]) -> None:
+        by_open = {item["open_time"]: item for item in candles}
+        for item in self._items:
+            by_open[item["open_time"]] = item
+        merged = sorted(by_open.values(), key=lambda c: c["open_time"])
+        self._items = deque(merged[-self.capacity:], maxlen=self.capacity)
+
+    def snapshot(self, limit: int) -> List[Candle]:
+        size = len(self._items)
+        return list(islice(self._items, max(size - limit, 0), size))
+
+
+class _Feed:
+    def __init__(self, symbol: str, interval: str, capacity: int) -> None:
+        self.symbol = symbol
+        self.interval = interval
+        self.ring = CandleRing(capacity)
+        self.lock = threading.Lock()
+        self.subscribers: List[Subscriber] = []
+        self.connected = False
+        self.last_message_at = 0.0
+        self.last_backfill_at = 0.0
+        self.backfilled_limit = 0
+        self.last_access = time.time()
+        self.last_error = ""
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+
+class MarketDataHub:
+    def __init__(
+        self,
+        source: str,
+        backfill_fn: BackfillFn,
+        stream_factory: Optional[StreamFactory] = None,
+        capacity: int = 1000,
+        rest_ttl_seconds: float = 10.0,
+        stale_seconds: float = 30.0,
+        idle_seconds: float = 900.0,
+    ) -> None:
+        self.source = source
+        self.backfill_fn = backfill_fn
+        self.stream_factory = stream_factory
+        self.capacity = capacity
+        self.rest_ttl_seconds = rest_ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.idle_seconds = idle_seconds
+        self._feeds: Dict[FeedKey, _Feed] = {}
+        self._marks: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _feed(self, symbol: str, interval: str) -> _Feed:
+        interval_ms(interval)
+        key = (symbol, interval)
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = _Feed(key[0], interval, self.capacity)
+                self._feeds[key] = feed
+        feed.last_access = time.time()
+        if self.stream_factory is not None and not (feed.thread and feed.thread.is_alive()):
+            feed.stop_event.clear()
+            feed.thread = threading.Thread(
+                target=self._stream_loop, args=(feed,), name=f"md-{self.source}-{key[0]}-{interval}", daemon=True
+            )
+            feed.thread.start()
+        self._stop_idle()
+        return feed
+
+    def is_live(self, feed: _Feed) -> bool:
+        return feed.connected and time.time() - feed.last_message_at < self.stale_seconds
+
+    def snapshot(self, symbol: str, interval: str, limit: int) -> List[Candle]:
+        feed = self._feed(symbol, interval)
+        limit = max(1, min(int(limit), self.capacity))
+        with feed.lock:
+            if feed.backfilled_limit < limit and len(feed.ring) < limit:
+                self._backfill(feed, limit, "warmup")
+            elif not self.is_live(feed) and time.time() - feed.last_backfill_at > self.rest_ttl_seconds:
+                self._backfill(feed, limit, "poll")
+            return feed.ring.snapshot(limit)
+
+    def _backfill(self, feed: _Feed, limit: int, reason: str) -> None:
+        FEED_BACKFILLS.inc(1, self.source, reason)
+        candles = self.backfill_fn(feed.symbol, feed.interval, limit)
+        feed.ring.merge(candles)
+        feed.last_backfill_at = time.time()
+        feed.backfilled_limit = max(feed.backfilled_limit, limit)
+
+    def subscribe(self, symbol: str, interval: str, callback: Subscriber) -> Callable[[], None]:
+        feed = self._feed(symbol, interval)
+        with feed.lock:
+            feed.subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with feed.lock:
+                if callback in feed.subscribers:
+                    feed.subscribers.remove(callback)
+
+        return unsubscribe
+
+    def mark_price(self, symbol: str) -> Optional[float]:
+        item = self._marks.get(symbol)
+        if item is None or time.time() - item[1] > self.stale_seconds:
+            return None
+        return item[0]
+
+    def handle_event(self, feed: _Feed, event: Dict[str, Any]) -> None:
+        kind = str(event.get("kind", ""))
+        FEED_EVENTS.inc(1, self.source, kind or "unknown")
+        if kind == "mark":
+            self._marks[feed.symbol] = (float(event["price"]), time.time())
+            return
+        if kind != "kline":
+            return
+        candle: Candle = event["candle"]
+        closed = bool(event.get("closed", False))
+        step = interval_ms(feed.interval)
+        with feed.lock:
+            last = feed.ring.last_open_time
+            if last and candle["open_time"] > last + step:
+                missing = int((candle["open_time"] - last) // step) + 2
+                self._backfill(feed, min(max(missing, len(feed.ring)), self.capacity), "gap")
+            feed.ring.upsert(candle)
+            subscribers = list(feed.subscribers)
+        for callback in subscribers:
+            try:
+                callback(feed.symbol, feed.interval, candle, closed)
+            except Exception as exc:
+                feed.last_error = f"subscriber: {exc}"
+
+    def _stream_loop(self, feed: _Feed) -> None:
+        backoff = 1.0
+        while not feed.stop_event.is_set() and self.stream_factory is not None:
+            try:
+                for event in self.stream_factory(feed.symbol, feed.interval):
+                    if feed.stop_event.is_set():
+                        break
+                    feed.connected = True
+                    feed.last_message_at = time.time()
+                    self.handle_event(feed, event)
+                backoff = 1.0
+            except Exception as exc:
+                feed.last_error = str(exc)
+            feed.connected = False
+            feed.stop_event.wait(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    def _stop_idle(self) -> None:
+        now = time.time()
+        with self._lock:
+            idle = [
+                key
+                for key, feed in self._feeds.items()
+                if not feed.subscribers and now - feed.last_access > self.idle_seconds
+            ]
+            for key in idle:
+                self._feeds.pop(key).stop_event.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            feeds = list(self._feeds.values())
+            self._feeds.clear()
+        for feed in feeds:
+            feed.stop_event.set()
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            feeds = list(self._feeds.values())
+        return [
+            {
+                "symbol": feed.symbol,
+                "interval": feed.interval,
+                "bars": len(feed.ring),
+                "live": self.is_live(feed),
+                "subscribers": len(feed.subscribers),
+                "last_open_time": feed.ring.last_open_time,
+                "last_error": feed.last_error,
+            }
+            for feed in feeds
+        ]
+
+
+class HubCandleSource:
+    def __init__(self, hub: MarketDataHub) -> None:
+        self.hub = hub
+
+    def get_candles(self, coin: str, interval: str = "4h", bars: int = 80) -> List[Candle]:
+        return self.hub.snapshot(coin, interval, bars)
+
+
+class ReplayStream:
+    def __init__(self, events: List[Dict[str, Any]], delay_seconds: float = 0.0) -> None:
+        self.events = list(events)
+        self.delay_seconds = delay_seconds
+
+    def __call__(self, symbol: str, interval: str) -> Iterator[Dict[str, Any]]:
+        for event in self.events:
+            if self.delay_seconds:
+                time.sleep(self.delay_seconds)
+            yield event
+
+
+def aster_backfill(client: Any) -> BackfillFn:
+    def backfill(symbol: str, interval: str, limit: int) -> List[Candle]:
+        return [parse_kline_row(row) for row in client.get_klines(symbol=symbol, interval=interval, limit=limit)]
+
+    return backfill
+
+
+def parse_aster_message(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    payload = data.get("data", data)
+    event_type = payload.get("e")
+    if event_type == "kline":
+        k = payload.get("k", {})
+        candle = {
+            "open_time": float(k.get("t", 0)),
+            "close_time": float(k.get("T", 0)),
+            "open": float(k.get("o", 0)),
+            "high": float(k.get("h", 0)),
+            "low": float(k.get("l", 0)),
+            "close": float(k.get("c", 0)),
+            "volume": float(k.get("v", 0)),
+        }
+        return {"kind": "kline", "candle": candle, "closed": bool(k.get("x", False))}
+    if event_type == "markPriceUpdate":
+        return {"kind": "mark", "price": float(payload.get("p", 0))}
+    return None
+
+
+def parse_hyperliquid_message(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if data.get("channel") != "candle":
+        return None
+    item = data.get("data", {})
+    candle = {
+        "open_time": float(item.get("t", 0)),
+        "close_time": float(item.get("T", 0)),
+        "open": float(item.get("o", 0)),
+        "high": float(item.get("h", 0)),
+        "low": float(item.get("l", 0)),
+        "close": float(item.get("c", 0)),
+        "volume": float(item.get("v", 0)),
+    }
+    return {"kind": "kline", "candle": candle, "closed": False}
+
+
+def _websocket_events(
+    url: str,
+    parse: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    subscribe: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    from websockets.sync.client import connect
+
+    ws = connect(url, open_timeout=10, close_timeout=2)
+
+    def events() -> Iterator[Dict[str, Any]]:
+        with ws:
+            if subscribe is not None:
+                ws.send(json.dumps(subscribe))
+            for message in ws:
+                data = json.loads(message)
+                event = parse(data) if isinstance(data, dict) else None
+                if event is not None:
+                    yield event
+
+    return events()
+
+
+def aster_stream_factory(ws_base_url: str) -> StreamFactory:
+    def factory(symbol: str, interval: str) -> Iterator[Dict[str, Any]]:
+        name = symbol.lower()
+        url = f"{ws_base_url.rstrip('/')}/stream?streams={name}@kline_{interval}/{name}@markPrice@1s"
+        return _websocket_events(url, parse_aster_message)
+
+    return factory
+
+
+def hyperliquid_stream_factory(ws_url: str = "wss://api.hyperliquid.xyz/ws") -> StreamFactory:
+    def factory(symbol: str, interval: str) -> Iterator[Dict[str, Any]]:
+        subscribe = {"method": "subscribe", "subscription": {"type": "candle", "coin": symbol, "interval": interval}}
+        return _websocket_events(ws_url, parse_hyperliquid_message, subscribe)
+
+    return factory
@@ -0,0 +1,405 @@
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DEFAULT_WINDOW = 512
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(labelnames, labelvalues))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(math.ceil(pct * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+class _Timer:
+    __slots__ = ("_series", "_start")
+
+    def __init__(self, series: Any) -> None:
+        self._series = series
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self._series.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _CounterSeries:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeSeries:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+
+class _HistogramSeries:
+    __slots__ = ("_lock", "_bounds", "_counts", "_count", "_sum", "_recent")
+
+    def __init__(self, bounds: Tuple[float, ...], window: int) -> None:
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += value
+            self._recent.append(value)
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def state(self) -> Tuple[List[int], int, float, List[float]]:
+        with self._lock:
+            return list(self._counts), self._count, self._sum, list(self._recent)
+
+    def summary(self) -> Dict[str, float]:
+        _, count, total, recent = self.state()
+        ordered = sorted(recent)
+        return {
+            "count": count,
+            "sum": total,
+            "window": len(ordered),
+            "mean": (sum(ordered) / len(ordered)) if ordered else 0.0,
+            "p50": _percentile(ordered, 0.50),
+            "p90": _percentile(ordered, 0.90),
+            "p99": _percentile(ordered, 0.99),
+            "max": ordered[-1] if ordered else 0.0,
+        }
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *labelvalues: Any) -> Any:
+        key = tuple(str(v) for v in labelvalues)
+        series = self._series.get(key)
+        if series is not None:
+            return series
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._new_series()
+                self._series[key] = series
+            return series
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return sorted(self._series.items())
+
+    def header_lines(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self) -> _CounterSeries:
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0, *labelvalues: Any) -> None:
+        self.labels(*labelvalues).inc(amount)
+
+    def collect_lines(self) -> List[str]:
+        lines = self.header_lines()
+        for key, series in self._items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(series.value)}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [{"labels": dict(zip(self.labelnames, key)), "value": series.value} for key, series in self._items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._function: Optional[Callable[[], Any]] = None
+
+    def _new_series(self) -> _GaugeSeries:
+        return _GaugeSeries()
+
+    def set(self, value: float, *labelvalues: Any) -> None:
+        self.labels(*labelvalues).set(value)
+
+    def set_function(self, function: Callable[[], Any]) -> None:
+        self._function = function
+
+    def _values(self) -> List[Tuple[Tuple[str, ...], float]]:
+        if self._function is None:
+            return [(key, series.value) for key, series in self._items()]
+        try:
+            result = self._function()
+        except Exception:
+            return []
+        if isinstance(result, dict):
+            out: List[Tuple[Tuple[str, ...], float]] = []
+            for key, value in result.items():
+                labelvalues = tuple(str(v) for v in key) if isinstance(key, tuple) else (str(key),)
+                out.append((labelvalues, float(value)))
+            return sorted(out)
+        if result is None:
+            return []
+        return [((), float(result))]
+
+    def collect_lines(self) -> List[str]:
+        lines = self.header_lines()
+        for key, value in self._values():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [{"labels": dict(zip(self.labelnames, key)), "value": value} for key, value in self._values()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        window: int = DEFAULT_WINDOW,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(float(b))))
+        self.window = max(int(window), 1)
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets, self.window)
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        self.labels(*labelvalues).observe(value)
+
+    def time(self, *labelvalues: Any) -> _Timer:
+        return _Timer(self.labels(*labelvalues))
+
+    def collect_lines(self) -> List[str]:
+        lines = self.header_lines()
+        for key, series in self._items():
+            counts, count, total, _ = series.state()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            base_labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base_labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{base_labels} {count}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [{"labels": dict(zip(self.labelnames, key)), **series.summary()} for key, series in self._items()]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if existing.kind != metric.kind or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape.")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        window: int = DEFAULT_WINDOW,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets=buckets, window=window))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def _ordered(self) -> List[_Metric]:
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for metric in self._ordered():
+            lines.extend(metric.collect_lines())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            metric.name: {"type": metric.kind, "help": metric.help_text, "series": metric.snapshot()}
+            for metric in self._ordered()
+        }
+
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_request_seconds",
+    "Latency of upstream HTTP requests by client and endpoint.",
+    ("client", "endpoint"),
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "upstream_requests_total",
+    "Upstream HTTP requests by client, endpoint and status class (error = no response).",
+    ("client", "endpoint", "status"),
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds",
+    "Latency of dashboard/API requests served by this process.",
+    ("method", "route"),
+)
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "Dashboard/API requests served by this process.",
+    ("method", "route", "status"),
+)
+
+
+def status_class(status_code: int) -> str:
+    if status_code <= 0:
+        return "error"
+    return f"{status_code // 100}xx"
+
+
+class UpstreamProbe:
+    __slots__ = ("client", "endpoint", "_latency", "_statuses")
+
+    def __init__(self, client: str, endpoint: str) -> None:
+        self.client = client
+        self.endpoint = endpoint
+        self._latency = UPSTREAM_SECONDS.labels(client, endpoint)
+        self._statuses: Dict[int, _CounterSeries] = {}
+
+    def time(self) -> _Timer:
+        return _Timer(self._latency)
+
+    def record(self, status_code: int) -> None:
+        series = self._statuses.get(status_code)
+        if series is None:
+            series = UPSTREAM_REQUESTS.labels(self.client, self.endpoint, status_class(status_code))
+            self._statuses[status_code] = series
+        series.inc()
+
+
+_PROBES: Dict[Tuple[str, str], UpstreamProbe] = {}
+
+
+def upstream_probe(client: str, endpoint: str) -> UpstreamProbe:
+    key = (client, endpoint)
+    probe = _PROBES.get(key)
+    if probe is None:
+        probe = _PROBES.setdefault(key, UpstreamProbe(client, endpoint))
+    return probe
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message.get("type") == "http.response.start":
+                status["code"] = int(message.get("status", 500))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "other"
+            method = scope.get("method", "GET")
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, str(status["code"])).inc()
@@ -0,0 +1,334 @@
+import bisect
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+BOOK_EVENTS = REGISTRY.counter(
+    "orderbook_events_total",
+    "Depth diff events seen by the order book mirror, by outcome.",
+    ("symbol", "outcome"),
+)
+BOOK_RESYNCS = REGISTRY.counter(
+    "orderbook_resyncs_total",
+    "Order book snapshot reloads by reason.",
+    ("symbol", "reason"),
+)
+
+Level = Tuple[str, str]
+SnapshotFn = Callable[[str], Dict[str, Any]]
+StreamFactory = Callable[[str], Iterable[Dict[str, Any]]]
+
+
+class _BookSide:
+    def __init__(self, descending: bool) -> None:
+        self.descending = descending
+        self._prices: List[float] = []
+        self._levels: Dict[float, Level] = {}
+
+    def clear(self) -> None:
+        self._prices = []
+        self._levels = {}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def update(self, price_text: str, qty_text: str) -> None:
+        price = float(price_text)
+        if float(qty_text) <= 0:
+            if self._levels.pop(price, None) is not None:
+                idx = bisect.bisect_left(self._prices, price)
+                del self._prices[idx]
+            return
+        if price not in self._levels:
+            bisect.insort(self._prices, price)
+        self._levels[price] = (price_text, qty_text)
+
+    def best(self) -> Optional[float]:
+        if not self._prices:
+            return None
+        return self._prices[-1] if self.descending else self._prices[0]
+
+    def iter_prices(self) -> Iterator[float]:
+        return reversed(self._prices) if self.descending else iter(self._prices)
+
+    def top(self, limit: int) -> List[List[str]]:
+        out: List[List[str]] = []
+        for price in self.iter_prices():
+            if len(out) >= limit:
+                break
+            price_text, qty_text = self._levels[price]
+            out.append([price_text, qty_text])
+        return out
+
+    def walk(self, notional: float) -> Optional[float]:
+        remaining = notional
+        filled_qty = 0.0
+        for price in self.iter_prices():
+            qty = float(self._levels[price][1])
+            take = min(qty, remaining / price)
+            filled_qty += take
+            remaining -= take * price
+            if remaining <= 1e-12:
+                return (notional - max(remaining, 0.0)) / filled_qty
+        return None
+
+
+class OrderBook:
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol.upper()
+        self.bids = _BookSide(descending=True)
+        self.asks = _BookSide(descending=False)
+        self.last_update_id = 0
+        self.event_time = 0
+        self.updated_at = 0.0
+        self.synced = False
+        self._bridged = False
+        self._lock = threading.Lock()
+
+    def load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for price, qty in snapshot.get("bids", []):
+                self.bids.update(str(price), str(qty))
+            for price, qty in snapshot.get("asks", []):
+                self.asks.update(str(price), str(qty))
+            self.last_update_id = int(snapshot.get("lastUpdateId", 0))
+            self.event_time = int(snapshot.get("E", 0) or 0)
+            self.updated_at = time.time()
+            self.synced = True
+            self._bridged = False
+
+    def apply_diff(self, event: Dict[str, Any]) -> str:
+        first_id = int(event.get("U", 0))
+        final_id = int(event.get("u", 0))
+        with self._lock:
+            if not self.synced:
+                return "unsynced"
+            if final_id < self.last_update_id:
+                return "stale"
+            if not self._bridged:
+                if first_id > self.last_update_id + 1:
+                    self.synced = False
+                    return "gap"
+            else:
+                prev_id = event.get("pu")
+                expected = int(prev_id) if prev_id is not None else first_id - 1
+                if expected != self.last_update_id:
+                    self.synced = False
+                    return "gap"
+            for price, qty in event.get("b", []):
+                self.bids.update(str(price), str(qty))
+            for price, qty in event.get("a", []):
+                self.asks.update(str(price), str(qty))
+            self.last_update_id = final_id
+            self.event_time = int(event.get("E", 0) or 0)
+            self.updated_at = time.time()
+            self._bridged = True
+            return "applied"
+
+    def depth(self, limit: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "lastUpdateId": self.last_update_id,
+                "E": self.event_time,
+                "bids": self.bids.top(limit),
+                "asks": self.asks.top(limit),
+            }
+
+    def best_bid_ask(self) -> Tuple[Optional[float], Optional[float]]:
+        with self._lock:
+            return self.bids.best(), self.asks.best()
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def impact_price(self, side: str, notional: float) -> Optional[float]:
+        if notional <= 0:
+            return None
+        with self._lock:
+            book_side = self.asks if side.upper() == "BUY" else self.bids
+            return book_side.walk(notional)
+
+    def stats(self, impact_notional: float = 0.0) -> Dict[str, Any]:
+        bid, ask = self.best_bid_ask()
+        mid = (bid + ask) / 2 if bid is not None and ask is not None else None
+        out: Dict[str, Any] = {
+            "symbol": self.symbol,
+            "best_bid": bid,
+            "best_ask": ask,
+            "mid": mid,
+            "spread": ask - bid if mid is not None else None,
+            "spread_bps": (ask - bid) / mid * 10000 if mid else None,
+            "bid_levels": len(self.bids),
+            "ask_levels": len(self.asks),
+            "last_update_id": self.last_update_id,
+            "age_seconds": time.time() - self.updated_at if self.updated_at else None,
+        }
+        if impact_notional > 0:
+            out["impact_notional"] = impact_notional
+            out["impact_buy"] = self.impact_price("BUY", impact_notional)
+            out["impact_sell"] = self.impact_price("SELL", impact_notional)
+        return out
+
+
+class ReplayDepthStream:
+    def __init__(self, events: List[Dict[str, Any]], delay_seconds: float = 0.0) -> None:
+        self.events = list(events)
+        self.delay_seconds = delay_seconds
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for event in self.events:
+            if self.delay_seconds:
+                time.sleep(self.delay_seconds)
+            yield event
+
+
+def websocket_depth_stream(ws_base_url: str, speed: str = "100ms") -> StreamFactory:
+    def factory(symbol: str) -> Iterator[Dict[str, Any]]:
+        from websockets.sync.client import connect
+
+        url = f"{ws_base_url.rstrip('/')}/ws/{symbol.lower()}@depth@{speed}"
+        ws = connect(url, open_timeout=10, close_timeout=2)
+
+        def events() -> Iterator[Dict[str, Any]]:
+            with ws:
+                for message in ws:
+                    data = json.loads(message)
+                    if isinstance(data, dict) and data.get("e") == "depthUpdate":
+                        yield data
+
+        return events()
+
+    return factory
+
+
+class _BookFeed:
+    def __init__(self, book: OrderBook, snapshot_fn: SnapshotFn, stream_factory: StreamFactory) -> None:
+        self.book = book
+        self.snapshot_fn = snapshot_fn
+        self.stream_factory = stream_factory
+        self.last_access = time.time()
+        self.last_error = ""
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"orderbook-{self.book.symbol}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _resync(self, reason: str) -> None:
+        BOOK_RESYNCS.inc(1, self.book.symbol, reason)
+        self.book.load_snapshot(self.snapshot_fn(self.book.symbol))
+
+    def consume(self, events: Iterable[Dict[str, Any]]) -> None:
+        self._resync("connect")
+        for event in events:
+            if self._stop.is_set():
+                return
+            outcome = self.book.apply_diff(event)
+            BOOK_EVENTS.inc(1, self.book.symbol, outcome)
+            if outcome == "gap":
+                self._resync("gap")
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self.consume(self.stream_factory(self.book.symbol))
+                backoff = 1.0
+            except Exception as exc:
+                self.last_error = str(exc)
+                self.book.synced = False
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+class OrderBookMirror:
+    def __init__(
+        self,
+        snapshot_fn: SnapshotFn,
+        stream_factory: StreamFactory,
+        max_age_seconds: float = 5.0,
+        idle_seconds: float = 300.0,
+    ) -> None:
+        self.snapshot_fn = snapshot_fn
+        self.stream_factory = stream_factory
+        self.max_age_seconds = max_age_seconds
+        self.idle_seconds = idle_seconds
+        self._feeds: Dict[str, _BookFeed] = {}
+        self._lock = threading.Lock()
+
+    def feed(self, symbol: str) -> _BookFeed:
+        key = symbol.upper()
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = _BookFeed(OrderBook(key), self.snapshot_fn, self.stream_factory)
+                self._feeds[key] = feed
+        feed.last_access = time.time()
+        if not feed.is_alive():
+            feed.start()
+        self._stop_idle()
+        return feed
+
+    def book(self, symbol: str) -> Optional[OrderBook]:
+        feed = self.feed(symbol)
+        book = feed.book
+        if not book.synced or time.time() - book.updated_at > self.max_age_seconds:
+            return None
+        return book
+
+    def get_depth(self, symbol: str, limit: int = 20) -> Optional[Dict[str, Any]]:
+        book = self.book(symbol)
+        return book.depth(limit) if book is not None else None
+
+    def _stop_idle(self) -> None:
+        now = time.time()
+        with self._lock:
+            idle = [key for key, feed in self._feeds.items() if now - feed.last_access > self.idle_seconds]
+            for key in idle:
+                self._feeds.pop(key).stop()
+
+    def stop(self) -> None:
+        with self._lock:
+            feeds = list(self._feeds.values())
+            self._feeds.clear()
+        for feed in feeds:
+            feed.stop()
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            feeds = list(self._feeds.values())
+        return [
+            {
+                "symbol": feed.book.symbol,
+                "synced": feed.book.synced,
+                "running": feed.is_alive(),
+                "last_update_id": feed.book.last_update_id,
+                "age_seconds": time.time() - feed.book.updated_at if feed.book.updated_at else None,
+                "last_error": feed.last_error,
+            }
+            for feed in feeds
+        ]
@@ -0,0 +1,194 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .market_data import Candle, CandleRing, interval_ms
+
+
+def bucket_start(open_time: float, target_ms: int) -> float:
+    return float(int(open_time) // target_ms * target_ms)
+
+
+def can_resample(base_interval: str, interval: str) -> bool:
+    base_ms, target_ms = interval_ms(base_interval), interval_ms(interval)
+    return target_ms > base_ms and target_ms % base_ms == 0
+
+
+class _Bucket:
+    def __init__(self, start: float, target_ms: int, candle: Candle) -> None:
+        self.candle: Candle = {
+            "open_time": start,
+            "close_time": start + target_ms - 1,
+            "open": candle["open"],
+            "high": candle["high"],
+            "low": candle["low"],
+            "close": candle["close"],
+            "volume": candle["volume"],
+        }
+        self.complete_start = candle["open_time"] == start
+
+    def add(self, candle: Candle) -> None:
+        self.candle = self.merged(candle)
+
+    def merged(self, candle: Candle) -> Candle:
+        current = dict(self.candle)
+        current["high"] = max(current["high"], candle["high"])
+        current["low"] = min(current["low"], candle["low"])
+        current["close"] = candle["close"]
+        current["volume"] += candle["volume"]
+        return current
+
+
+class _Series:
+    def __init__(self, interval: str, base_ms: int, capacity: int) -> None:
+        self.interval = interval
+        self.target_ms = interval_ms(interval)
+        self.base_ms = base_ms
+        self.ring = CandleRing(capacity)
+        self.bucket: Optional[_Bucket] = None
+
+    def add(self, candle: Candle) -> None:
+        start = bucket_start(candle["open_time"], self.target_ms)
+        if self.bucket is not None and self.bucket.candle["open_time"] != start:
+            self._finish()
+        if self.bucket is None:
+            self.bucket = _Bucket(start, self.target_ms, candle)
+            self.bucket.complete_start = self.bucket.complete_start or bool(len(self.ring))
+        else:
+            self.bucket.add(candle)
+        if candle["open_time"] + self.base_ms >= start + self.target_ms:
+            self._finish()
+
+    def _finish(self) -> None:
+        if self.bucket is not None and self.bucket.complete_start:
+            self.ring.upsert(self.bucket.candle)
+        self.bucket = None
+
+    def forming(self, candle: Optional[Candle]) -> Optional[Candle]:
+        bucket = self.bucket if self.bucket is not None and self.bucket.complete_start else None
+        if candle is not None:
+            start = bucket_start(candle["open_time"], self.target_ms)
+            if bucket is not None and bucket.candle["open_time"] == start:
+                return bucket.merged(candle)
+            if bucket is None and candle["open_time"] == start:
+                return _Bucket(start, self.target_ms, candle).candle
+        return dict(bucket.candle) if bucket is not None else None
+
+
+class Resampler:
+    def __init__(self, base_interval: str, capacity: int = 1000, clock: Callable[[], float] = time.time) -> None:
+        self.base_interval = base_interval
+        self.base_ms = interval_ms(base_interval)
+        self.capacity = capacity
+        self.clock = clock
+        self.first_open_time: Optional[float] = None
+        self.last_closed = 0.0
+        self._forming: Optional[Candle] = None
+        self._series: Dict[str, _Series] = {}
+
+    def add_target(self, interval: str) -> None:
+        if not can_resample(self.base_interval, interval):
+            raise ValueError(f"Cannot derive {interval} bars from {self.base_interval} bars.")
+        self._series.setdefault(interval, _Series(interval, self.base_ms, self.capacity))
+
+    def targets(self) -> List[str]:
+        return list(self._series)
+
+    def reset(self) -> None:
+        self.first_open_time = None
+        self.last_closed = 0.0
+        self._forming = None
+        for interval in list(self._series):
+            self._series[interval] = _Series(interval, self.base_ms, self.capacity)
+
+    def update(self, candle: Candle, closed: bool) -> None:
+        open_time = candle["open_time"]
+        if open_time <= self.last_closed:
+            return
+        if not closed:
+            self._forming = candle
+            return
+        for series in self._series.values():
+            series.add(candle)
+        if self.first_open_time is None:
+            self.first_open_time = open_time
+        self.last_closed = open_time
+        if self._forming is not None and self._forming["open_time"] <= open_time:
+            self._forming = None
+
+    def feed(self, candles: List[Candle]) -> None:
+        if not candles:
+            return
+        if self.first_open_time is not None and candles[0]["open_time"] < self.first_open_time:
+            self.reset()
+        now_ms = self.clock() * 1000
+        for candle in candles:
+            self.update(candle, candle["close_time"] < now_ms)
+
+    def snapshot(self, interval: str, limit: int, include_forming: bool = True) -> List[Candle]:
+        series = self._series[interval]
+        items = series.ring.snapshot(limit)
+        if include_forming:
+            forming = series.forming(self._forming)
+            if forming is not None and (not items or forming["open_time"] > items[-1]["open_time"]):
+                items.append(forming)
+        return items[-limit:] if limit > 0 else []
+
+
+def resample(candles: List[Candle], base_interval: str, interval: str, include_forming: bool = True) -> List[Candle]:
+    resampler = Resampler(base_interval, capacity=max(len(candles), 1))
+    resampler.add_target(interval)
+    resampler.feed(sorted(candles, key=lambda c: c["open_time"]))
+    return resampler.snapshot(interval, len(candles) + 1, include_forming)
+
+
+class ResampledCandleSource:
+    def __init__(
+        self,
+        source: Any,
+        base_interval: str = "15m",
+        max_base_bars: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.source = source
+        self.base_interval = base_interval
+        self.base_ms = interval_ms(base_interval)
+        self.max_base_bars = max_base_bars
+        self.clock = clock
+        self.resampled = 0
+        self.passthrough = 0
+        self._resamplers: Dict[str, Resampler] = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.source, name)
+
+    def base_bars_for(self, interval: str, bars: int) -> int:
+        return (int(bars) + 1) * (interval_ms(interval) // self.base_ms)
+
+    def get_candles(self, coin: str, interval: str = "4h", bars: int = 80) -> List[Candle]:
+        if not can_resample(self.base_interval, interval) or self.base_bars_for(interval, bars) > self.max_base_bars:
+            self.passthrough += 1
+            return self.source.get_candles(coin, interval=interval, bars=bars)
+        base = self.source.get_candles(coin, interval=self.base_interval, bars=self.base_bars_for(interval, bars))
+        with self._lock:
+            resampler = self._resamplers.get(coin)
+            if resampler is None:
+                resampler = Resampler(self.base_interval, capacity=self.max_base_bars, clock=self.clock)
+                self._resamplers[coin] = resampler
+            if interval not in resampler.targets():
+                resampler.add_target(interval)
+                resampler.reset()
+            resampler.feed(base)
+            self.resampled += 1
+            return resampler.snapshot(interval, bars)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "base_interval": self.base_interval,
+                "max_base_bars": self.max_base_bars,
+                "resampled": self.resampled,
+                "passthrough": self.passthrough,
+                "coins": {coin: r.targets() for coin, r in self._resamplers.items()},
+            }
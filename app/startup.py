@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .metrics import REGISTRY
+
+STARTUP_PHASE_SECONDS = REGISTRY.gauge("startup_phase_seconds", "Wall time spent in each startup phase.", ("phase",))
+STARTUP_WARMUP_SECONDS = REGISTRY.gauge("startup_warmup_seconds", "Wall time of each cache warm-up task.", ("task",))
+STARTUP_READY = REGISTRY.gauge("startup_ready", "1 once the app has finished its blocking startup phases.")
+
+
+class StartupTracker:
+    def __init__(self, started: Optional[float] = None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.phases: Dict[str, float] = {}
+        self.warmup: Dict[str, Dict[str, Any]] = {}
+        self.ready_after: Optional[float] = None
+        self.warm_after: Optional[float] = None
+        self._warm_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    @property
+    def warm(self) -> bool:
+        return self.warm_after is not None
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = round(seconds, 6)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark_ready(self) -> None:
+        self.ready_after = round(time.perf_counter() - self.started, 6)
+
+    def start_warmup(self, tasks: Dict[str, Callable[[], Any]], max_workers: int = 4) -> threading.Thread:
+        with self._lock:
+            for name in tasks:
+                self.warmup[name] = {"state": "pending", "seconds": None, "error": ""}
+        thread = threading.Thread(target=self._warm, args=(tasks, max_workers), name="startup-warmup", daemon=True)
+        self._warm_thread = thread
+        thread.start()
+        return thread
+
+    def wait_warm(self, timeout: Optional[float] = None) -> bool:
+        if self._warm_thread is not None:
+            self._warm_thread.join(timeout)
+        return self.warm
+
+    def _warm(self, tasks: Dict[str, Callable[[], Any]], max_workers: int) -> None:
+        if tasks:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))), thread_name_prefix="warm") as pool:
+                for name, fn in tasks.items():
+                    pool.submit(self._run_task, name, fn)
+        self.warm_after = round(time.perf_counter() - self.started, 6)
+
+    def _run_task(self, name: str, fn: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        state, error = "ok", ""
+        try:
+            fn()
+        except Exception as exc:
+            state, error = "error", str(exc)
+        with self._lock:
+            self.warmup[name] = {"state": state, "seconds": round(time.perf_counter() - started, 6), "error": error}
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "warm": self.warm,
+                "ready_after_seconds": self.ready_after,
+                "warm_after_seconds": self.warm_after,
+                "phases": dict(self.phases),
+                "warmup": {name: dict(item) for name, item in self.warmup.items()},
+            }
+
+    def warmup_seconds(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: item["seconds"] for name, item in self.warmup.items() if item["seconds"] is not None}
+
+
+def bind_metrics(tracker: StartupTracker) -> None:
+    STARTUP_PHASE_SECONDS.set_function(lambda: dict(tracker.phases))
+    STARTUP_WARMUP_SECONDS.set_function(tracker.warmup_seconds)
+    STARTUP_READY.set_function(lambda: 1.0 if tracker.ready else 0.0)
@@ -1,5 +1,218 @@
+import hashlib
+import logging
+import queue
 import sqlite3
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+VERSION_EPOCH = format(int(time.time() * 1000), "x")
+_VERSIONS: Dict[Tuple[str, str], int] = {}
+_VERSIONS_LOCK = threading.Lock()
+_SHARED_VERSIONS = False
+_WATCHERS: Dict[str, sqlite3.Connection] = {}
+LOGGER = logging.getLogger(__name__)
+
+
+def bump_version(db_path: str, *names: str) -> None:
+    with _VERSIONS_LOCK:
+        for name in names:
+            key = (db_path, name)
+            _VERSIONS[key] = _VERSIONS.get(key, 0) + 1
+
+
+def data_version(db_path: str, *names: str) -> Tuple[int, ...]:
+    with _VERSIONS_LOCK:
+        return tuple(_VERSIONS.get((db_path, name), 0) for name in names)
+
+
+def enable_shared_versions() -> None:
+    global _SHARED_VERSIONS
+    _SHARED_VERSIONS = True
+
+
+def shared_version(db_path: str) -> int:
+    with _VERSIONS_LOCK:
+        conn = _WATCHERS.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            _WATCHERS[db_path] = conn
+        return int(conn.execute("PRAGMA data_version").fetchone()[0])
+
+
+def data_etag(db_path: str, *names: str, extra: str = "") -> str:
+    versions = ",".join(str(v) for v in data_version(db_path, *names))
+    if _SHARED_VERSIONS:
+        versions = f"{versions};{shared_version(db_path)}"
+    digest = hashlib.blake2s(f"{db_path}|{'|'.join(names)}|{versions}|{extra}".encode(), digest_size=8).hexdigest()
+    return f'W/"{VERSION_EPOCH}-{digest}"'
+
+
+def kv_version_key(key: str) -> str:
+    return f"kv:{key}"
+
+
+class WriteQueue:
+    def __init__(
+        self, flush_interval: float = 0.05, max_batch: int = 500, retries: int = 3, retry_backoff: float = 0.05
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.paths: Set[str] = set()
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Tuple[Any, ...], str]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self.written = 0
+        self.failed = 0
+        self.retried = 0
+        self.last_error = ""
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def submit(self, db_path: str, sql: str, params: Tuple[Any, ...], table: str = "") -> None:
+        self._queue.put((db_path, sql, params, table))
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            grouped: Dict[str, List[Tuple[str, Tuple[Any, ...], str]]] = {}
+            for item in batch:
+                if item is None:
+                    stopping = True
+                    continue
+                grouped.setdefault(item[0], []).append((item[1], item[2], item[3]))
+            for db_path, statements in grouped.items():
+                self._write_batch(db_path, statements)
+            for _ in batch:
+                self._queue.task_done()
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+
+    def _write_batch(self, db_path: str, statements: List[Tuple[str, Tuple[Any, ...], str]]) -> None:
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self._connections.get(db_path)
+                if conn is None:
+                    conn = sqlite3.connect(db_path, check_same_thread=False)
+                    self._connections[db_path] = conn
+                with conn:
+                    for sql, params, _ in statements:
+                        conn.execute(sql, params)
+                self.written += len(statements)
+                bump_version(db_path, *{table for _, _, table in statements if table})
+                return
+            except sqlite3.Error as exc:
+                self.last_error = str(exc)
+                conn = self._connections.pop(db_path, None)
+                if conn is not None:
+                    conn.close()
+                if attempt < self.retries:
+                    self.retried += 1
+                    time.sleep(self.retry_backoff * 2**attempt)
+        LOGGER.warning(
+            "Batch of %d writes to %s failed after %d attempts (%s); writing one by one.",
+            len(statements),
+            db_path,
+            self.retries + 1,
+            self.last_error,
+        )
+        for sql, params, table in statements:
+            try:
+                _write_now(db_path, table, sql, params)
+                self.written += 1
+            except sqlite3.Error as exc:
+                self.failed += 1
+                self.last_error = str(exc)
+                LOGGER.error("Dropped write to %s.%s: %s", db_path, table or "?", exc)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "paths": sorted(self.paths),
+            "pending": self.pending(),
+            "written": self.written,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_error": self.last_error,
+        }
+
+
+_WRITE_QUEUE: Optional[WriteQueue] = None
+
+
+def enable_write_queue(*db_paths: str) -> WriteQueue:
+    global _WRITE_QUEUE
+    if _WRITE_QUEUE is None:
+        _WRITE_QUEUE = WriteQueue()
+    _WRITE_QUEUE.paths.update(db_paths)
+    _WRITE_QUEUE.start()
+    return _WRITE_QUEUE
+
+
+def disable_write_queue(*db_paths: str) -> None:
+    global _WRITE_QUEUE
+    if _WRITE_QUEUE is None:
+        return
+    if db_paths:
+        _WRITE_QUEUE.paths.difference_update(db_paths)
+    else:
+        _WRITE_QUEUE.paths.clear()
+    _WRITE_QUEUE.flush()
+    if not _WRITE_QUEUE.paths:
+        _WRITE_QUEUE.stop()
+        _WRITE_QUEUE = None
+
+
+def write_queue_status() -> Optional[Dict[str, Any]]:
+    write_queue = _WRITE_QUEUE
+    return write_queue.status() if write_queue is not None else None
+
+
+def _append(db_path: str, table: str, sql: str, params: Tuple[Any, ...]) -> None:
+    write_queue = _WRITE_QUEUE
+    if write_queue is not None and db_path in write_queue.paths:
+        write_queue.submit(db_path, sql, params, table)
+        return
+    _write_now(db_path, table, sql, params)
+
+
+def _write_now(db_path: str, table: str, sql: str, params: Tuple[Any, ...]) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+    bump_version(db_path, table)
 
 
 def init_db(db_path: str) -> None:
@@ -64,19 +277,29 @@ def init_db(db_path: str) -> None:
             )
             """
         )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shadow_trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                variant TEXT NOT NULL,
+                coin TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                opened_at INTEGER NOT NULL,
+                closed_at INTEGER NOT NULL,
+                entry_price REAL NOT NULL,
+                exit_price REAL NOT NULL,
+                reason TEXT NOT NULL,
+                pnl REAL NOT NULL
+            )
+            """
+        )
         conn.commit()
     finally:
         conn.close()
 
 
 def add_log(db_path: str, ts: int, level: str, message: str) -> None:
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute("INSERT INTO logs (ts, level, message) VALUES (?, ?, ?)", (ts, level, message))
-        conn.commit()
-    finally:
-        conn.close()
+    _append(db_path, "logs", "INSERT INTO logs (ts, level, message) VALUES (?, ?, ?)", (ts, level, message))
 
 
 def get_logs(db_path: str, limit: int = 100) -> List[Dict[str, Any]]:
@@ -101,19 +324,15 @@ def add_trade(
     status: str,
     notes: str,
 ) -> None:
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO trades (ts, action, coin, side, margin, leverage, status, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (ts, action, coin, side, margin, leverage, status, notes),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _append(
+        db_path,
+        "trades",
+        """
+        INSERT INTO trades (ts, action, coin, side, margin, leverage, status, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (ts, action, coin, side, margin, leverage, status, notes),
+    )
 
 
 def get_trades(db_path: str, limit: int = 100) -> List[Dict[str, Any]]:
@@ -154,19 +373,15 @@ def add_equity_snapshot(
     unrealized: float,
     total_equity: float,
 ) -> None:
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO equity_curve (ts, balance, available, locked, unrealized, total_equity)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (ts, balance, available, locked, unrealized, total_equity),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _append(
+        db_path,
+        "equity_curve",
+        """
+        INSERT INTO equity_curve (ts, balance, available, locked, unrealized, total_equity)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (ts, balance, available, locked, unrealized, total_equity),
+    )
 
 
 def get_equity_curve(db_path: str, limit: int = 500) -> List[Dict[str, Any]]:
@@ -197,40 +412,89 @@ def get_equity_curve(db_path: str, limit: int = 500) -> List[Dict[str, Any]]:
 
 
 def add_signal(db_path: str, ts: int, coin: str, timeframe: str, signal: bool, details: str) -> None:
+    _append(
+        db_path,
+        "signals",
+        """
+        INSERT INTO signals (ts, coin, timeframe, signal, details)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (ts, coin, timeframe, 1 if signal else 0, details),
+    )
+
+
+def get_signals(db_path: str, limit: int = 200) -> List[Dict[str, Any]]:
     conn = sqlite3.connect(db_path)
     try:
         cur = conn.cursor()
         cur.execute(
             """
-            INSERT INTO signals (ts, coin, timeframe, signal, details)
-            VALUES (?, ?, ?, ?, ?)
+            SELECT ts, coin, timeframe, signal, details
+            FROM signals ORDER BY id DESC LIMIT ?
             """,
-            (ts, coin, timeframe, 1 if signal else 0, details),
+            (limit,),
         )
-        conn.commit()
+        rows = cur.fetchall()
+        return [
+            {
+                "ts": row[0],
+                "coin": row[1],
+                "timeframe": row[2],
+                "signal": bool(row[3]),
+                "details": row[4],
+            }
+            for row in rows
+        ]
     finally:
         conn.close()
 
 
-def get_signals(db_path: str, limit: int = 200) -> List[Dict[str, Any]]:
+def add_shadow_trade(
+    db_path: str,
+    variant: str,
+    coin: str,
+    timeframe: str,
+    opened_at: int,
+    closed_at: int,
+    entry_price: float,
+    exit_price: float,
+    reason: str,
+    pnl: float,
+) -> None:
+    _append(
+        db_path,
+        "shadow_trades",
+        """
+        INSERT INTO shadow_trades (variant, coin, timeframe, opened_at, closed_at, entry_price, exit_price, reason, pnl)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (variant, coin, timeframe, opened_at, closed_at, entry_price, exit_price, reason, pnl),
+    )
+
+
+def get_shadow_trades(db_path: str, variant: str = "", limit: int = 200) -> List[Dict[str, Any]]:
     conn = sqlite3.connect(db_path)
     try:
         cur = conn.cursor()
         cur.execute(
             """
-            SELECT ts, coin, timeframe, signal, details
-            FROM signals ORDER BY id DESC LIMIT ?
+            SELECT variant, coin, timeframe, opened_at, closed_at, entry_price, exit_price, reason, pnl
+            FROM shadow_trades WHERE (? = '' OR variant = ?) ORDER BY id DESC LIMIT ?
             """,
-            (limit,),
+            (variant, variant, limit),
         )
         rows = cur.fetchall()
         return [
             {
-                "ts": row[0],
+                "variant": row[0],
                 "coin": row[1],
                 "timeframe": row[2],
-                "signal": bool(row[3]),
-                "details": row[4],
+                "opened_at": row[3],
+                "closed_at": row[4],
+                "entry_price": row[5],
+                "exit_price": row[6],
+                "reason": row[7],
+                "pnl": row[8],
             }
             for row in rows
         ]
@@ -238,17 +502,39 @@ def get_signals(db_path: str, limit: int = 200) -> List[Dict[str, Any]]:
         conn.close()
 
 
+def get_shadow_totals(db_path: str) -> Dict[str, Dict[str, Any]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT variant, COUNT(*), SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END), SUM(pnl), MIN(pnl), MAX(pnl)
+            FROM shadow_trades GROUP BY variant
+            """
+        )
+        return {
+            row[0]: {"trades": row[1], "wins": row[2], "pnl": row[3], "worst": row[4], "best": row[5]}
+            for row in cur.fetchall()
+        }
+    finally:
+        conn.close()
+
+
 def set_kv(db_path: str, key: str, value: str) -> None:
     conn = sqlite3.connect(db_path)
     try:
         cur = conn.cursor()
         cur.execute(
-            "INSERT INTO kv (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            "INSERT INTO kv (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value "
+            "WHERE kv.value IS NOT excluded.value",
             (key, value),
         )
+        changed = cur.rowcount > 0
         conn.commit()
     finally:
         conn.close()
+    if changed:
+        bump_version(db_path, kv_version_key(key))
 
 
 def get_kv(db_path: str, key: str, default: str = "") -> str:
@@ -271,3 +557,18 @@ def get_all_kv(db_path: str) -> Dict[str, str]:
         return {row[0]: row[1] for row in rows}
     finally:
         conn.close()
+
+
+def get_table_row_counts(db_path: str) -> Dict[str, int]:
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+        tables = [row[0] for row in cur.fetchall()]
+        out: Dict[str, int] = {}
+        for table in tables:
+            cur.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{table}"')
+            out[table] = int(cur.fetchone()[0])
+        return out
+    finally:
+        conn.close()
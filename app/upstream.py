@@ -0,0 +1,119 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+import anyio
+
+from .metrics import REGISTRY
+
+T = TypeVar("T")
+
+GATE_IN_FLIGHT = REGISTRY.gauge("upstream_gate_in_flight", "Calls currently holding an upstream gate slot.", ("gate",))
+GATE_TIMEOUTS = REGISTRY.counter(
+    "upstream_gate_timeouts_total", "Gate calls abandoned because the request deadline expired.", ("gate",)
+)
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("upstream_deadline", default=None)
+
+
+class DeadlineExceeded(RuntimeError):
+    pass
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    current = _DEADLINE.get()
+    target = time.monotonic() + seconds
+    if current is not None:
+        target = min(target, current)
+    token = _DEADLINE.set(target)
+    try:
+        yield target
+    finally:
+        _DEADLINE.reset(token)
+
+
+def time_left() -> Optional[float]:
+    current = _DEADLINE.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def timeout_for(default: float) -> float:
+    left = time_left()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded before the upstream call.")
+    return min(default, left)
+
+
+def backoff(seconds: float) -> None:
+    left = time_left()
+    if left is not None and left <= seconds:
+        raise DeadlineExceeded("Request deadline leaves no room for another retry.")
+    time.sleep(seconds)
+
+
+class UpstreamGate:
+    def __init__(self, name: str, limit: int, timeout_seconds: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.timeout_seconds = timeout_seconds
+        self.limiter = anyio.CapacityLimiter(limit)
+        self.in_flight = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout_seconds: Optional[float] = None) -> T:
+        seconds = timeout_seconds or self.timeout_seconds
+        if seconds <= 0:
+            return await anyio.to_thread.run_sync(self._call, fn, args, limiter=self.limiter)
+        with deadline(seconds) as target:
+            try:
+                with anyio.fail_after(max(target - time.monotonic(), 0.0)):
+                    return await anyio.to_thread.run_sync(
+                        self._call, fn, args, limiter=self.limiter, abandon_on_cancel=True
+                    )
+            except TimeoutError as exc:
+                self.timeouts += 1
+                GATE_TIMEOUTS.inc(1, self.name)
+                raise DeadlineExceeded(f"{self.name} call exceeded its {seconds:.1f}s deadline.") from exc
+
+    def _call(self, fn: Callable[..., T], args: tuple) -> T:
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.limiter.statistics().tasks_waiting,
+            "timeout_seconds": self.timeout_seconds,
+            "timeouts": self.timeouts,
+        }
+
+
+_GATES: Dict[str, UpstreamGate] = {}
+
+
+def gate(name: str, limit: int, timeout_seconds: float) -> UpstreamGate:
+    existing = _GATES.get(name)
+    if existing is None:
+        existing = _GATES.setdefault(name, UpstreamGate(name, limit, timeout_seconds))
+    return existing
+
+
+def gates_status() -> Dict[str, Dict[str, Any]]:
+    return {name: g.status() for name, g in sorted(_GATES.items())}
+
+
+GATE_IN_FLIGHT.set_function(lambda: {name: g.in_flight for name, g in _GATES.items()})
@@ -0,0 +1,115 @@
+import json
+import sys
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COLUMNAR_JSON = "application/vnd.columnar+json"
+FLOAT64_COLUMNS = "application/vnd.float64-columns"
+SHAPE_ROWS = "rows"
+SHAPE_COLUMNS = "columns"
+SHAPE_FLOAT64 = "f64"
+
+Field = Tuple[Union[str, int], str, Callable[[Any], Any]]
+
+KLINE_FIELDS: Sequence[Field] = (
+    (0, "t", int),
+    (1, "open", float),
+    (2, "high", float),
+    (3, "low", float),
+    (4, "close", float),
+    (5, "volume", float),
+    (6, "close_t", int),
+)
+EQUITY_FIELDS: Sequence[Field] = (
+    ("ts", "t", int),
+    ("balance", "balance", float),
+    ("available", "available", float),
+    ("locked", "locked", float),
+    ("unrealized", "unrealized", float),
+    ("total_equity", "total_equity", float),
+)
+SIGNAL_FIELDS: Sequence[Field] = (
+    ("ts", "t", int),
+    ("coin", "coin", str),
+    ("timeframe", "timeframe", str),
+    ("signal", "signal", bool),
+    ("details", "details", str),
+)
+SERIES_FIELDS: Sequence[Field] = (("time", "t", int), ("value", "value", float))
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def negotiate(accept: str, fmt: str = "") -> str:
+    fmt = fmt.strip().lower()
+    if fmt in {SHAPE_COLUMNS, SHAPE_FLOAT64, SHAPE_ROWS}:
+        return fmt
+    accept = accept.lower()
+    if FLOAT64_COLUMNS in accept:
+        return SHAPE_FLOAT64
+    if COLUMNAR_JSON in accept:
+        return SHAPE_COLUMNS
+    return SHAPE_ROWS
+
+
+def to_columns(rows: Sequence[Any], fields: Sequence[Field]) -> Dict[str, List[Any]]:
+    columns: Dict[str, List[Any]] = {}
+    for src, dst, cast in fields:
+        columns[dst] = [cast(row[src]) for row in rows]
+    return columns
+
+
+def pack_float64(columns: Dict[str, List[Any]]) -> bytes:
+    packed = array("d")
+    for values in columns.values():
+        packed.extend(float(v) for v in values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def encode_series(
+    shape: str,
+    payload: Dict[str, Any],
+    fields: Sequence[Field],
+    key: str = "items",
+    binary: bool = True,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    out_headers = {**(headers or {}), "Vary": "Accept"}
+    if shape == SHAPE_ROWS:
+        return FastJSONResponse(payload, headers=out_headers)
+    rows = payload.get(key) or []
+    columns = to_columns(rows, fields)
+    if shape == SHAPE_FLOAT64 and binary:
+        out_headers["X-Columns"] = ",".join(columns)
+        out_headers["X-Rows"] = str(len(rows))
+        return Response(pack_float64(columns), media_type=FLOAT64_COLUMNS, headers=out_headers)
+    meta = {k: v for k, v in payload.items() if k != key}
+    return FastJSONResponse(
+        {**meta, "count": len(rows), "columns": columns}, media_type=COLUMNAR_JSON, headers=out_headers
+    )
+
+
+def encode_nested_series(shape: str, payload: Dict[str, Any], fields: Sequence[Field], keys: Sequence[str]) -> Response:
+    headers = {"Vary": "Accept"}
+    if shape == SHAPE_ROWS:
+        return FastJSONResponse(payload, headers=headers)
+    series = {key: to_columns(payload.get(key) or [], fields) for key in keys}
+    return FastJSONResponse({**payload, **series}, media_type=COLUMNAR_JSON, headers=headers)
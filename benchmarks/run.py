@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from BoktoshiBotModule.strategy import detect_ema_rsi_long_markers, detect_ma50_crossup_markers, ema, rsi, sma
+
+DEFAULT_SIZES = [300, 10_000, 1_000_000]
+QUICK_SIZES = [300, 10_000]
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SEED = 20240219
+
+
+def synthetic_candles(count: int, interval_ms: int = 900_000, seed: int = SEED) -> List[Dict[str, float]]:
+    rng = random.Random(seed)
+    out: List[Dict[str, float]] = []
+    price = 2000.0
+    for i in range(count):
+        open_price = price
+        price = max(1.0, price * (1 + rng.gauss(0, 0.004)))
+        high = max(open_price, price) * (1 + abs(rng.gauss(0, 0.001)))
+        low = min(open_price, price) * (1 - abs(rng.gauss(0, 0.001)))
+        out.append(
+            {
+                "open_time": float(i * interval_ms),
+                "close_time": float((i + 1) * interval_ms - 1),
+                "open": open_price,
+                "high": high,
+                "low": low,
+                "close": price,
+                "volume": 100 + rng.random() * 50,
+            }
+        )
+    return out
+
+
+def measure(fn: Callable[[], Any], repeat: int, number: int = 1, warmup: int = 1) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "max_s": max(samples),
+        "runs": len(samples),
+        "number": number,
+    }
+
+
+def bench_indicators(sizes: List[int]) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        candles = synthetic_candles(size)
+        closes = [c["close"] for c in candles]
+        repeat = 3 if size >= 1_000_000 else 7
+        number = 1 if size >= 10_000 else 20
+        cases: Dict[str, Callable[[], Any]] = {
+            "sma50": lambda: sma(closes, 50),
+            "ema20": lambda: ema(closes, 20),
+            "rsi14": lambda: rsi(closes, 14),
+            "ema_rsi_markers": lambda: detect_ema_rsi_long_markers(candles),
+            "ma50_markers": lambda: detect_ma50_crossup_markers(candles),
+        }
+        for name, fn in cases.items():
+            results[f"indicator.{name}.{size}"] = measure(fn, repeat=repeat, number=number, warmup=0 if size >= 1_000_000 else 1)
+    return results
+
+
+def _populate_db(db_path: str, rows: int) -> None:
+    from app.storage import add_equity_snapshot, add_log, add_signal, init_db, set_kv
+
+    init_db(db_path)
+    for i in range(rows):
+        add_log(db_path, 1_700_000_000 + i, "INFO", f"seed log {i}")
+    for i in range(1000):
+        add_equity_snapshot(db_path, 1_700_000_000 + i * 20, 1000.0, 900.0, 100.0, float(i % 7), 1100.0 + i % 7)
+    for i in range(200):
+        add_signal(db_path, 1_700_000_000 + i * 900, "ETH", "15m", i % 10 == 0, json.dumps({"reason": "seed"}))
+    for i in range(100):
+        set_kv(db_path, f"seed_key_{i}", json.dumps({"i": i}))
+
+
+def bench_storage(workdir: str, rows: int, ops: int) -> Dict[str, Dict[str, Any]]:
+    from app.storage import add_log, get_all_kv, set_kv
+
+    db_path = os.path.join(workdir, "storage_bench.db")
+    _populate_db(db_path, rows)
+    counter = {"i": 0}
+
+    def write_log() -> None:
+        counter["i"] += 1
+        add_log(db_path, 1_800_000_000 + counter["i"], "INFO", "benchmark log line")
+
+    def write_kv() -> None:
+        counter["i"] += 1
+        set_kv(db_path, "bench_key", str(counter["i"]))
+
+    return {
+        "storage.add_log": measure(write_log, repeat=5, number=ops),
+        "storage.set_kv": measure(write_kv, repeat=5, number=ops),
+        "storage.get_all_kv": measure(lambda: get_all_kv(db_path), repeat=5, number=ops),
+    }
+
+
+def bench_api(workdir: str, requests_per_endpoint: int) -> Dict[str, Dict[str, Any]]:
+    db_path = os.path.join(workdir, "api_bench.db")
+    os.environ["DB_PATH"] = db_path
+    _populate_db(db_path, 2000)
+
+    from fastapi.testclient import TestClient
+
+    import app.main as app_main
+    from app.storage import set_kv
+
+    candles = synthetic_candles(600)
+    app_main.runner.hyperliquid.get_candles = lambda coin, interval="4h", bars=80: candles[-bars:]
+    app_main.runner.active_strategy = app_main.runner.STRATEGY_EMA_RSI
+    positions = [
+        {"positionId": f"p{i}", "coin": "ETH", "side": "LONG", "openedAt": 1_700_000_000_000 + i, "unrealizedPnl": 1.5}
+        for i in range(4)
+    ]
+    set_kv(db_path, "positions", json.dumps({"positions": positions}))
+    set_kv(db_path, "strategy_position_id", "p0")
+    set_kv(db_path, "manual_position_ids", json.dumps(["p1", "p2"]))
+    set_kv(db_path, "last_signal", json.dumps({"signal": False, "reason": "conditions_not_met"}))
+
+    client = TestClient(app_main.app)
+    endpoints = {
+        "api.status": "/api/status",
+        "api.strategy_overlay": "/api/strategy/overlay?symbol=ETHUSDT&interval=15m&limit=320",
+        "api.pnl_history": "/api/pnl-history",
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, path in endpoints.items():
+        def call(path: str = path) -> None:
+            resp = client.get(path)
+            if resp.status_code != 200:
+                raise RuntimeError(f"{path} returned {resp.status_code}: {resp.text[:200]}")
+
+        results[name] = measure(call, repeat=5, number=requests_per_endpoint)
+    return results
+
+
+def compare_results(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    base_results = baseline.get("results", {}) if isinstance(baseline, dict) else {}
+    overrides = baseline.get("thresholds", {}) if isinstance(baseline, dict) else {}
+    out: List[Dict[str, Any]] = []
+    for name, current in sorted(results.items()):
+        reference = base_results.get(name)
+        if not isinstance(reference, dict) or not reference.get("median_s"):
+            out.append({"name": name, "status": "new", "median_s": current["median_s"]})
+            continue
+        limit = float(overrides.get(name, threshold))
+        ratio = current["median_s"] / float(reference["median_s"])
+        out.append(
+            {
+                "name": name,
+                "status": "regression" if ratio > 1 + limit else "ok",
+                "median_s": current["median_s"],
+                "baseline_median_s": reference["median_s"],
+                "ratio": ratio,
+                "threshold": limit,
+            }
+        )
+    return out
+
+
+def run(
+    sizes: List[int],
+    suites: List[str],
+    storage_rows: int = 10_000,
+    storage_ops: int = 200,
+    api_requests: int = 20,
+) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="boktoshi-bench-") as workdir:
+        if "indicators" in suites:
+            results.update(bench_indicators(sizes))
+        if "storage" in suites:
+            results.update(bench_storage(workdir, storage_rows, storage_ops))
+        if "api" in suites:
+            results.update(bench_api(workdir, api_requests))
+    return {
+        "meta": {
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "suites": suites,
+            "seed": SEED,
+        },
+        "results": results,
+    }
+
+
+def _load_json(path: str) -> Optional[Dict[str, Any]]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for indicators, storage and API endpoints.")
+    parser.add_argument("--sizes", default="", help="Comma separated bar counts (default 300,10000,1000000).")
+    parser.add_argument("--quick", action="store_true", help="Skip the 1M-bar indicator runs.")
+    parser.add_argument("--suite", action="append", choices=["indicators", "storage", "api"], help="Repeatable.")
+    parser.add_argument("--output", default="", help="Write results JSON to this path (default stdout).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown ratio, 0.25 = +25%%.")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with these results.")
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    else:
+        sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+    suites = args.suite or ["indicators", "storage", "api"]
+
+    report = run(sizes, suites)
+    baseline = _load_json(args.baseline)
+    comparison = compare_results(report["results"], baseline or {}, args.threshold) if baseline else []
+    report["comparison"] = comparison
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.update_baseline:
+        previous = baseline or {}
+        merged = dict(previous.get("results", {}))
+        merged.update(report["results"])
+        stored = {"meta": report["meta"], "thresholds": previous.get("thresholds", {}), "results": merged}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+
+    regressions = [item for item in comparison if item["status"] == "regression"]
+    for item in regressions:
+        print(
+            f"REGRESSION {item['name']}: {item['median_s']:.6f}s vs baseline {item['baseline_median_s']:.6f}s "
+            f"(x{item['ratio']:.2f} > x{1 + item['threshold']:.2f})",
+            file=sys.stderr,
+        )
+    return 1 if regressions and not args.update_baseline else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,25 @@
+import pytest
+
+from BoktoshiBotModule.bot_runner import BotRunner
+from app.storage import init_db
+
+
+@pytest.fixture
+def runner(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    init_db(db_path)
+    return BotRunner(
+        db_path=db_path,
+        base_url="https://example.com/api/v1",
+        api_key="test_key",
+        poll_seconds=20,
+        dry_run=False,
+        bot_name="test",
+        bot_desc="test",
+        trade_coin="ETHUSDT",
+        margin_boks=100.0,
+        leverage=5.0,
+        sl_capital_pct=0.01,
+        tp_capital_pct=0.03,
+        max_positions=5,
+    )
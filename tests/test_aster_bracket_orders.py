@@ -0,0 +1,109 @@
+from AsterTradingModule import AsterManualTradingService, AsterTradingConfig
+from AsterTradingModule.client import AsterTradeError
+
+
+class FakeAsterClient:
+    def __init__(self, batch_results=None, retry_error=None):
+        self.calls = []
+        self.batch_results = batch_results
+        self.retry_error = retry_error
+        self.next_id = 100
+
+    def get_exchange_info(self):
+        return {"symbols": [{"symbol": "ETHUSDT", "filters": [
+            {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+            {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+        ]}]}
+
+    def get_premium_index(self, symbol):
+        return {"markPrice": "2000"}
+
+    def get_positions(self, symbol):
+        return [{"symbol": symbol, "positionAmt": "0", "leverage": "5"}]
+
+    def set_leverage(self, symbol, leverage):
+        self.calls.append(("set_leverage", leverage))
+        return {"symbol": symbol, "leverage": leverage}
+
+    def _ack(self, order):
+        self.next_id += 1
+        return {"orderId": self.next_id, "status": "FILLED" if order["type"] == "MARKET" else "NEW",
+                "executedQty": str(order.get("quantity", 0)) if order["type"] == "MARKET" else "0"}
+
+    def place_batch_orders(self, orders):
+        self.calls.append(("batch", [order["type"] for order in orders]))
+        if self.batch_results is not None:
+            return self.batch_results
+        return [self._ack(order) for order in orders]
+
+    def place_order(self, order):
+        self.calls.append(("order", order["type"], order.get("reduceOnly")))
+        if self.retry_error and order["type"] != "MARKET":
+            raise AsterTradeError(self.retry_error, code=-2021, status_code=400)
+        return self._ack(order)
+
+    def cancel_order(self, symbol, order_id):
+        self.calls.append(("cancel", order_id))
+        return {"orderId": order_id, "status": "CANCELED"}
+
+
+def make_service(client):
+    service = AsterManualTradingService(AsterTradingConfig(api_key="k", api_secret="s", leverage=5, dry_run=False))
+    service.client = client
+    return service
+
+
+def test_bracket_uses_single_batch_and_skips_cached_leverage():
+    client = FakeAsterClient()
+    service = make_service(client)
+
+    first = service.place_manual_order({"side": "BUY", "notional_usdt": 100})
+    assert first["success"] is True
+    assert first["mode"] == "batch"
+    assert client.calls == [("set_leverage", 5), ("batch", ["MARKET", "STOP_MARKET", "TAKE_PROFIT_MARKET"])]
+
+    client.calls.clear()
+    second = service.place_manual_order({"side": "BUY", "notional_usdt": 100})
+    assert second["results"]["set_leverage"]["skipped"] is True
+    assert client.calls == [("batch", ["MARKET", "STOP_MARKET", "TAKE_PROFIT_MARKET"])]
+
+
+def test_failed_protective_leg_is_retried_then_rolled_back():
+    client = FakeAsterClient(
+        batch_results=[
+            {"orderId": 1, "status": "FILLED", "executedQty": "0.05"},
+            {"code": -2021, "msg": "Order would immediately trigger."},
+            {"orderId": 3, "status": "NEW", "executedQty": "0"},
+        ],
+        retry_error="Order would immediately trigger.",
+    )
+    service = make_service(client)
+    service.get_open_positions()
+
+    result = service.place_manual_order({"side": "BUY", "notional_usdt": 100})
+
+    assert result["success"] is False
+    assert result["rollback"]["failed"] == ["stop_loss_order"]
+    assert ("order", "STOP_MARKET", None) in client.calls
+    assert ("cancel", 3) in client.calls
+    assert ("cancel", 1) not in client.calls
+    assert result["rollback"]["flatten_order"]["executedQty"] == "0.05"
+    assert client.calls[-1] == ("order", "MARKET", "true")
+    assert client.calls[0][0] == "batch"
+
+
+def test_rejected_main_order_cancels_protective_legs():
+    client = FakeAsterClient(
+        batch_results=[
+            {"code": -2019, "msg": "Margin is insufficient."},
+            {"orderId": 2, "status": "NEW"},
+            {"orderId": 3, "status": "NEW"},
+        ],
+    )
+    service = make_service(client)
+
+    result = service.place_manual_order({"side": "BUY", "notional_usdt": 100})
+
+    assert result["success"] is False
+    assert "Margin is insufficient" in result["message"]
+    assert [call for call in client.calls if call[0] == "cancel"] == [("cancel", 2), ("cancel", 3)]
@@ -0,0 +1,87 @@
+import pytest
+
+from AsterTradingModule import AsterManualTradingService, AsterTradingConfig
+from AsterTradingModule.client import AsterTradeError, floor_to_step, round_to_tick
+from AsterTradingModule.filters import build_filter_index, quantizer
+
+
+class MultiSymbolClient:
+    def __init__(self):
+        self.exchange_info_calls = 0
+        self.position_queries = []
+
+    def get_exchange_info(self):
+        self.exchange_info_calls += 1
+        return {"symbols": [
+            {"symbol": "ETHUSDT", "filters": [
+                {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+                {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+            ]},
+            {"symbol": "BTCUSDT", "filters": [
+                {"filterType": "LOT_SIZE", "stepSize": "0.0001", "minQty": "0.0001"},
+                {"filterType": "PRICE_FILTER", "tickSize": "0.5"},
+                {"filterType": "MIN_NOTIONAL", "notional": "5"},
+            ]},
+        ]}
+
+    def get_premium_index(self, symbol):
+        return {"markPrice": {"ETHUSDT": "2000", "BTCUSDT": "60000.7"}[symbol]}
+
+    def get_positions(self, symbol=""):
+        self.position_queries.append(symbol)
+        rows = [
+            {"symbol": "ETHUSDT", "positionAmt": "0.5", "leverage": "5"},
+            {"symbol": "BTCUSDT", "positionAmt": "-0.01", "leverage": "3"},
+            {"symbol": "SOLUSDT", "positionAmt": "0", "leverage": "2"},
+        ]
+        return [r for r in rows if not symbol or r["symbol"] == symbol]
+
+
+def test_quantizers_match_decimal_rounding():
+    assert floor_to_step(0.123456, "0.001") == 0.123
+    assert floor_to_step(7.9, "0.5") == 7.5
+    assert round_to_tick(60000.74, "0.5") == 60000.5
+    assert round_to_tick(2000.019, "0.010") == 2000.01
+    assert floor_to_step(1234.5, "10") == 1230.0
+    assert quantizer("0.001") is quantizer("0.001")
+
+    index = build_filter_index(MultiSymbolClient().get_exchange_info())
+    assert sorted(index) == ["BTCUSDT", "ETHUSDT"]
+    assert index["BTCUSDT"].min_notional == 5.0
+    assert index["BTCUSDT"].as_dict()["tick_size"] == "0.5"
+
+
+def test_service_previews_any_symbol_and_lists_all_positions():
+    service = AsterManualTradingService(AsterTradingConfig(api_key="k", api_secret="s", symbol="ETHUSDT"))
+    client = MultiSymbolClient()
+    service.client = client
+
+    preview = service.preview_order({"symbol": "btcusdt", "side": "SELL", "notional_usdt": 100, "stop_loss_pct": 0.01})
+    assert preview["symbol"] == "BTCUSDT"
+    assert preview["quantity"] == 0.0016
+    assert preview["stop_price"] == 60600.5
+    assert service.preview_order({"notional_usdt": 100})["symbol"] == "ETHUSDT"
+    assert client.exchange_info_calls == 1
+
+    everything = service.get_open_positions(symbol="ALL")
+    assert [p["symbol"] for p in everything["items"]] == ["ETHUSDT", "BTCUSDT"]
+    assert client.position_queries == [""]
+    assert [p["symbol"] for p in service.get_open_positions()["items"]] == ["ETHUSDT"]
+
+
+def test_unknown_symbols_refresh_exchange_info_at_most_once_per_window():
+    service = AsterManualTradingService(AsterTradingConfig(api_key="k", api_secret="s", symbol="ETHUSDT"))
+    client = MultiSymbolClient()
+    service.client = client
+
+    for _ in range(3):
+        with pytest.raises(AsterTradeError, match="DOGEUSDT"):
+            service._symbol_filters("DOGEUSDT")
+    assert client.exchange_info_calls == 1
+
+    service._filter_loaded_at -= service.FILTER_REFRESH_SECONDS
+    with pytest.raises(AsterTradeError):
+        service._symbol_filters("DOGEUSDT")
+    assert client.exchange_info_calls == 2
+    assert service._symbol_filters("BTCUSDT").min_notional == 5.0
+    assert client.exchange_info_calls == 2
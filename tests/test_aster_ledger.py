@@ -0,0 +1,109 @@
+import time
+
+from AsterTradingModule import AsterLedger, AsterManualTradingService, AsterTradingConfig
+import AsterTradingModule.ledger as ledger_module
+from AsterTradingModule.ledger import get_sync_state
+
+
+class FakeLedgerClient:
+    def __init__(self):
+        now = int(time.time() * 1000)
+        self.trades = [
+            {"id": i, "symbol": "ETHUSDT", "orderId": 100 + i, "side": "SELL", "price": "2000", "qty": "0.1",
+             "realizedPnl": "1.5", "commission": "0.02", "time": now - 3_600_000 + i}
+            for i in range(1, 6)
+        ]
+        self.income = [
+            {"tranId": 1, "incomeType": "REALIZED_PNL", "symbol": "ETHUSDT", "income": "7.5", "asset": "USDT", "time": now - 1000},
+            {"tranId": 2, "incomeType": "COMMISSION", "symbol": "ETHUSDT", "income": "-0.1", "asset": "USDT", "time": now - 900},
+            {"tranId": 3, "incomeType": "FUNDING_FEE", "symbol": "ETHUSDT", "income": "-0.4", "asset": "USDT", "time": now - 800},
+        ]
+        self.orders = [
+            {"orderId": 101, "symbol": "ETHUSDT", "status": "FILLED", "updateTime": now},
+            {"orderId": 102, "symbol": "ETHUSDT", "status": "NEW", "updateTime": now},
+        ]
+        self.trade_calls = []
+
+    def get_user_trades(self, symbol, limit, from_id=None, start_time=None, end_time=None):
+        self.trade_calls.append({"from_id": from_id, "start_time": start_time})
+        rows = [t for t in self.trades if from_id is None or t["id"] >= from_id]
+        if start_time is not None:
+            rows = [t for t in rows if start_time <= t["time"] <= end_time]
+        return rows[:limit]
+
+    def get_income(self, symbol, limit, start_time=None, end_time=None, page=None):
+        rows = [i for i in self.income if (start_time is None or i["time"] >= start_time) and (end_time is None or i["time"] <= end_time)]
+        offset = ((page or 1) - 1) * limit
+        return rows[offset : offset + limit]
+
+    def get_all_orders(self, symbol, limit, order_id=None, start_time=None):
+        return [o for o in self.orders if order_id is None or o["orderId"] >= order_id][:limit]
+
+
+def test_ledger_syncs_incrementally_and_dedupes(tmp_path):
+    client = FakeLedgerClient()
+    ledger = AsterLedger(client, str(tmp_path / "ledger.db"), ["ETHUSDT"], lookback_days=2)
+
+    first = ledger.sync()
+    assert first["errors"] == []
+    assert first["fills"] == 5
+    assert ledger.ready
+
+    client.trade_calls.clear()
+    client.trades.append(dict(client.trades[-1], id=6, time=client.trades[-1]["time"] + 1))
+    second = ledger.sync()
+    assert client.trade_calls == [{"from_id": 6, "start_time": None}]
+    assert second["fills"] == 1
+
+    assert [f["id"] for f in ledger.fills("ETHUSDT", 3)] == [6, 5, 4]
+    assert len(ledger.income("ETHUSDT")) == 3
+    assert get_sync_state(ledger.db_path)["fills:ETHUSDT"]["cursor"] == 6
+    assert get_sync_state(ledger.db_path)["orders:ETHUSDT"]["cursor"] == 102
+
+    days = ledger.daily_pnl("ETHUSDT", days=7)
+    assert len(days) == 1
+    assert days[0]["realized_pnl"] == 7.5
+    assert round(days[0]["net"], 6) == 7.0
+
+
+def test_service_reads_history_from_ready_ledger(tmp_path):
+    service = AsterManualTradingService(AsterTradingConfig(api_key="k", api_secret="s", symbol="ETHUSDT"))
+    client = FakeLedgerClient()
+    ledger = AsterLedger(client, str(tmp_path / "ledger.db"), ["ETHUSDT"], lookback_days=2)
+    ledger.sync()
+    service.client = client
+    service.attach_ledger(ledger)
+
+    history = service.get_trade_history(limit=2)
+    assert [t["id"] for t in history["items"]] == [5, 4]
+    assert service.get_daily_pnl(days=7)["items"][0]["funding"] == -0.4
+
+
+def test_ledger_restarts_after_fast_stop_start(tmp_path):
+    ledger = AsterLedger(FakeLedgerClient(), str(tmp_path / "ledger.db"), ["ETHUSDT"], sync_seconds=60)
+    ledger.start()
+    ledger.stop()
+    ledger.start()
+    try:
+        assert ledger._thread.is_alive()
+    finally:
+        ledger.stop()
+    assert not ledger._thread.is_alive()
+
+
+def test_ledger_pages_through_rows_sharing_a_timestamp(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger_module, "PAGE_LIMIT", 2)
+    client = FakeLedgerClient()
+    now = int(time.time() * 1000)
+    times = [now - 3000, now - 2000, now - 2000, now - 2000, now - 2000, now - 1000]
+    client.income = [
+        {"tranId": i, "incomeType": "FUNDING_FEE", "symbol": "ETHUSDT", "income": "-0.1", "asset": "USDT", "time": ts}
+        for i, ts in enumerate(times, start=1)
+    ]
+    client.orders = [{"orderId": 100 + i, "symbol": "ETHUSDT", "status": "FILLED", "updateTime": now} for i in range(5)]
+    ledger = AsterLedger(client, str(tmp_path / "ledger.db"), ["ETHUSDT"], lookback_days=2)
+
+    assert ledger.sync_income() == 6
+    assert len(ledger.income(limit=10)) == 6
+    assert ledger.sync_orders("ETHUSDT") == 5
+    assert get_sync_state(ledger.db_path)["orders:ETHUSDT"]["cursor"] == 104
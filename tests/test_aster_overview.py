@@ -0,0 +1,62 @@
+import threading
+import time
+
+from AsterTradingModule import AsterManualTradingService, AsterTradingConfig
+
+
+class SlowAsterClient:
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _call(self, name, value):
+        with self.lock:
+            self.calls.append(name)
+        time.sleep(self.delay)
+        return value
+
+    def get_account(self):
+        return self._call("account", {"totalWalletBalance": "100", "totalMarginBalance": "110", "totalMaintMargin": "11"})
+
+    def get_balance(self):
+        return self._call("balance", [{"asset": "USDT", "walletBalance": "100", "availableBalance": "90"}])
+
+    def get_positions(self, symbol):
+        return self._call("positions", [{"symbol": symbol, "positionAmt": "0.5", "leverage": "5"}])
+
+    def get_open_orders(self, symbol):
+        return self._call("open_orders", [{"orderId": 1}])
+
+    def get_user_trades(self, symbol, limit):
+        return self._call("user_trades", [{"id": 1}])
+
+    def get_income(self, symbol, limit):
+        raise RuntimeError("income endpoint down")
+
+
+def test_snapshot_fetches_legs_concurrently_and_caches():
+    service = AsterManualTradingService(AsterTradingConfig(api_key="k", api_secret="s"))
+    service.client = SlowAsterClient(delay=0.1)
+
+    started = time.perf_counter()
+    snapshot = service.get_snapshot(limit=30)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.3
+    assert snapshot["overview"]["margin"]["account_margin_ratio"] == 0.1
+    assert snapshot["open_positions"]["items"][0]["positionAmt"] == "0.5"
+    assert snapshot["open_orders"]["items"] == [{"orderId": 1}]
+    assert snapshot["pnl_history"]["items"] == []
+    assert "income endpoint down" in snapshot["errors"]["income:30"]
+    assert service._leverage_cache == {"ETHUSDT": 5}
+
+    calls = len(service.client.calls)
+    service.get_open_positions()
+    service.get_account_overview()
+    service.get_trade_history(limit=30)
+    assert len(service.client.calls) == calls
+
+    service.invalidate_account_cache()
+    service.get_open_orders()
+    assert service.client.calls[-1] == "open_orders"
@@ -0,0 +1,71 @@
+import hashlib
+import hmac
+import time
+from urllib.parse import parse_qsl
+
+from AsterTradingModule import AsterTradingConfig
+from AsterTradingModule.client import AsterTradeClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, server_offset_ms, recv_window_ms):
+        self.server_offset_ms = server_offset_ms
+        self.recv_window_ms = recv_window_ms
+        self.requests = []
+        self.headers = {}
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None):
+        server_now = int(time.time() * 1000) + self.server_offset_ms
+        self.requests.append((method, url, params, data))
+        if url.endswith("/fapi/v1/time"):
+            return FakeResponse(200, {"serverTime": server_now})
+        query = params if data is None else data
+        fields = dict(parse_qsl(query))
+        signed_part = query.rsplit("&signature=", 1)[0]
+        expected = hmac.new(b"secret", signed_part.encode(), hashlib.sha256).hexdigest()
+        assert fields["signature"] == expected
+        if abs(int(fields["timestamp"]) - server_now) > int(fields["recvWindow"]):
+            return FakeResponse(400, {"code": -1021, "msg": "Timestamp for this request is outside of the recvWindow."})
+        return FakeResponse(200, {"ok": True, "symbol": fields.get("symbol")})
+
+
+def make_client(offset_ms):
+    client = AsterTradeClient(AsterTradingConfig(api_key="key", api_secret="secret", recv_window_ms=1000))
+    client.session = FakeSession(offset_ms, 1000)
+    return client
+
+
+def test_signed_requests_use_synced_server_time():
+    client = make_client(offset_ms=-7000)
+
+    assert client.get_open_orders("ETHUSDT") == []
+    paths = [req[1].rsplit("/", 1)[-1] for req in client.session.requests]
+    assert paths == ["time", "openOrders"]
+    assert -7100 < client.time_offset_ms < -6900
+
+    client.session.requests.clear()
+    client.place_order({"symbol": "ETHUSDT", "side": "BUY", "type": "MARKET", "quantity": 0.01})
+    method, url, params, data = client.session.requests[0]
+    assert len(client.session.requests) == 1
+    assert params is None and data.startswith("symbol=ETHUSDT&side=BUY")
+
+
+def test_timestamp_reject_triggers_one_resync_and_retry():
+    client = make_client(offset_ms=0)
+    client.get_account()
+    client.session.server_offset_ms = 9000
+    client.session.requests.clear()
+
+    assert client.get_account() == {"ok": True, "symbol": None}
+    paths = [req[1].rsplit("/", 1)[-1] for req in client.session.requests]
+    assert paths == ["account", "time", "account"]
@@ -0,0 +1,20 @@
+from benchmarks.run import compare_results, synthetic_candles
+
+
+def test_compare_results_flags_regressions_with_overrides():
+    baseline = {
+        "results": {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}},
+        "thresholds": {"b": 1.0},
+    }
+    results = {"a": {"median_s": 1.3}, "b": {"median_s": 1.8}, "c": {"median_s": 0.1}}
+
+    by_name = {item["name"]: item for item in compare_results(results, baseline, threshold=0.25)}
+
+    assert by_name["a"]["status"] == "regression"
+    assert by_name["b"]["status"] == "ok"
+    assert by_name["c"]["status"] == "new"
+
+
+def test_synthetic_candles_are_deterministic():
+    assert synthetic_candles(50) == synthetic_candles(50)
+    assert synthetic_candles(3)[2]["open_time"] == 2 * 900_000
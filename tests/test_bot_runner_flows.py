@@ -1,33 +1,9 @@
 import json
 
-import BoktoshiBotModule.bot_runner as bot_runner_module
-from BoktoshiBotModule.bot_runner import BotRunner
-from app.storage import get_kv, init_db, set_kv
-
-
-def make_runner(tmp_path):
-    db_path = str(tmp_path / "bot.db")
-    init_db(db_path)
-    runner = BotRunner(
-        db_path=db_path,
-        base_url="https://example.com/api/v1",
-        api_key="test_key",
-        poll_seconds=20,
-        dry_run=False,
-        bot_name="test",
-        bot_desc="test",
-        trade_coin="ETHUSDT",
-        margin_boks=100.0,
-        leverage=5.0,
-        sl_capital_pct=0.01,
-        tp_capital_pct=0.03,
-        max_positions=5,
-    )
-    return runner
+from app.storage import get_kv, set_kv
 
 
-def test_sync_owned_position_ids_clears_stale(tmp_path):
-    runner = make_runner(tmp_path)
+def test_sync_owned_position_ids_clears_stale(runner):
     set_kv(runner.db_path, "strategy_position_id", "s1")
     set_kv(runner.db_path, "manual_position_ids", json.dumps(["m1", "m2"]))
 
@@ -41,9 +17,7 @@ def test_sync_owned_position_ids_clears_stale(tmp_path):
     assert runner._get_manual_position_ids() == ["m1"]
 
 
-def test_pause_resume_updates_status_kv(tmp_path):
-    runner = make_runner(tmp_path)
-
+def test_pause_resume_updates_status_kv(runner):
     pause_result = runner.pause_strategy()
     assert pause_result["success"] is True
     assert pause_result["paused"] is True
@@ -57,8 +31,7 @@ def test_pause_resume_updates_status_kv(tmp_path):
     assert get_kv(runner.db_path, "strategy_state", "") == "running"
 
 
-def test_manual_close_rejects_strategy_and_closes_selected_manual(tmp_path, monkeypatch):
-    runner = make_runner(tmp_path)
+def test_manual_close_rejects_strategy_and_closes_selected_manual(runner, monkeypatch):
     set_kv(runner.db_path, "strategy_position_id", "s1")
     set_kv(runner.db_path, "manual_position_ids", json.dumps(["m1", "m2"]))
 
@@ -83,14 +56,13 @@ def test_manual_close_rejects_strategy_and_closes_selected_manual(tmp_path, monk
     assert runner._get_manual_position_ids() == ["m2"]
 
 
-def test_ema_strategy_trailing_stop_after_1r(tmp_path, monkeypatch):
-    runner = make_runner(tmp_path)
+def test_ema_strategy_trailing_stop_after_1r(runner, monkeypatch):
     runner.active_strategy = runner.STRATEGY_EMA_RSI
     set_kv(runner.db_path, "strategy_position_id", "s1")
 
     closes = [100 + i for i in range(80)]
     candles = [{"open_time": i * 900000, "close": c} for i, c in enumerate(closes)]
-    monkeypatch.setattr(runner, "_get_closed_ema_candles", lambda: candles)
+    monkeypatch.setattr(runner, "_strategy_candles", lambda strategy, now: candles)
 
     close_calls = []
     monkeypatch.setattr(
@@ -116,13 +88,15 @@ def test_ema_strategy_trailing_stop_after_1r(tmp_path, monkeypatch):
     assert "trailing stop" in close_calls[0]["comment"].lower()
 
 
-def test_ema_strategy_cross_down_exits_position(tmp_path, monkeypatch):
-    runner = make_runner(tmp_path)
+def test_ema_strategy_cross_down_exits_position(runner, monkeypatch):
     runner.active_strategy = runner.STRATEGY_EMA_RSI
     set_kv(runner.db_path, "strategy_position_id", "s1")
 
-    monkeypatch.setattr(bot_runner_module, "evaluate_exit_ema_cross_down_15m", lambda candles: {"signal": True})
-    monkeypatch.setattr(runner, "_get_closed_ema_candles", lambda: [{"open_time": 1, "close": 100.0}] * 80)
+    closes = [100 + i * 0.5 for i in range(120)] + [20.0]
+    candles = [{"open_time": i * 900000, "close": c, "volume": 1.0} for i, c in enumerate(closes)]
+    monkeypatch.setattr(runner, "_strategy_candles", lambda strategy, now: candles[:-1])
+    assert runner._strategy_signal(runner.strategy(), 1700000000, "exit")["signal"] is False
+    monkeypatch.setattr(runner, "_strategy_candles", lambda strategy, now: candles)
 
     close_calls = []
     monkeypatch.setattr(
@@ -141,8 +115,7 @@ def test_ema_strategy_cross_down_exits_position(tmp_path, monkeypatch):
     assert "cross down" in close_calls[0]["comment"].lower()
 
 
-def test_ema_strategy_keeps_one_position_per_symbol(tmp_path, monkeypatch):
-    runner = make_runner(tmp_path)
+def test_ema_strategy_keeps_one_position_per_symbol(runner, monkeypatch):
     runner.active_strategy = runner.STRATEGY_EMA_RSI
 
     open_called = {"value": False}
@@ -0,0 +1,98 @@
+import os
+import threading
+
+import pytest
+
+from BoktoshiBotModule.candle_archive import (
+    ArchiveError,
+    CandleArchive,
+    CandleDownloader,
+    CandleSeries,
+    CandleWriter,
+    RequestBudget,
+    series_path,
+)
+
+STEP = 900_000
+HOLE = range(40 * STEP, 43 * STEP)
+
+
+class FakeHyperliquid:
+    def __init__(self, listed_ms=10 * STEP):
+        self.listed_ms = listed_ms
+        self.calls = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def get_candles_range(self, coin, interval, start_ms, end_ms):
+        with self._lock:
+            self.calls.append((coin, interval, start_ms, end_ms))
+            self.threads.add(threading.get_ident())
+        first = max(start_ms, self.listed_ms)
+        return [
+            {"open_time": float(t), "open": t / STEP, "high": t / STEP + 1, "low": t / STEP - 1, "close": t / STEP, "volume": 1.0}
+            for t in range(first, end_ms + 1, STEP)
+            if t not in HOLE
+        ]
+
+
+def test_download_pages_in_parallel_and_maps_columns(tmp_path):
+    client = FakeHyperliquid()
+    downloader = CandleDownloader(client, str(tmp_path), workers=3, bars_per_request=8)
+
+    report = downloader.download("eth", "15m", since_ms=0, until_ms=100 * STEP + 5)
+
+    assert report["complete"] and report["windows"] == 13 and report["fetched"] == 13
+    assert report["rows"] == 87 and report["gaps"] == 1
+    assert all(end - start == 8 * STEP - 1 for _, _, start, end in client.calls[:-1])
+    with CandleSeries(str(tmp_path), "ETH", "15m") as series:
+        times = series.column("open_time")
+        assert times.format == "q" and times[0] == 10 * STEP and times[-1] == 99 * STEP
+        window = series.slice(50 * STEP, 52 * STEP)
+        assert list(window["close"]) == [50.0, 51.0]
+        assert series.candles(39 * STEP, 44 * STEP)[1]["open_time"] == 43 * STEP
+        assert series.validate() == {"rows": 87, "gaps": 1, "unordered": 0, "misaligned": 0, "ok": True}
+    assert CandleWriter(str(tmp_path), "ETH", "15m").meta["gaps"] == [[40 * STEP, 43 * STEP]]
+
+
+def test_download_resumes_after_request_cap_and_interrupted_append(tmp_path):
+    client = FakeHyperliquid(listed_ms=0)
+    capped = CandleDownloader(client, str(tmp_path), workers=2, budget=RequestBudget(max_requests=3), bars_per_request=10)
+    first = capped.download("ETH", "15m", since_ms=0, until_ms=60 * STEP)
+    assert not first["complete"] and first["rows"] == 30
+
+    path = os.path.join(series_path(str(tmp_path), "ETH", "15m"), "close.d64")
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 12)
+
+    client.calls.clear()
+    second = CandleDownloader(client, str(tmp_path), workers=2, bars_per_request=10).download(
+        "ETH", "15m", since_ms=0, until_ms=60 * STEP
+    )
+    assert second["complete"] and second["rows"] == 57
+    assert client.calls[0][2] == 30 * STEP
+    assert os.path.getsize(path) == 57 * 8
+    assert CandleArchive(str(tmp_path)).get_candles("ETH", "15m", bars=2)[-1]["close"] == 59.0
+
+
+def test_writer_rejects_misaligned_bars_and_short_columns(tmp_path):
+    writer = CandleWriter(str(tmp_path), "BTC", "1h")
+    with pytest.raises(ArchiveError):
+        writer.append([{"open_time": 5.0, "close": 1.0}])
+    writer.append([{"open_time": 3_600_000.0, "close": 1.0}])
+    with open(os.path.join(writer.path, "volume.d64"), "wb"):
+        pass
+    with pytest.raises(ArchiveError):
+        CandleWriter(str(tmp_path), "BTC", "1h")
+
+
+def test_request_budget_waits_for_weight_and_stops_at_cap():
+    now = [0.0]
+    slept = []
+    budget = RequestBudget(weight_per_minute=60, max_requests=3, clock=lambda: now[0], sleep=slept.append)
+
+    assert budget.acquire(60) and slept == []
+    assert budget.acquire(30) and slept == [30.0]
+    now[0] = 90.0
+    assert budget.acquire(30) and slept == [30.0]
+    assert not budget.acquire(1)
@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+import app.main as app_main
+from app.storage import add_log, data_version, init_db, set_kv
+
+
+def test_read_endpoints_return_304_until_data_changes(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "bot.db")
+    init_db(db_path)
+    monkeypatch.setattr(app_main, "DB_PATH", db_path)
+    add_log(db_path, 1, "INFO", "first")
+    client = TestClient(app_main.app)
+
+    first = client.get("/api/logs")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert [row["message"] for row in first.json()["items"]] == ["first"]
+
+    cached = client.get("/api/logs", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    add_log(db_path, 2, "INFO", "second")
+    fresh = client.get("/api/logs", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert len(fresh.json()["items"]) == 2
+
+
+def test_kv_versions_only_move_when_the_value_changes(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "bot.db")
+    init_db(db_path)
+    monkeypatch.setattr(app_main, "DB_PATH", db_path)
+    monkeypatch.setattr(app_main.runner, "db_path", db_path)
+    client = TestClient(app_main.app)
+
+    set_kv(db_path, "positions", "[]")
+    etag = client.get("/api/open-positions").headers["etag"]
+    set_kv(db_path, "positions", "[]")
+    set_kv(db_path, "last_tick", "123")
+    assert data_version(db_path, "kv:positions") == (1,)
+    assert client.get("/api/open-positions", headers={"If-None-Match": etag}).status_code == 304
+
+    set_kv(db_path, "positions", '[{"positionId": "p1", "coin": "ETH", "side": "LONG"}]')
+    changed = client.get("/api/open-positions", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["items"][0]["positionId"] == "p1"
@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+
+from BoktoshiBotModule.journal import EventJournal, read_journal
+from BoktoshiBotModule.replay import main as replay_main
+from BoktoshiBotModule.replay import replay
+from app.storage import set_kv
+from benchmarks.run import synthetic_candles
+
+
+class FakeMTC:
+    api_key = "test_key"
+
+    def __init__(self):
+        self.positions = [{"positionId": "s1", "coin": "ETH", "side": "LONG", "unrealizedPnl": -20.0}]
+        self.orders = []
+
+    def get_account(self):
+        return {"boks": {"balance": 1000, "availableBalance": 900, "lockedMargin": 100}}
+
+    def get_positions(self):
+        return {"positions": list(self.positions)}
+
+    def get_history(self, limit=50, offset=0):
+        return {"history": []}
+
+    def open_trade(self, payload):
+        self.orders.append(payload)
+        self.positions.append({"positionId": "m1", "coin": payload["coin"], "side": "LONG"})
+        return {"positionId": "m1"}
+
+    def close_trade(self, payload):
+        self.orders.append(payload)
+        self.positions = [p for p in self.positions if p["positionId"] != payload["positionId"]]
+        return {"closed": payload["positionId"]}
+
+    def daily_claim(self):
+        return {"claimed": 0}
+
+
+class FakeCandles:
+    def get_candles(self, coin, interval="4h", bars=80):
+        return synthetic_candles(bars, interval_ms=14_400_000)
+
+
+def record_session(tmp_path, runner):
+    runner.client = FakeMTC()
+    runner.hyperliquid = FakeCandles()
+    set_kv(runner.db_path, "strategy_position_id", "s1")
+    journal = EventJournal(str(tmp_path / "journal"), segment_bytes=4096)
+    runner.attach_journal(journal)
+    for i in range(4):
+        runner.run_once(now=1700000000 + i * 20)
+    runner.manual_force_open_long("ETHUSDT")
+    runner.run_once(now=1700000100)
+    journal.close()
+    return journal
+
+
+def test_journal_segments_record_inputs_decisions_and_orders(tmp_path, runner):
+    journal = record_session(tmp_path, runner)
+    records = list(read_journal(journal.directory))
+    types = [r["type"] for r in records]
+
+    assert len(journal.segments()) > 1
+    assert types.count("tick") == 5 and types.count("manual") == 1
+    for segment in journal.segments():
+        digests = [r["digest"] for r in read_journal(segment) if r["type"] == "candles"]
+        assert len(digests) == len(set(digests))
+    first_tick = next(r for r in records if r["type"] == "tick")
+    assert first_tick["state"]["kv"]["strategy_position_id"] == "s1"
+    assert [c["fn"] for c in first_tick["calls"]][:2] == ["get_account", "get_positions"]
+    assert any(d["kind"] == "trade" and d["action"] == "CLOSE" for d in first_tick["decisions"])
+    assert [o.get("positionId", o.get("coin")) for o in runner.client._inner.orders] == ["s1", "ETH"]
+
+
+def test_replay_reproduces_decisions_without_network(tmp_path, runner, capsys):
+    journal = record_session(tmp_path, runner)
+
+    report = replay(journal.directory)
+    assert report["records"] == {"tick": 5, "manual": 1}
+    assert report["mismatch_count"] == 0
+    assert report["missing_calls"] == 0
+    assert report["replay"]["count"] == 6
+
+    assert replay_main([journal.directory, "--kind", "manual", "--strict"]) == 0
+    assert json.loads(capsys.readouterr().out)["records"] == {"manual": 1}
+
+
+def test_replay_counts_a_mismatching_record_and_keeps_going(tmp_path, runner):
+    journal = record_session(tmp_path, runner)
+    edited = str(tmp_path / "journal-edited.jsonl.gz")
+    with gzip.open(edited, "wt") as f:
+        for record in read_journal(journal.directory):
+            if record["type"] == "manual":
+                record["calls"] = []
+            f.write(json.dumps(record) + "\n")
+
+    report = replay(edited)
+    assert report["records"] == {"tick": 5, "manual": 1}
+    assert report["mismatch_count"] == 1
+    assert report["missing_calls"] == 1
+    assert report["mismatches"][0]["type"] == "manual"
+    assert report["mismatches"][0]["error"].startswith("No recorded response for")
+
+
+def test_reader_tolerates_a_truncated_tail(tmp_path):
+    journal = EventJournal(str(tmp_path / "journal"))
+    sizes = []
+    for i in range(500):
+        journal.append({"type": "tick", "ts": i, "pad": "x" * (i % 37)})
+        sizes.append(os.path.getsize(journal.segments()[0]))
+    path = journal.segments()[0]
+    journal.close()
+    with open(path, "rb") as f:
+        data = f.read()
+    with gzip.open(path, "rt") as f:
+        assert sum(1 for _ in f) == 501
+
+    with open(path, "wb") as f:
+        f.write(data[: sizes[-2] + (sizes[-1] - sizes[-2]) // 2])
+    assert [r["ts"] for r in read_journal(path) if r["type"] == "tick"] == list(range(499))
@@ -0,0 +1,124 @@
+import sqlite3
+import threading
+
+import pytest
+
+import app.storage as storage
+from app.leader import CommandTimeout, LeaderElector, LeaderLease, RunnerCommands
+from app.storage import data_etag, init_db
+
+
+def test_lease_takeover_after_expiry_bumps_term(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    first = LeaderLease(db_path, ttl_seconds=10, holder="a")
+    second = LeaderLease(db_path, ttl_seconds=10, holder="b")
+
+    assert first.acquire(now=100.0)
+    assert not second.acquire(now=105.0)
+    assert first.acquire(now=108.0)
+    assert not second.acquire(now=117.0)
+    assert second.acquire(now=119.0)
+    assert second.term == 2
+    assert not first.acquire(now=120.0)
+    assert first.current()["holder"] == "b"
+
+
+def test_elector_runs_exactly_one_trading_loop(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    events = []
+
+    def elector(name):
+        lease = LeaderLease(db_path, ttl_seconds=10, holder=name)
+        return LeaderElector(
+            lease,
+            lambda: events.append(f"{name}:elected"),
+            lambda: events.append(f"{name}:demoted"),
+            on_follow=lambda: events.append(f"{name}:follow"),
+        )
+
+    a, b = elector("a"), elector("b")
+    assert a.step(now=100.0)
+    assert not b.step(now=101.0)
+    assert b.step(now=111.0)
+    assert not a.step(now=112.0)
+    assert events == ["a:elected", "b:follow", "b:elected", "a:demoted"]
+
+
+def test_runner_stops_trading_once_the_lease_is_lost(tmp_path, runner):
+    lease = LeaderLease(str(tmp_path / "lease.db"), ttl_seconds=10, holder="a")
+    elector = LeaderElector(lease, lambda: None, lambda: None)
+    assert elector.step(now=100.0)
+    assert elector.holds(now=105.0)
+    assert not elector.holds(now=111.0)
+
+    held = {"lease": True}
+    runner.fence = lambda: held["lease"]
+    assert runner._can_send_trade(1_700_000_000)
+    held["lease"] = False
+    assert not runner._can_send_trade(1_700_000_001)
+    assert not runner._holds_fence(1_700_000_001)
+    assert list(runner._trade_timestamps) == [1_700_000_000]
+
+
+def test_followers_forward_commands_to_the_leader(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    state = {"paused": False}
+
+    def pause(payload):
+        state["paused"] = True
+        return {"success": True, "paused": True, "by": threading.current_thread().name}
+
+    handlers = {"pause": pause, "fail": lambda payload: 1 / 0}
+    leader = RunnerCommands(db_path, handlers, worker="leader", poll_seconds=0.01)
+    follower = RunnerCommands(db_path, handlers, worker="follower", poll_seconds=0.01)
+    leader.start()
+    try:
+        result = follower.call("pause", {}, timeout=5)
+        with pytest.raises(RuntimeError, match="division by zero"):
+            follower.call("fail", {}, timeout=5)
+    finally:
+        leader.stop()
+    assert state["paused"] and result["by"] == "runner-commands"
+    with pytest.raises(CommandTimeout):
+        follower.call("pause", {}, timeout=0.05)
+    leader.ttl_seconds = 0
+    assert leader.process_pending() == 0
+    assert leader.status()["states"] == {"done": 1, "error": 1, "expired": 1}
+
+
+def test_orphaned_and_late_commands_are_never_executed(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    calls = []
+    handlers = {"pause": lambda payload: calls.append(payload) or {"success": True}}
+    crashed = RunnerCommands(db_path, handlers, worker="crashed", ttl_seconds=30)
+    orphan = crashed.submit("pause", {"n": 1})
+    assert [item["id"] for item in crashed._claim()] == [orphan]
+
+    follower = RunnerCommands(db_path, handlers, worker="follower", poll_seconds=0.01)
+    with pytest.raises(CommandTimeout):
+        follower.call("pause", {"n": 2}, timeout=0.05)
+    leader = RunnerCommands(db_path, handlers, worker="leader", ttl_seconds=30)
+    assert leader.process_pending() == 0
+    leader.ttl_seconds = 0
+    assert leader.process_pending() == 0
+    assert calls == []
+    assert leader.result(orphan)["state"] == "expired"
+    assert leader.status()["states"] == {"expired": 2}
+
+
+def test_shared_versions_see_writes_from_other_processes(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "bot.db")
+    init_db(db_path)
+    before = data_etag(db_path, "kv:positions")
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO kv (key, value) VALUES ('positions', '[]')")
+    conn.commit()
+    assert data_etag(db_path, "kv:positions") == before
+
+    monkeypatch.setattr(storage, "_SHARED_VERSIONS", True)
+    shared = data_etag(db_path, "kv:positions")
+    assert data_etag(db_path, "kv:positions") == shared
+    conn.execute("UPDATE kv SET value='[1]' WHERE key='positions'")
+    conn.commit()
+    conn.close()
+    assert data_etag(db_path, "kv:positions") != shared
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from app.market_data import CandleRing, HubCandleSource, MarketDataHub, ReplayStream, candle_to_kline_row
+
+STEP = 900_000
+
+
+def candle(i, close=100.0):
+    return {
+        "open_time": float(i * STEP),
+        "close_time": float(i * STEP + STEP - 1),
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": 1.0,
+    }
+
+
+def kline(i, close, closed=False):
+    return {"kind": "kline", "candle": candle(i, close), "closed": closed}
+
+
+def test_candle_ring_is_bounded_and_upserts_in_place():
+    ring = CandleRing(capacity=3)
+    ring.merge([candle(i) for i in range(5)])
+    assert [c["open_time"] for c in ring.snapshot(10)] == [2 * STEP, 3 * STEP, 4 * STEP]
+
+    assert ring.upsert(candle(4, 110.0)) == "update"
+    assert ring.upsert(candle(3, 105.0)) == "update"
+    assert ring.upsert(candle(0)) == "ignored"
+    assert ring.upsert(candle(5)) == "append"
+    assert [c["close"] for c in ring.snapshot(3)] == [105.0, 110.0, 100.0]
+    assert candle_to_kline_row(ring.snapshot(1)[0])[0] == 5 * STEP
+
+
+def test_hub_backfills_streams_and_repairs_gaps():
+    backfills = []
+    history = {i: candle(i) for i in range(20)}
+    gate = threading.Event()
+
+    def backfill(symbol, interval, limit):
+        backfills.append(limit)
+        return [history[i] for i in sorted(history)][-limit:]
+
+    replay = ReplayStream([
+        {"kind": "mark", "price": 101.5},
+        kline(19, 102.0, closed=True),
+        kline(20, 103.0),
+        kline(23, 105.0),
+    ])
+
+    def stream(symbol, interval):
+        gate.wait(2)
+        return replay(symbol, interval)
+
+    hub = MarketDataHub("test", backfill, stream, capacity=50)
+    received = []
+    hub.subscribe("ETH", "15m", lambda symbol, interval, c, closed: received.append((c["open_time"], closed)))
+    assert hub.snapshot("ETH", "15m", 10)[-1]["open_time"] == 19 * STEP
+
+    history.update({20: candle(20, 103.0), 21: candle(21, 104.0), 22: candle(22, 104.5)})
+    gate.set()
+    deadline = time.time() + 2
+    while len(received) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    candles = HubCandleSource(hub).get_candles("ETH", interval="15m", bars=5)
+    hub.stop()
+
+    assert received == [(19 * STEP, True), (20 * STEP, False), (23 * STEP, False)]
+    assert hub.mark_price("ETH") == 101.5
+    assert [c["open_time"] / STEP for c in candles] == [19, 20, 21, 22, 23]
+    assert [c["close"] for c in candles] == [102.0, 103.0, 104.0, 104.5, 105.0]
+    assert backfills == [10, 11]
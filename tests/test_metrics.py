@@ -0,0 +1,76 @@
+import pytest
+
+from app.metrics import REGISTRY, UPSTREAM_REQUESTS, MetricsRegistry, upstream_probe
+from BoktoshiBotModule.profiling import TickInstrumentation
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("demo_seconds", "Demo latency.", ("stage",), buckets=(0.1, 1.0))
+    hist.observe(0.05, "a")
+    hist.observe(0.5, "a")
+    hist.observe(3.0, "a")
+
+    text = registry.render_prometheus()
+
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+    summary = registry.snapshot()["demo_seconds"]["series"][0]
+    assert summary["count"] == 3
+    assert summary["max"] == 3.0
+
+
+def test_tick_instrumentation_records_stages_and_failed_stage():
+    probe = TickInstrumentation(bot="alpha")
+    with pytest.raises(RuntimeError):
+        with probe.tick(1700000000):
+            with probe.span("fetch_account"):
+                pass
+            with probe.span("fetch_positions"):
+                raise RuntimeError("boom")
+
+    assert probe.failed_stage == "fetch_positions"
+    assert set(probe.last_tick["stages"]) == {"fetch_account", "fetch_positions"}
+    assert probe.last_tick["failed_stage"] == "fetch_positions"
+    text = REGISTRY.render_prometheus()
+    assert 'bot_tick_seconds_count{bot="alpha"} 1' in text
+    assert 'bot_tick_stage_seconds_count{bot="alpha",stage="fetch_account"} 1' in text
+    assert 'bot_tick_stage_failures_total{bot="alpha",stage="fetch_positions"} 1' in text
+
+
+def test_profile_capture_covers_requested_ticks():
+    probe = TickInstrumentation()
+    assert probe.request_profile(2)["success"] is True
+    for now in (1, 2):
+        with probe.tick(now):
+            with probe.span("work"):
+                sum(range(1000))
+
+    status = probe.profile_status()
+    assert status["pending_ticks"] == 0
+    assert status["last"]["ticks"] == 2
+    assert "cumulative" in status["last"]["stats"]
+
+
+def test_gauge_function_and_upstream_probe_status_classes():
+    registry = MetricsRegistry()
+    registry.gauge("demo_rows", "Rows per table.", ("table",)).set_function(lambda: {"logs": 3, "kv": 1})
+    text = registry.render_prometheus()
+    assert 'demo_rows{table="kv"} 1' in text
+    assert 'demo_rows{table="logs"} 3' in text
+
+    probe = upstream_probe("test_client", "/ping")
+    with probe.time():
+        pass
+    probe.record(200)
+    probe.record(503)
+    probe.record(0)
+    counts = {
+        item["labels"]["status"]: item["value"]
+        for item in UPSTREAM_REQUESTS.snapshot()
+        if item["labels"]["client"] == "test_client"
+    }
+    assert counts == {"2xx": 1.0, "5xx": 1.0, "error": 1.0}
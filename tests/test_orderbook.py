@@ -0,0 +1,63 @@
+import time
+
+from app.orderbook import OrderBook, OrderBookMirror, ReplayDepthStream
+
+
+SNAPSHOT = {
+    "lastUpdateId": 100,
+    "bids": [["1999.5", "2.0"], ["1999.0", "5.0"], ["1998.0", "1.0"]],
+    "asks": [["2000.5", "1.0"], ["2001.0", "3.0"]],
+}
+
+
+def diff(first, final, prev, bids=(), asks=()):
+    return {"e": "depthUpdate", "E": final, "U": first, "u": final, "pu": prev, "b": list(bids), "a": list(asks)}
+
+
+def test_order_book_applies_diffs_in_sorted_order():
+    book = OrderBook("ethusdt")
+    book.load_snapshot(SNAPSHOT)
+
+    assert book.apply_diff(diff(90, 99, 89)) == "stale"
+    assert book.apply_diff(diff(95, 105, 94, bids=[["1999.5", "0"], ["1999.8", "1.5"]])) == "applied"
+    assert book.apply_diff(diff(106, 110, 105, asks=[["2000.5", "0"], ["2000.8", "2.0"]])) == "applied"
+
+    depth = book.depth(2)
+    assert depth["lastUpdateId"] == 110
+    assert depth["bids"] == [["1999.8", "1.5"], ["1999.0", "5.0"]]
+    assert depth["asks"] == [["2000.8", "2.0"], ["2001.0", "3.0"]]
+    assert abs(book.spread() - 1.0) < 1e-9
+    assert abs(book.mid() - 2000.3) < 1e-9
+
+    impact = book.impact_price("BUY", 2000.8 * 2 + 2001.0)
+    assert 2000.8 < impact < 2001.0
+    assert book.impact_price("BUY", 1e9) is None
+
+    assert book.apply_diff(diff(120, 125, 118)) == "gap"
+    assert book.synced is False
+
+
+def test_mirror_resyncs_on_gap_and_serves_depth_from_memory():
+    snapshots = [dict(SNAPSHOT), {"lastUpdateId": 200, "bids": [["1990.0", "1.0"]], "asks": [["1991.0", "1.0"]]}]
+    calls = []
+
+    def snapshot_fn(symbol):
+        calls.append(symbol)
+        return snapshots[min(len(calls) - 1, len(snapshots) - 1)]
+
+    events = [
+        diff(95, 105, 94, bids=[["1999.6", "1.0"]]),
+        diff(150, 160, 140),
+        diff(190, 205, 189, asks=[["1990.5", "4.0"]]),
+    ]
+    mirror = OrderBookMirror(snapshot_fn, lambda symbol: ReplayDepthStream(events), max_age_seconds=60)
+    feed = mirror.feed("ETHUSDT")
+    deadline = time.time() + 2
+    while feed.book.last_update_id != 205 and time.time() < deadline:
+        time.sleep(0.01)
+    depth = mirror.get_depth("ETHUSDT", limit=5)
+    mirror.stop()
+
+    assert calls == ["ETHUSDT", "ETHUSDT"]
+    assert depth["bids"] == [["1990.0", "1.0"]]
+    assert depth["asks"] == [["1990.5", "4.0"], ["1991.0", "1.0"]]
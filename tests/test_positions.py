@@ -0,0 +1,54 @@
+import json
+
+from BoktoshiBotModule.positions import PositionsSnapshot
+from app.storage import set_kv
+
+
+def test_snapshot_indexes_by_id_and_coin_side():
+    snapshot = PositionsSnapshot.from_response(
+        {
+            "positions": [
+                {"positionId": "s1", "coin": "eth", "side": "long", "unrealizedPnl": "1.5", "openedAt": 10},
+                {"positionId": "x1", "coin": "ETH", "side": "LONG", "unrealizedPnl": 2},
+                {"positionId": "b1", "coin": "BTC", "side": "SHORT", "unrealizedPnl": None},
+            ]
+        }
+    )
+    assert len(snapshot) == 3 and "b1" in snapshot
+    assert snapshot.get("s1")["coin"] == "eth"
+    assert snapshot.ids("ETH") == ["s1", "x1"]
+    assert snapshot.has("BTC", "SHORT") and not snapshot.has("BTC")
+    assert snapshot.unrealized == 3.5
+    assert snapshot.record("s1").opened_at == 10
+
+    grouped = snapshot.classify("ETH", "s1", ["m1"])
+    assert grouped["strategy_position"]["positionId"] == "s1"
+    assert grouped["manual_positions"] == []
+    assert [p["positionId"] for p in grouped["unknown_positions"]] == ["x1"]
+    assert snapshot.classify("ETH", "s1", ["m1"]) is grouped
+    assert PositionsSnapshot.from_json("not json").items == ()
+
+
+def test_runner_publishes_fetched_snapshot_to_api_reads(runner, monkeypatch):
+    set_kv(runner.db_path, "strategy_position_id", "s1")
+    stored = json.dumps([{"positionId": "s1", "coin": "ETH", "side": "LONG"}])
+    set_kv(runner.db_path, "positions", stored)
+
+    from_kv = runner.positions_snapshot()
+    assert runner.positions_snapshot() is from_kv
+    assert runner.classify_open_positions()["strategy_position"]["positionId"] == "s1"
+
+    fetched = {
+        "positions": [
+            {"positionId": "s1", "coin": "ETH", "side": "LONG"},
+            {"positionId": "m9", "coin": "ETH", "side": "LONG"},
+        ]
+    }
+    monkeypatch.setattr(runner.client, "get_positions", lambda: fetched)
+    published = runner._fetch_positions(1700000000)
+    assert runner.positions_snapshot() is published
+    grouped = runner.classify_open_positions()
+    assert [p["positionId"] for p in grouped["unknown_positions"]] == ["m9"]
+    assert runner.classify_open_positions() is grouped
+    runner.stop()
+    assert runner.positions_snapshot() is not published
@@ -0,0 +1,99 @@
+from app.resample import ResampledCandleSource, Resampler, resample
+
+M15 = 900_000
+H1 = 3_600_000
+H4 = 14_400_000
+D1 = 86_400_000
+
+
+def bars(start, count, step=M15):
+    return [
+        {
+            "open_time": float(start + i * step),
+            "close_time": float(start + (i + 1) * step - 1),
+            "open": 100.0 + i,
+            "high": 101.0 + i,
+            "low": 99.0 + i,
+            "close": 100.5 + i,
+            "volume": 1.0,
+        }
+        for i in range(count)
+    ]
+
+
+def test_resample_aligns_buckets_and_drops_leading_partial():
+    base = bars(D1 - 2 * M15, 2 + 16 + 5)
+
+    out = resample(base, "15m", "4h")
+
+    assert [c["open_time"] for c in out] == [D1, D1 + H4]
+    full = out[0]
+    assert full == {
+        "open_time": float(D1),
+        "close_time": float(D1 + H4 - 1),
+        "open": 102.0,
+        "high": 118.0,
+        "low": 101.0,
+        "close": 117.5,
+        "volume": 16.0,
+    }
+    assert out[1]["open"] == 118.0 and out[1]["close"] == 122.5 and out[1]["volume"] == 5.0
+    assert [c["open_time"] for c in resample(base, "15m", "4h", include_forming=False)] == [D1]
+    assert [c["open_time"] for c in resample(base, "15m", "1d")] == [D1]
+    assert len(resample(base, "15m", "1h")) == 6
+
+
+def test_incremental_updates_close_higher_bars_with_the_last_base_bar():
+    base = bars(D1, 40)
+    resampler = Resampler("15m", clock=lambda: 0.0)
+    for interval in ("30m", "1h", "4h"):
+        resampler.add_target(interval)
+
+    for candle in base[:15]:
+        resampler.update(candle, closed=True)
+    assert resampler.snapshot("4h", 5, include_forming=False) == []
+    resampler.update(dict(base[15], close=1.0), closed=False)
+    assert resampler.snapshot("4h", 5)[-1]["close"] == 1.0
+    resampler.update(base[15], closed=True)
+    assert len(resampler.snapshot("4h", 5, include_forming=False)) == 1
+
+    for candle in base[16:]:
+        resampler.update(candle, closed=True)
+    for interval in ("30m", "1h", "4h"):
+        assert resampler.snapshot(interval, 100) == resample(base, "15m", interval)
+
+
+class CountingSource:
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+        self.calls = []
+
+    def get_candles(self, coin, interval="4h", bars=80):
+        self.calls.append((interval, bars))
+        step = {"1m": 60_000, "15m": M15, "1h": H1, "4h": H4, "1d": D1}[interval]
+        end = self.now_ms // step * step
+        return bars_between(end - (bars - 1) * step, end, step)
+
+
+def bars_between(start, end, step):
+    return bars(start, (end - start) // step + 1, step)
+
+
+def test_source_derives_intervals_from_one_base_feed():
+    now_ms = 30 * D1 + 5 * H1 + 7 * 60_000
+    source = CountingSource(now_ms)
+    resampled = ResampledCandleSource(source, base_interval="15m", max_base_bars=1500, clock=lambda: now_ms / 1000)
+
+    four_hour = resampled.get_candles("ETH", interval="4h", bars=5)
+    hourly = resampled.get_candles("ETH", interval="1h", bars=3)
+    resampled.get_candles("ETH", interval="4h", bars=5)
+
+    assert [c["open_time"] for c in four_hour] == [30 * D1 - 3 * H4 + i * H4 for i in range(5)]
+    assert four_hour[-1]["close_time"] > now_ms
+    assert [c["open_time"] for c in hourly] == [30 * D1 + 3 * H1, 30 * D1 + 4 * H1, 30 * D1 + 5 * H1]
+    assert {interval for interval, _ in source.calls} == {"15m"}
+
+    resampled.get_candles("ETH", interval="1d", bars=90)
+    resampled.get_candles("ETH", interval="1m", bars=10)
+    assert source.calls[-2:] == [("1d", 90), ("1m", 10)]
+    assert resampled.stats()["passthrough"] == 2
@@ -0,0 +1,77 @@
+from BoktoshiBotModule.risk import capital_exit, r_multiple_exit
+from BoktoshiBotModule.risk_engine import RULE_R_MULTIPLE, RiskEngine, TrackedPosition
+from app.storage import set_kv
+
+
+def test_exit_rules():
+    assert capital_exit(-10.0, 1000.0, 0.01, 0.03) == "SL"
+    assert capital_exit(30.0, 1000.0, 0.01, 0.03) == "TP"
+    assert capital_exit(5.0, 1000.0, 0.01, 0.03) == ""
+
+    step = r_multiple_exit(1.2, 1.0, 0.5, False)
+    assert step["activated"] is True and step["exit"] == ""
+    assert r_multiple_exit(0.3, 1.0, 1.5, True)["exit"] == "TRAIL"
+    assert r_multiple_exit(-1.0, 1.0, 0.0, False)["exit"] == "SL"
+    assert r_multiple_exit(2.0, 1.0, 2.0, True)["exit"] == "TP"
+
+
+def test_engine_trails_from_local_mark_prices():
+    exits = []
+    engine = RiskEngine(lambda pos, reason, pnl: exits.append((pos.position_id, reason, round(pnl, 6))))
+    engine.sync([
+        TrackedPosition("p1", "strategy", "ETH", entry_price=2000.0, notional=500.0, rule=RULE_R_MULTIPLE, risk_r=5.0)
+    ])
+
+    assert engine.on_price("ETH", 2030.0) == []
+    assert engine.tracked("p1").trailing_active is True
+    assert engine.on_price("BTC", 1.0) == []
+    assert engine.on_price("ETH", 2015.0) == []
+    assert engine.on_price("ETH", 2010.0) == [("p1", "TRAIL")]
+    assert exits == [("p1", "TRAIL", 2.5)]
+    assert engine.on_price("ETH", 1000.0) == []
+
+
+def test_runner_closes_from_price_feed_once(runner, monkeypatch):
+    runner.clock = lambda: 1700000000.0
+    set_kv(runner.db_path, "strategy_position_id", "s1")
+    account = {"boks": {"balance": 1000, "lockedMargin": 0}}
+    positions = [{"positionId": "s1", "coin": "ETH", "side": "LONG", "entryPrice": 2000.0, "margin": 100, "leverage": 5}]
+
+    callbacks = {}
+    runner.attach_price_feed(lambda coin, interval, cb: callbacks.setdefault(coin, cb) and (lambda: None))
+    closes = []
+    monkeypatch.setattr(runner, "_can_send_trade", lambda now: True)
+    monkeypatch.setattr(runner.client, "close_trade", lambda payload: closes.append(payload) or {"ok": True})
+
+    runner._sync_risk_engine(account, positions)
+    assert set(callbacks) == {"ETH"}
+    callbacks["ETH"]("ETH", "1m", {"close": 1990.0}, False)
+    assert closes == []
+    callbacks["ETH"]("ETH", "1m", {"close": 1959.0}, False)
+    assert [c["positionId"] for c in closes] == ["s1"]
+    assert runner.export_state()["closed_ids"] == {"s1": 1700000000}
+
+    positions[0]["unrealizedPnl"] = -10.5
+    set_kv(runner.db_path, "strategy_position_id", "s1")
+    runner._manage_open_positions(1700000000, account, positions)
+    runner._sync_risk_engine(account, positions)
+    callbacks["ETH"]("ETH", "1m", {"close": 1950.0}, False)
+    assert len(closes) == 1
+    assert runner.get_risk_state()["subscriptions"] == ["ETH"]
+
+
+def test_rate_limited_close_is_retried_on_next_tick(runner, monkeypatch):
+    set_kv(runner.db_path, "strategy_position_id", "s1")
+    account = {"boks": {"balance": 1000, "lockedMargin": 0}}
+    positions = [{"positionId": "s1", "coin": "ETH", "side": "LONG", "unrealizedPnl": -10.5}]
+    closes = []
+    monkeypatch.setattr(runner.client, "close_trade", lambda payload: closes.append(payload) or {"ok": True})
+    for ts in range(1700000000, 1700000009):
+        assert runner._can_send_trade(ts)
+
+    runner._manage_open_positions(1700000010, account, positions)
+    assert closes == []
+    assert "s1" not in runner.export_state()["closed_ids"]
+
+    runner._manage_open_positions(1700000080, account, positions)
+    assert [c["positionId"] for c in closes] == ["s1"]
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+
+import pytest
+
+from BoktoshiBotModule.candle_cache import SharedCandleCache
+from BoktoshiBotModule.runner_manager import RunnerManager, load_bot_specs
+import app.storage as storage
+from app.storage import WriteQueue, add_log, get_kv, get_logs, init_db
+
+
+class _CountingHyperliquid:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_candles(self, coin, interval="4h", bars=80):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.05)
+        return [{"open_time": 0, "close_time": 1, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0}]
+
+
+def test_shared_candle_cache_single_flight():
+    upstream = _CountingHyperliquid()
+    cache = SharedCandleCache(upstream, ttl_seconds=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_candles("ETH", "15m", 300))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream.calls == 1
+    assert len(results) == 8
+    assert all(item is results[0] for item in results)
+    cache.get_candles("BTC", "15m", 300)
+    assert upstream.calls == 2
+
+
+def test_runner_manager_hosts_isolated_bots(tmp_path, monkeypatch):
+    specs_path = tmp_path / "bots.json"
+    specs_path.write_text(json.dumps([
+        {"id": "alpha", "db_path": str(tmp_path / "alpha.db"), "api_key": "", "poll_seconds": 30},
+        {"id": "beta", "db_path": str(tmp_path / "beta.db"), "api_key": "", "strategy": "EMA_RSI_15M_ETH_ONLY"},
+    ]))
+    manager = RunnerManager()
+    for spec in load_bot_specs(str(specs_path)):
+        manager.add_bot(spec)
+
+    alpha = manager.get_runner("alpha")
+    beta = manager.get_runner("beta")
+    assert alpha.hyperliquid is beta.hyperliquid
+    assert alpha.client.session is beta.client.session
+    assert alpha.overlay_cache is beta.overlay_cache
+    assert (alpha.instrumentation.bot, beta.instrumentation.bot) == ("alpha", "beta")
+    assert beta.get_active_strategy() == "EMA_RSI_15M_ETH_ONLY"
+    assert alpha.get_active_strategy() != beta.get_active_strategy()
+
+    assert manager.stop_bot("beta") is True
+    assert manager.dispatch_due(now=1700000000) == 1
+    assert get_kv(alpha.db_path, "last_tick", "") == "1700000000"
+    assert get_kv(beta.db_path, "last_tick", "") == ""
+    assert manager.dispatch_due(now=1700000010) == 0
+
+    manager.start_bot("beta")
+    assert manager.dispatch_due(now=1700000040) == 2
+    statuses = {item["id"]: item for item in manager.list_bots()}
+    assert statuses["alpha"]["ticks"] == 2
+    assert statuses["beta"]["running"] is True
+    assert manager.stop_bot("missing") is False
+
+
+def test_runner_manager_rejects_shared_db_path(tmp_path):
+    manager = RunnerManager()
+    manager.add_bot({"id": "a", "db_path": str(tmp_path / "a.db"), "autostart": False})
+    with pytest.raises(ValueError, match="already used"):
+        manager.add_bot({"id": "b", "db_path": str(tmp_path / "a.db")})
+
+
+def test_tick_errors_are_logged_to_the_bot_database(tmp_path, monkeypatch):
+    manager = RunnerManager()
+    runner = manager.add_bot({"id": "a", "db_path": str(tmp_path / "a.db")})
+
+    def fail(now):
+        raise RuntimeError("db locked")
+
+    monkeypatch.setattr(runner, "run_once", fail)
+    assert manager.dispatch_due(now=1700000000) == 1
+
+    assert manager.bot_status("a")["last_error"] == "db locked"
+    logs = get_logs(runner.db_path, 5)
+    assert [(row["level"], row["message"]) for row in logs] == [("ERROR", "Scheduled tick failed for a: db locked")]
+
+
+def test_stop_and_remove_close_scanner_pools(tmp_path):
+    manager = RunnerManager()
+    runner = manager.add_bot({"id": "a", "db_path": str(tmp_path / "a.db"), "scanner_symbols": ["BTCUSDT"], "autostart": False})
+    broken = manager.add_bot({"id": "b", "db_path": str(tmp_path / "b.db"), "scanner_symbols": ["SOLUSDT"], "autostart": False})
+    pool = runner.scanner._pool()
+
+    def fail():
+        raise RuntimeError("pool wedged")
+
+    broken.scanner.close = fail
+    manager.start()
+    manager.stop()
+    assert pool._shutdown
+    assert runner.scanner._executor is None
+    assert [row["message"] for row in get_logs(broken.db_path, 5)] == ["Scanner shutdown failed for b: pool wedged"]
+
+    reopened = runner.scanner._pool()
+    assert reopened is not pool
+    assert manager.remove_bot("a") is True
+    assert reopened._shutdown
+
+
+def test_write_queue_is_scoped_to_bot_databases(tmp_path):
+    main_db = str(tmp_path / "main.db")
+    init_db(main_db)
+    manager = RunnerManager()
+    manager.add_bot({"id": "a", "db_path": str(tmp_path / "a.db"), "autostart": False})
+    manager.start()
+    try:
+        assert storage._WRITE_QUEUE.paths == {str(tmp_path / "a.db")}
+        add_log(main_db, 1, "INFO", "written synchronously")
+        assert storage._WRITE_QUEUE.pending() == 0
+        assert [row["message"] for row in get_logs(main_db, 5)] == ["written synchronously"]
+    finally:
+        manager.stop()
+    assert storage._WRITE_QUEUE is None
+
+
+def test_write_queue_retries_then_isolates_bad_statements(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    init_db(db_path)
+    writer = WriteQueue(retries=2, retry_backoff=0)
+    writer._write_batch(
+        db_path,
+        [
+            ("INSERT INTO logs (ts, level, message) VALUES (?, ?, ?)", (1, "INFO", "kept"), "logs"),
+            ("INSERT INTO missing_table (x) VALUES (?)", (1,), "missing_table"),
+        ],
+    )
+    assert [row["message"] for row in get_logs(db_path, 5)] == ["kept"]
+    status = writer.status()
+    assert (status["written"], status["retried"], status["failed"]) == (1, 2, 1)
+    assert "missing_table" in status["last_error"]
@@ -0,0 +1,87 @@
+import random
+
+from BoktoshiBotModule.scanner import StrategyScanner, evaluate_universe
+from BoktoshiBotModule.strategies import STRATEGIES
+from BoktoshiBotModule.strategy import batch_ema, batch_rsi, batch_sma, ema, evaluate_long_ema_rsi_15m, rsi, sma
+
+
+def _walk(count, seed):
+    rng = random.Random(seed)
+    price = 100.0
+    out = []
+    for i in range(count):
+        price *= 1 + rng.gauss(0, 0.01)
+        out.append({"open_time": i * 900000, "close_time": (i + 1) * 900000 - 1, "close": price, "volume": 10.0})
+    return out
+
+
+def test_batch_indicators_match_single_series():
+    matrix = [[c["close"] for c in _walk(200, seed)] for seed in (1, 2, 3)]
+    for single, batch, period in ((sma, batch_sma, 50), (ema, batch_ema, 20), (rsi, batch_rsi, 14)):
+        for row, aligned in zip(matrix, batch(matrix, period)):
+            assert [v for v in aligned if v is not None] == single(row, period)
+
+
+def test_universe_evaluation_matches_single_symbol_evaluator():
+    universe = {f"C{seed}": _walk(300, seed) for seed in range(12)}
+    rows = {row["coin"]: row for row in evaluate_universe(STRATEGIES.get("EMA_RSI_15M_ETH_ONLY"), universe)}
+    for coin, candles in universe.items():
+        single = evaluate_long_ema_rsi_15m(candles)
+        assert rows[coin]["signal"] == single["signal"]
+        assert rows[coin]["rsi"] == single["rsi"]
+
+
+def test_ragged_universe_keeps_each_coin_full_history():
+    universe = {f"C{seed}": _walk(120 + 37 * (seed % 4), seed) for seed in range(10)}
+    universe["SHORT"] = _walk(40, 99)
+    strategy = STRATEGIES.get("EMA_RSI_15M_ETH_ONLY")
+    rows = {row["coin"]: row for row in evaluate_universe(strategy, universe)}
+    assert rows["SHORT"]["reason"] == "not_enough_candles"
+    for coin, candles in universe.items():
+        if coin == "SHORT":
+            continue
+        single = evaluate_long_ema_rsi_15m(candles)
+        assert {f: rows[coin][f] for f in ("signal", "ema_fast", "ema_slow", "rsi")} == {
+            f: single[f] for f in ("signal", "ema_fast", "ema_slow", "rsi")
+        }
+
+
+class _FakeHyperliquid:
+    def __init__(self, universe):
+        self.universe = universe
+        self.calls = []
+
+    def get_candles(self, coin, interval="4h", bars=80):
+        self.calls.append(coin)
+        return self.universe[coin]
+
+
+def test_scanner_ranks_signals_and_runner_opens_per_symbol(runner, monkeypatch):
+    universe = {"BTC": _walk(300, 1), "SOL": _walk(300, 2)}
+    fake = _FakeHyperliquid(universe)
+    scanner = StrategyScanner(fake, ["BTCUSDT", "SOLUSDT"])
+    monkeypatch.setattr(
+        "BoktoshiBotModule.scanner.evaluate_universe",
+        lambda strategy, u: [
+            {"coin": "BTC", "signal": False, "score": 9.0, "close": 1.0},
+            {"coin": "SOL", "signal": True, "score": 0.5, "close": 150.0, "last_candle_open_time": 42},
+        ],
+    )
+
+    result = scanner.scan("EMA_RSI_15M_ETH_ONLY", now_ms=1_700_000_000_000)
+    assert [r["coin"] for r in result["signals"]] == ["SOL", "BTC"]
+    assert scanner.scan("EMA_RSI_15M_ETH_ONLY", now_ms=1_700_000_010_000) is result
+    assert sorted(fake.calls) == ["BTC", "SOL"]
+
+    runner.active_strategy = runner.STRATEGY_EMA_RSI
+    runner.scanner = scanner
+    opened = []
+    monkeypatch.setattr(runner.client, "open_trade", lambda payload: opened.append(payload) or {"positionId": "sol-1"})
+    monkeypatch.setattr(runner, "_fetch_positions", lambda now: [{"positionId": "sol-1", "coin": "SOL", "side": "LONG"}])
+
+    account = {"boks": {"balance": 1000, "lockedMargin": 0}}
+    runner._scan_and_trade(1_700_000_000, account, [])
+    runner._scan_and_trade(1_700_000_010, account, [])
+
+    assert [p["coin"] for p in opened] == ["SOL"]
+    assert runner._get_scanner_position_ids() == {"SOL": "sol-1"}
@@ -0,0 +1,103 @@
+import json
+
+from BoktoshiBotModule.shadow import ShadowMode, load_shadow_variants, shadow_summary
+from BoktoshiBotModule.strategies import STRATEGIES, STRATEGY_EMA_RSI, STRATEGY_MA50, derive_strategy, parity_candles
+from BoktoshiBotModule.shadow import SHADOW_STATE_KEY
+from app.storage import get_shadow_totals, get_shadow_trades, init_db, set_kv
+
+
+def _expected_events(strategy, candles, start):
+    batch = strategy.evaluate_batch([candles])
+    out, holding = [], False
+    for t in range(start, len(candles)):
+        if holding and batch.exit[0][t]:
+            out.append(("CLOSE", int(candles[t]["open_time"])))
+            holding = False
+        elif not holding and batch.entry[0][t]:
+            out.append(("OPEN", int(candles[t]["open_time"])))
+            holding = True
+    return out
+
+
+def test_variants_share_one_indicator_graph_and_follow_batch_signals(tmp_path):
+    db_path = str(tmp_path / "shadow.db")
+    init_db(db_path)
+    ema = STRATEGIES.get(STRATEGY_EMA_RSI)
+    shadow = ShadowMode(db_path, "ETH")
+    strategies = [ema] + [derive_strategy(ema, f"EMA_RSI_BAND_{hi}", {"entry.rsi_band_ok.upper": hi}) for hi in range(72, 90, 2)]
+    for strategy in strategies:
+        shadow.add(strategy, ema.id)
+
+    candles = parity_candles("15m", 900, seed=3)
+    events = []
+    for t in range(299, len(candles)):
+        now = int(candles[t]["close_time"] / 1000) + 1
+        window = candles[t + 1 - 300 : t + 1]
+        events += shadow.run(now, lambda interval, bars: window, {"margin_boks": 100.0, "leverage": 5.0})
+
+    graph = shadow.graphs["15m"]
+    assert graph.nodes == 3
+    assert graph.updates == 3 * len(candles)
+    totals = get_shadow_totals(db_path)
+    for strategy in strategies:
+        got = [(e["action"], e["time"]) for e in events if e["variant"] == strategy.id]
+        assert got == _expected_events(strategy, candles, 299)
+        assert totals.get(strategy.id, {"trades": 0})["trades"] == sum(1 for action, _ in got if action == "CLOSE")
+    assert any(e["action"] == "CLOSE" for e in events)
+
+
+def test_runner_shadow_reuses_tick_candles_and_persists_summary(tmp_path, runner, monkeypatch):
+    runner.dry_run = True
+    runner.active_strategy = runner.STRATEGY_EMA_RSI
+    feeds = {"15m": parity_candles("15m", 300), "4h": parity_candles("4h", 90)}
+    calls = []
+    monkeypatch.setattr(
+        runner.hyperliquid,
+        "get_candles",
+        lambda coin, interval="4h", bars=80: calls.append((interval, bars)) or feeds[interval][-bars:],
+    )
+    config = tmp_path / "shadow.json"
+    config.write_text(
+        json.dumps({"variants": [{"base": STRATEGY_EMA_RSI, "id": "ema_rsi_fast12", "set": {"indicators.ema_fast.period": 12}}]})
+    )
+    runner.enable_shadow(load_shadow_variants(str(config), STRATEGIES))
+
+    account = {"boks": {"balance": 1000, "lockedMargin": 0}}
+    runner._tick_candles = {}
+    runner._maybe_open_long(1_700_000_000, account, [])
+    runner._run_shadow(1_700_000_000, account)
+    runner._tick_candles = None
+
+    assert sorted(calls) == [("15m", 300), ("4h", 90)]
+    summary = shadow_summary(runner.db_path)
+    assert summary["enabled"] is True
+    assert {v["id"] for v in summary["variants"]} == {STRATEGY_MA50, STRATEGY_EMA_RSI, "EMA_RSI_FAST12"}
+    assert summary["graphs"]["15m"] == {"indicator_nodes": 4, "variants": 2, "bars": 300, "indicator_updates": 1200}
+    assert all(v["evaluated"] == 1 for v in summary["variants"])
+
+
+def test_backfill_replays_stops_for_restored_positions(tmp_path):
+    db_path = str(tmp_path / "shadow.db")
+    init_db(db_path)
+    candles = parity_candles("15m", 300, seed=4)
+    opened = 100
+    stop_loss = min(c["low"] for c in candles[opened + 1 : 250]) + 1e-9
+    hit = next(t for t in range(opened + 1, len(candles)) if candles[t]["low"] <= stop_loss)
+    position = {
+        "opened_at": int(candles[opened]["open_time"]),
+        "entry_price": candles[opened]["close"],
+        "stop_loss": stop_loss,
+        "take_profit": 0.0,
+        "notional": 500.0,
+    }
+    set_kv(db_path, SHADOW_STATE_KEY, json.dumps({"variants": {STRATEGY_EMA_RSI: {"position": position}}}))
+
+    shadow = ShadowMode(db_path, "ETH")
+    shadow.add(STRATEGIES.get(STRATEGY_EMA_RSI))
+    now = int(candles[-1]["close_time"] / 1000) + 1
+    events = shadow.run(now, lambda interval, bars: candles, {"margin_boks": 100.0, "leverage": 5.0})
+
+    closes = [e for e in events if e["action"] == "CLOSE"]
+    assert hit < len(candles) - 1
+    assert [(e["time"], e["reason"], e["price"]) for e in closes][:1] == [(int(candles[hit]["open_time"]), "SL", stop_loss)]
+    assert get_shadow_trades(db_path, limit=5)[-1]["reason"] == "SL"
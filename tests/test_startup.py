@@ -0,0 +1,45 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main as app_main
+from app.startup import StartupTracker
+
+
+def test_tracker_records_phases_and_parallel_warmup():
+    tracker = StartupTracker()
+    with tracker.phase("init_db"):
+        time.sleep(0.01)
+    tracker.mark_ready()
+    barrier = threading.Barrier(2, timeout=2)
+
+    def fail():
+        raise RuntimeError("exchangeInfo down")
+
+    tracker.start_warmup({"candles": barrier.wait, "symbols": barrier.wait, "exchange_info": fail})
+    assert tracker.wait_warm(5)
+    status = tracker.status()
+    assert status["ready"] and status["warm"]
+    assert status["phases"]["init_db"] >= 0.01
+    assert status["warmup"]["candles"]["state"] == "ok"
+    assert status["warmup"]["exchange_info"]["state"] == "error"
+    assert status["warmup"]["exchange_info"]["error"] == "exchangeInfo down"
+
+
+def test_ready_endpoint_reports_503_until_startup_finishes(monkeypatch):
+    tracker = StartupTracker()
+    monkeypatch.setattr(app_main, "startup", tracker)
+    client = TestClient(app_main.app)
+
+    assert client.get("/healthz/live").status_code == 200
+    assert client.get("/healthz/ready").status_code == 503
+    tracker.mark_ready()
+    assert client.get("/healthz/ready").status_code == 200
+    release = threading.Event()
+    tracker.start_warmup({"candles": release.wait})
+    assert client.get("/healthz/ready?warm=true").status_code == 503
+    release.set()
+    tracker.wait_warm(5)
+    body = client.get("/healthz/ready?warm=true").json()
+    assert body["warm"] and body["warmup"]["candles"]["state"] == "ok"
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from BoktoshiBotModule.strategies import (
+    STRATEGIES,
+    STRATEGY_EMA_RSI,
+    STRATEGY_MA50,
+    RuleStrategy,
+    StrategyError,
+    StrategyRegistry,
+    builtin_strategies,
+    derive_strategy,
+    parity_candles,
+    strategy_from_dict,
+)
+from BoktoshiBotModule.strategy import evaluate_long_ema_rsi_15m, evaluate_long_ma50_cross_3_candles
+
+CROSS_SMA = {
+    "id": "sma_10_30_cross",
+    "label": "SMA10/30 cross",
+    "interval": "1h",
+    "bars": 120,
+    "indicators": {"fast": {"kind": "sma", "period": 10}, "slow": {"kind": "sma", "period": 30}},
+    "entry": [{"op": "cross_above", "left": "fast", "right": "slow", "label": "cross_up"}],
+    "exit": [{"op": "cross_below", "left": "fast", "right": "slow", "label": "cross_down"}],
+    "overlay": ["fast", "slow"],
+    "score": ["fast", "slow"],
+}
+
+
+def test_builtins_pass_parity_and_match_legacy_evaluators():
+    for strategy_id in (STRATEGY_MA50, STRATEGY_EMA_RSI):
+        assert STRATEGIES.parity[strategy_id]["ok"]
+        assert STRATEGIES.parity[strategy_id]["signals"]["entry"] > 0
+
+    ma50, ema_rsi = STRATEGIES.get(STRATEGY_MA50), STRATEGIES.get(STRATEGY_EMA_RSI)
+    for strategy, legacy, fields in (
+        (ma50, evaluate_long_ma50_cross_3_candles, ("signal", "close", "ma50")),
+        (ema_rsi, evaluate_long_ema_rsi_15m, ("signal", "close", "ema_fast", "ema_slow", "rsi")),
+    ):
+        candles = parity_candles(strategy.interval, 300, seed=11)
+        result = strategy.evaluate_batch([candles])
+        for t in range(strategy.min_bars - 1, len(candles)):
+            expected = legacy(candles[: t + 1])
+            got = result.payload(0, t)
+            assert {f: got[f] for f in fields} == {f: expected[f] for f in fields}
+
+
+def test_min_bars_never_drops_below_indicator_warmup():
+    assert strategy_from_dict(CROSS_SMA).min_bars == 31
+    assert strategy_from_dict({**CROSS_SMA, "min_bars": 5}).min_bars == 31
+    assert strategy_from_dict({**CROSS_SMA, "min_bars": 40}).min_bars == 40
+
+    ema_rsi = STRATEGIES.get(STRATEGY_EMA_RSI)
+    assert ema_rsi.min_bars == 55
+    assert derive_strategy(ema_rsi, "EMA_RSI_SLOW_80", {"indicators.ema_slow.period": 80}).min_bars == 81
+    assert derive_strategy(ema_rsi, "EMA_RSI_FAST_10", {"indicators.ema_fast.period": 10}).min_bars == 55
+
+
+def test_registry_rejects_plugin_whose_live_and_batch_disagree():
+    class Broken(RuleStrategy):
+        def evaluate_batch(self, rows):
+            result = super().evaluate_batch(rows)
+            result.entry = [[not hit for hit in row] for row in result.entry]
+            return result
+
+    spec = strategy_from_dict(CROSS_SMA)
+    broken = Broken(
+        "broken", "", "", spec.interval, spec.bars, spec.indicators, spec.entry_rules, spec.exit_rules
+    )
+    registry = StrategyRegistry(parity_bars=200)
+    with pytest.raises(StrategyError, match="disagree"):
+        registry.register(broken)
+    assert "BROKEN" not in registry
+
+
+def test_live_evaluator_resumes_from_exported_state():
+    strategy = STRATEGIES.get(STRATEGY_EMA_RSI)
+    candles = parity_candles("15m", 360, seed=5)
+    continuous = strategy.live()
+    continuous.feed(candles[:300])
+    continuous.feed(candles[60:360])
+
+    resumed = strategy.live()
+    resumed.feed(candles[:300])
+    saved = json.loads(json.dumps(resumed.state()))
+    restored = strategy.live()
+    restored.load(saved)
+    restored.feed(candles[60:360])
+
+    assert restored.entry() == continuous.entry()
+    assert restored.exit() == continuous.exit()
+    assert continuous.count == 360
+
+
+def test_json_defined_strategy_registers_and_drives_runner(tmp_path, runner):
+    path = tmp_path / "strategies.json"
+    path.write_text(json.dumps({"strategies": [CROSS_SMA]}))
+    registry = StrategyRegistry(parity_bars=200)
+    for builtin in builtin_strategies():
+        registry.register(builtin, check=False)
+
+    assert registry.load_file(str(path)) == ["SMA_10_30_CROSS"]
+    assert registry.overlay_series() == ("ma50", "ema_fast", "ema_slow", "fast", "slow")
+    strategy = registry.get("sma_10_30_cross")
+    assert strategy.min_bars == 31
+    assert strategy_from_dict(strategy.to_dict()).to_dict() == strategy.to_dict()
+
+    runner.strategies = registry
+    assert runner.set_active_strategy("sma_10_30_cross")["success"] is True
+    assert runner.required_interval() == "1h"
+    assert [item["id"] for item in runner.list_strategies()][-1] == "SMA_10_30_CROSS"
+
+
+def test_ma50_keeps_the_forming_bar_and_ema_rsi_waits_for_close(runner, monkeypatch):
+    feeds = {"4h": parity_candles("4h", 90, seed=3), "15m": parity_candles("15m", 300, seed=3)}
+    monkeypatch.setattr(runner.hyperliquid, "get_candles", lambda coin, interval="4h", bars=80: feeds[interval][-bars:])
+
+    ma50, ema_rsi = STRATEGIES.get(STRATEGY_MA50), STRATEGIES.get(STRATEGY_EMA_RSI)
+    assert ma50.closed_only is False and ema_rsi.closed_only is True
+    for strategy, legacy in ((ma50, evaluate_long_ma50_cross_3_candles), (ema_rsi, evaluate_long_ema_rsi_15m)):
+        candles = feeds[strategy.interval]
+        now = int(candles[-1]["open_time"] / 1000) + 60
+        expected = legacy(candles if strategy is ma50 else candles[:-1])
+        got = runner._strategy_signal(strategy, now)
+        assert got["last_candle_open_time"] == expected["last_candle_open_time"]
+        assert got["signal"] == expected["signal"]
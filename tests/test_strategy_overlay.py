@@ -22,7 +22,7 @@ def _mock_candles(count: int = 120):
 def test_overlay_rejects_wrong_interval_for_ema(monkeypatch):
     monkeypatch.setattr(app_main.runner, "get_active_strategy", lambda: app_main.runner.STRATEGY_EMA_RSI)
 
-    result = app_main.strategy_overlay(symbol="ETHUSDT", interval="4h", limit=120)
+    result = app_main._strategy_overlay(symbol="ETHUSDT", interval="4h", limit=120)
 
     assert result["enabled"] is False
     assert result["required_interval"] == "15m"
@@ -33,9 +33,9 @@ def test_overlay_returns_ema_lines_for_ema_strategy(monkeypatch):
     monkeypatch.setattr(app_main.runner, "get_active_strategy", lambda: app_main.runner.STRATEGY_EMA_RSI)
     monkeypatch.setattr(app_main.runner.hyperliquid, "get_candles", lambda coin, interval, bars: _mock_candles(150))
     monkeypatch.setattr(app_main, "get_all_kv", lambda db_path: {})
-    monkeypatch.setattr(app_main.runner, "classify_open_positions", lambda positions: {"strategy_position": None})
+    monkeypatch.setattr(app_main.runner, "classify_open_positions", lambda positions=None: {"strategy_position": None})
 
-    result = app_main.strategy_overlay(symbol="ETHUSDT", interval="15m", limit=150)
+    result = app_main._strategy_overlay(symbol="ETHUSDT", interval="15m", limit=150)
 
     assert result["enabled"] is True
     assert result["strategy"] == app_main.runner.STRATEGY_EMA_RSI
@@ -49,9 +49,9 @@ def test_overlay_returns_ma50_line_for_ma_strategy(monkeypatch):
     monkeypatch.setattr(app_main.runner, "get_active_strategy", lambda: app_main.runner.STRATEGY_MA50)
     monkeypatch.setattr(app_main.runner.hyperliquid, "get_candles", lambda coin, interval, bars: _mock_candles(200))
     monkeypatch.setattr(app_main, "get_all_kv", lambda db_path: {})
-    monkeypatch.setattr(app_main.runner, "classify_open_positions", lambda positions: {"strategy_position": None})
+    monkeypatch.setattr(app_main.runner, "classify_open_positions", lambda positions=None: {"strategy_position": None})
 
-    result = app_main.strategy_overlay(symbol="ETHUSDT", interval="4h", limit=200)
+    result = app_main._strategy_overlay(symbol="ETHUSDT", interval="4h", limit=200)
 
     assert result["enabled"] is True
     assert result["strategy"] == app_main.runner.STRATEGY_MA50
@@ -59,3 +59,33 @@ def test_overlay_returns_ma50_line_for_ma_strategy(monkeypatch):
     assert len(result["ma50"]) > 0
     assert result["ema_fast"] == []
     assert result["ema_slow"] == []
+
+
+def test_overlay_cache_reuses_result_until_next_candle_closes():
+    from BoktoshiBotModule.overlay_cache import OverlayCache
+    from BoktoshiBotModule.strategies import STRATEGIES
+
+    interval_ms = 900000
+    now_ms = 1_700_000_000_000 - (1_700_000_000_000 % interval_ms) + 5_000
+    last_closed = now_ms - 5_000 - interval_ms
+    candles = _mock_candles(150)
+    offset = last_closed - candles[-1]["open_time"]
+    for c in candles:
+        c["open_time"] += offset
+        c["close_time"] = c["open_time"] + interval_ms - 1
+
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return candles
+
+    cache = OverlayCache()
+    ema_rsi = STRATEGIES.get("EMA_RSI_15M_ETH_ONLY")
+    first = cache.get_or_build(ema_rsi, 150, fetch, now_ms=now_ms)
+    second = cache.get_or_build(ema_rsi, 150, fetch, now_ms=now_ms + 60_000)
+    assert first is second
+    assert len(calls) == 1
+
+    cache.get_or_build(ema_rsi, 150, fetch, now_ms=now_ms + interval_ms)
+    assert len(calls) == 2
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.upstream import DeadlineExceeded, UpstreamGate, backoff, deadline, timeout_for
+
+
+def test_deadline_caps_client_timeouts_and_retries():
+    assert timeout_for(15) == 15
+    with deadline(0.5):
+        assert timeout_for(15) <= 0.5
+        with deadline(30):
+            assert timeout_for(15) <= 0.5
+        with pytest.raises(DeadlineExceeded):
+            backoff(1.0)
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            timeout_for(15)
+
+
+def test_gate_limits_concurrency_and_propagates_deadline():
+    gate = UpstreamGate("test", limit=2, timeout_seconds=2.0)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        return timeout_for(15)
+
+    async def main():
+        return await asyncio.gather(*(gate.run(work) for _ in range(6)))
+
+    timeouts = asyncio.run(main())
+    assert max(peak) == 2
+    assert all(t <= 2.0 for t in timeouts)
+    assert gate.status()["in_flight"] == 0
+
+
+def test_gate_abandons_calls_past_deadline():
+    gate = UpstreamGate("slow", limit=1, timeout_seconds=0.1)
+    release = threading.Event()
+
+    async def main():
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            await gate.run(release.wait, 5)
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) < 1.0
+    release.set()
+    assert gate.status()["timeouts"] == 1
@@ -0,0 +1,54 @@
+import struct
+
+from fastapi.testclient import TestClient
+
+import app.main as app_main
+import app.wire as wire
+from app.storage import add_equity_snapshot, add_signal, init_db
+from app.wire import COLUMNAR_JSON, FLOAT64_COLUMNS, dumps, negotiate
+
+
+def test_negotiate_prefers_query_then_accept():
+    assert negotiate("application/json") == "rows"
+    assert negotiate(f"{COLUMNAR_JSON}, application/json") == "columns"
+    assert negotiate(FLOAT64_COLUMNS) == "f64"
+    assert negotiate(FLOAT64_COLUMNS, "columns") == "columns"
+
+
+def test_dumps_matches_with_and_without_orjson(monkeypatch):
+    payload = {"coin": "ETH", "close": [1.5, 2.25], "signal": True, "details": "é"}
+    fast = dumps(payload)
+    monkeypatch.setattr(wire, "orjson", None)
+    assert dumps(payload) == fast == '{"coin":"ETH","close":[1.5,2.25],"signal":true,"details":"é"}'.encode("utf-8")
+
+
+def test_pnl_history_columnar_and_float64(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "bot.db")
+    init_db(db_path)
+    monkeypatch.setattr(app_main, "DB_PATH", db_path)
+    for i in range(300):
+        add_equity_snapshot(db_path, 1700000000 + i, 1000.0 + i, 900.0, 100.0, 0.5, 1000.5 + i)
+    add_signal(db_path, 1700000000, "ETH", "4h", True, "cross")
+    client = TestClient(app_main.app)
+
+    rows = client.get("/api/pnl-history", headers={"Accept-Encoding": "gzip"})
+    assert rows.headers["content-encoding"] == "gzip"
+    assert rows.json()["items"][0]["ts"] == 1700000299
+
+    columns = client.get("/api/pnl-history", headers={"Accept": COLUMNAR_JSON})
+    body = columns.json()
+    assert columns.headers["content-type"].startswith(COLUMNAR_JSON)
+    assert body["count"] == 300
+    assert body["columns"]["t"][:2] == [1700000299, 1700000298]
+    assert columns.headers["etag"] != rows.headers["etag"]
+
+    packed = client.get("/api/pnl-history", headers={"Accept": FLOAT64_COLUMNS})
+    names = packed.headers["x-columns"].split(",")
+    count = int(packed.headers["x-rows"])
+    values = struct.unpack(f"<{len(names) * count}d", packed.content)
+    total_equity = values[names.index("total_equity") * count:][:count]
+    assert total_equity[0] == 1299.5
+
+    signals = client.get("/api/signals?format=f64").json()
+    assert signals["columns"]["coin"] == ["ETH"]
+    assert signals["columns"]["signal"] == [True]